@@ -1,4 +1,3 @@
-import json
 import requests
 import time
 
@@ -7,6 +6,7 @@ from manager import ManagerAlpha
 from agent import Agent
 from polymarket_reader import PolymarketReader
 from strategy_engine import StrategyEngine
+from alpha_system.market.market_normalizer import normalize_market
 
 
 API_URL = "https://gamma-api.polymarket.com/markets"
@@ -16,10 +16,7 @@ EDGE_THRESHOLD = 0.05
 
 
 def parse_prices(market):
-    prices_raw = market.get("outcomePrices", "[null, null]")
-    if isinstance(prices_raw, str):
-        return json.loads(prices_raw)
-    return prices_raw
+    return list(normalize_market(market).prices)
 
 
 class AlphaBot:
@@ -78,16 +75,16 @@ class AlphaBot:
 
     def is_tradable(self, market):
 
-        if market.get("closed"):
-            return False
+        normalized = normalize_market(market)
 
-        prices = parse_prices(market)
+        if normalized.closed:
+            return False
 
-        if len(prices) < 2:
+        if len(normalized.prices) < 2 or normalized.yes_price is None:
             return False
 
-        yes_price = float(prices[0])
-        volume = float(market.get("volume", 0))
+        yes_price = normalized.yes_price
+        volume = normalized.volume
 
         if volume < MIN_VOLUME:
             return False
@@ -100,8 +97,6 @@ class AlphaBot:
 
     def create_signal(self, market):
 
-        prices = parse_prices(market)
-
         return {
 
             "signal_id": str(market.get("id", "unknown")),
@@ -150,8 +145,7 @@ class AlphaBot:
 
         if status == "APPROVED":
 
-            prices = parse_prices(market)
-            price = float(prices[0])
+            price = normalize_market(market).yes_price
 
             order = self.execution_engine.create_order(
                 market_title=alpha_decision.get("market", signal["market"]),
@@ -0,0 +1,362 @@
+"""
+Concurrent Ensemble — évaluation parallèle des modèles IA.
+
+Fan-out de tous les modèles en parallèle avec :
+- deadline par modèle (ENSEMBLE_MODEL_DEADLINE / ENSEMBLE_MODEL_DEADLINES)
+- deadline globale (ENSEMBLE_DEADLINE)
+- sortie anticipée dès que la décision est acquise :
+    "best"   : premier trade >= ENSEMBLE_EARLY_EXIT_CONFIDENCE, sinon
+               meilleure confiance une fois tous les modèles revenus
+    "quorum" : ENSEMBLE_QUORUM modèles d'accord (trade, même side)
+- annulation des retardataires
+- ModelRouter optionnel : sous-ensemble de modèles par marché et requête
+  dupliquée (hedge) vers un modèle de secours au-delà du p95 du primaire
+
+Les threads Python ne sont pas interruptibles : l'annulation passe par un
+contexte d'appel (thread-local) que les clients IA consultent —
+call_timeout() borne le timeout HTTP, call_sleep() / call_cancelled()
+coupent les retries. call_deadline() pose une deadline sur le thread
+appelant (timeout d'étape du Pipeline) ; un ensemble lancé sous cette
+deadline la reprend comme borne de sa deadline globale.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from alpha_system.core.tracer import get_tracer
+
+
+NO_TRADE = {"trade": False, "side": "NO", "confidence": 0}
+
+
+# ============================================
+# CALL CONTEXT (thread-local)
+# ============================================
+
+_context = threading.local()
+
+
+def call_timeout(default):
+    """Timeout HTTP borné par la deadline de l'appel en cours."""
+
+    deadline = getattr(_context, "deadline", None)
+    if deadline is None:
+        return default
+
+    return max(0.1, min(default, deadline - time.monotonic()))
+
+
+def call_cancelled():
+    """True si l'appel en cours est annulé ou a dépassé sa deadline."""
+
+    cancel = getattr(_context, "cancel", None)
+    if cancel is not None and cancel.is_set():
+        return True
+
+    deadline = getattr(_context, "deadline", None)
+    return deadline is not None and time.monotonic() >= deadline
+
+
+@contextmanager
+def call_deadline(seconds):
+    """Deadline des appels IA du thread courant pour la durée du bloc
+    (None : pas de borne). Une deadline englobante plus proche est gardée."""
+
+    previous = getattr(_context, "deadline", None)
+    if seconds is not None:
+        deadline = time.monotonic() + seconds
+        _context.deadline = deadline if previous is None else min(previous, deadline)
+
+    try:
+        yield
+    finally:
+        _context.deadline = previous
+
+
+def call_sleep(seconds):
+    """Pause interruptible (backoff entre retries). True si annulé."""
+
+    cancel = getattr(_context, "cancel", None)
+    deadline = getattr(_context, "deadline", None)
+
+    if deadline is not None:
+        seconds = min(seconds, max(0, deadline - time.monotonic()))
+
+    if cancel is None:
+        time.sleep(seconds)
+    else:
+        cancel.wait(seconds)
+
+    return call_cancelled()
+
+
+# ============================================
+# CONCURRENT ENSEMBLE
+# ============================================
+
+class ConcurrentEnsemble:
+    """Exécuteur d'ensemble parallèle — même forme de résultat que les modèles."""
+
+    def __init__(self, evaluators, config=None, errors=None, router=None):
+        """evaluators : liste de (model, callable(market) -> résultat).
+        router : ModelRouter optionnel (sélection des modèles + hedging)."""
+
+        config = config or {}
+
+        self.evaluators = list(evaluators)
+        self.fns = dict(self.evaluators)
+        self.errors = errors
+        self.router = router
+        self.tracer = get_tracer()
+
+        self.policy = config.get("ENSEMBLE_POLICY", "best")
+        self.quorum = config.get("ENSEMBLE_QUORUM", 2)
+        self.early_exit_confidence = config.get("ENSEMBLE_EARLY_EXIT_CONFIDENCE", 0.75)
+        self.deadline = config.get("ENSEMBLE_DEADLINE", 30)
+        self.model_deadline = config.get("ENSEMBLE_MODEL_DEADLINE", 20)
+        self.model_deadlines = config.get("ENSEMBLE_MODEL_DEADLINES", {})
+
+        self.executor = ThreadPoolExecutor(
+            max_workers=config.get("ENSEMBLE_MAX_WORKERS", 4 * max(1, len(self.evaluators))),
+            thread_name_prefix="ensemble",
+        )
+
+        # Metrics
+        self.lock = threading.Lock()
+        self.evaluations = 0
+        self.early_exits = 0
+        self.timeouts = {model: 0 for model, _ in self.evaluators}
+        self.cancelled = 0
+        self.total_latency = 0.0
+
+    # ============================================
+    # EVALUATE
+    # ============================================
+
+    def evaluate(self, market):
+        """Meilleur résultat retenu par la politique, ou None."""
+
+        return self.evaluate_detailed(market)["best"]
+
+    def evaluate_detailed(self, market):
+        """Retourne {best, results, early_exit, elapsed}."""
+
+        start = time.monotonic()
+        overall = start + self.deadline
+        cancel = threading.Event()
+
+        # Appelant sous deadline (timeout d'étape) : borne la deadline globale
+        caller = getattr(_context, "deadline", None)
+        if caller is not None:
+            overall = min(overall, caller)
+
+        models = self.router.select(market) if self.router else list(self.fns)
+
+        # Un groupe par modèle sélectionné : primaire + secours éventuel (hedge)
+        groups = {}
+        owners = {}   # future -> (groupe, modèle appelé, instant de soumission)
+        for model in models:
+            deadline = min(overall, start + self.model_deadlines.get(model, self.model_deadline))
+            future = self.executor.submit(self._call, self.fns[model], market, model, deadline, cancel)
+            owners[future] = (model, model, start)
+
+            hedge_at, backup = None, None
+            if self.router:
+                delay = self.router.hedge_delay(model)
+                backup = self.router.backup_for(model, models) if delay is not None else None
+                if backup is not None:
+                    hedge_at = start + delay
+
+            groups[model] = {"deadline": deadline, "hedge_at": hedge_at, "backup": backup,
+                             "futures": [future], "hedged": False}
+
+        pending = set(groups)
+        results = []
+        best, final = None, False
+
+        while pending and not final:
+
+            now = time.monotonic()
+
+            # Deadline par modèle dépassée -> retardataire
+            for group in [g for g in pending if groups[g]["deadline"] <= now]:
+                pending.discard(group)
+                self._count_timeout(group)
+                if self.router:
+                    self.router.record(group, now - start, False)
+
+            # Primaire au-delà de son p95 -> requête dupliquée vers le secours
+            for group in pending:
+                info = groups[group]
+                if info["hedge_at"] is not None and info["hedge_at"] <= now:
+                    backup = info["backup"]
+                    future = self.executor.submit(self._call, self.fns[backup], market,
+                                                  backup, info["deadline"], cancel)
+                    owners[future] = (group, backup, now)
+                    info["futures"].append(future)
+                    info["hedge_at"] = None
+                    info["hedged"] = True
+
+            if not pending:
+                break
+
+            events = [groups[g]["deadline"] for g in pending]
+            events += [groups[g]["hedge_at"] for g in pending if groups[g]["hedge_at"] is not None]
+            active = [f for g in pending for f in groups[g]["futures"]]
+
+            done, _ = wait(active, timeout=max(0, min(events) - now), return_when=FIRST_COMPLETED)
+
+            now = time.monotonic()
+            for future in done:
+                group, model, submitted_at = owners[future]
+                if group not in pending:
+                    continue  # perdant d'un hedge déjà résolu
+
+                pending.discard(group)
+
+                # Revenu après sa deadline (fallback d'un appel coupé) -> ignoré
+                if now >= groups[group]["deadline"]:
+                    self._count_timeout(group)
+                    continue
+
+                result = future.result()
+                results.append(result)
+
+                if self.router:
+                    # Latence propre à l'appel (hedge : depuis sa soumission) ;
+                    # un hit cache ne dit rien de la latence du modèle
+                    if not self._cached(result):
+                        self.router.record(model, now - submitted_at, self._succeeded(result))
+                    if groups[group]["hedged"]:
+                        self.router.record_hedge(group, groups[group]["backup"], model != group)
+
+            best, final = self._decide(results, len(pending))
+
+        if not final:
+            best, _ = self._decide(results, 0)
+
+        if self.router:
+            self._record_agreement(best, results)
+
+        # Annule les retardataires (et les perdants des hedges)
+        early_exit = bool(pending)
+        cancel.set()
+        for future in owners:
+            future.cancel()
+
+        elapsed = time.monotonic() - start
+        with self.lock:
+            self.evaluations += 1
+            self.total_latency += elapsed
+            if early_exit:
+                self.early_exits += 1
+                self.cancelled += len(pending)
+
+        return {
+            "best": best,
+            "results": results,
+            "early_exit": early_exit,
+            "elapsed": round(elapsed, 3),
+        }
+
+    # ============================================
+    # POLICY
+    # ============================================
+
+    def _decide(self, results, remaining):
+        """(best, final) — final = la décision ne peut plus changer."""
+
+        trades = [r for r in results if r.get("trade", False)]
+
+        if self.policy == "quorum":
+            by_side = {}
+            for r in trades:
+                by_side.setdefault(r.get("side"), []).append(r)
+
+            for side_trades in by_side.values():
+                if len(side_trades) >= self.quorum:
+                    return max(side_trades, key=lambda x: x.get("confidence", 0)), True
+
+            # Quorum devenu impossible
+            agreeing = max((len(v) for v in by_side.values()), default=0)
+            if agreeing + remaining < self.quorum:
+                return None, True
+
+            return None, False
+
+        # "best"
+        best = max(trades, key=lambda x: x.get("confidence", 0)) if trades else None
+
+        if best is not None and best.get("confidence", 0) >= self.early_exit_confidence:
+            return best, True
+
+        return best, remaining == 0
+
+    # ============================================
+    # INTERNAL
+    # ============================================
+
+    def _call(self, fn, market, model, deadline, cancel):
+
+        _context.deadline = deadline
+        _context.cancel = cancel
+
+        try:
+            with self.tracer.span(market, f"model:{model}"):
+                result = fn(market)
+            if not isinstance(result, dict):
+                return dict(NO_TRADE, model=model)
+            return result
+
+        except Exception as e:
+            if self.errors:
+                self.errors.handle(e, f"ai_{model}")
+            return dict(NO_TRADE, model=model, source="error")
+
+        finally:
+            _context.deadline = None
+            _context.cancel = None
+
+    @staticmethod
+    def _succeeded(result):
+        """Réponse exploitable (pas un fallback, une erreur ou un miss replay)."""
+
+        return result.get("source", "ai") not in ("fallback", "error", "replay_miss")
+
+    @staticmethod
+    def _cached(result):
+
+        return bool(result.get("cached")) or result.get("source") == "cache"
+
+    def _record_agreement(self, best, results):
+
+        for result in results:
+            if best is None:
+                agreed = not result.get("trade", False)
+            else:
+                agreed = result.get("trade", False) and result.get("side") == best.get("side")
+            self.router.record_agreement(result.get("model"), agreed)
+
+    def _count_timeout(self, model):
+
+        with self.lock:
+            self.timeouts[model] = self.timeouts.get(model, 0) + 1
+
+    def shutdown(self):
+        """Libère le pool sans attendre les retardataires."""
+
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_status(self):
+
+        with self.lock:
+            return {
+                "policy": self.policy,
+                "evaluations": self.evaluations,
+                "early_exits": self.early_exits,
+                "cancelled": self.cancelled,
+                "timeouts": dict(self.timeouts),
+                "avg_latency": round(self.total_latency / max(1, self.evaluations), 3),
+            }
@@ -1,10 +1,128 @@
+"""
+Confidence Manager — seuil de confidence + calibration par modèle.
+
+Calibration incrémentale (reliability diagram) :
+- un ring buffer borné (CALIBRATION_WINDOW) par modèle
+- bins de confidence prédite (CALIBRATION_BINS) : trades et gains par bin,
+  mis à jour en O(1) à chaque résultat (ajout + éviction du plus ancien)
+- confidence calibrée = win rate réalisé du bin, lissé vers la confidence
+  brute (CALIBRATION_PRIOR pseudo-trades), optionnellement rendu monotone
+  par régression isotonique (pool adjacent violators sur les bins)
+
+validate() compare la confidence calibrée du modèle au seuil global ;
+tant qu'un modèle a moins de CALIBRATION_MIN_SAMPLES résultats, sa
+confidence brute est utilisée.
+"""
+
+import threading
+from collections import deque
+
+
+class _Calibrator:
+    """Reliability diagram glissant d'un modèle."""
+
+    def __init__(self, bins, window, prior, isotonic):
+
+        self.bins = bins
+        self.prior = prior
+        self.isotonic = isotonic
+
+        self.history = deque(maxlen=window)     # (bin, won)
+        self.counts = [0] * bins
+        self.wins = [0] * bins
+        self.mapping = None                     # cache isotonique, invalidé à chaque ajout
+
+    def bin_of(self, confidence):
+        return min(self.bins - 1, max(0, int(confidence * self.bins)))
+
+    def record(self, confidence, won):
+
+        if len(self.history) == self.history.maxlen:
+            old_bin, old_won = self.history[0]
+            self.counts[old_bin] -= 1
+            self.wins[old_bin] -= old_won
+
+        b = self.bin_of(confidence)
+        self.history.append((b, int(won)))
+        self.counts[b] += 1
+        self.wins[b] += int(won)
+        self.mapping = None
+
+    def _smoothed(self, b):
+        """Win rate du bin, lissé vers le centre du bin."""
+
+        center = (b + 0.5) / self.bins
+        if self.counts[b] + self.prior == 0:
+            return center
+        return (self.wins[b] + self.prior * center) / (self.counts[b] + self.prior)
+
+    def _isotonic(self):
+        """PAV sur les bins (pondérés par trades + prior) — O(bins)."""
+
+        blocks = []   # [valeur, poids, nb_bins]
+        for b in range(self.bins):
+            # Bin vide : poids quasi nul, ne déplace pas ses voisins
+            blocks.append([self._smoothed(b), max(self.counts[b] + self.prior, 1e-6), 1])
+            while len(blocks) > 1 and blocks[-2][0] > blocks[-1][0]:
+                v2, w2, n2 = blocks.pop()
+                v1, w1, n1 = blocks.pop()
+                blocks.append([(v1 * w1 + v2 * w2) / (w1 + w2), w1 + w2, n1 + n2])
+
+        mapping = []
+        for value, _, n in blocks:
+            mapping.extend([value] * n)
+        return mapping
+
+    def calibrate(self, confidence):
+
+        b = self.bin_of(confidence)
+
+        if not self.isotonic:
+            return self._smoothed(b)
+
+        if self.mapping is None:
+            self.mapping = self._isotonic()
+        return self.mapping[b]
+
+    def __len__(self):
+        return len(self.history)
+
+    def get_status(self):
+
+        total = len(self.history)
+        ece = 0.0
+        diagram = []
+        for b in range(self.bins):
+            if not self.counts[b]:
+                continue
+            center = (b + 0.5) / self.bins
+            winrate = self.wins[b] / self.counts[b]
+            ece += self.counts[b] / total * abs(winrate - center)
+            diagram.append((round(center, 2), self.counts[b], round(winrate, 2)))
+
+        return {"samples": total, "ece": round(ece, 3), "diagram": diagram}
+
+
 class ConfidenceManager:
     """Filtre décisions IA par confidence — empêche trades faibles."""
 
     def __init__(self, config):
 
         self.threshold = config["CONFIDENCE_THRESHOLD"]
-        self.outcomes = []
+
+        # Seuil global : win rate glissant sur 50 trades (compteur incrémental)
+        self.outcomes = deque(maxlen=50)
+        self.recent_wins = 0
+
+        # Calibration par modèle
+        self.window = config.get("CALIBRATION_WINDOW", 200)
+        self.bins = config.get("CALIBRATION_BINS", 10)
+        self.min_samples = config.get("CALIBRATION_MIN_SAMPLES", 30)
+        self.prior = config.get("CALIBRATION_PRIOR", 5)
+        self.isotonic = config.get("CALIBRATION_ISOTONIC", True)
+        self.calibrators = {}
+
+        self.lock = threading.Lock()
 
     def should_trade(self, confidence):
         """Retourne True si la confidence justifie un trade."""
@@ -22,39 +140,101 @@ class ConfidenceManager:
 
         return self.threshold
 
-    def record_outcome(self, confidence, won):
-        """Enregistre le résultat d'un trade pour ajustement futur."""
+    def calibrate(self, confidence, model=""):
+        """Confidence calibrée du modèle (brute tant que l'historique est court)."""
+
+        with self.lock:
+            calibrator = self.calibrators.get(model)
+            if calibrator is None or len(calibrator) < self.min_samples:
+                return confidence
+            return round(calibrator.calibrate(confidence), 4)
+
+    def record_outcome(self, confidence, won, model=""):
+        """Enregistre le résultat d'un trade — O(1)."""
 
-        self.outcomes.append({
-            "confidence": confidence,
-            "won": won,
-        })
+        with self.lock:
+            if len(self.outcomes) == self.outcomes.maxlen:
+                self.recent_wins -= self.outcomes[0]
+            self.outcomes.append(bool(won))
+            self.recent_wins += bool(won)
 
-        # Auto-ajustement tous les 50 trades
-        if len(self.outcomes) >= 50:
-            self._auto_adjust()
+            if isinstance(confidence, (int, float)) and 0 <= confidence <= 1:
+                calibrator = self.calibrators.get(model)
+                if calibrator is None:
+                    calibrator = _Calibrator(self.bins, self.window, self.prior, self.isotonic)
+                    self.calibrators[model] = calibrator
+                calibrator.record(confidence, won)
+
+            # Auto-ajustement dès 50 trades
+            if len(self.outcomes) >= 50:
+                self._auto_adjust()
 
     def validate(self, decision):
-        """Valide la confidence d'une décision. Retourne (ok, reason)."""
+        """Valide la confidence calibrée d'une décision. Retourne (ok, reason)."""
 
         if decision is None:
             return False, "no decision"
 
         confidence = decision.get("confidence", 0)
 
-        if not self.should_trade(confidence):
-            return False, f"confidence {confidence} < threshold {self.threshold}"
+        if not isinstance(confidence, (int, float)) or not 0 <= confidence <= 1:
+            return False, f"confidence {confidence} invalid"
+
+        calibrated = self.calibrate(confidence, decision.get("model", ""))
 
-        return True, f"confidence {confidence} OK"
+        if not self.should_trade(calibrated):
+            return False, f"confidence {confidence} (calibrated {calibrated}) < threshold {self.threshold}"
+
+        return True, f"confidence {confidence} (calibrated {calibrated}) OK"
+
+    # ============================================
+    # WARM START (snapshot)
+    # ============================================
+
+    def export_state(self):
+        """Seuil, résultats récents et historique de calibration (bins) par modèle."""
+
+        with self.lock:
+            return {
+                "threshold": self.threshold,
+                "outcomes": [int(o) for o in self.outcomes],
+                "bins": self.bins,
+                "calibrators": {m: [list(h) for h in c.history] for m, c in self.calibrators.items()},
+            }
+
+    def restore_state(self, state):
+        """Recharge un export (calibration ignorée si CALIBRATION_BINS a changé)."""
+
+        with self.lock:
+            self.threshold = state.get("threshold", self.threshold)
+
+            self.outcomes.clear()
+            self.outcomes.extend(bool(o) for o in state.get("outcomes", []))
+            self.recent_wins = sum(self.outcomes)
+
+            if state.get("bins") != self.bins:
+                return
+
+            for model, history in state.get("calibrators", {}).items():
+                calibrator = _Calibrator(self.bins, self.window, self.prior, self.isotonic)
+                for b, won in history:
+                    calibrator.record((b + 0.5) / self.bins, won)
+                self.calibrators[model] = calibrator
 
     def _auto_adjust(self):
         """Ajuste le seuil en fonction des résultats récents."""
 
-        recent = self.outcomes[-50:]
-        wins = [o for o in recent if o["won"]]
-        winrate = len(wins) / len(recent)
+        winrate = self.recent_wins / len(self.outcomes)
 
         if winrate < 0.45:
             self.threshold = min(0.90, self.threshold + 0.05)
         elif winrate > 0.65:
             self.threshold = max(0.55, self.threshold - 0.02)
+
+    def get_status(self):
+
+        with self.lock:
+            return {
+                "threshold": self.threshold,
+                "models": {m: c.get_status() for m, c in self.calibrators.items()},
+            }
@@ -1,4 +1,5 @@
 from alpha_system.ai.agent_brain import AgentBrain
+from alpha_system.ai.concurrent_ensemble import ConcurrentEnsemble
 
 
 class EnsembleEngine:
@@ -10,30 +11,36 @@ class EnsembleEngine:
             AgentBrain("glm-5"),
         ]
 
+        # Agents en parallèle — sortie dès le premier trade >= 0.65
+        self.executor = ConcurrentEnsemble(
+            [(agent.model, self._tagged(agent)) for agent in self.agents],
+            config={"ENSEMBLE_EARLY_EXIT_CONFIDENCE": 0.65},
+        )
+
+    @staticmethod
+    def _tagged(agent):
+        return lambda market: dict(agent.evaluate(market), model=agent.model)
+
     def evaluate(self, market):
 
         print(f"\n=== ENSEMBLE ENGINE ===")
         print(f"Market: {market['market']}")
 
-        results = []
-        for agent in self.agents:
-            result = agent.evaluate(market)
-            results.append(result)
+        evaluation = self.executor.evaluate_detailed(market)
+
+        for result in evaluation["results"]:
             trade = result.get("trade", False)
             conf = result.get("confidence", 0)
             side = result.get("side", "?")
-            print(f"  [{agent.model}] trade:{trade} confidence:{conf} side:{side}")
+            print(f"  [{result.get('model', '?')}] trade:{trade} confidence:{conf} side:{side}")
 
-        # Filtrer les TRADE
-        trades = [r for r in results if r.get("trade", False)]
+        # Meilleure confiance parmi les TRADE
+        best = evaluation["best"]
 
-        if not trades:
+        if best is None:
             print("  Ensemble verdict: REJECT")
             return None
 
-        # Meilleure confiance
-        best = max(trades, key=lambda x: x.get("confidence", 0))
-
         if best.get("confidence", 0) < 0.65:
             print("  Ensemble verdict: REJECT (low confidence)")
             return None
@@ -0,0 +1,137 @@
+"""
+Heuristic Scorer — pré-score vectorisé (NumPy) de tout l'univers scanné.
+
+Même heuristique que les fallbacks (SecureAIClient, OllamaClient, AIEngine,
+StrategyEngine) — distance au prix 0.50 — mais calculée en un seul passage
+sur tous les marchés :
+
+    confidence   = min(2 x |p - 0.5|, 0.95)       side = YES si p > 0.5
+    size         = ProfitOptimizer (1% capital x confidence, borné)
+    expected_net = size x edge x confidence - coûts CostCalculator
+
+Masque de rejet : un marché n'atteint l'IA que si sa borne haute peut
+encore passer les contrôles aval —
+    - expected_net > 0 à la borne de confidence (check coûts de
+      CostCalculator.validate) : rejette les marchés non rentables même
+      si l'IA répondait avec confidence maximale
+    - borne de confidence >= seuil courant de ConfidenceManager
+
+Borne = heuristique + HEURISTIC_CONFIDENCE_MARGIN (max 1). Par défaut la
+marge vaut 1.0 : borne = 1, seul le masque coûts s'applique (la
+confidence IA n'est pas liée à la distance au prix). Une marge < 1 est
+opt-in : elle suppose que l'IA ne dépasse jamais l'heuristique de plus
+que la marge — ex: 0.4 écarte tout marché entre 0.325 et 0.675 avec un
+seuil de 0.75.
+
+rank() retourne les marchés admis, meilleur expected_net d'abord.
+"""
+
+import numpy as np
+
+
+MAX_HEURISTIC_CONFIDENCE = 0.95
+
+# Codes de rejet (tableau "reason")
+ADMITTED = 0
+REJECT_CONFIDENCE = 1
+REJECT_COST = 2
+
+REASONS = {ADMITTED: "admitted", REJECT_CONFIDENCE: "confidence", REJECT_COST: "cost"}
+
+
+class HeuristicScorer:
+    """Score heuristique + masque de rejet, en batch NumPy."""
+
+    def __init__(self, config):
+
+        self.threshold = config["CONFIDENCE_THRESHOLD"]
+        self.margin = config.get("HEURISTIC_CONFIDENCE_MARGIN", 1.0)
+        self.max_trade_size = config["MAX_TRADE_SIZE"]
+
+        # Coûts (mêmes paramètres que CostCalculator)
+        self.taker_fee = config["TAKER_FEE"]
+        self.base_slippage = config["BASE_SLIPPAGE"]
+        self.max_slippage = config["MAX_SLIPPAGE"]
+
+        # Stats
+        self.scored = 0
+        self.rejected = {REJECT_CONFIDENCE: 0, REJECT_COST: 0}
+
+    # ============================================
+    # VECTORISÉ
+    # ============================================
+
+    def _size(self, capital, confidence):
+        """ProfitOptimizer.calculate_size vectorisé."""
+
+        size = np.round(capital * 0.01 * confidence, 2)
+        return np.maximum(0.1, np.minimum(size, self.max_trade_size))
+
+    def _net(self, size, edge, confidence):
+        """CostCalculator.is_trade_worth_it vectorisé -> expected_net."""
+
+        fee = size * self.taker_fee
+        size_factor = np.minimum(size / 100, 1.0)
+        slippage = size * (self.base_slippage + (self.max_slippage - self.base_slippage) * size_factor)
+
+        return size * edge * confidence - (fee + slippage)
+
+    def score(self, markets, capital, threshold=None):
+        """Score tous les marchés. Retourne un dict de tableaux alignés sur markets."""
+
+        threshold = self.threshold if threshold is None else threshold
+
+        prices = np.fromiter((m.get("price") or 0 for m in markets), dtype=float, count=len(markets))
+
+        edge = np.abs(prices - 0.5)
+        confidence = np.minimum(edge * 2, MAX_HEURISTIC_CONFIDENCE)
+        expected_net = self._net(self._size(capital, confidence), edge, confidence)
+
+        # Borne haute : la confidence IA peut dépasser l'heuristique de margin (1.0 : toujours 1)
+        bound = np.minimum(confidence + self.margin, 1.0)
+        bound_net = self._net(self._size(capital, bound), edge, bound)
+
+        reason = np.full(len(markets), ADMITTED, dtype=np.int8)
+        reason[bound_net <= 0] = REJECT_COST
+        reason[bound < threshold] = REJECT_CONFIDENCE
+
+        self.scored += len(markets)
+        self.rejected[REJECT_CONFIDENCE] += int(np.count_nonzero(reason == REJECT_CONFIDENCE))
+        self.rejected[REJECT_COST] += int(np.count_nonzero(reason == REJECT_COST))
+
+        return {
+            "confidence": confidence,
+            "side_yes": prices > 0.5,
+            "expected_net": expected_net,
+            "bound": bound,
+            "rejected": reason != ADMITTED,
+            "reason": reason,
+        }
+
+    def rank(self, markets, capital, threshold=None):
+        """Marchés admis, triés par expected_net décroissant."""
+
+        if not markets:
+            return []
+
+        scores = self.score(markets, capital, threshold)
+        admitted = np.flatnonzero(~scores["rejected"])
+        order = admitted[np.argsort(-scores["expected_net"][admitted], kind="stable")]
+
+        return [markets[i] for i in order]
+
+    def admit(self, market, capital, threshold=None):
+        """Version unitaire (flux WebSocket)."""
+
+        return not bool(self.score([market], capital, threshold)["rejected"][0])
+
+    def get_status(self):
+
+        rejected = sum(self.rejected.values())
+        return {
+            "scored": self.scored,
+            "rejected": rejected,
+            "rejected_confidence": self.rejected[REJECT_CONFIDENCE],
+            "rejected_cost": self.rejected[REJECT_COST],
+            "reject_rate": round(rejected / max(1, self.scored) * 100, 1),
+        }
@@ -0,0 +1,266 @@
+"""
+Local AI Server — stand-in Ollama /api/chat pour tests de charge et de chaos.
+
+Implémente la forme requête / réponse d'Ollama :
+    POST /api/chat {"model", "messages": [{"role", "content"}], "stream"}
+    -> {"message": {"role": "assistant", "content": ...}, "done": true}
+    -> stream : NDJSON chunké, un chunk {"message": {...}, "done": false} par morceau
+
+Comportement scriptable par modèle (clé "*" = défaut) :
+    latency        secondes (moyenne)          jitter          écart-type
+    error_rate     proba HTTP 500              malformed_rate  proba JSON invalide
+    timeout_rate   proba de bloquer hang s     hang            durée du blocage
+    verbose        texte ajouté après le JSON  chunk_size      caractères par chunk
+
+Réponses déterministes : la décision dépend uniquement de (seed, modèle,
+marché, prix) et le tirage des incidents de (seed, modèle, marché, n° d'appel)
+— un run est reproductible quel que soit l'ordonnancement des threads.
+
+Usage :
+    in-process : server = LocalAIServer({"glm-5": {"latency": 0.5}}).start()
+                 CONFIG["AI_API_URL"] = server.url
+    subprocess : python -m alpha_system.ai.local_ai_server --port 11434 --behaviours b.json
+                 ALPHA_AI_API_URL=http://127.0.0.1:11434/api/chat python -m alpha_system.main
+"""
+
+import hashlib
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+DEFAULT_BEHAVIOUR = {
+    "latency": 0.05,
+    "jitter": 0.0,
+    "error_rate": 0.0,
+    "malformed_rate": 0.0,
+    "timeout_rate": 0.0,
+    "hang": 120,
+    "verbose": "",
+    "chunk_size": 16,
+}
+
+SINGLE_PATTERN = re.compile(r"Market: (.+)\nPrice: ([0-9.]+)")
+BATCH_PATTERN = re.compile(r"- id (\d+): Market: (.+?) \| Price: ([0-9.]+)")
+
+
+class LocalAIServer:
+    """Serveur HTTP local, lancé dans un thread (in-process) ou en CLI."""
+
+    def __init__(self, behaviours=None, host="127.0.0.1", port=0, seed=0):
+
+        self.behaviours = behaviours or {}
+        self.seed = seed
+        self.lock = threading.Lock()
+        self.calls = {}            # (model, prompt hash) -> n
+        self.stats = {}            # model -> {requests, errors, malformed, timeouts}
+
+        handler = type("Handler", (_ChatHandler,), {"server_ref": self})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/api/chat"
+
+    # ============================================
+    # LIFECYCLE
+    # ============================================
+
+    def start(self):
+        """Démarre en arrière-plan. Retourne self."""
+
+        self.thread = threading.Thread(target=self.httpd.serve_forever,
+                                       name="local-ai-server", daemon=True)
+        self.thread.start()
+        return self
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def stop(self):
+
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    # ============================================
+    # BEHAVIOUR
+    # ============================================
+
+    def behaviour(self, model):
+
+        behaviour = dict(DEFAULT_BEHAVIOUR)
+        behaviour.update(self.behaviours.get("*", {}))
+        behaviour.update(self.behaviours.get(model, {}))
+        return behaviour
+
+    def plan(self, model, prompt):
+        """Tire le scénario d'un appel : (incident, latence, contenu)."""
+
+        behaviour = self.behaviour(model)
+        digest = hashlib.sha1(prompt.encode()).hexdigest()
+
+        with self.lock:
+            key = (model, digest)
+            n = self.calls.get(key, 0)
+            self.calls[key] = n + 1
+            stats = self.stats.setdefault(model, {"requests": 0, "errors": 0,
+                                                  "malformed": 0, "timeouts": 0})
+            stats["requests"] += 1
+
+        rng = random.Random(f"{self.seed}|{model}|{digest}|{n}")
+        latency = max(0.0, rng.gauss(behaviour["latency"], behaviour["jitter"]))
+
+        draw = rng.random()
+        incident = None
+        if draw < behaviour["error_rate"]:
+            incident = "error"
+        elif draw < behaviour["error_rate"] + behaviour["timeout_rate"]:
+            incident = "timeout"
+            latency = behaviour["hang"]
+        elif draw < behaviour["error_rate"] + behaviour["timeout_rate"] + behaviour["malformed_rate"]:
+            incident = "malformed"
+
+        if incident:
+            with self.lock:
+                stats[{"error": "errors", "timeout": "timeouts", "malformed": "malformed"}[incident]] += 1
+
+        if incident == "malformed":
+            content = '{"trade": true, "side": "YES", "confidence": '   # tronqué
+        else:
+            content = self.answer(model, prompt) + behaviour["verbose"]
+
+        return incident, latency, content, behaviour
+
+    def answer(self, model, prompt):
+        """Réponse déterministe — objet unique ou tableau (prompt batch)."""
+
+        batch = BATCH_PATTERN.findall(prompt)
+        if batch:
+            return json.dumps([dict(self.decide(model, market, float(price)), id=int(i))
+                               for i, market, price in batch])
+
+        match = SINGLE_PATTERN.search(prompt)
+        if match is None:
+            return "OK"
+
+        return json.dumps(self.decide(model, match.group(1).strip(), float(match.group(2))))
+
+    def decide(self, model, market, price):
+        """Décision reproductible : signal prix + bruit propre au modèle."""
+
+        rng = random.Random(f"{self.seed}|{model}|{market}|{price}")
+        distance = abs(price - 0.5)
+        confidence = round(min(0.99, max(0.0, distance * 2 + rng.uniform(-0.1, 0.1))), 2)
+
+        return {
+            "trade": distance >= 0.1,
+            "side": "YES" if price > 0.5 else "NO",
+            "confidence": confidence,
+        }
+
+    def get_status(self):
+
+        with self.lock:
+            return {"url": self.url, "models": {m: dict(s) for m, s in self.stats.items()}}
+
+
+# ============================================
+# HTTP HANDLER
+# ============================================
+
+class _ChatHandler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+    server_ref = None
+
+    def do_POST(self):
+
+        if self.path.rstrip("/") != "/api/chat":
+            return self._send(404, b"")
+
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            model = payload.get("model", "")
+            prompt = payload["messages"][-1]["content"]
+        except (ValueError, KeyError, IndexError, TypeError):
+            return self._send(400, b"")
+
+        incident, latency, content, behaviour = self.server_ref.plan(model, prompt)
+
+        if incident == "error":
+            time.sleep(latency)
+            return self._send(500, b'{"error": "injected"}')
+
+        try:
+            if payload.get("stream", True):
+                self._stream(model, content, latency, behaviour["chunk_size"])
+            else:
+                time.sleep(latency)
+                body = json.dumps({"model": model, "done": True,
+                                   "message": {"role": "assistant", "content": content}})
+                self._send(200, body.encode())
+        except OSError:
+            pass  # client parti (stream fermé, timeout)
+
+    def _stream(self, model, content, latency, chunk_size):
+        """NDJSON chunké — la latence est répartie sur les chunks."""
+
+        chunks = [content[i:i + chunk_size] for i in range(0, len(content), chunk_size)] or [""]
+        delay = latency / len(chunks)
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        for i, text in enumerate(chunks):
+            time.sleep(delay)
+            line = json.dumps({"model": model, "done": i == len(chunks) - 1,
+                               "message": {"role": "assistant", "content": text}}).encode() + b"\n"
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+            self.wfile.flush()
+
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _send(self, status, body):
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+if __name__ == "__main__":
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Stand-in Ollama /api/chat local")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--behaviours", help="JSON {modèle: {latency, error_rate, ...}}")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    behaviours = {}
+    if args.behaviours:
+        with open(args.behaviours) as f:
+            behaviours = json.load(f)
+
+    server = LocalAIServer(behaviours, host=args.host, port=args.port, seed=args.seed)
+    print(f"Local AI server on {server.url}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+        sys.exit(0)
@@ -0,0 +1,226 @@
+"""
+Model Router — sélection des modèles par latence, fiabilité et accord.
+
+Statistiques par modèle :
+- latence EWMA et p95 (fenêtre glissante)
+- taux de succès (réponse IA valide vs fallback / timeout)
+- taux d'accord avec la décision finale de l'ensemble
+
+Politique (ROUTER_POLICY) :
+    "all"      : tous les modèles, comme avant (hedging seul) — défaut
+    "adaptive" : opt-in, modèles sains triés par score, ROUTER_MAX_MODELS au plus ;
+                 les modèles en warmup sont toujours interrogés et un modèle
+                 écarté est réessayé avec la probabilité ROUTER_EXPLORE
+
+Hedging : si le modèle primaire dépasse son p95, une requête dupliquée
+part vers un modèle de secours non sélectionné — le premier revenu gagne.
+"""
+
+import random
+import threading
+from collections import deque
+
+
+class ModelStats:
+    """Statistiques glissantes d'un modèle."""
+
+    def __init__(self, alpha=0.2, window=200):
+
+        self.alpha = alpha
+        self.ewma_latency = None
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)      # True = réponse valide
+        self.agreements = deque(maxlen=window)    # True = d'accord avec l'ensemble
+        self.selected = 0
+        self.skipped = 0
+        self.hedges_won = 0
+
+    def record(self, latency, success):
+
+        self.latencies.append(latency)
+        self.outcomes.append(bool(success))
+        if self.ewma_latency is None:
+            self.ewma_latency = latency
+        else:
+            self.ewma_latency = self.alpha * latency + (1 - self.alpha) * self.ewma_latency
+
+    def percentile(self, pct):
+
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    @property
+    def samples(self):
+        return len(self.outcomes)
+
+    @property
+    def success_rate(self):
+        return sum(self.outcomes) / len(self.outcomes) if self.outcomes else 1.0
+
+    @property
+    def agreement_rate(self):
+        return sum(self.agreements) / len(self.agreements) if self.agreements else 1.0
+
+
+class ModelRouter:
+    """Choisit, par marché, les modèles à interroger et leur secours."""
+
+    def __init__(self, models, config=None, logger=None):
+
+        config = config or {}
+
+        self.models = list(models)
+        self.log = logger
+
+        self.policy = config.get("ROUTER_POLICY", "all")
+        self.max_models = config.get("ROUTER_MAX_MODELS", 2)
+        self.min_models = config.get("ROUTER_MIN_MODELS", 1)
+        self.min_success = config.get("ROUTER_MIN_SUCCESS", 0.5)
+        self.warmup = config.get("ROUTER_WARMUP", 10)
+        self.explore = config.get("ROUTER_EXPLORE", 0.1)
+        self.hedge = config.get("ROUTER_HEDGE", True)
+        self.hedge_percentile = config.get("ROUTER_HEDGE_PERCENTILE", 95)
+
+        alpha = config.get("ROUTER_EWMA_ALPHA", 0.2)
+        self.stats = {model: ModelStats(alpha) for model in self.models}
+
+        self.lock = threading.Lock()
+        self.routed = 0
+        self.hedges = 0
+
+    # ============================================
+    # SELECTION
+    # ============================================
+
+    def select(self, market=None):
+        """Liste des modèles à interroger pour ce marché."""
+
+        with self.lock:
+            self.routed += 1
+
+            if self.policy == "all":
+                selected = list(self.models)
+            else:
+                selected = self._select_adaptive()
+
+            for model in self.models:
+                if model in selected:
+                    self.stats[model].selected += 1
+                else:
+                    self.stats[model].skipped += 1
+
+        if self.log and len(selected) < len(self.models):
+            name = (market or {}).get("market", "")[:40]
+            skipped = [m for m in self.models if m not in selected]
+            self.log.debug(f"Router [{name}]: {selected} (skipped: {skipped})")
+
+        return selected
+
+    def _select_adaptive(self):
+
+        warming = [m for m in self.models if self.stats[m].samples < self.warmup]
+        healthy = [m for m in self.models
+                   if m not in warming and self.stats[m].success_rate >= self.min_success]
+
+        ranked = sorted(healthy, key=self.score, reverse=True)
+        selected = warming + ranked[:max(0, self.max_models - len(warming))]
+
+        # Toujours au moins min_models (les moins mauvais des restants)
+        if len(selected) < self.min_models:
+            rest = sorted((m for m in self.models if m not in selected), key=self.score, reverse=True)
+            selected += rest[:self.min_models - len(selected)]
+
+        # Exploration : garde des stats fraîches sur les modèles écartés
+        excluded = [m for m in self.models if m not in selected]
+        if excluded and random.random() < self.explore:
+            selected.append(random.choice(excluded))
+
+        # Ordre d'origine (stabilité des logs et du replay)
+        return [m for m in self.models if m in selected]
+
+    def score(self, model):
+        """Plus haut = meilleur : fiabilité x accord / latence."""
+
+        stats = self.stats[model]
+        latency = stats.ewma_latency or 1.0
+        return stats.success_rate * stats.agreement_rate / max(latency, 0.01)
+
+    # ============================================
+    # HEDGING
+    # ============================================
+
+    def hedge_delay(self, model):
+        """Délai avant requête dupliquée (p95 du modèle), None si pas de hedge."""
+
+        if not self.hedge:
+            return None
+
+        with self.lock:
+            stats = self.stats.get(model)
+            if stats is None or stats.samples < self.warmup:
+                return None
+            return stats.percentile(self.hedge_percentile)
+
+    def backup_for(self, model, selected):
+        """Meilleur modèle sain non sélectionné, ou None."""
+
+        with self.lock:
+            candidates = [m for m in self.models
+                          if m != model and m not in selected
+                          and self.stats[m].success_rate >= self.min_success]
+            if not candidates:
+                return None
+            return max(candidates, key=self.score)
+
+    def record_hedge(self, primary, backup, backup_won):
+
+        with self.lock:
+            self.hedges += 1
+            if backup_won:
+                self.stats[backup].hedges_won += 1
+
+        if self.log:
+            winner = backup if backup_won else primary
+            self.log.debug(f"Router hedge: {primary} > p{self.hedge_percentile} -> {backup} | winner: {winner}")
+
+    # ============================================
+    # FEEDBACK
+    # ============================================
+
+    def record(self, model, latency, success):
+
+        with self.lock:
+            if model in self.stats:
+                self.stats[model].record(latency, success)
+
+    def record_agreement(self, model, agreed):
+
+        with self.lock:
+            if model in self.stats:
+                self.stats[model].agreements.append(bool(agreed))
+
+    def get_status(self):
+
+        with self.lock:
+            models = {}
+            for model, stats in self.stats.items():
+                p95 = stats.percentile(self.hedge_percentile)
+                models[model] = {
+                    "ewma_latency": round(stats.ewma_latency or 0, 3),
+                    "p95": round(p95, 3) if p95 is not None else None,
+                    "success_rate": round(stats.success_rate * 100, 1),
+                    "agreement_rate": round(stats.agreement_rate * 100, 1),
+                    "selected": stats.selected,
+                    "skipped": stats.skipped,
+                    "hedges_won": stats.hedges_won,
+                }
+
+            return {
+                "policy": self.policy,
+                "routed": self.routed,
+                "hedges": self.hedges,
+                "models": models,
+            }
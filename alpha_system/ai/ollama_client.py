@@ -1,8 +1,11 @@
 import json
-import requests
 import os
 from dotenv import load_dotenv
 
+from alpha_system.ai.concurrent_ensemble import call_timeout
+from alpha_system.config import CONFIG
+from alpha_system.core.http_pool import get_session_pool
+
 load_dotenv()
 
 
@@ -10,7 +13,8 @@ class OllamaClient:
 
     def __init__(self):
         self.api_key = os.getenv("OLLAMA_API_KEY", "")
-        self.url = "https://ollama.com/api/chat"
+        self.url = CONFIG["AI_API_URL"]
+        self.http = get_session_pool()
 
     def evaluate(self, market, model="deepseek-v3.2"):
 
@@ -30,7 +34,7 @@ Return ONLY valid JSON, no other text:
 {{"trade": true, "side": "YES", "confidence": 0.85}}"""
 
         try:
-            response = requests.post(
+            response = self.http.post(
                 self.url,
                 headers={
                     "Authorization": f"Bearer {self.api_key}",
@@ -41,7 +45,7 @@ Return ONLY valid JSON, no other text:
                     "messages": [{"role": "user", "content": prompt}],
                     "stream": False
                 },
-                timeout=60
+                timeout=self.http.timeout(call_timeout(self.http.read_timeout))
             )
 
             if response.status_code != 200:
@@ -1,9 +1,16 @@
 import json
+import threading
 import time
-import requests
 import os
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
+from alpha_system.ai.concurrent_ensemble import call_timeout, call_cancelled, call_sleep
+from alpha_system.ai.stream_parser import JSONObjectDetector
+from alpha_system.core.http_pool import get_session_pool
+from alpha_system.memory.ai_cache import get_ai_cache
+from alpha_system.protection.circuit_breaker import get_circuit_breaker
+
 load_dotenv()
 
 # Mapping Polymarket YES/NO <-> directive buy/sell/hold/skip
@@ -11,23 +18,89 @@ SIDE_MAP_TO_POLYMARKET = {"buy": "YES", "sell": "NO", "hold": "NO", "skip": "NO"
 SIDE_MAP_FROM_POLYMARKET = {"YES": "buy", "NO": "sell"}
 VALID_SIDES = {"YES", "NO", "buy", "sell", "hold", "skip"}
 
+# À incrémenter à chaque modification du prompt evaluate (invalide le cache IA)
+PROMPT_VERSION = "v1"
+
+BATCH_PROMPT = """Evaluate these prediction markets for trading.
+
+{markets}
+
+Rules:
+- If price is far from 0.50 (strong signal), trade = true
+- If price is close to 0.50 (uncertain), trade = false
+- confidence must be between 0 and 1
+- side = YES if you think the event will happen, NO otherwise
+- one object per market, same id
+
+Return ONLY a valid JSON array:
+[{{"id": 0, "trade": true, "side": "YES", "confidence": 0.85}}]"""
+
+
+# Fin de stream lue hors du chemin de décision (connexion keep-alive rendue au pool)
+_drain_executor = None
+_drain_lock = threading.Lock()
+
+
+def _get_drain_executor():
+
+    global _drain_executor
+
+    with _drain_lock:
+        if _drain_executor is None:
+            _drain_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="ai-drain")
+        return _drain_executor
+
 
 class SecureAIClient:
     """Client IA sécurisé — validation, retry, fallback, benchmark, query()."""
 
-    def __init__(self, config):
+    def __init__(self, config, recorder=None, cache=None):
 
         self.api_key = os.getenv("OLLAMA_API_KEY", "")
-        self.url = "https://ollama.com/api/chat"
-        self.timeout = 60
+        self.url = config.get("AI_API_URL", "https://ollama.com/api/chat")
+        self.timeout = config.get("HTTP_READ_TIMEOUT", 60)
         self.max_retries = 2
+
+        # Streaming NDJSON — décision retournée dès le premier objet valide,
+        # fin du stream drainée en tâche de fond (au plus AI_STREAM_DRAIN_TIMEOUT)
+        self.stream = config.get("AI_STREAM", True)
+        self.drain_timeout = config.get("AI_STREAM_DRAIN_TIMEOUT", 5)
         self.confidence_threshold = config["CONFIDENCE_THRESHOLD"]
 
+        # Batch adaptatif (AIMD sur la latence observée)
+        self.batch_size = config.get("AI_BATCH_SIZE", 8)
+        self.batch_min = config.get("AI_BATCH_MIN", 1)
+        self.batch_max = config.get("AI_BATCH_MAX", 20)
+        self.batch_target_latency = config.get("AI_BATCH_TARGET_LATENCY", 10)
+
+        # Sessions keep-alive partagées (connexions TLS réutilisées)
+        self.http = get_session_pool()
+
+        # Enregistrement session (replay)
+        self.recorder = recorder
+
+        # Cache des réponses IA (SQLite, partagé) — cache=False le désactive.
+        # Tests "is not None" : un cache vide (__len__ == 0) est falsy.
+        if cache is None and config.get("AI_CACHE_ENABLED", True):
+            cache = get_ai_cache()
+        self.cache = None if cache is False else cache
+
         # Benchmark
+        self.cache_hits = 0
         self.total_calls = 0
         self.successful_calls = 0
         self.fallback_calls = 0
         self.total_latency = 0
+        self.batch_calls = 0
+        self.batch_items = 0
+        self.batch_misses = 0
+        self.stream_early_closes = 0
+        self.stream_drained = 0
+        self.stream_discarded = 0
+        self.stream_bad_chunks = 0
+        self.breaker_rejected = 0
+        self.total_ttfd = 0
+        self.ttfd_count = 0
 
     # === QUERY — generic prompt (directive obligatoire) ===
 
@@ -36,11 +109,17 @@ class SecureAIClient:
 
         self.total_calls += 1
 
+        # Breaker ouvert : aucun temps réseau
+        breaker = get_circuit_breaker(f"ai:{model}")
+        if not breaker.allow():
+            self.breaker_rejected += 1
+            return None
+
         for attempt in range(self.max_retries + 1):
             try:
                 start = time.time()
 
-                response = requests.post(
+                response = self.http.post(
                     self.url,
                     headers={
                         "Authorization": f"Bearer {self.api_key}",
@@ -51,18 +130,19 @@ class SecureAIClient:
                         "messages": [{"role": "user", "content": prompt}],
                         "stream": False
                     },
-                    timeout=self.timeout
+                    timeout=self.http.timeout(call_timeout(self.timeout))
                 )
 
                 latency = time.time() - start
                 self.total_latency += latency
 
                 if response.status_code != 200:
-                    if attempt < self.max_retries:
-                        time.sleep(2)
+                    breaker.record_failure()
+                    if attempt < self.max_retries and not breaker.is_open() and not call_sleep(2):
                         continue
                     return None
 
+                breaker.record_success()
                 data = response.json()
                 content = data.get("message", {}).get("content", "")
 
@@ -70,13 +150,13 @@ class SecureAIClient:
                     self.successful_calls += 1
                     return content
 
-                if attempt < self.max_retries:
+                if attempt < self.max_retries and not call_cancelled():
                     continue
                 return None
 
             except Exception:
-                if attempt < self.max_retries:
-                    time.sleep(2)
+                breaker.record_failure()
+                if attempt < self.max_retries and not breaker.is_open() and not call_sleep(2):
                     continue
                 return None
 
@@ -85,7 +165,26 @@ class SecureAIClient:
     # === EVALUATE — market evaluation (existing) ===
 
     def evaluate(self, market, model="deepseek-v3.2"):
-        """Évalue un marché avec validation complète de la réponse."""
+        """Évalue un marché avec validation complète de la réponse.
+        Le cache est consulté avant tout appel réseau (source="cache")."""
+
+        result = self.cache.get(model, PROMPT_VERSION, market) if self.cache is not None else None
+
+        if result is not None:
+            self.cache_hits += 1
+        else:
+            result = self._evaluate(market, model)
+
+            # Seules les vraies réponses IA sont mémorisées (pas les fallbacks)
+            if self.cache is not None and result.get("source") == "ai":
+                self.cache.put(model, PROMPT_VERSION, market, result)
+
+        if self.recorder:
+            self.recorder.record_ai(market, model, result)
+
+        return result
+
+    def _evaluate(self, market, model):
 
         self.total_calls += 1
 
@@ -104,12 +203,19 @@ Rules:
 Return ONLY valid JSON:
 {{"trade": true, "side": "YES", "confidence": 0.85}}"""
 
-        # Retry loop
+        # Breaker ouvert : fallback immédiat, aucun temps réseau
+        breaker = get_circuit_breaker(f"ai:{model}")
+        if not breaker.allow():
+            self.breaker_rejected += 1
+            return self._fallback(market, model)
+
+        # Retry loop — borné par la deadline de l'ensemble (call_timeout / call_sleep)
+        # et interrompu dès que le breaker s'ouvre
         for attempt in range(self.max_retries + 1):
             try:
                 start = time.time()
 
-                response = requests.post(
+                response = self.http.post(
                     self.url,
                     headers={
                         "Authorization": f"Bearer {self.api_key}",
@@ -118,32 +224,43 @@ Return ONLY valid JSON:
                     json={
                         "model": model,
                         "messages": [{"role": "user", "content": prompt}],
-                        "stream": False
+                        "stream": self.stream
                     },
-                    timeout=self.timeout
+                    stream=self.stream,
+                    timeout=self.http.timeout(call_timeout(self.timeout))
                 )
 
-                latency = time.time() - start
-                self.total_latency += latency
-
                 if response.status_code != 200:
-                    if attempt < self.max_retries:
-                        time.sleep(2)
+                    response.close()
+                    self.total_latency += time.time() - start
+                    breaker.record_failure()
+                    if attempt < self.max_retries and not breaker.is_open() and not call_sleep(2):
                         continue
                     return self._fallback(market, model)
 
-                data = response.json()
-                content = data.get("message", {}).get("content", "")
+                if self.stream:
+                    content, result = self._read_stream(response, start)
+                else:
+                    data = response.json()
+                    content = data.get("message", {}).get("content", "")
+                    result = None
 
-                if not content:
-                    if attempt < self.max_retries:
-                        continue
-                    return self._fallback(market, model)
+                latency = time.time() - start
+                self.total_latency += latency
+
+                # Stream terminé sans objet détecté -> parse du texte complet
+                if result is None and content:
+                    result = self._parse_and_validate(content)
 
-                result = self._parse_and_validate(content)
+                # Un seul verdict par tentative, une fois la réponse lue :
+                # succès = décision valide (ou appel annulé par l'ensemble)
+                if result is not None or call_cancelled():
+                    breaker.record_success()
+                else:
+                    breaker.record_failure()
 
                 if result is None:
-                    if attempt < self.max_retries:
+                    if attempt < self.max_retries and not breaker.is_open() and not call_cancelled():
                         continue
                     return self._fallback(market, model)
 
@@ -154,13 +271,223 @@ Return ONLY valid JSON:
                 return result
 
             except Exception as e:
-                if attempt < self.max_retries:
-                    time.sleep(2)
+                breaker.record_failure()
+                if attempt < self.max_retries and not breaker.is_open() and not call_sleep(2):
                     continue
                 return self._fallback(market, model)
 
         return self._fallback(market, model)
 
+    def _read_stream(self, response, start):
+        """Consomme les chunks NDJSON Ollama. Retourne (texte, décision ou None).
+
+        La décision est retournée dès qu'un objet {trade, side, confidence}
+        valide est complet — la suite de la génération n'est pas attendue :
+        elle est drainée en tâche de fond pour que la connexion keep-alive
+        retourne au pool. Le stream n'est fermé (connexion perdue) que sur
+        erreur, annulation ou drain trop long."""
+
+        detector = JSONObjectDetector()
+        parts = []
+        lines = response.iter_lines()
+        handed_off = False
+
+        try:
+            for line in lines:
+                if not line:
+                    continue
+
+                # Ligne tronquée / invalide : ignorée, la suite du stream peut encore conclure
+                try:
+                    chunk = json.loads(line)
+                except ValueError:
+                    self.stream_bad_chunks += 1
+                    continue
+
+                text = chunk.get("message", {}).get("content", "")
+
+                if text:
+                    parts.append(text)
+
+                    for candidate in detector.feed(text):
+                        result = self._parse_and_validate(candidate)
+                        if result is None:
+                            continue
+
+                        ttfd = time.time() - start
+                        self.total_ttfd += ttfd
+                        self.ttfd_count += 1
+                        if not chunk.get("done"):
+                            self.stream_early_closes += 1
+
+                        result["ttfd"] = round(ttfd, 3)
+                        handed_off = self._drain_later(response, lines)
+                        return "".join(parts), result
+
+                # Fin de génération : la boucle se termine avec le body (pas de break)
+                if call_cancelled():
+                    break
+        finally:
+            if not handed_off:
+                response.close()
+
+        return "".join(parts), None
+
+    def _drain_later(self, response, lines):
+        """Lit la fin du stream en tâche de fond. False si le drain n'a pas pu être lancé."""
+
+        if call_cancelled():
+            return False
+
+        deadline = time.monotonic() + self.drain_timeout
+        try:
+            _get_drain_executor().submit(self._drain, response, lines, deadline)
+        except RuntimeError:
+            return False  # executor arrêté (fin de process)
+        return True
+
+    def _drain(self, response, lines, deadline):
+
+        drained = False
+        try:
+            for _ in lines:
+                if time.monotonic() >= deadline:
+                    break
+            else:
+                drained = True
+        except Exception:
+            pass
+        finally:
+            # Body lu en entier : close() rend la connexion au pool, sinon la ferme
+            response.close()
+
+        if drained:
+            self.stream_drained += 1
+        else:
+            self.stream_discarded += 1
+
+    # === EVALUATE BATCH — N marchés par prompt ===
+
+    def evaluate_batch(self, markets, model="deepseek-v3.2"):
+        """Évalue plusieurs marchés en un minimum d'appels.
+
+        Retourne une liste de résultats alignée sur markets (même format
+        qu'evaluate). Les items absents ou invalides de la réponse repassent
+        par evaluate() ; un appel batch en échec bascule sur _fallback."""
+
+        results = [None] * len(markets)
+        pending = []
+
+        for i, market in enumerate(markets):
+            cached = self.cache.get(model, PROMPT_VERSION, market) if self.cache is not None else None
+            if cached is not None:
+                self.cache_hits += 1
+                results[i] = cached
+            else:
+                pending.append(i)
+
+        while pending:
+            chunk = pending[:self.batch_size]
+            pending = pending[self.batch_size:]
+
+            batch = self._query_batch([markets[i] for i in chunk], model)
+
+            for pos, i in enumerate(chunk):
+                market = markets[i]
+
+                if batch is None:
+                    result = self._fallback(market, model)
+                elif pos in batch:
+                    result = batch[pos]
+                    if self.cache is not None:
+                        self.cache.put(model, PROMPT_VERSION, market, result)
+                else:
+                    # Item manquant ou invalide -> appel unitaire
+                    self.batch_misses += 1
+                    results[i] = self.evaluate(market, model)
+                    continue
+
+                if self.recorder:
+                    self.recorder.record_ai(market, model, result)
+                results[i] = result
+
+        return results
+
+    def _query_batch(self, markets, model):
+        """Un prompt pour N marchés. Retourne {position: résultat validé} ou None."""
+
+        lines = "\n".join(
+            f"- id {i}: Market: {m['market']} | Price: {m['price']} | Volume: {m.get('volume', 'N/A')}"
+            for i, m in enumerate(markets)
+        )
+
+        start = time.time()
+        content = self.query(BATCH_PROMPT.format(markets=lines), model)
+        latency = time.time() - start
+
+        self.batch_calls += 1
+        self.batch_items += len(markets)
+        self._adapt_batch_size(latency, len(markets))
+
+        if content is None:
+            return None
+
+        items = self._parse_batch(content)
+        if items is None:
+            return None
+
+        per_item = round(latency / max(1, len(markets)), 2)
+        validated = {}
+
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            try:
+                pos = int(item.get("id"))
+            except (TypeError, ValueError):
+                continue
+            if pos < 0 or pos >= len(markets) or pos in validated:
+                continue
+
+            result = self._validate(item)
+            if result is None:
+                continue
+
+            result["model"] = model
+            result["latency"] = per_item
+            result["source"] = "ai"
+            validated[pos] = result
+
+        return validated
+
+    def _parse_batch(self, content):
+        """Extrait le tableau JSON de la réponse batch."""
+
+        try:
+            parsed = json.loads(content.strip())
+        except Exception:
+            start = content.find("[")
+            end = content.rfind("]") + 1
+            if start < 0 or end <= start:
+                return None
+            try:
+                parsed = json.loads(content[start:end])
+            except Exception:
+                return None
+
+        if isinstance(parsed, dict):
+            parsed = parsed.get("results") or parsed.get("markets")
+
+        return parsed if isinstance(parsed, list) else None
+
+    def _adapt_batch_size(self, latency, size):
+        """AIMD : +1 sous la latence cible, /2 au-dessus."""
+
+        if latency > self.batch_target_latency:
+            self.batch_size = max(self.batch_min, self.batch_size // 2)
+        elif size >= self.batch_size:
+            self.batch_size = min(self.batch_max, self.batch_size + 1)
+
     def _parse_and_validate(self, content):
         """Parse et valide strictement la réponse IA."""
 
@@ -180,7 +507,14 @@ Return ONLY valid JSON:
         if parsed is None:
             return None
 
-        # Validation stricte
+        return self._validate(parsed)
+
+    def _validate(self, parsed):
+        """Validation stricte d'une décision parsée (evaluate et batch)."""
+
+        if not isinstance(parsed, dict):
+            return None
+
         if "trade" not in parsed:
             return None
 
@@ -237,10 +571,24 @@ Return ONLY valid JSON:
         avg_latency = round(self.total_latency / max(1, self.total_calls), 2)
         success_rate = round(self.successful_calls / max(1, self.total_calls) * 100, 1)
 
+        # Réutilisation des connexions vers le host IA (pool partagé)
+        http = self.http.get_stats(self.url)
+
         return {
             "total_calls": self.total_calls,
             "successful": self.successful_calls,
             "fallbacks": self.fallback_calls,
             "success_rate": success_rate,
             "avg_latency": avg_latency,
+            "cache_hits": self.cache_hits,
+            "batch_calls": self.batch_calls,
+            "batch_size": self.batch_size,
+            "stream_early_closes": self.stream_early_closes,
+            "stream_drained": self.stream_drained,
+            "stream_discarded": self.stream_discarded,
+            "stream_bad_chunks": self.stream_bad_chunks,
+            "breaker_rejected": self.breaker_rejected,
+            "avg_ttfd": round(self.total_ttfd / max(1, self.ttfd_count), 3),
+            "connections": http["connections"],
+            "reuse_rate": http["reuse_rate"],
         }
@@ -0,0 +1,75 @@
+"""
+Stream Parser — détection incrémentale d'objets JSON dans un flux texte.
+
+Les modèles verbeux produisent souvent l'objet JSON en premier puis
+continuent à générer des explications. JSONObjectDetector reçoit les
+chunks au fil de l'eau (NDJSON Ollama "stream": true) et retourne chaque
+objet {...} de premier niveau dès que son accolade fermante arrive —
+le client peut alors valider et fermer le stream.
+
+Gère les chaînes JSON (accolades et guillemets échappés ignorés).
+"""
+
+
+MAX_OBJECT_SIZE = 10000
+
+
+class JSONObjectDetector:
+    """Machine à états : profondeur d'accolades, chaîne, échappement."""
+
+    def __init__(self, max_size=MAX_OBJECT_SIZE):
+
+        self.max_size = max_size
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.current = []
+
+    def feed(self, text):
+        """Ajoute un chunk. Retourne la liste des objets complets (texte brut)."""
+
+        objects = []
+
+        for ch in text:
+
+            # Hors objet : on attend une accolade ouvrante
+            if self.depth == 0:
+                if ch == "{":
+                    self.depth = 1
+                    self.current = [ch]
+                continue
+
+            self.current.append(ch)
+
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+
+            elif ch == '"':
+                self.in_string = True
+
+            elif ch == "{":
+                self.depth += 1
+
+            elif ch == "}":
+                self.depth -= 1
+                if self.depth == 0:
+                    objects.append("".join(self.current))
+                    self.current = []
+
+            # Objet aberrant (accolade jamais fermée) -> abandon
+            if len(self.current) > self.max_size:
+                self.reset()
+
+        return objects
+
+    def reset(self):
+
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.current = []
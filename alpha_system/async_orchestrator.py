@@ -0,0 +1,290 @@
+"""
+Async Orchestrator — une seule boucle asyncio autour d'AlphaOrchestrator.
+
+Tâches de la boucle :
+    scan     : get_markets (executor) -> pré-score -> évaluation IA du top N
+               (semaphore ASYNC_AI_CONCURRENCY, pipeline jusqu'à "confidence"
+               dans l'executor) -> trade en série (budget du cycle)
+    monitor  : PositionMonitor.run() — flux de prix WebSocket, TP / SL /
+               trailing déclenchés dans la boucle dès le tick reçu
+    report   : report périodique (ASYNC_REPORT_INTERVAL)
+    backup   : backup DB périodique (ASYNC_BACKUP_INTERVAL)
+    snapshot : snapshot warm start périodique (SNAPSHOT_INTERVAL)
+
+Les appels bloquants (HTTP, IA, exécution, SQLite) passent par un
+ThreadPoolExecutor borné : la boucle reste libre pour les ticks de prix
+pendant qu'un cycle attend l'IA. Après un cycle qui a tradé, les nouvelles
+positions sont souscrites immédiatement (sans attendre le refresh du monitor).
+
+Usage :
+    python -m alpha_system.async_orchestrator
+"""
+
+import asyncio
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from alpha_system.config import CONFIG
+from alpha_system.orchestrator import AlphaOrchestrator
+
+
+class AsyncAlphaOrchestrator:
+    """Boucle asyncio : scan + IA bornée + PositionMonitor + report + backup."""
+
+    def __init__(self, bot=None, **kwargs):
+        """bot : AlphaOrchestrator existant, sinon construit avec kwargs
+        (reader, ai_clients, recorder, db_path)."""
+
+        self.bot = bot or AlphaOrchestrator(**kwargs)
+        self.log = self.bot.log
+
+        self.ai_concurrency = CONFIG.get("ASYNC_AI_CONCURRENCY", 4)
+        self.executor_workers = CONFIG.get("ASYNC_EXECUTOR_WORKERS", 8)
+        self.monitor_enabled = CONFIG.get("ASYNC_POSITION_MONITOR", True)
+        self.report_interval = CONFIG.get("ASYNC_REPORT_INTERVAL", 600)
+        self.backup_interval = CONFIG.get("ASYNC_BACKUP_INTERVAL", 6000)
+
+        # Créés dans la boucle (run)
+        self.loop = None
+        self.executor = None
+        self.semaphore = None
+        self.stopping = None
+        self.tasks = []
+
+        # Stats
+        self.cycles = 0
+        self.results = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    # ============================================
+    # HELPERS
+    # ============================================
+
+    async def offload(self, fn, *args, **kwargs):
+        """Appel bloquant dans l'executor."""
+
+        return await self.loop.run_in_executor(self.executor, partial(fn, *args, **kwargs))
+
+    async def sleep(self, seconds):
+        """Attente interrompue par stop(). True si arrêt demandé."""
+
+        try:
+            await asyncio.wait_for(self.stopping.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def stop(self):
+        """Demande l'arrêt (appelable depuis un autre thread)."""
+
+        if self.loop is not None and self.stopping is not None:
+            self.loop.call_soon_threadsafe(self.stopping.set)
+
+    # ============================================
+    # SCAN + EVALUATE + TRADE
+    # ============================================
+
+    async def cycle(self):
+        """Un cycle : scan -> pré-score -> IA (concurrence bornée) -> trade."""
+
+        bot = self.bot
+        cycle_start = time.monotonic()
+
+        status = bot._precheck()
+        if status is not None:
+            return status
+
+        markets = await self.offload(
+            bot.errors.safe_execute, bot.reader.get_markets, default=[], context="market_scan"
+        )
+
+        if not markets:
+            bot.scanner.record_scan(0)
+            return "NO_MARKETS"
+
+        bot.scanner.record_scan(len(markets))
+        self.log.info(f"{len(markets)} markets fetched")
+        timings = {"scan": time.monotonic() - cycle_start}
+
+        t = time.monotonic()
+        candidates = bot._rank(markets)[:bot.cycle_top_n]
+        timings["rank"] = time.monotonic() - t
+        bot._trace_candidates(candidates, cycle_start, timings)
+
+        t = time.monotonic()
+        decisions = await asyncio.gather(*(self.evaluate(m) for m in candidates))
+        passing = [d for d in decisions if d is not None]   # ordre du classement conservé
+        timings["evaluate"] = time.monotonic() - t
+
+        t = time.monotonic()
+        executed, committed, budget = await self.offload(bot._execute_decisions, passing)
+        timings["trade"] = time.monotonic() - t
+
+        # Nouvelles positions : souscription immédiate au flux de prix
+        if executed and bot.monitor.connected:
+            await bot.monitor.subscribe_to_open_positions()
+
+        self.log.info(f"Cycle: {len(candidates)} evaluated, {len(passing)} candidates, {executed} executed | committed: {round(committed, 2)}/{round(budget, 2)}")
+
+        timings["total"] = time.monotonic() - cycle_start
+        bot._record_cycle(timings, {"evaluated": len(candidates), "candidates": len(passing), "executed": executed})
+
+        return "EXECUTED" if executed else "NO_TRADE"
+
+    async def evaluate(self, market):
+        """gate -> ai -> confidence d'un marché, au plus ai_concurrency à la fois."""
+
+        async with self.semaphore:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                return await self.offload(self.bot.pipeline.run, market, stop="confidence")
+            finally:
+                self.in_flight -= 1
+
+    # ============================================
+    # LOOPS
+    # ============================================
+
+    async def scan_loop(self):
+
+        bot = self.bot
+
+        while not self.stopping.is_set():
+
+            try:
+                result = await self.cycle()
+            except Exception as e:
+                bot.errors.handle(e, "async_cycle")
+                result = "ERROR"
+
+            self.cycles += 1
+            self.results[result] = self.results.get(result, 0) + 1
+            self.log.info(f"Cycle {self.cycles} -> {result}")
+
+            # Kill switch (cycle ou étape gate du pipeline)
+            if result == "KILLED" or not bot.running:
+                self.stopping.set()
+                break
+
+            wait = max(bot.scanner.get_interval(), bot.scanner.get_rate_limit_wait())
+            if await self.sleep(wait):
+                break
+
+    async def report_loop(self):
+
+        while not await self.sleep(self.report_interval):
+            try:
+                await self.offload(self.report)
+            except Exception as e:
+                self.bot.errors.handle(e, "async_report")
+
+    async def backup_loop(self):
+
+        while not await self.sleep(self.backup_interval):
+            try:
+                await self.offload(self.bot.db.backup)
+            except Exception as e:
+                self.bot.errors.handle(e, "async_backup")
+
+    async def snapshot_loop(self):
+
+        while not await self.sleep(self.bot.snapshot.interval):
+            try:
+                await self.offload(self.bot.snapshot.save, self.bot)
+            except Exception as e:
+                self.bot.errors.handle(e, "async_snapshot")
+
+    # ============================================
+    # RUN / SHUTDOWN
+    # ============================================
+
+    async def run(self):
+        """Lance toutes les tâches ; rend la main après stop() et arrêt propre."""
+
+        self.loop = asyncio.get_running_loop()
+        self.executor = ThreadPoolExecutor(max_workers=self.executor_workers,
+                                           thread_name_prefix="async-alpha")
+        self.semaphore = asyncio.Semaphore(self.ai_concurrency)
+        self.stopping = asyncio.Event()
+
+        self.log.info(f"Async orchestrator started | AI concurrency: {self.ai_concurrency} | monitor: {self.monitor_enabled}")
+
+        self.tasks = [
+            asyncio.create_task(self.scan_loop(), name="scan"),
+            asyncio.create_task(self.report_loop(), name="report"),
+            asyncio.create_task(self.backup_loop(), name="backup"),
+            asyncio.create_task(self.snapshot_loop(), name="snapshot"),
+        ]
+        if self.monitor_enabled:
+            self.tasks.append(asyncio.create_task(self.bot.monitor.run(), name="monitor"))
+
+        try:
+            await self.stopping.wait()
+        finally:
+            await self.shutdown()
+
+    async def shutdown(self):
+
+        self.log.info("Async orchestrator stopping...")
+
+        # Le scan en cours se termine (appels bloquants non interruptibles)
+        scan = self.tasks[0] if self.tasks else None
+        if scan is not None:
+            await asyncio.gather(scan, return_exceptions=True)
+
+        # Le monitor absorbe CancelledError dans ses boucles : couper running d'abord
+        self.bot.monitor.running = False
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+        self.executor.shutdown(wait=True)
+        self.report()
+        self.bot.shutdown()
+
+    def report(self):
+
+        self.bot.report()
+        self.log.info(f"  Async: {self.cycles} cycles {self.results} | AI concurrency:{self.ai_concurrency} max_in_flight:{self.max_in_flight}")
+
+    def get_status(self):
+
+        return {
+            "cycles": self.cycles,
+            "results": dict(self.results),
+            "ai_concurrency": self.ai_concurrency,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "monitor": self.bot.monitor.get_status(),
+        }
+
+
+# ============================================
+# ENTRY POINT
+# ============================================
+
+async def main():
+
+    system = AsyncAlphaOrchestrator()
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, system.stop)
+        except (NotImplementedError, RuntimeError):
+            pass   # Windows : KeyboardInterrupt
+
+    await system.run()
+
+
+if __name__ == "__main__":
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("\nStopped by user")
@@ -12,6 +12,17 @@ CONFIG = {
     # === AI ===
     "CONFIDENCE_THRESHOLD": 0.75,
 
+    # === HEURISTIC PRE-SCORE (NumPy, avant tout appel IA) ===
+    "HEURISTIC_PRESCORE": True,
+    "HEURISTIC_CONFIDENCE_MARGIN": 1.0,    # borne IA = heuristique + marge ; >= 1.0 : masque coûts seul (< 1.0 opt-in)
+
+    # === CALIBRATION CONFIDENCE (par modèle, ConfidenceManager) ===
+    "CALIBRATION_WINDOW": 200,             # résultats gardés par modèle (ring buffer)
+    "CALIBRATION_BINS": 10,                # bins du reliability diagram
+    "CALIBRATION_MIN_SAMPLES": 30,         # en dessous : confidence brute
+    "CALIBRATION_PRIOR": 5,                # pseudo-trades lissant vers la confidence brute
+    "CALIBRATION_ISOTONIC": True,          # mapping monotone (pool adjacent violators)
+
     # === RISK ===
     "MAX_RISK_PER_TRADE": 0.02,
     "MAX_DRAWDOWN_PCT": 0.15,
@@ -33,8 +44,149 @@ CONFIG = {
     "MIN_SCAN_INTERVAL": 15,
     "MAX_SCAN_INTERVAL": 120,
 
+    # === DELTA (ultra fast) ===
+    "DELTA_PRICE_EPSILON": 0.005,
+    "DELTA_VOLUME_EPSILON": 0.02,   # variation relative
+    "DELTA_SPREAD_EPSILON": 0.005,
+    "DELTA_MAX_AGE": 900,           # secondes avant réévaluation forcée
+
+    # === COOLDOWN (FastFilter, timing wheel) ===
+    "COOLDOWN_MIN_FACTOR": 0.25,       # marché volatil -> cooldown x0.25
+    "COOLDOWN_MAX_FACTOR": 4.0,        # marché plat -> cooldown x4
+    "COOLDOWN_VOLATILITY_REF": 0.002,  # |Δprix| / sqrt(s) de référence
+    "COOLDOWN_EWMA_ALPHA": 0.3,
+    "COOLDOWN_MAX_ENTRIES": 10000,
+
+    # === MARKET QUEUE (ultra fast, file à priorité) ===
+    "QUEUE_MAX_AGE": 30,               # secondes en file avant éviction
+    "QUEUE_SCORE_WEIGHTS": {
+        "volume": 1.0,
+        "distance": 1.0,               # |prix - 0.5|
+        "resolution": 0.5,             # résolution proche favorisée
+        "staleness": 1.0,              # pénalité par QUEUE_MAX_AGE en file
+    },
+
+    # === ADMISSION CONTROL (file scanner -> décision, ultra fast) ===
+    "QUEUE_SHED_POLICY": "drop_lowest",  # file pleine : drop_lowest | drop_oldest | drop_newest | coalesce
+    "QUEUE_OVERLOAD_HIGH": 0.8,        # remplissage -> surcharge (ou délestage)
+    "QUEUE_OVERLOAD_LOW": 0.5,         # remplissage -> fin de surcharge
+    "SCAN_OVERLOAD_BACKOFF": 2.0,      # surcharge : intervalle de scan x2 par scan
+    "SCAN_OVERLOAD_MAX_FACTOR": 8.0,
+
+    # === ENSEMBLE IA (modèles en parallèle) ===
+    "ENSEMBLE_POLICY": "best",             # "best" | "quorum"
+    "ENSEMBLE_QUORUM": 2,                  # modèles d'accord (policy quorum)
+    "ENSEMBLE_EARLY_EXIT_CONFIDENCE": 0.75,  # "best" : premier trade >= seuil
+    "ENSEMBLE_DEADLINE": 30,               # secondes, tous modèles
+    "ENSEMBLE_MODEL_DEADLINE": 20,         # secondes, par modèle
+    "ENSEMBLE_MODEL_DEADLINES": {},        # override par modèle
+    "ENSEMBLE_MAX_WORKERS": 12,
+
+    # === MODEL ROUTER (sélection adaptative + hedging) ===
+    "ROUTER_POLICY": "all",                # "all" (hedging seul) | "adaptive" (opt-in : écarte des modèles)
+    "ROUTER_MAX_MODELS": 2,                # adaptive : modèles interrogés par marché
+    "ROUTER_MIN_MODELS": 1,
+    "ROUTER_MIN_SUCCESS": 0.5,             # en dessous : modèle écarté
+    "ROUTER_WARMUP": 10,                   # appels avant de juger un modèle
+    "ROUTER_EXPLORE": 0.1,                 # proba de réessayer un modèle écarté
+    "ROUTER_EWMA_ALPHA": 0.2,
+    "ROUTER_HEDGE": True,
+    "ROUTER_HEDGE_PERCENTILE": 95,         # hedge au-delà du p95 du primaire
+
+    # === CIRCUIT BREAKER (par modèle IA) ===
+    "CB_WINDOW": 20,                       # derniers appels suivis
+    "CB_MIN_CALLS": 5,                     # avant de juger le taux d'échec
+    "CB_FAILURE_RATE": 0.5,                # au-delà : OPEN
+    "CB_COOLDOWN": 30,                     # secondes avant la sonde HALF_OPEN
+    "CB_HALF_OPEN_PROBES": 1,
+
+    # === AI CACHE (réponses IA persistées) ===
+    "AI_CACHE_ENABLED": True,
+    "AI_CACHE_PATH": "alpha_system/data/ai_cache.db",
+    "AI_CACHE_TTL": 1800,                  # secondes
+    "AI_CACHE_MAX_ENTRIES": 5000,
+    "AI_CACHE_PRICE_BUCKET": 0.01,
+    "AI_CACHE_VOLUME_BUCKETS": 4,          # buckets par décade de volume
+
+    # === AI STREAMING (NDJSON, sortie à la première décision valide) ===
+    "AI_STREAM": True,
+    "AI_STREAM_DRAIN_TIMEOUT": 5,          # s max de lecture de la fin du stream (keep-alive), sinon connexion fermée
+
+    # === AI BATCH (evaluate_batch, taille adaptative) ===
+    "AI_BATCH_SIZE": 8,                    # taille initiale
+    "AI_BATCH_MIN": 1,
+    "AI_BATCH_MAX": 20,
+    "AI_BATCH_TARGET_LATENCY": 10,         # secondes par appel batch
+    "AI_BATCH_PREFETCH": True,             # cycle Alpha concurrent : un batch par modèle -> cache IA, avant l'ensemble
+
+    # === HTTP (sessions keep-alive partagées) ===
+    "HTTP_POOL_MAXSIZE": 10,               # connexions par host
+    "HTTP_POOL_SIZES": {"ollama.com": 16}, # override par host
+    "HTTP_CONNECT_TIMEOUT": 5,
+    "HTTP_READ_TIMEOUT": 60,
+
+    # === CYCLE (AlphaOrchestrator) ===
+    "CYCLE_MODE": "sequential",        # "sequential" (top 3, un trade) | "concurrent" (opt-in, profil de risque différent)
+    "CYCLE_TOP_N": 10,                 # concurrent : marchés évalués en parallèle par cycle
+    "CYCLE_MAX_TRADES": 3,             # concurrent : trades max par cycle
+    "CYCLE_RISK_BUDGET": 0.05,         # concurrent : taille cumulée max par cycle (fraction du capital)
+
+    # === ASYNC (AsyncAlphaOrchestrator, une boucle asyncio) ===
+    "ASYNC_AI_CONCURRENCY": 4,         # évaluations IA simultanées (semaphore)
+    "ASYNC_EXECUTOR_WORKERS": 8,       # threads pour les appels bloquants
+    "ASYNC_POSITION_MONITOR": True,    # PositionMonitor (TP/SL temps réel) dans la boucle
+    "ASYNC_REPORT_INTERVAL": 600,      # secondes
+    "ASYNC_BACKUP_INTERVAL": 6000,     # secondes
+
+    # === PIPELINE DÉCISION (gate -> ai -> confidence -> trade) ===
+    # workers, file bornée, backpressure (block | drop_oldest | drop_new), timeout (s)
+    "PIPELINE_STAGES": {
+        "gate": {"workers": 1, "queue": 100, "policy": "block"},
+        "ai": {"workers": 3, "queue": 6, "policy": "block", "timeout": 60},
+        "confidence": {"workers": 1, "queue": 100, "policy": "block"},
+        "trade": {"workers": 1, "queue": 100, "policy": "block"},   # sérialisé (capital)
+    },
+    "PIPELINE_ALPHA": {"ai": {"workers": 4}},   # surcharges par étape, par orchestrator
+    "PIPELINE_ULTRA": {},
+    "PIPELINE_WS": {},
+
+    # === SHARDS (ultra / ws : IA + pré-risque en process, risque centralisé) ===
+    "SHARD_WORKERS": int(os.getenv("ALPHA_SHARD_WORKERS", "0")),   # 0 = pipeline threads
+    "SHARD_QUEUE_SIZE": 50,            # marchés en attente par shard
+    "SHARD_MAX_RESERVATIONS": 8,       # réservations de risque simultanées (tous shards)
+    "SHARD_REPLY_TIMEOUT": 30,         # s max d'attente d'une réponse du coordinateur (shard)
+    "SHARD_START_METHOD": "spawn",
+
+    # === TRACE (spans par décision, échantillonnés — core/tracer.py) ===
+    "TRACE_SAMPLE_RATE": 0.05,         # fraction des marchés tracés
+    "TRACE_RING_SIZE": 1000,           # traces terminées gardées en mémoire
+    "TRACE_FILE": os.getenv("ALPHA_TRACE_FILE", ""),   # JSONL optionnel
+
+    # === RATE LIMIT (token bucket par host/endpoint) ===
+    "RATE_LIMIT_DEFAULT_RATE": 5,        # requêtes / seconde
+    "RATE_LIMIT_DEFAULT_BURST": 10,
+    "RATE_LIMIT_CRITICAL_RESERVE": 0.2,  # part du burst réservée aux ordres
+    "RATE_LIMIT_DEFAULT_PENALTY": 5,     # secondes si 429 sans Retry-After
+    "RATE_LIMIT_MAX_PENALTY": 120,
+    "RATE_LIMITS": {},                   # "host/endpoint": (rate, burst)
+
     # === DATABASE ===
     "DB_PATH": "alpha_system/data/alpha_system.db",
+    "PERSIST_WRITE_BEHIND": False,     # opt-in : trades / audit / état commités en différé (thread dédié)
+    "PERSIST_FLUSH_INTERVAL": 0.5,     # fenêtre de durabilité (s) : délai max avant commit
+    "PERSIST_QUEUE_SIZE": 10000,       # écritures en attente max (au-delà : backpressure)
+    "PERSIST_BATCH_MAX": 500,          # écritures max par transaction
+    "PERSIST_READ_FLUSH_TIMEOUT": 5,   # attente max du flush avant une lecture (s)
+
+    # === WARM START (snapshot état runtime, memory/warm_start.py) ===
+    "SNAPSHOT_ENABLED": True,
+    "SNAPSHOT_PATH": os.getenv("ALPHA_SNAPSHOT_PATH", ""),   # vide = <DB>.snapshot.json
+    "SNAPSHOT_INTERVAL": 60,           # secondes entre deux snapshots
+    "SNAPSHOT_MAX_AGE": 21600,         # au-delà : cooldowns / backoff scanner ignorés
+    "SNAPSHOT_WARMUP_SPREAD": 60,      # cooldowns échus pendant l'arrêt : relâchés sur N s
+
+    # === REPLAY (enregistrement session si défini) ===
+    "RECORD_DIR": os.getenv("ALPHA_RECORD_DIR", ""),
 
     # === LOGGING ===
     "LOG_DIR": "alpha_system/data/logs",
@@ -43,6 +195,8 @@ CONFIG = {
     "MODE": os.getenv("TRADING_MODE", "DRY"),
 
     # === API ===
+    # Endpoint /api/chat — pointer sur alpha_system.ai.local_ai_server pour les tests de charge / chaos
+    "AI_API_URL": os.getenv("ALPHA_AI_API_URL", "https://ollama.com/api/chat"),
     "OLLAMA_API_KEY": os.getenv("OLLAMA_API_KEY", ""),
     "POLYMARKET_PRIVATE_KEY": os.getenv("POLYMARKET_PRIVATE_KEY", ""),
 }
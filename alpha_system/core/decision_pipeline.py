@@ -0,0 +1,221 @@
+"""
+Decision Pipeline — chaîne décision commune aux trois orchestrators.
+
+    gate -> ai -> confidence -> trade
+
+- gate       : admission propre à l'orchestrator (filtre, pré-score),
+               santé système, kill switch
+- ai         : ensemble IA (appels bloquants — étape à paralléliser)
+- confidence : ConfidenceManager (calibré par modèle)
+- trade      : taille, coûts, risque, exécution, état, DB — sérialisé
+               (capital partagé), quel que soit le nombre de workers
+
+Les orchestrators ne diffèrent plus que par leur source (poll REST,
+file à priorité, push WebSocket), leur exécuteur et les réglages
+d'étapes : CONFIG["PIPELINE_STAGES"], surchargés par
+CONFIG["PIPELINE_<NOM>"] (ex: PIPELINE_WS = {"ai": {"workers": 6}}).
+
+Tracing (core/tracer.py) : chaque étape ferme la trace du marché quand
+elle le rejette (erreur / timeout d'étape : abort) ; spans confidence,
+cost, risk, execute, persist. La décision hérite de l'id de trace du marché.
+"""
+
+import threading
+
+from alpha_system.core.pipeline import Pipeline
+from alpha_system.core.tracer import get_tracer
+
+
+STAGES = ("gate", "ai", "confidence", "trade")
+
+
+class DecisionStages:
+    """Fonctions d'étapes, branchées sur les composants de l'orchestrator."""
+
+    def __init__(self, system, execute, admit=None, audit=False):
+        """system : orchestrator (errors, kill_switch, confidence, optimizer, cost_calc,
+        risk, db, log, lock, capital...). execute(decision) -> order ou None.
+        admit(item) -> marché ou None. audit : trace EXECUTED en base."""
+
+        self.system = system
+        self.execute = execute
+        self.admit = admit
+        self.audit = audit
+        self.trade_lock = threading.Lock()
+        self.tracer = get_tracer()
+
+    def gate(self, item):
+
+        s = self.system
+
+        market = self.admit(item) if self.admit else item
+        if market is None:
+            return None
+
+        self.tracer.end_span(market, "queue")
+
+        if not s.errors.is_system_healthy():
+            s.log.critical("System unhealthy — skipping")
+            self.tracer.finish(market, "unhealthy")
+            return None
+
+        with s.lock:
+            capital = s.capital
+
+        if not s.kill_switch.validate(capital, s.starting_capital):
+            s.log.critical(f"KILL SWITCH — capital: {capital}")
+            s.db.log_audit("KILL_SWITCH", f"capital={capital}")
+            s.running = False
+            self.tracer.finish(market, "killed")
+            return None
+
+        return market
+
+    def ai(self, market):
+
+        decision = self.system._evaluate_market(market)
+        if decision is None:
+            self.tracer.finish(market, "no_trade")
+            return None
+        return self.tracer.link(market, decision)
+
+    def confidence(self, decision):
+
+        with self.tracer.span(decision, "confidence"):
+            conf_ok, conf_reason = self.system.confidence.validate(decision)
+
+        if not conf_ok:
+            self.system.log.debug(f"Confidence rejected: {conf_reason}")
+            self.tracer.finish(decision, "confidence_rejected")
+            return None
+        return decision
+
+    def trade(self, decision):
+
+        s = self.system
+
+        with self.trade_lock:
+
+            # Capital relu : un autre item a pu trader pendant l'appel IA
+            with s.lock:
+                capital = s.capital
+
+            size = s.optimizer.calculate_size(capital, decision["confidence"])
+            decision["size"] = size
+
+            with self.tracer.span(decision, "cost"):
+                cost_ok, cost_info = s.cost_calc.validate(decision)
+            if not cost_ok:
+                s.log.debug(f"Cost rejected: {cost_info}")
+                self.tracer.finish(decision, "cost_rejected")
+                return None
+
+            with self.tracer.span(decision, "risk"):
+                risk_ok, risk_reason = s.risk.validate_trade(capital, size, decision["confidence"])
+            if not risk_ok:
+                s.log.risk(f"Blocked: {risk_reason}")
+                s.db.log_audit("RISK_BLOCKED", risk_reason)
+                self.tracer.finish(decision, "risk_rejected")
+                return None
+
+            with self.tracer.span(decision, "execute"):
+                order = s.errors.safe_execute(
+                    self.execute, decision,
+                    default=None, context="execution"
+                )
+
+            if order is None:
+                self.tracer.finish(decision, "execution_failed")
+                return None
+
+            self.record(decision, order)
+            return order
+
+    def abort(self, item, reason):
+        """Item perdu sur erreur / timeout d'étape : ferme sa trace."""
+
+        self.tracer.finish(item, reason)
+
+    def record(self, decision, order):
+        """État, risque, calibration, DB, logs. Termine la trace ("executed")."""
+
+        with self.tracer.span(decision, "persist"):
+            self._record(decision, order)
+        self.tracer.finish(decision, "executed")
+
+    def _record(self, decision, order):
+
+        s = self.system
+        pnl = order.get("pnl", 0)
+        size = decision["size"]
+
+        with s.lock:
+            s.capital += pnl
+            s.total_pnl += pnl
+            s.total_trades += 1
+            if pnl > 0:
+                s.wins += 1
+            else:
+                s.losses += 1
+            capital = s.capital
+
+        s.risk.record_trade(pnl)
+        s.risk.update_capital(capital)
+        s.confidence.record_outcome(decision["confidence"], pnl > 0, decision.get("model", ""))
+
+        s.db.record_trade(
+            market=decision["market"],
+            side=decision["side"],
+            price=decision["price"],
+            size=size,
+            pnl=pnl,
+            confidence=decision["confidence"],
+            model=decision.get("model", ""),
+            source=decision.get("source", "ai"),
+            status=order.get("status", "SIMULATED"),
+        )
+        s._save_state()
+
+        s.log.trade(decision["market"], decision["side"], size, pnl, decision["confidence"])
+        if self.audit:
+            s.db.log_audit("EXECUTED", f"pnl={round(pnl, 2)} capital={round(capital, 2)}")
+        s.log.info(f"PnL: {round(pnl, 2)} | Capital: {round(capital, 2)}")
+
+
+def stage_settings(config, name):
+    """Réglages par étape : PIPELINE_STAGES surchargé par PIPELINE_<NOM>."""
+
+    defaults = config.get("PIPELINE_STAGES", {})
+    overrides = config.get(f"PIPELINE_{name.upper()}", {})
+
+    return {stage: dict(defaults.get(stage, {}), **overrides.get(stage, {})) for stage in STAGES}
+
+
+def build_decision_pipeline(system, name, config, execute, admit=None, source=None, audit=False):
+    """Pipeline gate -> ai -> confidence -> trade d'un orchestrator."""
+
+    stages = DecisionStages(system, execute, admit=admit, audit=audit)
+
+    return Pipeline.from_settings(
+        name,
+        [("gate", stages.gate), ("ai", stages.ai),
+         ("confidence", stages.confidence), ("trade", stages.trade)],
+        stage_settings(config, name),
+        errors=system.errors,
+        source=source,
+        on_abort=stages.abort,
+    )
+
+
+def format_pipeline_status(pipeline):
+    """Lignes de report, une par étape."""
+
+    lines = []
+    for stage, st in pipeline.get_status().items():
+        lat = st["latency"]
+        lines.append(
+            f"  Pipeline [{stage}]: w:{st['workers']} q:{st['depth']}/{st['maxsize']} in:{st['in_flight']} "
+            f"processed:{st['processed']} passed:{st['passed']} dropped:{st['dropped']} "
+            f"timeouts:{st['timeouts']} errors:{st['errors']} | p50:{lat['p50']}ms p95:{lat['p95']}ms avg:{lat['avg_ms']}ms"
+        )
+    return lines
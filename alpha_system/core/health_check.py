@@ -1,14 +1,17 @@
 import requests
 from datetime import datetime, UTC
 
+from alpha_system.core.rate_limiter import get_rate_limiter, PRIORITY_NORMAL, GAMMA_MARKETS_URL
+
 
 class HealthCheck:
     """Vérifie la santé de tous les composants avant chaque cycle."""
 
-    def __init__(self):
+    def __init__(self, rate_limiter=None):
 
         self.last_check = None
         self.status = {}
+        self.limiter = rate_limiter or get_rate_limiter()
 
         print("HealthCheck initialized")
 
@@ -34,20 +37,27 @@ class HealthCheck:
                 print("  [HEALTH] Capital <= 0")
                 all_ok = False
 
-        # 3. API Polymarket accessible
-        try:
-            r = requests.get(
-                "https://gamma-api.polymarket.com/markets?limit=1",
-                timeout=10
-            )
-            self.status["polymarket_api"] = r.status_code == 200
-            if r.status_code != 200:
-                print(f"  [HEALTH] Polymarket API: {r.status_code}")
+        # 3. API Polymarket accessible (skip si le budget de requêtes est épuisé)
+        if not self.limiter.acquire(GAMMA_MARKETS_URL, PRIORITY_NORMAL, timeout=2):
+            print("  [HEALTH] Polymarket API check skipped (rate limited)")
+        else:
+            try:
+                r = requests.get(
+                    f"{GAMMA_MARKETS_URL}?limit=1",
+                    timeout=10
+                )
+                self.limiter.report_response(GAMMA_MARKETS_URL, r.status_code, r.headers)
+
+                # 429 = API joignable mais saturée
+                self.status["polymarket_api"] = r.status_code in (200, 429)
+                if r.status_code != 200:
+                    print(f"  [HEALTH] Polymarket API: {r.status_code}")
+                if r.status_code not in (200, 429):
+                    all_ok = False
+            except Exception:
+                self.status["polymarket_api"] = False
+                print("  [HEALTH] Polymarket API unreachable")
                 all_ok = False
-        except Exception:
-            self.status["polymarket_api"] = False
-            print("  [HEALTH] Polymarket API unreachable")
-            all_ok = False
 
         # 4. Exposure cohérente
         if exposure:
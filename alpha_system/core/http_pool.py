@@ -0,0 +1,146 @@
+"""
+HTTP Session Pool — sessions keep-alive partagées par host.
+
+Une seule instance par process (get_session_pool()) : chaque host a sa
+requests.Session et son pool de connexions urllib3, réutilisé par tous
+les clients (les 3 SecureAIClient d'un orchestrator partagent les mêmes
+connexions TLS vers ollama.com).
+
+- taille de pool par host configurable (HTTP_POOL_SIZES, HTTP_POOL_MAXSIZE)
+- timeouts connect / read séparés
+- stats de réutilisation des connexions (urllib3 num_connections / num_requests)
+"""
+
+import threading
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class SessionPool:
+    """Sessions requests thread-safe, une par host."""
+
+    def __init__(self, config=None):
+
+        config = config or {}
+
+        self.pool_maxsize = config.get("HTTP_POOL_MAXSIZE", 10)
+        self.pool_sizes = config.get("HTTP_POOL_SIZES", {})
+        self.connect_timeout = config.get("HTTP_CONNECT_TIMEOUT", 5)
+        self.read_timeout = config.get("HTTP_READ_TIMEOUT", 60)
+
+        self.lock = threading.Lock()
+        self.sessions = {}   # host -> requests.Session
+
+    # ============================================
+    # SESSIONS
+    # ============================================
+
+    def session_for(self, url):
+        """Session keep-alive du host de url (créée au premier appel)."""
+
+        host = urlparse(url).netloc
+
+        with self.lock:
+            session = self.sessions.get(host)
+            if session is None:
+                session = self._create_session(host)
+                self.sessions[host] = session
+            return session
+
+    def _create_session(self, host):
+
+        size = self.pool_sizes.get(host, self.pool_maxsize)
+
+        # Pas de retry urllib3 : les clients gèrent déjà leurs retries
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=size,
+                              max_retries=0, pool_block=False)
+
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers["Connection"] = "keep-alive"
+        return session
+
+    def timeout(self, read=None):
+        """Tuple (connect, read) pour requests — read borné si fourni."""
+
+        read = self.read_timeout if read is None else read
+        return (min(self.connect_timeout, read), read)
+
+    # ============================================
+    # REQUESTS
+    # ============================================
+
+    def post(self, url, **kwargs):
+
+        kwargs.setdefault("timeout", self.timeout())
+        return self.session_for(url).post(url, **kwargs)
+
+    def get(self, url, **kwargs):
+
+        kwargs.setdefault("timeout", self.timeout())
+        return self.session_for(url).get(url, **kwargs)
+
+    # ============================================
+    # STATS
+    # ============================================
+
+    def get_stats(self, url=None):
+        """Réutilisation des connexions — tous hosts, ou host de url."""
+
+        host = urlparse(url).netloc if url else None
+
+        with self.lock:
+            sessions = [s for h, s in self.sessions.items() if host is None or h == host]
+
+        connections = 0
+        requests_sent = 0
+
+        for session in sessions:
+            for adapter in set(session.adapters.values()):
+                pools = adapter.poolmanager.pools
+                for key in list(pools.keys()):
+                    pool = pools.get(key)
+                    if pool is None:
+                        continue
+                    connections += pool.num_connections
+                    requests_sent += pool.num_requests
+
+        reused = max(0, requests_sent - connections)
+
+        return {
+            "hosts": len(sessions),
+            "connections": connections,
+            "requests": requests_sent,
+            "reused": reused,
+            "reuse_rate": round(reused / max(1, requests_sent) * 100, 1),
+        }
+
+    def close(self):
+
+        with self.lock:
+            for session in self.sessions.values():
+                session.close()
+            self.sessions.clear()
+
+
+# ============================================
+# SINGLETON
+# ============================================
+
+_pool_instance = None
+_pool_lock = threading.Lock()
+
+
+def get_session_pool():
+    """Retourne le pool de sessions partagé par tous les clients HTTP du process."""
+
+    global _pool_instance
+
+    with _pool_lock:
+        if _pool_instance is None:
+            from alpha_system.config import CONFIG
+            _pool_instance = SessionPool(CONFIG)
+        return _pool_instance
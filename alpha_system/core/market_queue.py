@@ -0,0 +1,345 @@
+"""
+Priority Market Queue — file de travail scanner -> décision.
+
+Remplace la FIFO queue.Queue :
+- priorité = score configurable (volume, distance à 0.5, temps avant
+  résolution, fraîcheur) — le thread décision traite d'abord les
+  marchés les plus intéressants et les plus frais
+- une mise à jour d'un marché déjà en file remplace son entrée (coalescée)
+- les entrées plus vieilles que max_age sont évincées avant traitement
+
+Admission control — file pleine, politique QUEUE_SHED_POLICY :
+    drop_lowest  l'entrée la moins prioritaire est éjectée si l'arrivée
+                 est plus prioritaire, sinon l'arrivée est rejetée
+    drop_oldest  l'entrée la plus ancienne en file est éjectée
+    drop_newest  toute arrivée est rejetée (même une mise à jour : la
+                 version déjà en file est gardée)
+    coalesce     seules les mises à jour de marchés déjà en file passent ;
+                 un nouveau marché est rejeté
+Surcharge (hystérésis) : remplissage >= QUEUE_OVERLOAD_HIGH ou marchés
+délestés depuis le dernier check -> overloaded, jusqu'à redescendre sous
+QUEUE_OVERLOAD_LOW. Le scanner s'en sert pour espacer ses scans.
+
+Interface compatible queue.Queue : put_nowait(), get(timeout), qsize(), full(),
+task_done(item) ; unfinished() = en file + pris et pas encore task_done.
+"""
+
+import heapq
+import itertools
+import math
+import queue
+import threading
+import time
+from datetime import datetime, UTC
+
+
+DEFAULT_WEIGHTS = {
+    "volume": 1.0,       # log10(volume) normalisé sur 1M
+    "distance": 1.0,     # |prix - 0.5| * 2
+    "resolution": 0.5,   # résolution proche = capital libéré plus tôt
+    "staleness": 1.0,    # pénalité par max_age passé en file
+}
+
+SHED_POLICIES = ("drop_lowest", "drop_oldest", "drop_newest", "coalesce")
+
+
+def score_market(market, weights=None):
+    """Score statique d'un marché (hors fraîcheur). Plus haut = plus prioritaire."""
+
+    weights = weights or DEFAULT_WEIGHTS
+
+    volume = market.get("volume", 0) or 0
+    volume_score = min(1.0, math.log10(1 + max(0, volume)) / 6)
+
+    price = market.get("price", 0.5)
+    distance_score = min(1.0, abs(price - 0.5) * 2)
+
+    resolution_score = _resolution_score(market.get("end_date"))
+
+    return (
+        weights.get("volume", 0) * volume_score
+        + weights.get("distance", 0) * distance_score
+        + weights.get("resolution", 0) * resolution_score
+    )
+
+
+def _resolution_score(end_date):
+    """1.0 = résolution imminente, -> 0 quand lointaine, 0.5 si inconnue."""
+
+    if not end_date:
+        return 0.5
+
+    try:
+        end = datetime.fromisoformat(str(end_date).replace("Z", "+00:00"))
+        if end.tzinfo is None:
+            end = end.replace(tzinfo=UTC)
+    except ValueError:
+        return 0.5
+
+    days = (end - datetime.now(UTC)).total_seconds() / 86400
+    if days <= 0:
+        return 0.0
+
+    return 1.0 / (1.0 + days / 30)
+
+
+class PriorityMarketQueue:
+    """File à priorité avec remplacement par marché et éviction des entrées périmées."""
+
+    def __init__(self, maxsize=1000, config=None, on_evict=None):
+        """on_evict(market, reason) : appelé hors verrou pour chaque marché
+        sorti de la file sans être traité ("shed" / "stale", "superseded" :
+        remplacé par une mise à jour du même marché)."""
+
+        config = config or {}
+
+        self.maxsize = maxsize
+        self.max_age = config.get("QUEUE_MAX_AGE", 30)
+        self.weights = dict(DEFAULT_WEIGHTS)
+        self.weights.update(config.get("QUEUE_SCORE_WEIGHTS", {}))
+        self.on_evict = on_evict
+
+        self.policy = config.get("QUEUE_SHED_POLICY", "drop_lowest")
+        if self.policy not in SHED_POLICIES:
+            raise ValueError(f"QUEUE_SHED_POLICY {self.policy!r} not in {SHED_POLICIES}")
+        self.overload_high = config.get("QUEUE_OVERLOAD_HIGH", 0.8)
+        self.overload_low = config.get("QUEUE_OVERLOAD_LOW", 0.5)
+        self.overloaded = False
+        self.overload_events = 0
+        self.shed_checked = 0
+
+        # market_key -> (priority, seq, enqueued_at, market) — ordre d'insertion = ancienneté
+        self.entries = {}
+
+        # Max-heap (priorité) et min-heap (éjection) — suppression paresseuse
+        self.max_heap = []
+        self.min_heap = []
+        self.seq = itertools.count()
+
+        self.cond = threading.Condition()
+
+        # Counters
+        self.enqueued = 0           # admis (nouveaux + coalescés)
+        self.replaced = 0           # coalescés (mise à jour d'un marché en file)
+        self.dropped = 0            # délestés (arrivées rejetées + entrées éjectées)
+        self.rejected = 0           # dont arrivées rejetées
+        self.stale_evicted = 0
+        self.dequeued = 0
+        self.in_progress = 0        # pris par get(), pas encore task_done
+
+    # ============================================
+    # PUT
+    # ============================================
+
+    def put(self, market):
+        """Ajoute ou remplace un marché. Retourne False si délesté (file pleine)."""
+
+        key = market.get("token_id") or market.get("market", "")
+        now = time.monotonic()
+
+        # Fraîcheur : à âge égal la pénalité est identique pour tous,
+        # donc la favoriser revient à bonus = poids * date d'entrée / max_age
+        priority = score_market(market, self.weights)
+        priority += self.weights.get("staleness", 0) * now / max(self.max_age, 1e-9)
+
+        evicted = None
+        superseded = None
+
+        with self.cond:
+            if not self._admit(key, priority):
+                self.dropped += 1
+                self.rejected += 1
+                return False
+
+            if key in self.entries:
+                superseded = self.entries.pop(key)[3]   # fin de l'ordre d'ancienneté
+                self.replaced += 1
+            elif len(self.entries) >= self.maxsize:
+                evicted = self._evict()
+
+            seq = next(self.seq)
+            self.entries[key] = (priority, seq, now, market)
+            heapq.heappush(self.max_heap, (-priority, seq, key))
+            heapq.heappush(self.min_heap, (priority, seq, key))
+            self.enqueued += 1
+
+            self._compact()
+            self.cond.notify()
+
+        if evicted is not None and self.on_evict:
+            self.on_evict(evicted, "shed")
+        if superseded is not None and self.on_evict:
+            self.on_evict(superseded, "superseded")
+
+        return True
+
+    def _admit(self, key, priority):
+        """Politique de délestage : l'arrivée entre-t-elle ?"""
+
+        if len(self.entries) < self.maxsize:
+            return True
+
+        if self.policy == "drop_newest":
+            return False
+
+        if key in self.entries:
+            return True                 # coalescée, ne grossit pas la file
+
+        if self.policy == "coalesce":
+            return False
+
+        if self.policy == "drop_lowest":
+            lowest = self._peek_lowest()
+            return lowest is not None and lowest[0] < priority
+
+        return True                     # drop_oldest
+
+    def _evict(self):
+        """Éjecte une entrée pour faire place (drop_lowest / drop_oldest)."""
+
+        if self.policy == "drop_oldest":
+            key = next(iter(self.entries))
+        else:
+            key = self._peek_lowest()[2]
+
+        self.dropped += 1
+        return self.entries.pop(key)[3]
+
+    def put_nowait(self, market):
+        return self.put(market)
+
+    # ============================================
+    # GET
+    # ============================================
+
+    def get(self, timeout=None):
+        """Retourne le marché le plus prioritaire encore frais. Lève queue.Empty."""
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        stale = []
+
+        try:
+            with self.cond:
+                while True:
+                    while self.max_heap:
+                        neg_priority, seq, key = heapq.heappop(self.max_heap)
+                        entry = self.entries.get(key)
+
+                        # Entrée remplacée ou éjectée
+                        if entry is None or entry[1] != seq:
+                            continue
+
+                        del self.entries[key]
+
+                        if time.monotonic() - entry[2] > self.max_age:
+                            self.stale_evicted += 1
+                            stale.append(entry[3])
+                            continue
+
+                        self.dequeued += 1
+                        self.in_progress += 1
+                        return entry[3]
+
+                    if deadline is None:
+                        self.cond.wait()
+                        continue
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise queue.Empty
+                    self.cond.wait(remaining)
+        finally:
+            if self.on_evict:
+                for market in stale:
+                    self.on_evict(market, "stale")
+
+    def get_nowait(self):
+        return self.get(timeout=0)
+
+    def task_done(self, market):
+        """Fin de traitement d'un marché rendu par get()."""
+
+        with self.cond:
+            self.in_progress = max(0, self.in_progress - 1)
+
+    def unfinished(self):
+
+        with self.cond:
+            return len(self.entries) + self.in_progress
+
+    # ============================================
+    # INTERNAL
+    # ============================================
+
+    def _peek_lowest(self):
+        """Entrée valide la moins prioritaire (priority, seq, key), ou None."""
+
+        while self.min_heap:
+            priority, seq, key = self.min_heap[0]
+            entry = self.entries.get(key)
+            if entry is not None and entry[1] == seq:
+                return priority, seq, key
+            heapq.heappop(self.min_heap)
+        return None
+
+    def _compact(self):
+        """Reconstruit les heaps quand les entrées mortes dominent."""
+
+        limit = 2 * len(self.entries) + 64
+        if len(self.max_heap) <= limit and len(self.min_heap) <= limit:
+            return
+
+        self.max_heap = [(-p, s, k) for k, (p, s, _, _) in self.entries.items()]
+        self.min_heap = [(p, s, k) for k, (p, s, _, _) in self.entries.items()]
+        heapq.heapify(self.max_heap)
+        heapq.heapify(self.min_heap)
+
+    # ============================================
+    # OVERLOAD
+    # ============================================
+
+    def check_overload(self):
+        """Met à jour l'état de surcharge (une fois par scan). Retourne overloaded."""
+
+        with self.cond:
+            fill = len(self.entries) / max(1, self.maxsize)
+            shed = self.dropped > self.shed_checked
+            self.shed_checked = self.dropped
+
+            if not self.overloaded and (shed or fill >= self.overload_high):
+                self.overloaded = True
+                self.overload_events += 1
+            elif self.overloaded and not shed and fill <= self.overload_low:
+                self.overloaded = False
+
+            return self.overloaded
+
+    # ============================================
+    # STATUS
+    # ============================================
+
+    def qsize(self):
+        return len(self.entries)
+
+    def empty(self):
+        return not self.entries
+
+    def full(self):
+        return len(self.entries) >= self.maxsize
+
+    def get_status(self):
+
+        with self.cond:
+            return {
+                "size": len(self.entries),
+                "maxsize": self.maxsize,
+                "enqueued": self.enqueued,
+                "dequeued": self.dequeued,
+                "replaced": self.replaced,
+                "dropped": self.dropped,
+                "rejected": self.rejected,
+                "stale_evicted": self.stale_evicted,
+                "policy": self.policy,
+                "overloaded": self.overloaded,
+                "overload_events": self.overload_events,
+            }
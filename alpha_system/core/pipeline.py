@@ -0,0 +1,483 @@
+"""
+Pipeline — étapes nommées reliées par des files bornées.
+
+Chaque étape (Stage) a :
+- sa fonction fn(item) -> item suivant, ou None (item filtré / terminé)
+- son pool de workers (concurrence réglable par étape, ex: appels IA)
+- sa file d'entrée bornée et sa politique de backpressure :
+    "block"       : le producteur attend une place (backpressure amont)
+    "drop_oldest" : l'entrée la plus ancienne est éjectée
+    "drop_new"    : l'item entrant est rejeté
+- son timeout : deadline de l'appel, posée dans le contexte d'appel IA
+  (call_deadline) — call_timeout() borne les requêtes HTTP, call_sleep() /
+  call_cancelled() coupent les retries, ConcurrentEnsemble borne sa deadline
+  globale ; un résultat rendu malgré tout après la deadline est abandonné
+- on_abort(item, raison) optionnel : item perdu sur erreur ou timeout
+  ("<étape>_error" / "<étape>_timeout"), ex: fermeture de sa trace
+- son histogramme de latence (p50 / p95 / p99)
+
+La première étape peut lire une source externe au lieu de sa propre file
+(PriorityMarketQueue, CoalescingBuffer) : objet avec get(timeout) levant
+queue.Empty, et optionnellement task_done(item), qsize() et unfinished()
+(items en file + pris et pas encore task_done — base de is_idle).
+
+task_done(item) est appelé quand l'item source quitte le pipeline : sortie
+de la dernière étape, ou filtré / rejeté (file pleine) / erreur / timeout à
+n'importe quelle étape. Les files entre étapes portent (item source, item) :
+la source garde la clé de l'item (un seul worker par token) jusqu'à la fin
+de la décision.
+
+Modes d'exécution :
+- start() / submit() / stop() : workers en threads (flux continu)
+- run(item)                   : toutes les étapes inline dans l'appelant
+- run_batch(items, stop=...)  : run() de plusieurs items en parallèle
+                                (ex: marchés d'un cycle jusqu'à "confidence")
+"""
+
+import bisect
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Bornes des buckets de latence (ms) — le dernier bucket est ouvert
+LATENCY_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+
+POLICIES = ("block", "drop_oldest", "drop_new")
+
+
+class LatencyHistogram:
+    """Histogramme à buckets fixes — record O(log buckets)."""
+
+    def __init__(self, bounds=LATENCY_BUCKETS_MS):
+
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def record(self, seconds):
+
+        ms = seconds * 1000
+        self.counts[bisect.bisect_left(self.bounds, ms)] += 1
+        self.total += ms
+        self.count += 1
+
+    def percentile(self, pct):
+        """Borne haute du bucket contenant le percentile (ms)."""
+
+        if not self.count:
+            return None
+
+        rank = pct / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return self.bounds[i] if i < len(self.bounds) else float("inf")
+        return float("inf")
+
+    def get_status(self):
+
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / max(1, self.count), 1),
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
+
+
+class StageQueue:
+    """File bornée thread-safe avec politique de débordement."""
+
+    def __init__(self, maxsize=100, policy="block", on_drop=None):
+
+        if policy not in POLICIES:
+            raise ValueError(f"unknown backpressure policy: {policy}")
+
+        self.maxsize = maxsize
+        self.policy = policy
+        self.items = deque()
+        self.cond = threading.Condition()
+        self.closed = False
+        self.dropped = 0
+        self.on_drop = on_drop      # on_drop(item) : item éjecté par drop_oldest
+
+    def put(self, item):
+        """Dépose un item selon la politique. False si item perdu."""
+
+        evicted = None
+
+        with self.cond:
+
+            if len(self.items) >= self.maxsize:
+
+                if self.policy == "drop_new":
+                    self.dropped += 1
+                    return False
+
+                if self.policy == "drop_oldest":
+                    evicted = self.items.popleft()
+                    self.dropped += 1
+
+                else:
+                    while len(self.items) >= self.maxsize and not self.closed:
+                        self.cond.wait(0.5)
+                    if self.closed:
+                        self.dropped += 1
+                        return False
+
+            self.items.append(item)
+            self.cond.notify_all()
+
+        # Hors verrou : on_drop peut prendre le verrou de la source
+        if evicted is not None and self.on_drop is not None:
+            self.on_drop(evicted)
+        return True
+
+    def get(self, timeout=None):
+
+        with self.cond:
+            if not self.items:
+                self.cond.wait(timeout)
+                if not self.items:
+                    raise queue.Empty
+
+            item = self.items.popleft()
+            self.cond.notify_all()   # libère un producteur bloqué
+            return item
+
+    def close(self):
+
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+    def drain(self):
+        """Vide la file (shutdown). Retourne les items restants."""
+
+        with self.cond:
+            items = list(self.items)
+            self.items.clear()
+            self.cond.notify_all()
+        return items
+
+    def qsize(self):
+        return len(self.items)
+
+
+class Stage:
+    """Étape nommée : fn + workers + file bornée + timeout + latences."""
+
+    def __init__(self, name, fn, workers=1, queue_size=100, policy="block", timeout=None, source=None,
+                 on_abort=None):
+
+        self.name = name
+        self.fn = fn
+        self.on_abort = on_abort
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.source = source
+        self.queue = StageQueue(queue_size, policy)
+
+        self.lock = threading.Lock()
+        self.latency = LatencyHistogram()
+        self.in_flight = 0
+
+        # Stats
+        self.processed = 0
+        self.passed = 0
+        self.filtered = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def get(self, timeout):
+
+        if self.source is not None:
+            return self.source.get(timeout=timeout)
+        return self.queue.get(timeout)
+
+    def task_done(self, item):
+
+        done = getattr(self.source, "task_done", None)
+        if done is not None:
+            done(item)
+
+    def pending(self):
+
+        size = self.queue.qsize()
+        if self.source is not None and hasattr(self.source, "qsize"):
+            size += self.source.qsize()
+        return size
+
+    def process(self, item, errors=None):
+        """Exécute fn avec mesure, timeout et capture d'erreur. Retourne l'item suivant ou None."""
+
+        # Import local : concurrent_ensemble -> tracer -> pipeline
+        from alpha_system.ai.concurrent_ensemble import call_deadline
+
+        start = time.monotonic()
+        aborted = None
+
+        try:
+            with call_deadline(self.timeout):
+                result = self.fn(item)
+        except Exception as e:
+            result = None
+            aborted = "error"
+            with self.lock:
+                self.errors += 1
+            if errors is not None:
+                errors.handle(e, f"stage_{self.name}")
+
+        elapsed = time.monotonic() - start
+
+        with self.lock:
+            self.processed += 1
+            self.latency.record(elapsed)
+
+            if result is not None and self.timeout is not None and elapsed > self.timeout:
+                self.timeouts += 1
+                result, aborted = None, "timeout"
+
+            elif result is None:
+                self.filtered += 1
+            else:
+                self.passed += 1
+
+        if aborted is not None and self.on_abort is not None:
+            self.on_abort(item, f"{self.name}_{aborted}")
+
+        return result
+
+    def get_status(self):
+
+        with self.lock:
+            return {
+                "workers": self.workers,
+                "policy": self.queue.policy,
+                "depth": self.pending(),
+                "maxsize": self.queue.maxsize,
+                "in_flight": self.in_flight,
+                "processed": self.processed,
+                "passed": self.passed,
+                "filtered": self.filtered,
+                "dropped": self.queue.dropped,
+                "timeouts": self.timeouts,
+                "errors": self.errors,
+                "latency": self.latency.get_status(),
+            }
+
+
+class Pipeline:
+    """Chaîne d'étapes — threads par étape, ou exécution inline (run)."""
+
+    def __init__(self, name, stages, errors=None):
+
+        self.name = name
+        self.stages = list(stages)
+        self.errors = errors
+        self.threads = []
+        self.running = False
+
+        # Items soumis (submit) pas encore sortis du pipeline
+        self.lock = threading.Lock()
+        self.active = 0
+
+        # Item éjecté d'une file (drop_oldest) : quitte le pipeline
+        for stage in self.stages:
+            stage.queue.on_drop = self._release
+
+    @classmethod
+    def from_settings(cls, name, functions, settings, errors=None, source=None, on_abort=None):
+        """Construit les étapes depuis [(nom, fn)] et {nom: {workers, queue, policy, timeout}}."""
+
+        stages = []
+        for i, (stage_name, fn) in enumerate(functions):
+            conf = settings.get(stage_name, {})
+            stages.append(Stage(
+                stage_name, fn,
+                workers=conf.get("workers", 1),
+                queue_size=conf.get("queue", 100),
+                policy=conf.get("policy", "block"),
+                timeout=conf.get("timeout"),
+                source=source if i == 0 else None,
+                on_abort=on_abort,
+            ))
+        return cls(name, stages, errors=errors)
+
+    def stage(self, name):
+
+        for stage in self.stages:
+            if stage.name == name:
+                return stage
+        raise KeyError(name)
+
+    # ============================================
+    # INLINE
+    # ============================================
+
+    def run(self, item, start=None, stop=None):
+        """Traverse les étapes start..stop (incluses, toutes par défaut) dans le
+        thread appelant. Retourne la sortie de la dernière étape ou None."""
+
+        names = [stage.name for stage in self.stages]
+        first = names.index(start) if start else 0
+        last = names.index(stop) if stop else len(names) - 1
+
+        for stage in self.stages[first:last + 1]:
+            item = stage.process(item, self.errors)
+            if item is None:
+                return None
+        return item
+
+    def run_batch(self, items, start=None, stop=None, max_workers=None):
+        """run() de plusieurs items en parallèle. Résultats dans l'ordre des items.
+
+        max_workers : par défaut le plus grand pool des étapes traversées."""
+
+        if not items:
+            return []
+
+        names = [stage.name for stage in self.stages]
+        first = names.index(start) if start else 0
+        last = names.index(stop) if stop else len(names) - 1
+        workers = max_workers or max(stage.workers for stage in self.stages[first:last + 1])
+
+        with ThreadPoolExecutor(max_workers=min(workers, len(items)),
+                                thread_name_prefix=f"{self.name}-batch") as pool:
+            return list(pool.map(lambda item: self.run(item, start, stop), items))
+
+    # ============================================
+    # THREADED
+    # ============================================
+
+    def start(self):
+
+        self.running = True
+        for i, stage in enumerate(self.stages):
+            downstream = self.stages[i + 1] if i + 1 < len(self.stages) else None
+            for w in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._worker, args=(stage, downstream),
+                    name=f"{self.name}-{stage.name}-{w}", daemon=True,
+                )
+                thread.start()
+                self.threads.append(thread)
+
+    def submit(self, item):
+        """Dépose un item dans la première étape (sans source externe). False si perdu."""
+
+        with self.lock:
+            self.active += 1
+
+        if self.stages[0].queue.put((item, item)):
+            return True
+
+        with self.lock:
+            self.active -= 1
+        return False
+
+    def _release(self, entry):
+        """L'item source quitte le pipeline : task_done de la source (libère sa clé)."""
+
+        head = self.stages[0]
+        if head.source is not None:
+            head.task_done(entry[0])
+            return
+
+        with self.lock:
+            self.active -= 1
+
+    def _worker(self, stage, downstream):
+
+        while self.running:
+
+            try:
+                entry = stage.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            # Files internes : (item source, item) ; source externe : item brut
+            if stage.source is not None:
+                entry = (entry, entry)
+            origin, item = entry
+
+            with stage.lock:
+                stage.in_flight += 1
+
+            forwarded = False
+            try:
+                result = stage.process(item, self.errors)
+                if result is not None and downstream is not None:
+                    forwarded = downstream.queue.put((origin, result))
+            finally:
+                # Terminé, filtré, erreur, timeout ou rejeté par la file suivante.
+                # task_done avant in_flight : pas de fenêtre "idle" pendant une reprogrammation
+                if not forwarded:
+                    self._release(entry)
+                with stage.lock:
+                    stage.in_flight -= 1
+
+    def wake_all(self):
+
+        for stage in self.stages:
+            with stage.queue.cond:
+                stage.queue.cond.notify_all()
+            wake = getattr(stage.source, "wake_all", None)
+            if wake is not None:
+                wake()
+
+    def stop(self, timeout=5):
+
+        self.running = False
+        for stage in self.stages:
+            stage.queue.close()
+        self.wake_all()
+
+        for thread in self.threads:
+            thread.join(timeout)
+        self.threads = []
+
+        # Items restés entre deux étapes : rendus à la source
+        for stage in self.stages:
+            for entry in stage.queue.drain():
+                self._release(entry)
+
+    def is_idle(self):
+        """Aucun item entré et pas encore sorti. Compteurs tenus jusqu'à _release :
+        self.active (submit) ou source.unfinished() (source externe)."""
+
+        head = self.stages[0]
+        if head.source is None:
+            with self.lock:
+                return self.active == 0
+
+        unfinished = getattr(head.source, "unfinished", None)
+        if unfinished is not None:
+            return unfinished() == 0
+
+        # Source sans suivi des items pris : files et étapes en cours
+        for stage in self.stages:
+            with stage.lock:
+                if stage.in_flight or stage.pending():
+                    return False
+        return True
+
+    def wait_idle(self, timeout=None):
+        """Attend que tous les items soient sortis du pipeline. True si idle."""
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while not self.is_idle():
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def get_status(self):
+
+        return {stage.name: stage.get_status() for stage in self.stages}
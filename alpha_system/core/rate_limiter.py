@@ -0,0 +1,339 @@
+"""
+Rate Limiter — token bucket partagé par host + endpoint.
+
+Une seule instance par process (get_rate_limiter()) utilisée par tous
+les clients HTTP : PolymarketReader, HealthCheck, WalletMonitor,
+OrderMonitor, executor LIVE et AdaptiveScanner.
+
+- Un bucket par (host, endpoint), débit et burst configurables
+- Lit les réponses 429 et le header Retry-After (secondes ou date HTTP)
+- Classes de priorité : les appels critiques (post ordre, check fill)
+  passent avant les scans marché, qui ne peuvent pas consommer la réserve
+"""
+
+import threading
+import time
+from datetime import datetime, UTC
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+
+# ============================================
+# PRIORITÉS
+# ============================================
+
+PRIORITY_CRITICAL = 0   # post ordre, check fill
+PRIORITY_NORMAL = 1     # balance wallet, health check
+PRIORITY_LOW = 2        # scan marchés
+
+PRIORITY_NAMES = {
+    PRIORITY_CRITICAL: "critical",
+    PRIORITY_NORMAL: "normal",
+    PRIORITY_LOW: "low",
+}
+
+GAMMA_MARKETS_URL = "https://gamma-api.polymarket.com/markets"
+CLOB_URL = "https://clob.polymarket.com"
+
+# "host/endpoint" -> (tokens par seconde, burst)
+DEFAULT_LIMITS = {
+    "gamma-api.polymarket.com/markets": (10, 20),
+    "clob.polymarket.com/order": (10, 20),
+    "clob.polymarket.com/balance": (2, 5),
+}
+
+
+def parse_retry_after(value, default=None):
+    """Convertit un header Retry-After (secondes ou date HTTP) en secondes."""
+
+    if value is None:
+        return default
+
+    try:
+        return max(0.0, float(value))
+    except (ValueError, TypeError):
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(str(value))
+        return max(0.0, (retry_at - datetime.now(UTC)).total_seconds())
+    except Exception:
+        return default
+
+
+# ============================================
+# TOKEN BUCKET
+# ============================================
+
+class TokenBucket:
+    """Bucket d'un couple host + endpoint."""
+
+    def __init__(self, key, rate, burst):
+
+        self.key = key
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+        # Rate limit serveur
+        self.blocked_until = 0.0
+        self.consecutive_429 = 0
+
+        # Appels critiques en attente (les autres leur cèdent la place)
+        self.critical_waiting = 0
+
+        # Stats
+        self.granted = {name: 0 for name in PRIORITY_NAMES.values()}
+        self.denied = 0
+        self.waits = 0
+        self.total_wait = 0.0
+        self.throttled = 0
+
+    def refill(self, now):
+
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def get_status(self, now):
+
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "tokens": round(self.tokens, 2),
+            "blocked_for": round(max(0.0, self.blocked_until - now), 2),
+            "granted": dict(self.granted),
+            "denied": self.denied,
+            "waits": self.waits,
+            "avg_wait_ms": round(self.total_wait / max(1, self.waits) * 1000, 1),
+            "throttled": self.throttled,
+        }
+
+
+# ============================================
+# RATE LIMITER
+# ============================================
+
+class RateLimiter:
+    """Token buckets par host + endpoint, pilotés par les réponses serveur."""
+
+    def __init__(self, config=None):
+
+        config = config or {}
+
+        self.default_rate = config.get("RATE_LIMIT_DEFAULT_RATE", 5)
+        self.default_burst = config.get("RATE_LIMIT_DEFAULT_BURST", 10)
+        self.reserve = config.get("RATE_LIMIT_CRITICAL_RESERVE", 0.2)   # part du burst
+        self.default_penalty = config.get("RATE_LIMIT_DEFAULT_PENALTY", 5)
+        self.max_penalty = config.get("RATE_LIMIT_MAX_PENALTY", 120)
+
+        self.limits = dict(DEFAULT_LIMITS)
+        self.limits.update(config.get("RATE_LIMITS", {}))
+
+        self.buckets = {}
+        self.cond = threading.Condition()
+
+    # ============================================
+    # ACQUIRE
+    # ============================================
+
+    def acquire(self, url, priority=PRIORITY_NORMAL, timeout=None):
+        """Attend un token pour cette URL. Retourne False si timeout dépassé."""
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        name = PRIORITY_NAMES.get(priority, "normal")
+        critical = priority == PRIORITY_CRITICAL
+        waited_from = None
+
+        with self.cond:
+            bucket = self._bucket(url)
+
+            if critical:
+                bucket.critical_waiting += 1
+
+            try:
+                while True:
+                    now = time.monotonic()
+                    bucket.refill(now)
+
+                    wait = self._wait_needed(bucket, now, critical)
+
+                    if wait <= 0:
+                        bucket.tokens -= 1
+                        bucket.granted[name] += 1
+                        if waited_from is not None:
+                            bucket.waits += 1
+                            bucket.total_wait += now - waited_from
+                        return True
+
+                    if deadline is not None:
+                        remaining = deadline - now
+                        if remaining <= 0:
+                            bucket.denied += 1
+                            return False
+                        wait = min(wait, remaining)
+
+                    if waited_from is None:
+                        waited_from = now
+
+                    self.cond.wait(wait)
+            finally:
+                if critical:
+                    bucket.critical_waiting -= 1
+                    self.cond.notify_all()
+
+    def try_acquire(self, url, priority=PRIORITY_NORMAL):
+        """Prend un token sans attendre."""
+
+        return self.acquire(url, priority, timeout=0)
+
+    def _wait_needed(self, bucket, now, critical):
+        """Temps d'attente avant qu'un token soit disponible (0 = maintenant)."""
+
+        if now < bucket.blocked_until:
+            return bucket.blocked_until - now
+
+        # Les appels critiques peuvent vider la réserve, pas les autres
+        floor = 1.0 if critical else 1.0 + bucket.burst * self.reserve
+
+        if not critical and bucket.critical_waiting > 0:
+            return max(0.01, 1.0 / max(bucket.rate, 0.001))
+
+        if bucket.tokens >= floor:
+            return 0
+
+        return (floor - bucket.tokens) / max(bucket.rate, 0.001)
+
+    # ============================================
+    # SERVER FEEDBACK
+    # ============================================
+
+    def report_response(self, url, status_code, headers=None):
+        """Analyse une réponse HTTP. Retourne l'attente imposée (s), 0 si OK."""
+
+        headers = headers or {}
+        retry_after = None
+
+        for k, v in headers.items():
+            if k.lower() == "retry-after":
+                retry_after = v
+                break
+
+        with self.cond:
+            bucket = self._bucket(url)
+
+            if status_code == 429 or (status_code == 503 and retry_after is not None):
+                bucket.throttled += 1
+                bucket.consecutive_429 += 1
+
+                # Backoff exponentiel si le serveur ne précise rien
+                penalty = min(
+                    self.max_penalty,
+                    self.default_penalty * (2 ** (bucket.consecutive_429 - 1))
+                )
+                wait = parse_retry_after(retry_after, default=penalty)
+                self._block(bucket, wait)
+                return wait
+
+            if 200 <= status_code < 300:
+                bucket.consecutive_429 = 0
+
+        return 0
+
+    def report_rate_limit(self, url, wait_seconds):
+        """Bloque un endpoint pour wait_seconds (rate limit détecté ailleurs)."""
+
+        with self.cond:
+            bucket = self._bucket(url)
+            bucket.throttled += 1
+            self._block(bucket, wait_seconds)
+
+    def clear(self, url):
+        """Lève le blocage serveur d'un endpoint."""
+
+        with self.cond:
+            bucket = self._bucket(url)
+            bucket.blocked_until = 0.0
+            bucket.consecutive_429 = 0
+            self.cond.notify_all()
+
+    def blocked_for(self, url):
+        """Secondes restantes de blocage serveur pour cette URL."""
+
+        with self.cond:
+            bucket = self._bucket(url)
+            return max(0.0, bucket.blocked_until - time.monotonic())
+
+    def _block(self, bucket, wait_seconds):
+
+        until = time.monotonic() + wait_seconds
+        bucket.blocked_until = max(bucket.blocked_until, until)
+        bucket.tokens = 0.0
+
+    # ============================================
+    # BUCKETS
+    # ============================================
+
+    def configure(self, url, rate, burst):
+        """Change le débit d'un endpoint."""
+
+        with self.cond:
+            bucket = self._bucket(url)
+            bucket.rate = rate
+            bucket.burst = burst
+            bucket.tokens = min(bucket.tokens, burst)
+
+    def _bucket(self, url):
+
+        key = self._key(url)
+        bucket = self.buckets.get(key)
+
+        if bucket is None:
+            rate, burst = self.limits.get(key, (self.default_rate, self.default_burst))
+            bucket = TokenBucket(key, rate, burst)
+            self.buckets[key] = bucket
+
+        return bucket
+
+    def _key(self, url):
+        """host/premier segment du path — /order/abc et /order/def partagent un bucket."""
+
+        parsed = urlparse(url)
+        segments = [s for s in parsed.path.split("/") if s]
+        endpoint = segments[0] if segments else ""
+        return f"{parsed.netloc}/{endpoint}"
+
+    def get_status(self):
+
+        with self.cond:
+            now = time.monotonic()
+            buckets = {k: b.get_status(now) for k, b in self.buckets.items()}
+
+        return {
+            "buckets": buckets,
+            "total_granted": sum(sum(b["granted"].values()) for b in buckets.values()),
+            "total_denied": sum(b["denied"] for b in buckets.values()),
+            "total_throttled": sum(b["throttled"] for b in buckets.values()),
+        }
+
+
+# ============================================
+# INSTANCE PROCESS-WIDE
+# ============================================
+
+_limiter_instance = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Retourne le rate limiter partagé par tous les clients HTTP du process."""
+
+    global _limiter_instance
+
+    with _limiter_lock:
+        if _limiter_instance is None:
+            from alpha_system.config import CONFIG
+            _limiter_instance = RateLimiter(CONFIG)
+        return _limiter_instance
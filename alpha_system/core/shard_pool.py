@@ -0,0 +1,653 @@
+"""
+Shard Pool — workers décision multi-process + coordinateur de risque central.
+
+    process orchestrator                          process shard k (x N)
+    ---------------------                         ---------------------
+    source -> gate -> shard_of(token_id) ------>  ai (ensemble IA)
+                                                  pré-risque (taille, coûts)
+    RiskCoordinator  <------ reserve ----------   (capital du dernier grant)
+      confidence calibrée, taille, coûts,
+      RiskEngineV2 (capital - réservé,
+      exposition + réservations, limites
+      jour / heure + réservations en cours)
+                     ------- grant / deny ----->  exécution (ExecutionEngine)
+      record (capital, risque, DB) <- result --
+
+Les shards (process spawn) sortent parsing, prompts, appels et validation
+IA du GIL de l'orchestrator. Tout l'état de risque reste dans un seul
+process : une réservation compte comme capital engagé, position ouverte et
+trade jusqu'à son release — N shards ne peuvent pas dépasser ensemble les
+limites de RiskEngineV2.
+
+Routage stable par token_id (crc32, identique d'un process à l'autre) :
+un marché est toujours évalué par le même shard.
+
+factory(shard) -> ShardWorker, appelée dans le process enfant : fonction
+de module (picklable). Défaut : build_worker (clients IA et exécution DRY /
+LIVE construits depuis CONFIG).
+
+Pannes : une erreur du coordinateur renvoie un refus (le shard ne reste
+jamais bloqué), un shard attend au plus SHARD_REPLY_TIMEOUT sa réponse
+(réponse tardive ignorée, réservation libérée au result), un shard mort
+est relancé et ses items en cours sont rendus à la source.
+"""
+
+import multiprocessing
+import queue
+import threading
+import time
+import zlib
+from functools import partial
+
+from alpha_system.core.decision_pipeline import DecisionStages
+from alpha_system.core.pipeline import LatencyHistogram
+
+
+def shard_of(key, shards):
+    """Shard d'une clé marché — stable entre process (hash() est salé)."""
+
+    return zlib.crc32(str(key).encode()) % shards
+
+
+# ============================================
+# WORKER (process enfant)
+# ============================================
+
+class ShardWorker:
+    """Étapes ai + pré-risque d'un shard."""
+
+    def __init__(self, shard, evaluate, execute, config):
+        """evaluate(market) -> décision ou None. execute(decision) -> order."""
+
+        from alpha_system.ai.profit_optimizer import ProfitOptimizer
+        from alpha_system.execution.cost_calculator import CostCalculator
+
+        self.shard = shard
+        self.evaluate = evaluate
+        self.execute = execute
+        self.optimizer = ProfitOptimizer()
+        self.cost_calc = CostCalculator(config)
+
+    def prerisk(self, decision, capital):
+        """Taille + coûts sur le capital connu — évite un aller-retour perdu."""
+
+        decision["size"] = self.optimizer.calculate_size(capital, decision["confidence"])
+
+        cost_ok, _ = self.cost_calc.validate(decision)
+        if not cost_ok:
+            return None
+        return decision
+
+
+def build_worker(shard, source=None):
+    """Factory par défaut : ensemble IA + exécution construits dans le shard."""
+
+    from alpha_system.config import CONFIG
+    from alpha_system.ai.secure_ai_client import SecureAIClient
+    from alpha_system.ai.concurrent_ensemble import ConcurrentEnsemble
+    from alpha_system.ai.model_router import ModelRouter
+    from alpha_system.execution.execution_engine import ExecutionEngine
+    from alpha_system.utils.logger import setup_logger
+
+    models = ["deepseek-v3.2", "qwen3-next:80b", "glm-5"]
+    log = setup_logger(f"shard_{shard}")
+
+    ensemble = ConcurrentEnsemble(
+        [(model, partial(SecureAIClient(CONFIG).evaluate, model=model)) for model in models],
+        config=CONFIG, router=ModelRouter(models, CONFIG, logger=log),
+    )
+    execution = ExecutionEngine()
+
+    def evaluate(market):
+
+        best = ensemble.evaluate(market)
+        if best is None:
+            return None
+
+        return {
+            "market": market["market"],
+            "token_id": market.get("token_id"),
+            "side": best["side"],
+            "confidence": best["confidence"],
+            "price": market["price"],
+            "volume": market.get("volume", 0),
+            "model": best.get("model", ""),
+            "source": source or best.get("source", "ai"),
+        }
+
+    return ShardWorker(shard, evaluate, execution.execute, CONFIG)
+
+
+def _await_grant(replies, item_id, timeout):
+    """Réponse du coordinateur pour item_id, ou None après timeout.
+    Les réponses tardives d'items abandonnés sont ignorées."""
+
+    deadline = time.monotonic() + timeout
+
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        try:
+            grant = replies.get(timeout=remaining)
+        except queue.Empty:
+            return None
+        if grant.get("item_id") == item_id:
+            return grant
+
+
+def _worker_main(shard, factory, inbox, requests, replies, capital, reply_timeout=30):
+    """Boucle du process shard : (item_id, market) -> reserve -> exécution -> result."""
+
+    worker = factory(shard)
+
+    while True:
+
+        message = inbox.get()
+        if message is None:
+            break
+
+        item_id, market = message
+        error = None
+        grant = None
+        order = None
+        reserve_s = None
+
+        start = time.perf_counter()
+        try:
+            decision = worker.evaluate(market)
+            if decision is not None:
+                decision = worker.prerisk(decision, capital)
+        except Exception as e:
+            decision = None
+            error = repr(e)
+        eval_s = time.perf_counter() - start
+
+        if decision is not None:
+            start = time.perf_counter()
+            requests.put(("reserve", shard, item_id, decision))
+            grant = _await_grant(replies, item_id, reply_timeout)
+            reserve_s = time.perf_counter() - start
+
+            if grant is None:
+                error = f"reserve timeout ({reply_timeout}s)"
+            elif grant["granted"]:
+                capital = grant["capital"]
+                try:
+                    order = worker.execute(grant["decision"])
+                except Exception as e:
+                    error = repr(e)
+            else:
+                capital = grant["capital"]
+
+        reservation = grant["reservation"] if grant and grant["granted"] else None
+        requests.put(("result", shard, item_id, reservation, order, eval_s, reserve_s, error))
+
+
+# ============================================
+# RISK COORDINATOR (process orchestrator)
+# ============================================
+
+class RiskCoordinator:
+    """Réservations de risque globales — un seul détenteur de l'état risque."""
+
+    def __init__(self, system, stages, max_reservations=8):
+
+        self.system = system
+        self.stages = stages
+        self.max_reservations = max_reservations
+
+        self.lock = threading.Lock()
+        self.reservations = {}      # id -> décision réservée
+        self.reserved = 0.0
+        self.next_id = 0
+
+        # Stats
+        self.granted = 0
+        self.denied = 0
+        self.released = 0
+
+    def reserve(self, decision):
+        """Valide et réserve. Retourne {granted, reason, reservation, decision, capital}."""
+
+        s = self.system
+
+        with self.lock:
+
+            with s.lock:
+                capital = s.capital
+            available = capital - self.reserved
+
+            reply = {"granted": False, "reservation": None, "decision": decision, "capital": available}
+
+            conf_ok, conf_reason = s.confidence.validate(decision)
+            if not conf_ok:
+                return self._deny(reply, conf_reason)
+
+            # Taille définitive sur le capital disponible (hors réservations en cours),
+            # celui que RiskEngineV2 valide
+            decision["size"] = s.optimizer.calculate_size(available, decision["confidence"])
+
+            cost_ok, cost_info = s.cost_calc.validate(decision)
+            if not cost_ok:
+                return self._deny(reply, cost_info)
+
+            risk_ok, risk_reason = s.risk.validate_trade(available, decision["size"], decision["confidence"])
+            if not risk_ok:
+                s.log.risk(f"Blocked: {risk_reason}")
+                return self._deny(reply, risk_reason)
+
+            # Réservations en cours = trades à venir pour les limites jour / heure
+            pending = len(self.reservations)
+            if pending >= self.max_reservations:
+                return self._deny(reply, f"reservations {pending} >= max {self.max_reservations}")
+            if s.risk.daily_trades + pending >= s.risk.max_daily_trades:
+                return self._deny(reply, f"daily trades {s.risk.daily_trades} + {pending} reserved")
+            if s.risk.hourly_trades + pending >= s.risk.max_hourly_trades:
+                return self._deny(reply, f"hourly trades {s.risk.hourly_trades} + {pending} reserved")
+
+            self.next_id += 1
+            reservation = self.next_id
+            self.reservations[reservation] = decision
+            self.reserved += decision["size"]
+            s.risk.add_position(f"reservation:{reservation}", decision["size"], decision["price"])
+            self.granted += 1
+
+            reply.update(granted=True, reason="OK", reservation=reservation,
+                         capital=capital - self.reserved)
+            return reply
+
+    def deny(self, decision, reason):
+        """Refus hors validation (erreur du coordinateur) — le shard n'attend jamais en vain."""
+
+        with self.system.lock:
+            available = self.system.capital - self.reserved
+        reply = {"granted": False, "reservation": None, "decision": decision, "capital": available}
+        return self._deny(reply, reason)
+
+    def _deny(self, reply, reason):
+
+        self.denied += 1
+        reply["reason"] = reason
+        self.system.log.debug(f"Reservation denied: {reason}")
+        return reply
+
+    def release(self, reservation, order):
+        """Libère la réservation ; trade exécuté -> record (capital, risque, DB)."""
+
+        with self.lock:
+            decision = self.reservations.pop(reservation, None)
+            if decision is None:
+                return
+            self.reserved = self.reserved - decision["size"] if self.reservations else 0.0   # pas de résidu flottant
+            self.system.risk.remove_position(f"reservation:{reservation}")
+            self.released += 1
+
+        if order is not None:
+            self.stages.record(decision, order)
+
+    def get_status(self):
+
+        with self.lock:
+            return {
+                "outstanding": len(self.reservations),
+                "reserved": round(self.reserved, 2),
+                "granted": self.granted,
+                "denied": self.denied,
+                "released": self.released,
+            }
+
+
+# ============================================
+# POOL
+# ============================================
+
+class ShardedDecisionPool:
+    """N process shards + dispatcher (gate, routage) + serveur du coordinateur."""
+
+    def __init__(self, system, name, config, factory=None, admit=None, source=None):
+
+        self.system = system
+        self.name = name
+        self.source = source
+        self.factory = factory or build_worker
+        self.shards = max(1, config.get("SHARD_WORKERS", 2))
+        self.queue_size = config.get("SHARD_QUEUE_SIZE", 50)
+        self.reply_timeout = config.get("SHARD_REPLY_TIMEOUT", 30)
+
+        self.stages = DecisionStages(system, execute=None, admit=admit)
+        self.coordinator = RiskCoordinator(system, self.stages, config.get("SHARD_MAX_RESERVATIONS", 8))
+
+        self.ctx = multiprocessing.get_context(config.get("SHARD_START_METHOD", "spawn"))
+        self.requests = self.ctx.Queue()
+        self.inboxes = [self.ctx.Queue(self.queue_size) for _ in range(self.shards)]
+        self.replies = [self.ctx.Queue() for _ in range(self.shards)]
+        self.processes = []
+        self.threads = []
+
+        self.lock = threading.Lock()
+        self.pending = {}           # item_id -> (item source, shard, marché, dispatch monotonic)
+        self.held = {}              # item_id -> réservation accordée (libérée au result)
+        self.restarts = 0
+        self.next_id = 0
+        self.running = False
+        self.started_at = None
+
+        self.stats = [{
+            "dispatched": 0, "processed": 0, "decisions": 0, "executed": 0, "errors": 0,
+            "eval": LatencyHistogram(), "reserve": LatencyHistogram(),
+        } for _ in range(self.shards)]
+
+    # ============================================
+    # LIFECYCLE
+    # ============================================
+
+    def start(self):
+
+        self.running = True
+        self.started_at = time.monotonic()
+
+        with self.system.lock:
+            capital = self.system.capital
+
+        for shard in range(self.shards):
+            self.processes.append(self._spawn(shard, capital))
+
+        targets = [self._serve]
+        if self.source is not None:
+            targets.append(self._dispatch_loop)
+        for target in targets:
+            thread = threading.Thread(target=target, name=f"{self.name}-{target.__name__[1:]}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def _spawn(self, shard, capital):
+
+        process = self.ctx.Process(
+            target=_worker_main,
+            args=(shard, self.factory, self.inboxes[shard], self.requests, self.replies[shard],
+                  capital, self.reply_timeout),
+            name=f"{self.name}-shard-{shard}", daemon=True,
+        )
+        process.start()
+        return process
+
+    def _check_shard(self, shard):
+        """Shard mort : items en cours rendus (réservations libérées), file neuve,
+        process relancé. True si le shard est vivant (ou relancé)."""
+
+        with self.lock:
+            if not self.running or shard >= len(self.processes):
+                return False
+            if self.processes[shard].is_alive():
+                return True
+
+            lost = [(item_id, entry) for item_id, entry in self.pending.items() if entry[1] == shard]
+            for item_id, _ in lost:
+                del self.pending[item_id]
+            held = [self.held.pop(item_id) for item_id, _ in lost if item_id in self.held]
+            self.stats[shard]["errors"] += len(lost)
+            self.inboxes[shard] = self.ctx.Queue(self.queue_size)
+            self.replies[shard] = self.ctx.Queue()
+            self.restarts += 1
+
+        self.system.log.error(f"Shard {shard} died (exit {self.processes[shard].exitcode}) — restarting, {len(lost)} items failed")
+
+        for reservation in held:
+            self.coordinator.release(reservation, None)
+        for _, (item, _, market, _) in lost:
+            self.stages.tracer.finish(market, "shard_died")
+            self._task_done(item)
+
+        with self.system.lock:
+            capital = self.system.capital
+        process = self._spawn(shard, capital)
+        with self.lock:
+            self.processes[shard] = process
+        return True
+
+    def stop(self, timeout=5):
+
+        self.running = False
+
+        for inbox in self.inboxes:
+            try:
+                inbox.put(None, timeout=timeout)
+            except queue.Full:
+                pass
+
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self.processes = []
+
+        for thread in self.threads:
+            thread.join(timeout)
+        self.threads = []
+
+    # ============================================
+    # DISPATCH
+    # ============================================
+
+    def submit(self, item):
+        """gate (process orchestrator) puis envoi au shard du marché. False si filtré."""
+
+        market = self.stages.gate(item)
+        if market is None:
+            return False
+
+        shard = shard_of(market.get("token_id") or market["market"], self.shards)
+
+        with self.lock:
+            self.next_id += 1
+            item_id = self.next_id
+            self.pending[item_id] = (item, shard, market, time.monotonic())
+            self.stats[shard]["dispatched"] += 1
+
+        # File du shard pleine : backpressure sur le dispatcher, sauf shard mort
+        # (relancé — ses items, celui-ci compris, sont rendus à la source)
+        while True:
+            try:
+                self.inboxes[shard].put((item_id, market), timeout=0.5)
+                return True
+            except queue.Full:
+                alive = self.processes[shard].is_alive() if shard < len(self.processes) else False
+                if self.running and alive:
+                    continue
+                with self.lock:
+                    owned = self.pending.pop(item_id, None) is not None
+                if self.running:
+                    self._check_shard(shard)
+                return not owned
+
+    def _dispatch_loop(self):
+
+        while self.running:
+
+            try:
+                item = self.source.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            try:
+                submitted = self.submit(item)
+            except Exception as e:
+                submitted = False
+                self.system.errors.handle(e, f"{self.name}_dispatch")
+
+            if not submitted:
+                self._task_done(item)
+
+    def _task_done(self, item):
+
+        done = getattr(self.source, "task_done", None)
+        if done is not None:
+            done(item)
+
+    # ============================================
+    # COORDINATOR SERVER
+    # ============================================
+
+    def _serve(self):
+        """Répond aux reserve, applique les result — thread unique (ordre des messages)."""
+
+        checked = time.monotonic()
+
+        while self.running or self.pending:
+
+            # Shards morts : vérifiés à chaque pause et au moins toutes les 0.5 s sous charge
+            now = time.monotonic()
+            if now - checked >= 0.5:
+                checked = now
+                for shard in range(len(self.processes)):
+                    self._check_shard(shard)
+
+            try:
+                message = self.requests.get(timeout=0.5)
+            except queue.Empty:
+                checked = 0.0
+                if not self.running and not any(p.is_alive() for p in self.processes):
+                    break
+                continue
+
+            if message[0] == "reserve":
+                self._on_reserve(*message[1:])
+                continue
+
+            try:
+                self._on_result(*message[1:])
+            except Exception as e:
+                self.system.errors.handle(e, f"{self.name}_coordinator")
+
+    def _on_reserve(self, shard, item_id, decision):
+        """Toujours une réponse au shard, même si le coordinateur lève."""
+
+        # Décision construite dans le shard : id de trace repris du marché dispatché
+        with self.lock:
+            entry = self.pending.get(item_id)
+        if entry is not None:
+            self.stages.tracer.link(entry[2], decision)
+
+        try:
+            with self.stages.tracer.span(decision, "reserve"):
+                reply = self.coordinator.reserve(decision)
+        except Exception as e:
+            self.system.errors.handle(e, f"{self.name}_coordinator")
+            reply = self.coordinator.deny(decision, f"coordinator error: {e!r}")
+
+        if reply["granted"]:
+            with self.lock:
+                self.held[item_id] = reply["reservation"]
+
+        reply["item_id"] = item_id
+        self.replies[shard].put(reply)
+
+    def _on_result(self, shard, item_id, reservation, order, eval_s, reserve_s, error):
+
+        # Accordée mais jamais reçue (timeout côté shard) : libérée ici
+        with self.lock:
+            held = self.held.pop(item_id, None)
+        if held is not None and reservation is None:
+            self.coordinator.release(held, None)
+
+        # Trace : aller-retour shard (IA + pré-risque + exécution, hors process),
+        # avant record qui termine la trace d'un trade exécuté (persist)
+        with self.lock:
+            _, _, market, dispatched = self.pending.get(item_id, (None, None, None, None))
+        tracer = self.stages.tracer
+        if market is not None:
+            tracer.add(market, "shard", dispatched)
+
+        if reservation is not None:
+            self.coordinator.release(reservation, order)
+
+        with self.lock:
+            stats = self.stats[shard]
+            stats["processed"] += 1
+            stats["eval"].record(eval_s)
+            if reserve_s is not None:
+                stats["decisions"] += 1
+                stats["reserve"].record(reserve_s)
+            if order is not None:
+                stats["executed"] += 1
+            if error is not None:
+                stats["errors"] += 1
+            item, _, _, _ = self.pending.pop(item_id, (None, None, None, None))
+
+        if market is not None:
+            if error is not None:
+                tracer.finish(market, "error")
+            elif reserve_s is None:
+                tracer.finish(market, "no_trade")
+            elif reservation is None:
+                tracer.finish(market, "reserve_denied")
+            elif order is None:
+                tracer.finish(market, "execution_failed")
+
+        if error is not None:
+            self.system.log.error(f"Shard {shard}: {error}")
+        if item is not None:
+            self._task_done(item)
+
+    # ============================================
+    # STATUS
+    # ============================================
+
+    def is_idle(self):
+
+        with self.lock:
+            if self.pending:
+                return False
+        return self.source is None or not getattr(self.source, "qsize", lambda: 0)()
+
+    def wait_idle(self, timeout=None):
+        """Attend la fin de tous les items dispatchés. True si idle."""
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        idle = 0
+        while idle < 2:
+            idle = idle + 1 if self.is_idle() else 0
+            if idle < 2 and deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def get_status(self):
+
+        elapsed = max(1e-6, time.monotonic() - (self.started_at or time.monotonic()))
+
+        with self.lock:
+            shards = {}
+            for shard, st in enumerate(self.stats):
+                shards[shard] = {
+                    "alive": shard < len(self.processes) and self.processes[shard].is_alive(),
+                    "dispatched": st["dispatched"],
+                    "processed": st["processed"],
+                    "decisions": st["decisions"],
+                    "executed": st["executed"],
+                    "errors": st["errors"],
+                    "throughput": round(st["processed"] / elapsed, 2),
+                    "eval": st["eval"].get_status(),
+                    "reserve": st["reserve"].get_status(),
+                }
+
+        return {"shards": shards, "pending": len(self.pending), "restarts": self.restarts,
+                "coordinator": self.coordinator.get_status()}
+
+
+def format_shard_status(pool):
+    """Lignes de report, une par shard + coordinateur."""
+
+    status = pool.get_status()
+    lines = []
+    for shard, st in status["shards"].items():
+        lines.append(
+            f"  Shard [{shard}]: alive:{st['alive']} processed:{st['processed']} ({st['throughput']}/s) "
+            f"decisions:{st['decisions']} executed:{st['executed']} errors:{st['errors']} | "
+            f"eval p50:{st['eval']['p50']}ms p95:{st['eval']['p95']}ms | reserve p50:{st['reserve']['p50']}ms p95:{st['reserve']['p95']}ms"
+        )
+    co = status["coordinator"]
+    lines.append(f"  Risk coordinator: outstanding:{co['outstanding']} reserved:{co['reserved']} granted:{co['granted']} denied:{co['denied']} released:{co['released']}")
+    return lines
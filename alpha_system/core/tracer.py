@@ -0,0 +1,287 @@
+"""
+Tracer — spans par décision (marché évalué), échantillonnés.
+
+Une trace suit un marché de son scan à sa persistance :
+    scan -> filter -> queue (enqueue..dequeue) -> model:<nom> (par appel)
+    -> confidence -> cost -> risk -> execute [guard, wallet, submit, fill]
+    -> persist
+Chaque span enregistre des timestamps monotonic (offsets en ms depuis le
+début de la trace). begin() pose l'id de trace sur le dict marché
+(TRACE_FIELD) ; link() le recopie sur la décision construite à partir du
+marché. Les traces sont retrouvées par cet id : un rescan du même marché
+ouvre une nouvelle trace sans toucher celle encore en cours de décision.
+
+- TRACE_SAMPLE_RATE : fraction des marchés tracés (le reste ne coûte
+  qu'une lecture de dict par point d'instrumentation)
+- TRACE_RING_SIZE   : traces terminées gardées en mémoire (ring)
+- TRACE_FILE        : JSONL optionnel, une trace terminée par ligne
+
+Un marché remplacé en file ou coalescé avant évaluation est terminé par
+sa source ("superseded"). Les traces jamais terminées sont éjectées
+("abandoned") au-delà de TRACE_RING_SIZE actives.
+"""
+
+import itertools
+import json
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+from alpha_system.core.pipeline import LatencyHistogram
+
+
+# Buckets fins (ms) : filter / confidence sont sub-milliseconde
+TRACE_BUCKETS_MS = [0.1, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+
+
+# Champ portant l'id de trace dans les dicts marché / décision
+TRACE_FIELD = "_trace_id"
+
+
+def trace_key(item):
+    """Clé marché d'un marché ou d'une décision (token_id, sinon nom)."""
+
+    if not isinstance(item, dict):
+        return None
+    return item.get("token_id") or item.get("market")
+
+
+def trace_id_of(item):
+
+    if not isinstance(item, dict):
+        return None
+    return item.get(TRACE_FIELD)
+
+
+class Trace:
+    """Spans d'une décision : [(nom, début, fin)] en secondes monotonic."""
+
+    __slots__ = ("trace_id", "key", "market", "start", "spans", "open")
+
+    def __init__(self, trace_id, key, market, start):
+
+        self.trace_id = trace_id
+        self.key = key
+        self.market = market
+        self.start = start
+        self.spans = []
+        self.open = {}
+
+    def to_dict(self, outcome, end):
+
+        return {
+            "trace_id": self.trace_id,
+            "market": self.market,
+            "outcome": outcome,
+            "total_ms": round((end - self.start) * 1000, 3),
+            "spans": [
+                {"name": name, "start_ms": round((s - self.start) * 1000, 3),
+                 "duration_ms": round((e - s) * 1000, 3)}
+                for name, s, e in self.spans
+            ],
+        }
+
+
+class Tracer:
+    """Traces actives par id + ring des traces terminées + histogrammes par span."""
+
+    def __init__(self, config):
+
+        self.sample_rate = config.get("TRACE_SAMPLE_RATE", 0.05)
+        self.ring_size = config.get("TRACE_RING_SIZE", 1000)
+        self.path = config.get("TRACE_FILE", "")
+
+        self.lock = threading.Lock()
+        self.active = OrderedDict()     # trace_id -> Trace
+        self.ring = deque(maxlen=self.ring_size)
+        self.histograms = {}            # span -> LatencyHistogram
+        self.ids = itertools.count(1)
+        self.file = open(self.path, "a", encoding="utf-8") if self.path else None
+
+        # Stats
+        self.seen = 0
+        self.sampled = 0
+        self.finished = 0
+        self.outcomes = {}
+
+    # ============================================
+    # TRACE
+    # ============================================
+
+    def begin(self, item, start=None):
+        """Ouvre une trace si le marché est échantillonné (id posé sur le dict).
+        start : monotonic du scan."""
+
+        key = trace_key(item)
+        if key is None:
+            return None
+
+        self.seen += 1
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return None
+
+        trace = Trace(next(self.ids), key, item.get("market", key), start or time.monotonic())
+        item[TRACE_FIELD] = trace.trace_id
+
+        with self.lock:
+            self.active[trace.trace_id] = trace
+            self.sampled += 1
+            evicted = None
+            if len(self.active) > self.ring_size:
+                _, evicted = self.active.popitem(last=False)
+
+        if evicted is not None:
+            self._close(evicted, "abandoned")
+        return trace
+
+    def link(self, source, item):
+        """Recopie l'id de trace du marché sur la décision qui en dérive."""
+
+        trace_id = trace_id_of(source)
+        if trace_id is not None and isinstance(item, dict):
+            item[TRACE_FIELD] = trace_id
+        return item
+
+    def get(self, item):
+
+        if not self.active:
+            return None
+        return self.active.get(trace_id_of(item))
+
+    def add(self, item, name, start, end=None):
+        """Span déjà mesuré (start / end monotonic)."""
+
+        trace = self.get(item)
+        if trace is not None:
+            trace.spans.append((name, start, end or time.monotonic()))
+
+    @contextmanager
+    def span(self, item, name):
+        """with tracer.span(market, "confidence"): ..."""
+
+        trace = self.get(item)
+        if trace is None:
+            yield
+            return
+
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            trace.spans.append((name, start, time.monotonic()))
+
+    def start_span(self, item, name):
+        """Span ouvert ici et fermé par end_span (ex: queue = enqueue..dequeue)."""
+
+        trace = self.get(item)
+        if trace is not None:
+            trace.open[name] = time.monotonic()
+
+    def end_span(self, item, name):
+
+        trace = self.get(item)
+        if trace is not None and name in trace.open:
+            trace.spans.append((name, trace.open.pop(name), time.monotonic()))
+
+    def finish(self, item, outcome):
+        """Termine la trace active du marché (exécuté, rejeté à une étape...)."""
+
+        if not self.active:
+            return
+
+        trace_id = trace_id_of(item)
+        if trace_id is None:
+            return
+        with self.lock:
+            trace = self.active.pop(trace_id, None)
+
+        if trace is not None:
+            self._close(trace, outcome)
+
+    def _close(self, trace, outcome):
+
+        end = time.monotonic()
+        record = trace.to_dict(outcome, end)
+
+        with self.lock:
+            self.finished += 1
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+            self.ring.append(record)
+
+            for name, s, e in trace.spans:
+                hist = self.histograms.get(name)
+                if hist is None:
+                    hist = self.histograms[name] = LatencyHistogram(TRACE_BUCKETS_MS)
+                hist.record(e - s)
+
+            total = self.histograms.get("total")
+            if total is None:
+                total = self.histograms["total"] = LatencyHistogram(TRACE_BUCKETS_MS)
+            total.record(end - trace.start)
+
+            if self.file is not None:
+                self.file.write(json.dumps(record) + "\n")
+                self.file.flush()
+
+    # ============================================
+    # STATUS
+    # ============================================
+
+    def recent(self, n=10):
+
+        with self.lock:
+            return list(self.ring)[-n:]
+
+    def close(self):
+
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+    def get_status(self):
+
+        with self.lock:
+            return {
+                "sample_rate": self.sample_rate,
+                "seen": self.seen,
+                "sampled": self.sampled,
+                "finished": self.finished,
+                "active": len(self.active),
+                "outcomes": dict(self.outcomes),
+                "spans": {name: hist.get_status() for name, hist in self.histograms.items()},
+            }
+
+
+def format_trace_status(tracer):
+    """Lignes de report : une ligne globale + une par span (p50 / p95 / p99)."""
+
+    status = tracer.get_status()
+    lines = [f"  Trace: {status['sampled']}/{status['seen']} sampled ({status['sample_rate'] * 100}%), "
+             f"{status['finished']} finished, {status['active']} active | {status['outcomes']}"]
+
+    for name, st in status["spans"].items():
+        lines.append(f"  Trace [{name}]: n:{st['count']} p50:{st['p50']}ms p95:{st['p95']}ms p99:{st['p99']}ms avg:{st['avg_ms']}ms")
+    return lines
+
+
+# ============================================
+# SINGLETON (process)
+# ============================================
+
+_tracer_instance = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer():
+    """Retourne le tracer partagé par tous les composants du process."""
+
+    global _tracer_instance
+
+    with _tracer_lock:
+        if _tracer_instance is None:
+            from alpha_system.config import CONFIG
+            _tracer_instance = Tracer(CONFIG)
+        return _tracer_instance
@@ -2,6 +2,7 @@ import uuid
 from datetime import datetime, UTC
 
 from alpha_system.config import CONFIG
+from alpha_system.core.tracer import get_tracer
 
 
 class ExecutionEngine:
@@ -21,6 +22,8 @@ class ExecutionEngine:
             from alpha_system.execution.polymarket_executor_dry import PolymarketExecutorDry
             self.executor = PolymarketExecutorDry()
 
+        self.tracer = get_tracer()
+
     def execute(self, decision):
 
         order = {
@@ -33,7 +36,8 @@ class ExecutionEngine:
             "token_id": decision.get("token_id"),
         }
 
-        result = self.executor.execute(decision)
+        with self.tracer.span(decision, "submit"):
+            result = self.executor.execute(decision)
 
         order["pnl"] = result.get("pnl", 0)
         order["status"] = result.get("status", "SIMULATED")
@@ -8,6 +8,7 @@ Compatible DRY et LIVE.
 """
 
 from alpha_system.config import CONFIG
+from alpha_system.core.tracer import get_tracer
 
 
 class LiveExecutionOrchestrator:
@@ -23,6 +24,7 @@ class LiveExecutionOrchestrator:
         self.order_monitor = order_monitor
         self.log = logger
         self.db = database
+        self.tracer = get_tracer()
 
         # Stats
         self.total_signals = 0
@@ -44,14 +46,16 @@ class LiveExecutionOrchestrator:
         self.total_signals += 1
 
         # 1. EXECUTION GUARD
-        guard_ok, guard_reason = self.guard.validate(signal)
+        with self.tracer.span(signal, "guard"):
+            guard_ok, guard_reason = self.guard.validate(signal)
         if not guard_ok:
             self.guard_blocked += 1
             self._log(f"Guard blocked: {guard_reason}")
             return {"pnl": 0, "status": "GUARD_BLOCKED", "reason": guard_reason}
 
         # 2. WALLET CHECK
-        wallet_ok, wallet_reason = self.wallet.validate_trade(signal.get("size", 0))
+        with self.tracer.span(signal, "wallet"):
+            wallet_ok, wallet_reason = self.wallet.validate_trade(signal.get("size", 0))
         if not wallet_ok:
             self.wallet_blocked += 1
             self._log(f"Wallet blocked: {wallet_reason}")
@@ -74,7 +78,8 @@ class LiveExecutionOrchestrator:
 
         # 4. WAIT FOR FILL (if order monitor available)
         if self.order_monitor and result.get("id"):
-            fill_status = self.order_monitor.wait_for_fill(result["id"])
+            with self.tracer.span(signal, "fill"):
+                fill_status = self.order_monitor.wait_for_fill(result["id"])
             if fill_status is None:
                 self.failed += 1
                 self._log(f"Order not filled — timeout")
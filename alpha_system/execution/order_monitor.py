@@ -9,17 +9,21 @@ import time
 from datetime import datetime, UTC
 
 from alpha_system.config import CONFIG
+from alpha_system.core.rate_limiter import get_rate_limiter, PRIORITY_CRITICAL, CLOB_URL
+
+ORDER_URL = f"{CLOB_URL}/order"
 
 
 class OrderMonitor:
     """Monitor les ordres en attente — confirme les fills."""
 
-    def __init__(self, polymarket_client=None, logger=None, database=None):
+    def __init__(self, polymarket_client=None, logger=None, database=None, rate_limiter=None):
 
         self.client = polymarket_client
         self.log = logger
         self.db = database
         self.mode = CONFIG.get("MODE", "DRY")
+        self.limiter = rate_limiter or get_rate_limiter()
 
         # Tracking
         self.monitored_orders = {}
@@ -57,7 +61,12 @@ class OrderMonitor:
 
         while time.time() - start < timeout:
             try:
-                status = self.client.get_order(order_id)
+                # Check fill = priorité critique
+                remaining = timeout - (time.time() - start)
+                if not self.limiter.acquire(ORDER_URL, PRIORITY_CRITICAL, timeout=remaining):
+                    break
+
+                status = self._get_order(order_id)
 
                 if status is None:
                     time.sleep(poll_interval)
@@ -97,18 +106,33 @@ class OrderMonitor:
     # CHECK ORDER STATUS (non-blocking)
     # ============================================
 
-    def check_order(self, order_id):
+    def check_order(self, order_id, poll_timeout=2):
         """Vérifie le statut d'un ordre sans bloquer."""
 
         if self.mode != "LIVE" or not self.client:
             return {"order_id": order_id, "status": "filled", "mode": "DRY"}
 
+        if not self.limiter.acquire(ORDER_URL, PRIORITY_CRITICAL, timeout=poll_timeout):
+            self._log(f"Check {order_id[:12]} rate limited")
+            return None
+
         try:
-            return self.client.get_order(order_id)
+            return self._get_order(order_id)
         except Exception as e:
             self._log(f"Check error: {e}")
             return None
 
+    def _get_order(self, order_id):
+        """get_order CLOB — remonte les 429 au rate limiter."""
+
+        try:
+            return self.client.get_order(order_id)
+        except Exception as e:
+            status_code = getattr(e, "status_code", None)
+            if status_code:
+                self.limiter.report_response(ORDER_URL, status_code)
+            raise
+
     # ============================================
     # STATUS
     # ============================================
@@ -18,6 +18,10 @@ import time
 import traceback
 from datetime import datetime, UTC
 
+from alpha_system.core.rate_limiter import get_rate_limiter, PRIORITY_CRITICAL, CLOB_URL
+
+ORDER_URL = f"{CLOB_URL}/order"
+
 
 class PolymarketExecutorLive:
     """Executor LIVE Polymarket — ordres réels signés sur Polygon."""
@@ -29,6 +33,7 @@ class PolymarketExecutorLive:
         self.log = logger
         self.db = database
         self.client = None
+        self.limiter = get_rate_limiter()
 
         # Order tracking
         self.pending_orders = {}
@@ -228,8 +233,18 @@ class PolymarketExecutorLive:
         # Sign
         signed_order = self.client.create_order(order_args)
 
-        # Send
-        result = self.client.post_order(signed_order)
+        # Send — post ordre = priorité critique
+        if not self.limiter.acquire(ORDER_URL, PRIORITY_CRITICAL, timeout=10):
+            self._log("Order post rate limited")
+            return None
+
+        try:
+            result = self.client.post_order(signed_order)
+        except Exception as e:
+            status_code = getattr(e, "status_code", None)
+            if status_code:
+                self.limiter.report_response(ORDER_URL, status_code)
+            raise
 
         self.pending_orders[order["id"]] = {
             "order": order,
@@ -5,6 +5,7 @@ Ouverture, suivi temps réel, take profit, stop loss,
 trailing stop, fermeture automatique, PnL, sync RiskEngine.
 """
 
+import threading
 import time
 from datetime import datetime, UTC
 
@@ -67,6 +68,41 @@ class Position:
             "open_time": self.open_time.isoformat(),
         }
 
+    def to_state(self):
+        """État complet (snapshot warm start) — from_state() le reconstruit."""
+
+        state = self.to_dict()
+        state.update(
+            model=self.model,
+            take_profit=self.take_profit,
+            stop_loss=self.stop_loss,
+            trailing_stop=self.trailing_stop,
+            current_price=self.current_price,
+        )
+        return state
+
+    @classmethod
+    def from_state(cls, state):
+
+        position = cls(
+            market_id=state["market_id"],
+            token_id=state["token_id"],
+            side=state["side"],
+            entry_price=state["entry_price"],
+            size=state["size"],
+            confidence=state.get("confidence", 0),
+            model=state.get("model", ""),
+            take_profit=state.get("take_profit"),
+            stop_loss=state.get("stop_loss"),
+            trailing_stop=state.get("trailing_stop"),
+        )
+        position.highest_price = state.get("highest_price", position.entry_price)
+        position.lowest_price = state.get("lowest_price", position.entry_price)
+        position.current_price = state.get("current_price", position.entry_price)
+        position.pnl = state.get("pnl", 0)
+        position.open_time = datetime.fromisoformat(state["open_time"])
+        return position
+
 
 # ============================================
 # POSITION MANAGER
@@ -87,6 +123,9 @@ class PositionManager:
         self.positions = {}
         self.closed_positions = []
 
+        # Prix (flux WebSocket) et ouvertures (exécution) sur des threads différents
+        self.lock = threading.RLock()
+
         # Defaults
         self.default_tp_pct = 0.10
         self.default_sl_pct = 0.05
@@ -141,7 +180,8 @@ class PositionManager:
             trailing_stop=trail_pct,
         )
 
-        self.positions[market_id] = position
+        with self.lock:
+            self.positions[market_id] = position
 
         # Sync avec RiskEngine
         if self.risk_engine:
@@ -168,36 +208,35 @@ class PositionManager:
     def update_price(self, market_id, current_price):
         """Met à jour le prix et vérifie les conditions de sortie."""
 
-        if market_id not in self.positions:
-            return None
+        with self.lock:
+            position = self.positions.get(market_id)
 
-        position = self.positions[market_id]
+            if position is None or position.status != "OPEN":
+                return None
 
-        if position.status != "OPEN":
-            return None
+            position.current_price = current_price
 
-        position.current_price = current_price
+            # Update highest / lowest
+            if current_price > position.highest_price:
+                position.highest_price = current_price
+            if current_price < position.lowest_price:
+                position.lowest_price = current_price
 
-        # Update highest / lowest
-        if current_price > position.highest_price:
-            position.highest_price = current_price
-        if current_price < position.lowest_price:
-            position.lowest_price = current_price
+            # Calculate PnL
+            position.pnl = self._calculate_pnl(position, current_price)
 
-        # Calculate PnL
-        position.pnl = self._calculate_pnl(position, current_price)
+            # Check exit conditions (priority: TP > SL > Trailing)
+            if self._should_take_profit(position, current_price):
+                reason = "TAKE_PROFIT"
+            elif self._should_stop_loss(position, current_price):
+                reason = "STOP_LOSS"
+            elif self._should_trailing_stop(position, current_price):
+                reason = "TRAILING_STOP"
+            else:
+                return None
 
-        # Check exit conditions (priority: TP > SL > Trailing)
-        if self._should_take_profit(position, current_price):
-            return self.close_position(market_id, current_price, "TAKE_PROFIT")
-
-        if self._should_stop_loss(position, current_price):
-            return self.close_position(market_id, current_price, "STOP_LOSS")
-
-        if self._should_trailing_stop(position, current_price):
-            return self.close_position(market_id, current_price, "TRAILING_STOP")
-
-        return None
+        # Fermeture hors verrou (DB, logs) — close_position re-vérifie le statut
+        return self.close_position(market_id, current_price, reason)
 
     def update_all_prices(self, price_map):
         """Met à jour les prix de toutes les positions ouvertes.
@@ -255,19 +294,21 @@ class PositionManager:
     def close_position(self, market_id, exit_price, reason="MANUAL"):
         """Ferme une position et enregistre le résultat."""
 
-        if market_id not in self.positions:
-            return None
+        # Transition OPEN -> CLOSED atomique : une seule fermeture par position
+        with self.lock:
+            position = self.positions.get(market_id)
 
-        position = self.positions[market_id]
+            if position is None or position.status != "OPEN":
+                return None
 
-        if position.status != "OPEN":
-            return None
+            position.status = "CLOSED"
+            position.close_time = datetime.now(UTC)
+            position.exit_price = exit_price
+            position.exit_reason = reason
+            position.pnl = self._calculate_pnl(position, exit_price)
 
-        position.status = "CLOSED"
-        position.close_time = datetime.now(UTC)
-        position.exit_price = exit_price
-        position.exit_reason = reason
-        position.pnl = self._calculate_pnl(position, exit_price)
+            self.closed_positions.append(position)
+            del self.positions[market_id]
 
         # Ajuster PnL avec les frais
         adjusted_pnl = position.pnl
@@ -305,10 +346,6 @@ class PositionManager:
             self.risk_engine.remove_position(market_id)
             self.risk_engine.record_trade(adjusted_pnl)
 
-        # Move to closed
-        self.closed_positions.append(position)
-        del self.positions[market_id]
-
         return {
             "market_id": market_id,
             "reason": reason,
@@ -323,16 +360,46 @@ class PositionManager:
         """Ferme toutes les positions ouvertes."""
 
         results = []
-        market_ids = list(self.positions.keys())
 
-        for market_id in market_ids:
-            price = current_prices.get(market_id, self.positions[market_id].current_price)
+        for market_id, position in self.get_open_positions().items():
+            price = current_prices.get(market_id, position.current_price)
             result = self.close_position(market_id, price, reason)
             if result:
                 results.append(result)
 
         return results
 
+    # ============================================
+    # WARM START (snapshot)
+    # ============================================
+
+    def export_state(self):
+
+        return [p.to_state() for p in self.get_open_positions().values()]
+
+    def restore_state(self, positions):
+        """Rouvre les positions d'un snapshot (TP / SL / trailing et extrêmes
+        conservés) et les re-synchronise avec le RiskEngine. Retourne le nombre."""
+
+        restored = 0
+
+        for state in positions:
+            position = Position.from_state(state)
+
+            with self.lock:
+                if position.market_id in self.positions:
+                    continue
+                self.positions[position.market_id] = position
+
+            if self.risk_engine:
+                self.risk_engine.add_position(position.market_id, position.size, position.entry_price)
+            restored += 1
+
+        if restored and self.log:
+            self.log.info(f"Positions restored: {restored}")
+
+        return restored
+
     # ============================================
     # PNL CALCULATION
     # ============================================
@@ -352,7 +419,8 @@ class PositionManager:
     def get_open_positions(self):
         """Retourne les positions ouvertes."""
 
-        return {k: v for k, v in self.positions.items() if v.status == "OPEN"}
+        with self.lock:
+            return {k: v for k, v in self.positions.items() if v.status == "OPEN"}
 
     def get_position(self, market_id):
         """Retourne une position spécifique."""
@@ -9,6 +9,7 @@ Latence: 1-20ms (vs 100-500ms HTTP polling)
 
 import asyncio
 import json
+import time
 import websockets
 from datetime import datetime, UTC
 
@@ -52,6 +53,7 @@ class PositionMonitor:
         self.messages_received = 0
         self.price_updates = 0
         self.exits_triggered = 0
+        self.exit_latency_ms = 0.0     # tick reçu -> position fermée (dernier exit)
         self.errors = 0
         self.connected = False
 
@@ -210,11 +212,13 @@ class PositionMonitor:
         self.price_updates += 1
 
         # Update position — peut déclencher TP/SL/Trailing
+        start = time.perf_counter()
         result = self.position_manager.update_price(market_id, price)
 
         if result is not None:
             # Une position a été fermée automatiquement
             self.exits_triggered += 1
+            self.exit_latency_ms = round((time.perf_counter() - start) * 1000, 2)
             self.log.info(
                 f"AUTO EXIT | {result['market_id'][:40]} | {result['reason']} "
                 f"| PnL: {result['pnl']}"
@@ -233,7 +237,7 @@ class PositionMonitor:
     def _find_market_id(self, token_id):
         """Trouve le market_id à partir d'un token_id."""
 
-        for market_id, position in self.position_manager.positions.items():
+        for market_id, position in self.position_manager.get_open_positions().items():
             if position.token_id == token_id:
                 return market_id
         return None
@@ -342,6 +346,7 @@ class PositionMonitor:
             "messages_received": self.messages_received,
             "price_updates": self.price_updates,
             "exits_triggered": self.exits_triggered,
+            "exit_latency_ms": self.exit_latency_ms,
             "errors": self.errors,
         }
 
@@ -8,16 +8,20 @@ Compatible DRY (balance simulée) et LIVE (balance réelle).
 
 import time
 from alpha_system.config import CONFIG
+from alpha_system.core.rate_limiter import get_rate_limiter, PRIORITY_NORMAL, CLOB_URL
+
+BALANCE_URL = f"{CLOB_URL}/balance"
 
 
 class WalletMonitor:
     """Monitor balance wallet — bloque si fonds insuffisants."""
 
-    def __init__(self, polymarket_client=None, logger=None, database=None):
+    def __init__(self, polymarket_client=None, logger=None, database=None, rate_limiter=None):
 
         self.client = polymarket_client
         self.log = logger
         self.db = database
+        self.limiter = rate_limiter or get_rate_limiter()
 
         self.cached_balance = 0
         self.last_check = 0
@@ -51,13 +55,20 @@ class WalletMonitor:
         if self.mode != "LIVE" or not self.client:
             return self.cached_balance
 
-        # LIVE — query balance réelle
+        # LIVE — query balance réelle (cache si budget de requêtes épuisé)
+        if not self.limiter.acquire(BALANCE_URL, PRIORITY_NORMAL, timeout=2):
+            self._log(f"Balance check rate limited — using cached: {self.cached_balance}")
+            return self.cached_balance
+
         try:
             balance = self.client.get_balance()
             self.cached_balance = float(balance)
             self.last_check = now
             self._log(f"Balance updated: {self.cached_balance}")
         except Exception as e:
+            status_code = getattr(e, "status_code", None)
+            if status_code:
+                self.limiter.report_response(BALANCE_URL, status_code)
             self._log(f"Balance check failed: {e} — using cached: {self.cached_balance}")
 
         return self.cached_balance
@@ -45,6 +45,9 @@ def main():
             if cycle_count % 100 == 0:
                 bot.db.backup()
 
+            # Warm start snapshot (SNAPSHOT_INTERVAL)
+            bot.snapshot.maybe_save(bot)
+
             bot.scanner.wait()
 
         except KeyboardInterrupt:
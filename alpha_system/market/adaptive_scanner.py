@@ -1,11 +1,15 @@
 import time
 
+from alpha_system.core.rate_limiter import get_rate_limiter, GAMMA_MARKETS_URL
+
 
 class AdaptiveScanner:
     """Contrôle la fréquence de scan — évite rate limit.
-    get_interval(), report_rate_limit(), clear_rate_limit()."""
+    get_interval(), report_rate_limit(), clear_rate_limit().
+    Client du RateLimiter partagé : les 429 vus par n'importe quel
+    client de l'endpoint de scan bloquent aussi le scanner."""
 
-    def __init__(self, config=None, base_interval=60):
+    def __init__(self, config=None, base_interval=60, rate_limiter=None, url=GAMMA_MARKETS_URL):
 
         # Config-driven si disponible
         if config:
@@ -17,6 +21,14 @@ class AdaptiveScanner:
             self.min_interval = 15
             self.max_interval = 120
 
+        # Surcharge aval (file scanner -> décision) : intervalle étiré
+        config = config or {}
+        self.overload_backoff = config.get("SCAN_OVERLOAD_BACKOFF", 2.0)
+        self.overload_max_factor = config.get("SCAN_OVERLOAD_MAX_FACTOR", 8.0)
+        self.overload_factor = 1.0
+        self.overloaded = False
+        self.overload_count = 0
+
         self.current_interval = self.base_interval
         self.last_scan = 0
         self.consecutive_empty = 0
@@ -27,15 +39,19 @@ class AdaptiveScanner:
         self.rate_limit_count = 0
         self.rate_limit_until = 0
 
+        # Rate limiter partagé (endpoint de scan)
+        self.limiter = rate_limiter or get_rate_limiter()
+        self.url = url
+
     def can_scan(self):
         """Vérifie si on peut scanner maintenant."""
 
         # Rate limit actif ?
-        if self.rate_limited and time.time() < self.rate_limit_until:
+        if self.get_rate_limit_wait() > 0:
             return False
 
         elapsed = time.time() - self.last_scan
-        return elapsed >= self.current_interval
+        return elapsed >= self.current_interval * self.overload_factor
 
     def record_scan(self, market_count):
         """Enregistre le résultat d'un scan."""
@@ -67,30 +83,88 @@ class AdaptiveScanner:
     # === DIRECTIVE METHODS ===
 
     def get_interval(self):
-        """Retourne l'intervalle de scan actuel (secondes)."""
+        """Retourne l'intervalle de scan actuel (secondes), surcharge comprise."""
 
-        return round(self.current_interval, 1)
+        return round(self.current_interval * self.overload_factor, 1)
+
+    def report_overload(self, overloaded):
+        """Signal de surcharge aval, une fois par scan. Surcharge : facteur
+        x SCAN_OVERLOAD_BACKOFF (plafonné) ; sinon retour progressif à 1."""
+
+        if overloaded:
+            if not self.overloaded:
+                self.overload_count += 1
+            self.overload_factor = min(self.overload_max_factor, self.overload_factor * self.overload_backoff)
+        else:
+            self.overload_factor = max(1.0, self.overload_factor / self.overload_backoff)
+
+        self.overloaded = overloaded
+
+    def stretch(self, delay):
+        """Délai de scan propre à l'appelant (ex: SCAN_DELAY ultra), étiré en surcharge."""
+
+        return delay * self.overload_factor
 
     def report_rate_limit(self, wait_seconds=60):
         """Signale un rate limit — augmente l'intervalle et bloque temporairement."""
 
-        self.rate_limited = True
-        self.rate_limit_count += 1
-        self.rate_limit_until = time.time() + wait_seconds
+        self.limiter.report_rate_limit(self.url, wait_seconds)
+        self._apply_rate_limit(wait_seconds)
 
-        # Augmenter l'intervalle (backoff)
-        self.current_interval = min(
-            self.max_interval * 2,
-            self.current_interval * 2
-        )
+    def record_response(self, status_code, headers=None):
+        """Analyse une réponse HTTP de scan (429 / Retry-After). Retourne l'attente imposée."""
+
+        wait = self.limiter.report_response(self.url, status_code, headers)
+        if wait > 0:
+            self._apply_rate_limit(wait)
+        return wait
+
+    def get_rate_limit_wait(self):
+        """Secondes avant le prochain scan autorisé par le serveur (0 = libre).
+        Applique le backoff d'un 429 vu par un autre client ; rate limit échu
+        (ici et dans le limiter) -> rate_limited remis à False."""
+
+        blocked = self.limiter.blocked_for(self.url)
+
+        # Un autre client du même endpoint a pris un 429
+        if blocked > 0 and not self.rate_limited:
+            self._apply_rate_limit(blocked)
+
+        if not self.rate_limited:
+            return 0
+
+        wait = max(blocked, self.rate_limit_until - time.time(), 0)
+        if wait <= 0:
+            self.rate_limited = False
+            self.rate_limit_until = 0
+        return wait
+
+    def peek_rate_limit_wait(self):
+        """get_rate_limit_wait sans effet de bord (status, reports)."""
+
+        own = self.rate_limit_until - time.time() if self.rate_limited else 0
+        return max(self.limiter.blocked_for(self.url), own, 0)
 
     def clear_rate_limit(self):
         """Efface le rate limit — restaure l'intervalle normal."""
 
+        self.limiter.clear(self.url)
         self.rate_limited = False
         self.rate_limit_until = 0
         self.current_interval = max(self.min_interval, self.base_interval)
 
+    def _apply_rate_limit(self, wait_seconds):
+
+        self.rate_limited = True
+        self.rate_limit_count += 1
+        self.rate_limit_until = max(self.rate_limit_until, time.time() + wait_seconds)
+
+        # Augmenter l'intervalle (backoff)
+        self.current_interval = min(
+            self.max_interval * 2,
+            self.current_interval * 2
+        )
+
     def set_interval(self, seconds):
         """Force un intervalle (respecte min/max)."""
 
@@ -99,19 +173,49 @@ class AdaptiveScanner:
             min(self.max_interval, seconds)
         )
 
+    def export_state(self):
+        """Backoff courant (rate_limit_until en temps mural : survit au restart)."""
+
+        return {
+            "interval": self.current_interval,
+            "empty_streaks": self.consecutive_empty,
+            "error_streaks": self.consecutive_errors,
+            "rate_limit_until": self.rate_limit_until if self.rate_limited else 0,
+        }
+
+    def restore_state(self, state):
+        """Reprend le backoff ; un rate limit serveur encore actif est re-signalé
+        au RateLimiter partagé."""
+
+        self.current_interval = max(self.min_interval, min(self.max_interval * 2, state.get("interval", self.base_interval)))
+        self.consecutive_empty = state.get("empty_streaks", 0)
+        self.consecutive_errors = state.get("error_streaks", 0)
+
+        remaining = state.get("rate_limit_until", 0) - time.time()
+        if remaining > 0:
+            self.limiter.report_rate_limit(self.url, remaining)
+            self.rate_limited = True
+            self.rate_limit_until = time.time() + remaining
+
     def wait(self):
-        """Attend l'intervalle courant."""
+        """Attend l'intervalle courant (ou la fin du rate limit serveur)."""
 
-        time.sleep(self.current_interval)
+        time.sleep(max(self.current_interval * self.overload_factor, self.get_rate_limit_wait()))
 
     def get_status(self):
 
+        wait = self.peek_rate_limit_wait()
+
         return {
             "interval": round(self.current_interval, 1),
             "min_interval": self.min_interval,
             "max_interval": self.max_interval,
             "empty_streaks": self.consecutive_empty,
             "error_streaks": self.consecutive_errors,
-            "rate_limited": self.rate_limited,
+            "rate_limited": wait > 0,
             "rate_limit_count": self.rate_limit_count,
+            "rate_limit_wait": round(wait, 1),
+            "overloaded": self.overloaded,
+            "overload_factor": round(self.overload_factor, 2),
+            "overload_count": self.overload_count,
         }
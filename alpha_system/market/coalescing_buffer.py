@@ -0,0 +1,162 @@
+"""
+Coalescing Buffer — ingestion WebSocket découplée des décisions.
+
+Le thread WebSocket ne fait que parser et déposer : seule la dernière
+update de chaque token est conservée, un ensemble "dirty" ordonné alimente
+le pool de workers décision.
+
+- update(key, market) : O(1), remplace l'update en attente (coalescence),
+                        retourne l'update remplacée (ou None)
+- take(timeout)       : prochain token dirty avec sa dernière update
+- done(key)           : libère le token en fin de décision — un seul worker par
+                        token à la fois, une update arrivée pendant le
+                        traitement est reprogrammée
+
+Comme source de Pipeline, task_done (done) n'est appelé que quand l'update
+quitte le pipeline (dernière étape, ou filtrée / rejetée / en erreur à
+n'importe quelle étape), pas à la sortie de la première étape.
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+
+
+class CoalescingBuffer:
+    """Dernière update par token + file des tokens à traiter."""
+
+    def __init__(self):
+
+        self.cond = threading.Condition()
+        self.latest = {}        # key -> dernière update non traitée
+        self.dirty = deque()    # ordre d'arrivée des tokens à traiter
+        self.queued = set()     # tokens présents dans dirty
+        self.in_flight = set()  # tokens en cours de traitement
+
+        # Metrics
+        self.ingested = 0
+        self.coalesced = 0
+        self.taken = 0
+        self.started = time.monotonic()
+        self.rate_window = (self.started, 0)
+
+    # ============================================
+    # INGESTION
+    # ============================================
+
+    def update(self, key, market):
+        """Dépose la dernière update d'un token (appelé par le thread WS).
+        Retourne l'update en attente remplacée, ou None."""
+
+        with self.cond:
+            self.ingested += 1
+
+            replaced = self.latest.get(key)
+            if replaced is not None:
+                self.coalesced += 1
+            self.latest[key] = market
+
+            if key not in self.queued and key not in self.in_flight:
+                self.queued.add(key)
+                self.dirty.append(key)
+                self.cond.notify()
+
+            return replaced
+
+    # ============================================
+    # WORKERS
+    # ============================================
+
+    def take(self, timeout=None):
+        """Retourne (key, market) du prochain token dirty, ou None au timeout."""
+
+        with self.cond:
+            if not self.dirty:
+                self.cond.wait(timeout)
+                if not self.dirty:
+                    return None
+
+            key = self.dirty.popleft()
+            self.queued.discard(key)
+            self.in_flight.add(key)
+            self.taken += 1
+            return key, self.latest.pop(key)
+
+    def done(self, key):
+        """Fin de traitement — reprogramme le token s'il a reçu une update entre-temps."""
+
+        with self.cond:
+            self.in_flight.discard(key)
+
+            if key in self.latest and key not in self.queued:
+                self.queued.add(key)
+                self.dirty.append(key)
+                self.cond.notify()
+
+    # Interface source de Pipeline (get / task_done / qsize)
+
+    def get(self, timeout=None):
+
+        item = self.take(timeout)
+        if item is None:
+            raise queue.Empty
+        return item
+
+    def task_done(self, item):
+        self.done(item[0])
+
+    def qsize(self):
+        return len(self.dirty)
+
+    def unfinished(self):
+        """Tokens en attente + en cours (jusqu'à task_done)."""
+
+        with self.cond:
+            return len(self.dirty) + len(self.in_flight)
+
+    def wake_all(self):
+        """Réveille les workers en attente (shutdown)."""
+
+        with self.cond:
+            self.cond.notify_all()
+
+    def wait_idle(self, timeout=None):
+        """Attend que tout soit traité (replay, shutdown). True si vide."""
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            with self.cond:
+                if not self.dirty and not self.in_flight:
+                    return True
+
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+
+    # ============================================
+    # STATUS
+    # ============================================
+
+    def depth(self):
+        return len(self.dirty)
+
+    def get_status(self):
+        """Métriques — ingest_rate calculé depuis le précédent appel."""
+
+        with self.cond:
+            now = time.monotonic()
+            last_time, last_count = self.rate_window
+            rate = (self.ingested - last_count) / max(now - last_time, 1e-9)
+            self.rate_window = (now, self.ingested)
+
+            return {
+                "ingested": self.ingested,
+                "coalesced": self.coalesced,
+                "taken": self.taken,
+                "coalescing_ratio": round(self.coalesced / max(1, self.ingested) * 100, 1),
+                "ingest_rate": round(rate, 1),
+                "depth": len(self.dirty),
+                "in_flight": len(self.in_flight),
+            }
@@ -0,0 +1,324 @@
+"""
+Cooldown Service — dédup / cooldown par marché sur timing wheel hiérarchique.
+
+Remplace les dicts recently_seen des FastFilter :
+- insert, refresh et expiration en O(1) (timing wheel, pas de scan O(n))
+- mémoire bornée (max_entries, éviction du plus ancien)
+- cooldown adaptatif : un marché qui bouge vite est réévalué plus tôt,
+  un marché plat plus tard (EWMA de |Δprix| / sqrt(Δt))
+"""
+
+import math
+import random
+import time
+from collections import OrderedDict
+
+
+# ============================================
+# TIMING WHEEL
+# ============================================
+
+class TimingWheel:
+    """Timing wheel hiérarchique — planifie l'expiration de clés.
+
+    Niveau 0 : slots de `tick` secondes, niveau n : slots de tick * slots^n.
+    Les entrées d'un niveau supérieur redescendent (cascade) quand
+    leur slot arrive à échéance.
+    """
+
+    def __init__(self, tick=1.0, slots=64, levels=3, now=None):
+
+        self.tick = tick
+        self.slots = slots
+        self.levels = levels
+        self.wheels = [[set() for _ in range(slots)] for _ in range(levels)]
+        self.entries = {}   # key -> (level, slot, deadline_tick)
+
+        # Initialisé au premier advance() si non fourni
+        self.current_tick = None if now is None else self._to_tick(now)
+
+    def schedule(self, key, deadline):
+        """Planifie (ou replanifie) l'expiration de key à deadline."""
+
+        if self.current_tick is None:
+            self.current_tick = self._to_tick(time.monotonic())
+
+        self.cancel(key)
+        self._insert(key, max(self._to_tick(deadline), self.current_tick + 1))
+
+    def cancel(self, key):
+
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            level, slot, _ = entry
+            self.wheels[level][slot].discard(key)
+
+    def advance(self, now):
+        """Avance jusqu'à now. Retourne la liste des clés expirées."""
+
+        target = self._to_tick(now)
+        expired = []
+
+        if self.current_tick is None:
+            self.current_tick = target
+            return expired
+
+        # Inactif plus longtemps que la portée totale — tout est expiré
+        if target - self.current_tick >= self.slots ** self.levels:
+            expired = list(self.entries)
+            for level in self.wheels:
+                for slot in level:
+                    slot.clear()
+            self.entries.clear()
+            self.current_tick = target
+            return expired
+
+        while self.current_tick < target:
+            self.current_tick += 1
+            self._cascade()
+
+            slot = self.wheels[0][self.current_tick % self.slots]
+            if slot:
+                for key in slot:
+                    del self.entries[key]
+                expired.extend(slot)
+                slot.clear()
+
+        return expired
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _insert(self, key, deadline_tick):
+
+        delta = deadline_tick - self.current_tick
+
+        level = 0
+        span = self.slots
+        while delta >= span and level < self.levels - 1:
+            level += 1
+            span *= self.slots
+
+        # Au-delà de la portée : on plafonne au dernier slot du dernier niveau
+        if delta >= span:
+            deadline_tick = self.current_tick + span - 1
+
+        slot = (deadline_tick // (self.slots ** level)) % self.slots
+        self.wheels[level][slot].add(key)
+        self.entries[key] = (level, slot, deadline_tick)
+
+    def _cascade(self):
+        """Redescend les entrées des niveaux supérieurs arrivées à échéance."""
+
+        for level in range(1, self.levels):
+            unit = self.slots ** level
+            if self.current_tick % unit != 0:
+                break
+
+            slot = self.wheels[level][(self.current_tick // unit) % self.slots]
+            if not slot:
+                continue
+
+            keys = list(slot)
+            slot.clear()
+            for key in keys:
+                _, _, deadline_tick = self.entries.pop(key)
+                self._insert(key, max(deadline_tick, self.current_tick))
+
+    def _to_tick(self, t):
+        return int(t / self.tick)
+
+
+# ============================================
+# COOLDOWN SERVICE
+# ============================================
+
+class CooldownService:
+    """Cooldown adaptatif par marché, mémoire bornée, expiration O(1)."""
+
+    def __init__(self, base_cooldown=300, config=None, tick=1.0):
+
+        config = config or {}
+
+        self.base_cooldown = base_cooldown
+        self.min_factor = config.get("COOLDOWN_MIN_FACTOR", 0.25)
+        self.max_factor = config.get("COOLDOWN_MAX_FACTOR", 4.0)
+        self.volatility_ref = config.get("COOLDOWN_VOLATILITY_REF", 0.002)
+        self.ewma_alpha = config.get("COOLDOWN_EWMA_ALPHA", 0.3)
+        self.max_entries = config.get("COOLDOWN_MAX_ENTRIES", 10000)
+
+        # Expiration wheel après le cooldown le plus long possible, + une
+        # période de base pour garder les statistiques de volatilité
+        self.retention = base_cooldown * (self.max_factor + 1)
+
+        # key -> [cooldown_until, marked_at, last_price, last_seen, volatility]
+        self.entries = OrderedDict()
+        self.wheel = TimingWheel(tick=tick)
+
+        # Metrics
+        self.checks = 0
+        self.passed = 0
+        self.cooling = 0
+        self.shortened = 0
+        self.extended = 0
+        self.expired = 0
+        self.evicted = 0
+        self.total_cooldown = 0.0
+
+    # ============================================
+    # ACQUIRE
+    # ============================================
+
+    def acquire(self, key, price=None, now=None):
+        """True si key n'est pas en cooldown — démarre alors un nouveau cooldown."""
+
+        now = time.monotonic() if now is None else now
+        self.checks += 1
+        self._expire(now)
+
+        entry = self.entries.get(key)
+
+        if entry is not None:
+            self._observe(entry, price, now)
+
+            # Recalibre le cooldown en cours : plus court si le marché
+            # bouge vite, plus long s'il est plat
+            adjusted = entry[1] + self.cooldown_for(entry[4])
+            if adjusted < entry[0]:
+                self.shortened += 1
+            elif adjusted > entry[0]:
+                self.extended += 1
+            entry[0] = adjusted
+
+            if now < entry[0]:
+                self.cooling += 1
+                return False
+        else:
+            entry = [0.0, now, price, now, None]
+            self.entries[key] = entry
+            self._evict()
+
+        cooldown = self.cooldown_for(entry[4])
+        entry[0] = now + cooldown
+        entry[1] = now
+        self.entries.move_to_end(key)
+        self.wheel.schedule(key, now + self.retention)
+
+        self.passed += 1
+        self.total_cooldown += cooldown
+        return True
+
+    def release(self, key):
+        """Annule le cooldown de key (marché délesté avant évaluation)."""
+
+        if self.entries.pop(key, None) is not None:
+            self.wheel.cancel(key)
+
+    def is_cooling(self, key, now=None):
+
+        now = time.monotonic() if now is None else now
+        entry = self.entries.get(key)
+        return entry is not None and now < entry[0]
+
+    def cooldown_for(self, volatility):
+        """Durée de cooldown pour une volatilité donnée (None = base)."""
+
+        if volatility is None:
+            return self.base_cooldown
+
+        if volatility <= 0:
+            return self.base_cooldown * self.max_factor
+
+        factor = self.volatility_ref / volatility
+        factor = max(self.min_factor, min(self.max_factor, factor))
+        return self.base_cooldown * factor
+
+    def expire(self, now=None):
+        """Avance la wheel — purge les entrées expirées (O(expirées))."""
+
+        self._expire(time.monotonic() if now is None else now)
+
+    # ============================================
+    # WARM START (snapshot)
+    # ============================================
+
+    def export_state(self, now=None):
+        """[clé, cooldown restant (s), dernier prix, volatilité] — ordre LRU.
+        Restant relatif : les timestamps monotonic ne survivent pas au process."""
+
+        now = time.monotonic() if now is None else now
+        return [[key, round(entry[0] - now, 3), entry[2], entry[4]]
+                for key, entry in self.entries.items()]
+
+    def restore_state(self, entries, elapsed=0.0, spread=0.0, now=None):
+        """Recharge un export. elapsed : secondes écoulées depuis l'export.
+        Cooldowns échus pendant l'arrêt : relâchés uniformément sur [0, spread]
+        au lieu de tous en même temps. Retourne le nombre d'entrées chargées."""
+
+        now = time.monotonic() if now is None else now
+
+        for key, remaining, price, volatility in entries:
+            remaining -= elapsed
+            if remaining <= 0:
+                remaining = random.uniform(0, spread) if spread > 0 else 0.0
+
+            # marked_at tel que la recalibration d'acquire() retombe sur le restant
+            marked_at = now + remaining - self.cooldown_for(volatility)
+            self.entries[key] = [now + remaining, marked_at, price, now - elapsed, volatility]
+            self.entries.move_to_end(key)
+            self.wheel.schedule(key, now + max(remaining, self.retention))
+
+        self._evict()
+        return len(entries)
+
+    # ============================================
+    # INTERNAL
+    # ============================================
+
+    def _observe(self, entry, price, now):
+        """Met à jour l'EWMA de volatilité |Δp| / sqrt(Δt)."""
+
+        last_price = entry[2]
+        dt = now - entry[3]
+
+        if price is not None and last_price is not None and dt > 0:
+            sample = abs(price - last_price) / math.sqrt(dt)
+            if entry[4] is None:
+                entry[4] = sample
+            else:
+                entry[4] = self.ewma_alpha * sample + (1 - self.ewma_alpha) * entry[4]
+
+        if price is not None:
+            entry[2] = price
+        entry[3] = now
+
+    def _expire(self, now):
+
+        for key in self.wheel.advance(now):
+            if self.entries.pop(key, None) is not None:
+                self.expired += 1
+
+    def _evict(self):
+
+        while len(self.entries) > self.max_entries:
+            key, _ = self.entries.popitem(last=False)
+            self.wheel.cancel(key)
+            self.evicted += 1
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get_status(self):
+
+        return {
+            "size": len(self.entries),
+            "max_entries": self.max_entries,
+            "checks": self.checks,
+            "passed": self.passed,
+            "cooling": self.cooling,
+            "shortened": self.shortened,
+            "extended": self.extended,
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "avg_cooldown": round(self.total_cooldown / max(1, self.passed), 1),
+        }
@@ -0,0 +1,129 @@
+"""
+Market Delta — ne transmet que les marchés qui ont réellement bougé.
+
+Mémorise le dernier état évalué par marché (prix, volume, spread).
+Un marché n'est retransmis que si un des champs a changé au-delà de
+son epsilon, ou si sa dernière évaluation est plus vieille que max_age.
+
+L'état est mémorisé dès qu'un marché est transmis, quelle que soit la
+suite (rejet FastFilter, cooldown, pré-score) : un marché rejeté n'est
+pas retransmis à chaque scan tant qu'il ne bouge pas. Seul un marché
+délesté sans évaluation est oublié (forget) et retransmis.
+"""
+
+import time
+
+
+class MarketDelta:
+    """Étape delta entre le scanner et la queue de décision."""
+
+    def __init__(self, config=None):
+
+        config = config or {}
+
+        self.price_epsilon = config.get("DELTA_PRICE_EPSILON", 0.005)
+        self.volume_epsilon = config.get("DELTA_VOLUME_EPSILON", 0.02)   # relatif
+        self.spread_epsilon = config.get("DELTA_SPREAD_EPSILON", 0.005)
+        self.max_age = config.get("DELTA_MAX_AGE", 900)
+
+        # market_key -> {"price", "volume", "spread", "evaluated_at"}
+        self.last_state = {}
+
+        # Stats
+        self.forwarded = {"new": 0, "price": 0, "volume": 0, "spread": 0, "stale": 0}
+        self.skipped = {"unchanged": 0, "no_key": 0}
+
+    # ============================================
+    # EVALUATE
+    # ============================================
+
+    def evaluate(self, market):
+        """Retourne True si le marché a changé depuis sa dernière évaluation
+        (et mémorise alors son état)."""
+
+        key = self._key(market)
+        if not key:
+            self.skipped["no_key"] += 1
+            return False
+
+        last = self.last_state.get(key)
+        if last is None:
+            self.forwarded["new"] += 1
+            self.record(market)
+            return True
+
+        reason = self._change_reason(market, last)
+        if reason is None:
+            self.skipped["unchanged"] += 1
+            return False
+
+        self.forwarded[reason] += 1
+        self.record(market)
+        return True
+
+    def record(self, market):
+        """Mémorise l'état évalué d'un marché (horodaté maintenant)."""
+
+        key = self._key(market)
+        if not key:
+            return
+
+        self.last_state[key] = {
+            "price": market.get("price", 0),
+            "volume": market.get("volume", 0),
+            "spread": market.get("spread", 0),
+            "evaluated_at": time.time(),
+        }
+
+    def forget(self, market):
+        """Oublie un marché transmis mais jamais évalué (délesté) : retransmis au prochain scan."""
+
+        self.last_state.pop(self._key(market), None)
+
+    def cleanup(self):
+        """Purge les états plus vieux que 2 x max_age."""
+
+        now = time.time()
+        expired = [k for k, v in self.last_state.items()
+                   if now - v["evaluated_at"] > self.max_age * 2]
+        for k in expired:
+            del self.last_state[k]
+
+    # ============================================
+    # INTERNAL
+    # ============================================
+
+    def _key(self, market):
+        return market.get("token_id") or market.get("market")
+
+    def _change_reason(self, market, last):
+        """Retourne la raison du changement, ou None si inchangé."""
+
+        if abs(market.get("price", 0) - last["price"]) > self.price_epsilon:
+            return "price"
+
+        last_volume = last["volume"]
+        volume = market.get("volume", 0)
+        if last_volume > 0:
+            if abs(volume - last_volume) / last_volume > self.volume_epsilon:
+                return "volume"
+        elif volume > 0:
+            return "volume"
+
+        if abs(market.get("spread", 0) - last["spread"]) > self.spread_epsilon:
+            return "spread"
+
+        if time.time() - last["evaluated_at"] > self.max_age:
+            return "stale"
+
+        return None
+
+    def get_status(self):
+
+        return {
+            "tracked": len(self.last_state),
+            "forwarded": sum(self.forwarded.values()),
+            "skipped": sum(self.skipped.values()),
+            "forward_reasons": dict(self.forwarded),
+            "skip_reasons": dict(self.skipped),
+        }
@@ -1,4 +1,4 @@
-import json
+from alpha_system.market.market_normalizer import normalize_market
 
 
 class MarketFilter:
@@ -14,18 +14,12 @@ class MarketFilter:
 
     def parse_prices(self, market):
 
-        prices_raw = market.get("outcomePrices", "[null, null]")
-        if isinstance(prices_raw, str):
-            return json.loads(prices_raw)
-        return prices_raw
+        return list(normalize_market(market).prices)
 
 
     def parse_token_ids(self, market):
 
-        tokens_raw = market.get("clobTokenIds", "[]")
-        if isinstance(tokens_raw, str):
-            return json.loads(tokens_raw)
-        return tokens_raw
+        return list(normalize_market(market).token_ids)
 
 
     def filter(self, markets):
@@ -37,15 +31,16 @@ class MarketFilter:
 
             try:
 
-                if market.get("closed"):
+                normalized = normalize_market(market)
+
+                if normalized.closed:
                     continue
 
-                prices = self.parse_prices(market)
-                if len(prices) < 2 or prices[0] is None:
+                if len(normalized.prices) < 2 or normalized.yes_price is None:
                     continue
 
-                price = float(prices[0])
-                volume = float(market.get("volume", 0))
+                price = normalized.yes_price
+                volume = normalized.volume
 
                 if volume < self.min_volume:
                     continue
@@ -53,13 +48,11 @@ class MarketFilter:
                 if abs(price - 0.5) < self.min_edge:
                     continue
 
-                tokens = self.parse_token_ids(market)
-
                 tradable.append({
                     "market": market["question"],
                     "price": price,
                     "volume": volume,
-                    "token_id": tokens[0] if tokens else None,
+                    "token_id": normalized.token_id,
                     "raw": market
                 })
 
@@ -0,0 +1,172 @@
+"""
+Market Normalizer — parse unique des marchés gamma-api.
+
+outcomePrices et clobTokenIds sont des JSON strings dans le JSON gamma.
+Ce module les décode une seule fois par version de marché : le résultat
+est mémoïsé par (id, updatedAt), un marché inchangé n'est jamais re-parsé.
+
+Utilisé par tous les readers et filtres (alpha_system et racine).
+Aucune dépendance hors bibliothèque standard.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+
+
+CACHE_MAX_SIZE = 5000
+
+
+class NormalizedMarket:
+    """Marché gamma décodé — compact et en lecture seule par convention."""
+
+    __slots__ = (
+        "id", "question", "prices", "yes_price", "no_price",
+        "token_ids", "token_id", "volume", "spread",
+        "active", "closed", "end_date", "updated_at",
+    )
+
+    def __init__(self, raw):
+
+        self.id = raw.get("id")
+        self.question = raw.get("question", "Unknown")
+        self.updated_at = raw.get("updatedAt")
+        self.end_date = raw.get("endDate")
+
+        self.prices = _parse_json_list(raw.get("outcomePrices"))
+        self.yes_price = _to_float(self.prices[0]) if len(self.prices) > 0 else None
+        self.no_price = _to_float(self.prices[1]) if len(self.prices) > 1 else None
+
+        self.token_ids = _parse_json_list(raw.get("clobTokenIds"))
+        self.token_id = self.token_ids[0] if self.token_ids else None
+
+        self.volume = _to_float(raw.get("volume"), 0.0)
+        self.spread = _to_float(raw.get("spread"), 0.0)
+        self.active = bool(raw.get("active", True))
+        self.closed = bool(raw.get("closed", False))
+
+    def to_market(self):
+        """Format marché standard des orchestrators."""
+
+        return {
+            "market": self.question,
+            "price": self.yes_price,
+            "token_id": self.token_id,
+            "volume": self.volume,
+            "spread": self.spread,
+            "end_date": self.end_date,
+        }
+
+    def __repr__(self):
+        return f"NormalizedMarket({self.question[:40]!r}, yes={self.yes_price}, vol={self.volume})"
+
+
+# ============================================
+# MEMO CACHE
+# ============================================
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "uncached": 0}
+
+
+def normalize_market(raw):
+    """Retourne le NormalizedMarket d'un marché gamma brut (mémoïsé), ou None."""
+
+    if isinstance(raw, NormalizedMarket):
+        return raw
+
+    if not isinstance(raw, dict):
+        return None
+
+    market_id = raw.get("id")
+    updated_at = raw.get("updatedAt")
+
+    # Sans version, impossible de savoir si le marché a changé
+    if market_id is None or updated_at is None:
+        _stats["uncached"] += 1
+        return NormalizedMarket(raw)
+
+    key = (market_id, updated_at)
+
+    with _lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+            _stats["hits"] += 1
+            return cached
+
+    normalized = NormalizedMarket(raw)
+
+    with _lock:
+        _stats["misses"] += 1
+        _cache[key] = normalized
+        if len(_cache) > CACHE_MAX_SIZE:
+            _cache.popitem(last=False)
+
+    return normalized
+
+
+def normalize_markets(raw_markets):
+    """Normalise une liste gamma — ignore les entrées invalides."""
+
+    result = []
+    for raw in raw_markets or []:
+        normalized = normalize_market(raw)
+        if normalized is not None:
+            result.append(normalized)
+    return result
+
+
+def get_cache_stats():
+
+    with _lock:
+        lookups = _stats["hits"] + _stats["misses"]
+        return {
+            "size": len(_cache),
+            "hits": _stats["hits"],
+            "misses": _stats["misses"],
+            "uncached": _stats["uncached"],
+            "hit_rate": round(_stats["hits"] / max(1, lookups) * 100, 1),
+        }
+
+
+def clear_cache():
+
+    with _lock:
+        _cache.clear()
+        for k in _stats:
+            _stats[k] = 0
+
+
+# ============================================
+# INTERNAL
+# ============================================
+
+def _parse_json_list(value):
+    """JSON string ou liste -> tuple. Valeur invalide -> tuple vide."""
+
+    if value is None:
+        return ()
+
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except (ValueError, TypeError):
+            return ()
+
+    if not isinstance(value, (list, tuple)):
+        return ()
+
+    return tuple(value)
+
+
+def _to_float(value, default=None):
+
+    if value is None or value == "":
+        return default
+
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return default
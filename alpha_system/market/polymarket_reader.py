@@ -1,59 +1,57 @@
-import json
 import requests
 
+from alpha_system.core.rate_limiter import get_rate_limiter, PRIORITY_LOW, GAMMA_MARKETS_URL
+from alpha_system.market.market_normalizer import normalize_market
+
 
 class PolymarketReader:
 
-    def __init__(self):
-        self.url = "https://gamma-api.polymarket.com/markets"
+    def __init__(self, rate_limiter=None, recorder=None):
+        self.url = GAMMA_MARKETS_URL
+        self.limiter = rate_limiter or get_rate_limiter()
+        self.recorder = recorder
 
     def get_markets(self):
+
+        # Scan = priorité basse — cède la place aux appels ordres
+        if not self.limiter.acquire(self.url, PRIORITY_LOW, timeout=5):
+            return []
+
         try:
             response = requests.get(
                 self.url,
                 params={"closed": "false", "active": "true", "limit": 100},
                 timeout=15
             )
+
+            if self.limiter.report_response(self.url, response.status_code, response.headers):
+                print(f"  PolymarketReader rate limited ({response.status_code})")
+                return []
+
             data = response.json()
         except Exception as e:
             print(f"  PolymarketReader error: {e}")
             return []
 
+        if self.recorder:
+            self.recorder.record_gamma(data)
+
+        return self.parse_markets(data)
+
+    def parse_markets(self, data):
+        """Convertit une réponse gamma-api brute en marchés standard."""
+
         markets = []
         for m in data:
-            try:
-                # outcomePrices = JSON string "[\"0.78\", \"0.22\"]"
-                prices_raw = m.get("outcomePrices", "[]")
-                if isinstance(prices_raw, str):
-                    prices = json.loads(prices_raw)
-                else:
-                    prices = prices_raw
-
-                if not prices or len(prices) < 1 or prices[0] is None:
-                    continue
-
-                price = float(prices[0])
-
-                # clobTokenIds = JSON string
-                tokens_raw = m.get("clobTokenIds", "[]")
-                if isinstance(tokens_raw, str):
-                    tokens = json.loads(tokens_raw)
-                else:
-                    tokens = tokens_raw
-
-                token_id = tokens[0] if tokens else None
-                volume = float(m.get("volume", 0) or 0)
-
-                if not m.get("active", True):
-                    continue
-
-                markets.append({
-                    "market": m.get("question", "Unknown"),
-                    "price": price,
-                    "token_id": token_id,
-                    "volume": volume,
-                })
-            except Exception:
+            # Parse unique mémoïsé (outcomePrices / clobTokenIds = JSON strings)
+            normalized = normalize_market(m)
+
+            if normalized is None or normalized.yes_price is None:
                 continue
 
+            if not normalized.active:
+                continue
+
+            markets.append(normalized.to_market())
+
         return markets
@@ -0,0 +1,216 @@
+"""
+AI Decision Cache — mémoire persistante des réponses IA.
+
+Un marché réévalué au même prix (fin de cooldown, redémarrage) ne repart
+pas vers le LLM : la réponse est servie depuis le cache.
+
+Clé : (modèle, version du prompt, marché, bucket prix, bucket volume)
+- bucket prix   : AI_CACHE_PRICE_BUCKET (0.01 -> 0.80 et 0.804 partagent la clé)
+- bucket volume : log10, AI_CACHE_VOLUME_BUCKETS par décade
+- TTL (AI_CACHE_TTL) et borne LRU (AI_CACHE_MAX_ENTRIES)
+
+Persisté en SQLite (AI_CACHE_PATH, dans alpha_system/data) : un
+redémarrage repart avec le cache chaud. Hit rate suivi par modèle.
+"""
+
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class AIDecisionCache:
+    """Cache LRU + TTL des réponses IA, write-through SQLite."""
+
+    def __init__(self, path="alpha_system/data/ai_cache.db", config=None):
+
+        config = config or {}
+
+        self.path = path
+        self.ttl = config.get("AI_CACHE_TTL", 1800)
+        self.max_entries = config.get("AI_CACHE_MAX_ENTRIES", 5000)
+        self.price_bucket = config.get("AI_CACHE_PRICE_BUCKET", 0.01)
+        self.volume_buckets = config.get("AI_CACHE_VOLUME_BUCKETS", 4)
+
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()   # key -> (created_at, result)
+
+        # Stats par modèle
+        self.hits = {}
+        self.misses = {}
+        self.evicted = 0
+        self.expired = 0
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS ai_cache (
+                key TEXT PRIMARY KEY,
+                created_at REAL NOT NULL,
+                result TEXT NOT NULL
+            )
+        """)
+        self.conn.commit()
+        self._load()
+
+    # ============================================
+    # KEY
+    # ============================================
+
+    def make_key(self, model, version, market):
+
+        price = market.get("price") or 0
+        volume = market.get("volume") or 0
+
+        price_bucket = int(round(price / self.price_bucket))
+        volume_bucket = int(math.log10(1 + max(0, volume)) * self.volume_buckets)
+
+        return f"{model}|{version}|{market.get('market', '')}|{price_bucket}|{volume_bucket}"
+
+    # ============================================
+    # GET / PUT
+    # ============================================
+
+    def get(self, model, version, market):
+        """Réponse en cache (copie, source="cache"), ou None."""
+
+        key = self.make_key(model, version, market)
+        now = time.time()
+
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is not None and now - entry[0] > self.ttl:
+                del self.entries[key]
+                self._delete(key)
+                self.expired += 1
+                entry = None
+
+            if entry is None:
+                self.misses[model] = self.misses.get(model, 0) + 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits[model] = self.hits.get(model, 0) + 1
+
+        result = dict(entry[1])
+        result["source"] = "cache"
+        result["cache_age"] = round(now - entry[0], 1)
+        return result
+
+    def put(self, model, version, market, result):
+        """Mémorise une réponse IA (write-through SQLite)."""
+
+        key = self.make_key(model, version, market)
+        now = time.time()
+        stored = {k: v for k, v in result.items() if k not in ("source", "cache_age")}
+
+        with self.lock:
+            self.entries[key] = (now, stored)
+            self.entries.move_to_end(key)
+
+            try:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO ai_cache (key, created_at, result) VALUES (?, ?, ?)",
+                    (key, now, json.dumps(stored)),
+                )
+                self._evict()
+                self.conn.commit()
+            except sqlite3.Error:
+                pass  # cache best-effort — la mémoire reste valide
+
+    # ============================================
+    # INTERNAL
+    # ============================================
+
+    def _load(self):
+        """Recharge les entrées non expirées, plus récentes en dernier (LRU)."""
+
+        cutoff = time.time() - self.ttl
+        self.conn.execute("DELETE FROM ai_cache WHERE created_at < ?", (cutoff,))
+        self.conn.commit()
+
+        rows = self.conn.execute(
+            "SELECT key, created_at, result FROM ai_cache ORDER BY created_at DESC LIMIT ?",
+            (self.max_entries,),
+        ).fetchall()
+
+        for key, created_at, result in reversed(rows):
+            try:
+                self.entries[key] = (created_at, json.loads(result))
+            except ValueError:
+                continue
+
+    def _evict(self):
+
+        while len(self.entries) > self.max_entries:
+            key, _ = self.entries.popitem(last=False)
+            self._delete(key)
+            self.evicted += 1
+
+    def _delete(self, key):
+
+        try:
+            self.conn.execute("DELETE FROM ai_cache WHERE key = ?", (key,))
+        except sqlite3.Error:
+            pass
+
+    def clear(self):
+
+        with self.lock:
+            self.entries.clear()
+            self.conn.execute("DELETE FROM ai_cache")
+            self.conn.commit()
+
+    def close(self):
+
+        with self.lock:
+            self.conn.commit()
+            self.conn.close()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get_status(self):
+
+        with self.lock:
+            models = {}
+            for model in set(self.hits) | set(self.misses):
+                hits = self.hits.get(model, 0)
+                lookups = hits + self.misses.get(model, 0)
+                models[model] = round(hits / max(1, lookups) * 100, 1)
+
+            return {
+                "size": len(self.entries),
+                "max_entries": self.max_entries,
+                "hits": sum(self.hits.values()),
+                "misses": sum(self.misses.values()),
+                "hit_rate": models,
+                "expired": self.expired,
+                "evicted": self.evicted,
+            }
+
+
+# ============================================
+# SINGLETON
+# ============================================
+
+_cache_instance = None
+_cache_lock = threading.Lock()
+
+
+def get_ai_cache():
+    """Cache IA partagé par tous les SecureAIClient du process."""
+
+    global _cache_instance
+
+    with _cache_lock:
+        if _cache_instance is None:
+            from alpha_system.config import CONFIG
+            _cache_instance = AIDecisionCache(CONFIG.get("AI_CACHE_PATH", "alpha_system/data/ai_cache.db"), CONFIG)
+        return _cache_instance
@@ -1,24 +1,78 @@
 import sqlite3
 import os
 import shutil
+import threading
 from datetime import datetime, UTC
 
+from alpha_system.memory.persistence_writer import PersistenceWriter
+
 
 class DatabaseManager:
     """SQLite persistence — trades, capital_history, strategy_versions, backup, recovery."""
 
-    def __init__(self, db_path="alpha_system/data/alpha_system.db"):
+    def __init__(self, db_path="alpha_system/data/alpha_system.db", write_behind=None, backup_dir=None):
+        """write_behind : écritures différées (PersistenceWriter), opt-in — défaut CONFIG.
+        backup_dir : défaut backups/ à côté de la DB (une DB de test -> ses backups)."""
+
+        from alpha_system.config import CONFIG
 
         self.db_path = db_path
-        self.backup_dir = "alpha_system/data/backups"
+        self.backup_dir = backup_dir or os.path.join(os.path.dirname(db_path) or ".", "backups")
 
-        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
         os.makedirs(self.backup_dir, exist_ok=True)
 
-        self.conn = sqlite3.connect(db_path)
+        # Partagée entre threads (workers décision) — sqlite3 en mode sérialisé
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
         self.conn.row_factory = sqlite3.Row
+        self.lock = threading.RLock()
         self._create_tables()
 
+        # Write-behind : trades / audit / état commités par lots hors thread décision
+        if write_behind is None:
+            write_behind = CONFIG.get("PERSIST_WRITE_BEHIND", False)
+
+        self.read_flush_timeout = CONFIG.get("PERSIST_READ_FLUSH_TIMEOUT", 5)
+        self.stale_reads = 0
+
+        self.writer = None
+        if write_behind:
+            self.writer = PersistenceWriter(
+                self.conn, self.lock,
+                flush_interval=CONFIG.get("PERSIST_FLUSH_INTERVAL", 0.5),
+                queue_size=CONFIG.get("PERSIST_QUEUE_SIZE", 10000),
+                batch_max=CONFIG.get("PERSIST_BATCH_MAX", 500),
+            )
+
+    def _write(self, sql, params):
+        """INSERT / UPDATE : différé si write-behind, sinon commit immédiat."""
+
+        if self.writer is not None:
+            self.writer.write(sql, params)
+            return
+
+        with self.lock:
+            self.conn.execute(sql, params)
+            self.conn.commit()
+
+    def flush(self, timeout=None):
+        """Commit des écritures différées (lecture cohérente, backup, arrêt)."""
+
+        if self.writer is not None:
+            return self.writer.flush(timeout)
+        return True
+
+    def _read(self, sql, params=()):
+        """SELECT après flush, sous self.lock : la connexion est partagée avec
+        le writer et les workers décision. Flush borné (PERSIST_READ_FLUSH_TIMEOUT) :
+        au-delà, lecture de l'état commité. Retourne toutes les lignes."""
+
+        # Hors verrou : le writer en a besoin pour commiter
+        if not self.flush(self.read_flush_timeout):
+            self.stale_reads += 1
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
     def _create_tables(self):
 
         self.conn.executescript("""
@@ -101,7 +155,7 @@ class DatabaseManager:
                      model="", source="ai", status="SIMULATED",
                      fees=0, slippage=0):
 
-        self.conn.execute("""
+        self._write("""
             INSERT INTO trades (timestamp, market, side, price, size, pnl,
                                 confidence, model, source, status, fees, slippage)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
@@ -109,7 +163,6 @@ class DatabaseManager:
             datetime.now(UTC).isoformat(), market, side, price, size, pnl,
             confidence, model, source, status, fees, slippage
         ))
-        self.conn.commit()
 
     def update_trade(self, trade_id, **kwargs):
         """Met à jour un trade existant."""
@@ -123,26 +176,20 @@ class DatabaseManager:
         set_clause = ", ".join(f"{k} = ?" for k in updates)
         values = list(updates.values()) + [trade_id]
 
-        self.conn.execute(
-            f"UPDATE trades SET {set_clause} WHERE id = ?", values
-        )
-        self.conn.commit()
+        self._write(f"UPDATE trades SET {set_clause} WHERE id = ?", values)
 
     def get_trades(self, limit=100):
 
-        cursor = self.conn.execute(
-            "SELECT * FROM trades ORDER BY id DESC LIMIT ?", (limit,)
-        )
-        return [dict(row) for row in cursor.fetchall()]
+        rows = self._read("SELECT * FROM trades ORDER BY id DESC LIMIT ?", (limit,))
+        return [dict(row) for row in rows]
 
     def get_trade_count(self):
 
-        cursor = self.conn.execute("SELECT COUNT(*) FROM trades")
-        return cursor.fetchone()[0]
+        return self._read("SELECT COUNT(*) FROM trades")[0][0]
 
     def get_stats(self):
 
-        cursor = self.conn.execute("""
+        rows = self._read("""
             SELECT
                 COUNT(*) as total,
                 SUM(CASE WHEN pnl > 0 THEN 1 ELSE 0 END) as wins,
@@ -151,47 +198,42 @@ class DatabaseManager:
                 ROUND(AVG(confidence), 4) as avg_confidence
             FROM trades
         """)
-        row = cursor.fetchone()
-        return dict(row) if row else {}
+        return dict(rows[0]) if rows else {}
 
     # === CAPITAL HISTORY ===
 
     def record_capital(self, capital, pnl, drawdown_pct, trade_count):
 
-        self.conn.execute("""
+        self._write("""
             INSERT INTO capital_history (timestamp, capital, pnl, drawdown_pct, trade_count)
             VALUES (?, ?, ?, ?, ?)
         """, (datetime.now(UTC).isoformat(), capital, pnl, drawdown_pct, trade_count))
-        self.conn.commit()
 
     def get_capital_history(self, limit=500):
 
-        cursor = self.conn.execute(
-            "SELECT * FROM capital_history ORDER BY id DESC LIMIT ?", (limit,)
-        )
-        return [dict(row) for row in cursor.fetchall()]
+        rows = self._read("SELECT * FROM capital_history ORDER BY id DESC LIMIT ?", (limit,))
+        return [dict(row) for row in rows]
 
     # === STRATEGY VERSIONS ===
 
     def save_strategy_version(self, version, confidence_threshold, max_risk, notes=""):
 
-        self.conn.execute("""
+        self._write("""
             INSERT INTO strategy_versions (timestamp, version, confidence_threshold, max_risk, notes)
             VALUES (?, ?, ?, ?, ?)
         """, (datetime.now(UTC).isoformat(), version, confidence_threshold, max_risk, notes))
-        self.conn.commit()
 
     def get_strategy_versions(self):
 
-        cursor = self.conn.execute("SELECT * FROM strategy_versions ORDER BY id DESC")
-        return [dict(row) for row in cursor.fetchall()]
+        rows = self._read("SELECT * FROM strategy_versions ORDER BY id DESC")
+        return [dict(row) for row in rows]
 
     # === STATE ===
 
     def save_state(self, capital, starting_capital, total_pnl,
                    total_trades, wins, losses):
 
-        self.conn.execute("""
+        sql = """
             INSERT INTO system_state (id, capital, starting_capital, total_pnl,
                                       total_trades, wins, losses, updated_at)
             VALUES (1, ?, ?, ?, ?, ?, ?, ?)
@@ -203,28 +245,35 @@ class DatabaseManager:
                 wins=excluded.wins,
                 losses=excluded.losses,
                 updated_at=excluded.updated_at
-        """, (
+        """
+        params = (
             capital, starting_capital, total_pnl,
             total_trades, wins, losses,
             datetime.now(UTC).isoformat()
-        ))
-        self.conn.commit()
+        )
+
+        # Snapshot : seul le plus récent compte (coalescé par le writer)
+        if self.writer is not None:
+            self.writer.set_state(sql, params)
+            return
+
+        with self.lock:
+            self.conn.execute(sql, params)
+            self.conn.commit()
 
     def load_state(self):
 
-        cursor = self.conn.execute("SELECT * FROM system_state WHERE id = 1")
-        row = cursor.fetchone()
-        return dict(row) if row else None
+        rows = self._read("SELECT * FROM system_state WHERE id = 1")
+        return dict(rows[0]) if rows else None
 
     # === AUDIT ===
 
     def log_audit(self, action, detail=""):
 
-        self.conn.execute("""
+        self._write("""
             INSERT INTO audit_log (timestamp, action, detail)
             VALUES (?, ?, ?)
         """, (datetime.now(UTC).isoformat(), action, detail))
-        self.conn.commit()
 
     # === BACKUP ===
 
@@ -233,10 +282,22 @@ class DatabaseManager:
         timestamp = datetime.now(UTC).strftime("%Y%m%d_%H%M%S")
         backup_path = os.path.join(self.backup_dir, f"alpha_system_{timestamp}.db")
 
-        self.conn.commit()
-        shutil.copy2(self.db_path, backup_path)
+        self.flush()
+        with self.lock:
+            self.conn.commit()
+            shutil.copy2(self.db_path, backup_path)
 
         return backup_path
 
     def close(self):
+
+        # Commit final des écritures différées
+        if self.writer is not None:
+            self.writer.stop()
         self.conn.close()
+
+    def get_status(self):
+
+        if self.writer is None:
+            return {"write_behind": False}
+        return dict(self.writer.get_status(), write_behind=True, stale_reads=self.stale_reads)
@@ -0,0 +1,234 @@
+"""
+Persistence Writer — écriture SQLite différée (write-behind) dans un thread dédié.
+
+Les threads décision déposent leurs écritures et repartent aussitôt :
+- INSERT (trades, audit, capital...) : file bornée, rejoués dans l'ordre
+  en une seule transaction par lot (executemany par requête consécutive)
+- snapshot d'état (system_state) : un seul slot, le dernier écrase les
+  précédents — seul l'état le plus récent est écrit
+
+Fenêtre de durabilité (PERSIST_FLUSH_INTERVAL) : délai maximal entre le
+dépôt d'une écriture et son commit. Un crash perd au plus cette fenêtre ;
+0 = commit dès que le writer est libre (les écritures arrivées pendant un
+commit forment le lot suivant).
+
+flush() attend que tout ce qui a été déposé avant l'appel soit commité
+(lectures, backup, arrêt). Chaque lot fait avancer committed_seq jusqu'au
+dernier dépôt qu'il couvre : un flush aboutit même si les producteurs
+remplissent la file plus vite qu'un lot ne la vide. File pleine : le
+producteur attend une place.
+"""
+
+import threading
+import time
+from collections import deque
+
+
+class PersistenceWriter:
+    """Thread writer : lots d'INSERT + dernier snapshot d'état, un commit par lot."""
+
+    def __init__(self, conn, lock, flush_interval=0.5, queue_size=10000, batch_max=500):
+        """conn : connexion sqlite3 partagée. lock : verrou des écritures sur conn."""
+
+        self.conn = conn
+        self.lock = lock
+        self.flush_interval = flush_interval
+        self.queue_size = queue_size
+        self.batch_max = batch_max
+
+        self.cond = threading.Condition()
+        self.pending = deque()          # (seq, sql, params)
+        self.state = None               # (seq, sql, params) — dernier snapshot
+        self.first_pending = None       # monotonic du plus ancien dépôt non commité
+        self.flush_requested = False
+        self.running = True
+
+        # Séquences : dépôts / commits (flush attend committed >= seq)
+        self.enqueued_seq = 0
+        self.committed_seq = 0
+
+        # Stats
+        self.batches = 0
+        self.written = 0
+        self.coalesced = 0
+        self.failed = 0
+        self.max_lag = 0.0
+        self.last_error = None
+
+        self.thread = threading.Thread(target=self._run, name="persistence-writer", daemon=True)
+        self.thread.start()
+
+    # ============================================
+    # PRODUCTEURS
+    # ============================================
+
+    def write(self, sql, params):
+        """Dépose un INSERT / UPDATE. Retourne sans attendre le commit."""
+
+        with self.cond:
+            while len(self.pending) >= self.queue_size and self.running:
+                self.flush_requested = True
+                self.cond.notify_all()
+                self.cond.wait(0.1)
+
+            self.pending.append((self._mark(), sql, params))
+
+    def set_state(self, sql, params):
+        """Dépose le snapshot d'état — remplace le précédent non écrit."""
+
+        with self.cond:
+            if self.state is not None:
+                self.coalesced += 1
+            self.state = (self._mark(), sql, params)
+
+    def _mark(self):
+        """Numéro de séquence du dépôt (sous self.cond)."""
+
+        self.enqueued_seq += 1
+        if self.first_pending is None:
+            self.first_pending = time.monotonic()
+        self.cond.notify_all()
+        return self.enqueued_seq
+
+    def flush(self, timeout=None):
+        """Attend le commit de tout ce qui a été déposé avant l'appel. True si fait."""
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self.cond:
+            target = self.enqueued_seq
+            self.flush_requested = True
+            self.cond.notify_all()
+
+            while self.committed_seq < target and self.thread.is_alive():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.cond.wait(remaining if remaining is not None else 0.1)
+
+            return self.committed_seq >= target
+
+    # ============================================
+    # WRITER
+    # ============================================
+
+    def _run(self):
+
+        while True:
+
+            with self.cond:
+
+                # Attente : premier dépôt, puis fin de fenêtre (ou lot plein / flush / arrêt)
+                while self.running and not self._ready():
+                    if self.first_pending is None:
+                        self.cond.wait(0.5)
+                    else:
+                        self.cond.wait(max(0.0, self.first_pending + self.flush_interval - time.monotonic()))
+
+                if not self.running and self.first_pending is None:
+                    return
+
+                batch = [self.pending.popleft() for _ in range(min(len(self.pending), self.batch_max))]
+
+                # État écrit avec le lot qui contient tous les INSERT déposés avant lui
+                state = None
+                if self.state is not None and (not self.pending or self.state[0] < self.pending[0][0]):
+                    state, self.state = self.state, None
+
+                # Dernier dépôt couvert : tout ce qui précède le premier restant
+                seq = self.enqueued_seq
+                if self.pending:
+                    seq = self.pending[0][0] - 1
+                if self.state is not None:
+                    seq = min(seq, self.state[0] - 1)
+
+                lag = time.monotonic() - self.first_pending
+                self.first_pending = time.monotonic() if (self.pending or self.state) else None
+                if self.first_pending is None:
+                    self.flush_requested = False
+                self.cond.notify_all()   # libère un producteur bloqué (file pleine)
+
+            self._commit(batch, state)
+
+            with self.cond:
+                self.batches += 1
+                self.written += len(batch) + (state is not None)
+                self.max_lag = max(self.max_lag, lag)
+                self.committed_seq = max(self.committed_seq, seq)
+                self.cond.notify_all()
+
+    def _ready(self):
+
+        if self.first_pending is None:
+            return False
+        if self.flush_requested or len(self.pending) >= self.batch_max:
+            return True
+        return time.monotonic() - self.first_pending >= self.flush_interval
+
+    def _commit(self, batch, state):
+        """Une transaction pour le lot ; en cas d'échec, rejeu ligne à ligne."""
+
+        statements = [(sql, params) for _, sql, params in batch]
+        if state is not None:
+            statements.append(state[1:])
+
+        with self.lock:
+            try:
+                for sql, rows in self._group(statements):
+                    self.conn.executemany(sql, rows)
+                self.conn.commit()
+                return
+            except Exception as e:
+                self.conn.rollback()
+                self.last_error = str(e)
+
+            # Une écriture invalide ne doit pas emporter le lot
+            for sql, params in statements:
+                try:
+                    self.conn.execute(sql, params)
+                    self.conn.commit()
+                except Exception as e:
+                    self.conn.rollback()
+                    self.failed += 1
+                    self.last_error = str(e)
+
+    @staticmethod
+    def _group(statements):
+        """Regroupe les requêtes identiques consécutives (ordre conservé)."""
+
+        groups = []
+        for sql, params in statements:
+            if groups and groups[-1][0] == sql:
+                groups[-1][1].append(params)
+            else:
+                groups.append((sql, [params]))
+        return groups
+
+    # ============================================
+    # STOP
+    # ============================================
+
+    def stop(self, timeout=10):
+        """Vide la file (commit final) puis arrête le thread."""
+
+        self.flush(timeout)
+
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        self.thread.join(timeout)
+
+    def get_status(self):
+
+        with self.cond:
+            return {
+                "pending": len(self.pending) + (self.state is not None),
+                "batches": self.batches,
+                "written": self.written,
+                "coalesced": self.coalesced,
+                "failed": self.failed,
+                "avg_batch": round(self.written / max(1, self.batches), 1),
+                "max_lag_ms": round(self.max_lag * 1000, 1),
+                "flush_interval": self.flush_interval,
+                "last_error": self.last_error,
+            }
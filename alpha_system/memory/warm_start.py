@@ -0,0 +1,226 @@
+"""
+Warm Start — snapshot périodique de l'état runtime des orchestrators.
+
+La DB ne garde que capital et compteurs (system_state). Le snapshot
+ajoute ce qui rend un redémarrage "à chaud" :
+    cooldowns   FastFilter (CooldownService) — évite de réévaluer tous
+                les marchés d'un coup au démarrage
+    confidence  seuil, résultats récents, calibration par modèle
+    risk        série de pertes, compteurs jour / heure, peak capital
+    scanner     backoff AdaptiveScanner, rate limit serveur en cours
+    positions   positions ouvertes (TP / SL / trailing, extrêmes)
+
+Fichier JSON versionné, écrit de façon atomique (tmp + fsync + replace) :
+un crash pendant l'écriture laisse le snapshot précédent intact.
+
+Règles de fraîcheur à la restauration :
+- version ou mode (DRY / LIVE) différents : snapshot ignoré
+- positions, confidence : toujours repris (exposition réelle, historique appris)
+- risk : compteurs repris dans le même jour / la même heure UTC
+- cooldowns, scanner : repris si le snapshot a moins de SNAPSHOT_MAX_AGE ;
+  cooldowns décomptés du temps d'arrêt, ceux échus relâchés sur
+  SNAPSHOT_WARMUP_SPREAD secondes (pas de rafale d'appels IA au démarrage)
+
+Composants absents d'un orchestrator (pas de PositionManager, pas de
+scanner...) : ignorés.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+
+SNAPSHOT_VERSION = 1
+
+
+def snapshot_path_for(db_path):
+    """Snapshot à côté de la DB (une DB par orchestrator / test)."""
+
+    return os.path.splitext(db_path)[0] + ".snapshot.json"
+
+
+class WarmStartSnapshot:
+    """Capture / écriture atomique / restauration de l'état runtime."""
+
+    def __init__(self, config, path=None, db_path=None, logger=None):
+
+        self.enabled = config.get("SNAPSHOT_ENABLED", True)
+        self.interval = config.get("SNAPSHOT_INTERVAL", 60)
+        self.max_age = config.get("SNAPSHOT_MAX_AGE", 21600)
+        self.spread = config.get("SNAPSHOT_WARMUP_SPREAD", 60)
+        self.mode = config.get("MODE", "DRY")
+        self.path = path or config.get("SNAPSHOT_PATH") or snapshot_path_for(db_path or config["DB_PATH"])
+        self.log = logger
+
+        self.lock = threading.Lock()
+        self.last_save = time.monotonic()
+
+        # Stats
+        self.saves = 0
+        self.failures = 0
+        self.last_bytes = 0
+        self.last_duration = 0.0
+        self.restored = {}
+        self.restored_age = None
+
+    # ============================================
+    # CAPTURE
+    # ============================================
+
+    def capture(self, system):
+        """État runtime de l'orchestrator (dict JSON-sérialisable)."""
+
+        state = {}
+
+        cooldowns = getattr(getattr(system, "filter", None), "cooldowns", None)
+        if cooldowns is not None:
+            with getattr(system, "filter_lock", None) or nullcontext():
+                state["cooldowns"] = cooldowns.export_state()
+
+        if getattr(system, "confidence", None) is not None:
+            state["confidence"] = system.confidence.export_state()
+
+        if getattr(system, "risk", None) is not None:
+            with system.lock:
+                state["risk"] = system.risk.export_state()
+
+        if getattr(system, "scanner", None) is not None:
+            state["scanner"] = system.scanner.export_state()
+
+        if getattr(system, "positions", None) is not None:
+            state["positions"] = system.positions.export_state()
+
+        return {
+            "version": SNAPSHOT_VERSION,
+            "saved_at": time.time(),
+            "mode": self.mode,
+            "state": state,
+        }
+
+    # ============================================
+    # WRITE (atomique)
+    # ============================================
+
+    def save(self, system):
+        """Capture et écrit le snapshot. True si écrit."""
+
+        if not self.enabled:
+            return False
+
+        start = time.monotonic()
+
+        with self.lock:
+            try:
+                data = json.dumps(self.capture(system), separators=(",", ":"))
+
+                tmp = self.path + ".tmp"
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, self.path)
+
+            except Exception as e:
+                self.failures += 1
+                if self.log:
+                    self.log.error(f"Snapshot save failed: {e}")
+                return False
+
+            self.saves += 1
+            self.last_bytes = len(data)
+            self.last_duration = time.monotonic() - start
+            self.last_save = time.monotonic()
+            return True
+
+    def maybe_save(self, system):
+        """Écrit si SNAPSHOT_INTERVAL est écoulé (boucles principales)."""
+
+        if time.monotonic() - self.last_save >= self.interval:
+            return self.save(system)
+        return False
+
+    # ============================================
+    # RESTORE
+    # ============================================
+
+    def load(self):
+        """Snapshot valide (version, mode) ou None."""
+
+        if not self.enabled or not os.path.exists(self.path):
+            return None
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            if self.log:
+                self.log.warning(f"Snapshot unreadable, ignored: {e}")
+            return None
+
+        if snapshot.get("version") != SNAPSHOT_VERSION:
+            if self.log:
+                self.log.warning(f"Snapshot version {snapshot.get('version')} != {SNAPSHOT_VERSION}, ignored")
+            return None
+
+        if snapshot.get("mode") != self.mode:
+            if self.log:
+                self.log.warning(f"Snapshot mode {snapshot.get('mode')} != {self.mode}, ignored")
+            return None
+
+        return snapshot
+
+    def restore(self, system):
+        """Applique le snapshot selon les règles de fraîcheur. Retourne {composant: détail}."""
+
+        snapshot = self.load()
+        if snapshot is None:
+            return {}
+
+        age = max(0.0, time.time() - snapshot["saved_at"])
+        fresh = age <= self.max_age
+        state = snapshot["state"]
+        restored = {}
+
+        if "positions" in state and getattr(system, "positions", None) is not None:
+            restored["positions"] = system.positions.restore_state(state["positions"])
+
+        if "confidence" in state and getattr(system, "confidence", None) is not None:
+            system.confidence.restore_state(state["confidence"])
+            restored["confidence"] = len(state["confidence"].get("calibrators", {}))
+
+        if "risk" in state and getattr(system, "risk", None) is not None:
+            system.risk.restore_state(state["risk"])
+            restored["risk"] = system.risk.daily_trades
+
+        cooldowns = getattr(getattr(system, "filter", None), "cooldowns", None)
+        if fresh and "cooldowns" in state and cooldowns is not None:
+            restored["cooldowns"] = cooldowns.restore_state(state["cooldowns"], elapsed=age, spread=self.spread)
+
+        if fresh and "scanner" in state and getattr(system, "scanner", None) is not None:
+            system.scanner.restore_state(state["scanner"])
+            restored["scanner"] = system.scanner.get_interval()
+
+        self.restored = restored
+        self.restored_age = round(age, 1)
+
+        if self.log:
+            stale = "" if fresh else f" (older than {self.max_age}s: cooldowns / scanner skipped)"
+            self.log.info(f"Warm start | snapshot age: {round(age, 1)}s | {restored}{stale}")
+
+        return restored
+
+    def get_status(self):
+
+        return {
+            "enabled": self.enabled,
+            "path": self.path,
+            "saves": self.saves,
+            "failures": self.failures,
+            "last_bytes": self.last_bytes,
+            "last_duration_ms": round(self.last_duration * 1000, 2),
+            "restored": dict(self.restored),
+            "restored_age": self.restored_age,
+        }
@@ -1,12 +1,25 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
 from alpha_system.config import CONFIG
 from alpha_system.utils.logger import Logger
 from alpha_system.memory.database import DatabaseManager
+from alpha_system.memory.warm_start import WarmStartSnapshot
 from alpha_system.protection.error_handler import ErrorHandler
 from alpha_system.protection.kill_switch import KillSwitch
+from alpha_system.protection.circuit_breaker import get_breakers_status
 from alpha_system.market.polymarket_reader import PolymarketReader
 from alpha_system.market.adaptive_scanner import AdaptiveScanner
 from alpha_system.ai.secure_ai_client import SecureAIClient
+from alpha_system.ai.concurrent_ensemble import ConcurrentEnsemble
+from alpha_system.ai.model_router import ModelRouter
+from alpha_system.core.http_pool import get_session_pool
+from alpha_system.core.decision_pipeline import build_decision_pipeline, format_pipeline_status
+from alpha_system.core.tracer import get_tracer, format_trace_status
 from alpha_system.ai.confidence_manager import ConfidenceManager
+from alpha_system.ai.heuristic_scorer import HeuristicScorer
 from alpha_system.ai.profit_optimizer import ProfitOptimizer
 from alpha_system.execution.execution_engine import ExecutionEngine
 from alpha_system.execution.cost_calculator import CostCalculator
@@ -17,36 +30,51 @@ from alpha_system.execution.order_monitor import OrderMonitor
 from alpha_system.execution.execution_guard import ExecutionGuard
 from alpha_system.execution.live_execution_orchestrator import LiveExecutionOrchestrator
 from alpha_system.risk.risk_engine_v2 import RiskEngineV2
+from alpha_system.replay.session_recorder import SessionRecorder
 
 
 class AlphaOrchestrator:
     """Orchestrator final — pipeline complet sécurisé."""
 
-    def __init__(self):
+    def __init__(self, reader=None, ai_clients=None, recorder=None, db_path=None):
+        """reader / ai_clients injectables (replay, tests). recorder enregistre la session."""
 
         # Logger (premier — utilisé par tout)
         self.log = Logger()
         self.log.info("Initializing Trading Bot Alpha...")
 
         # Database
-        self.db = DatabaseManager(CONFIG["DB_PATH"])
+        self.db = DatabaseManager(db_path or CONFIG["DB_PATH"])
 
         # Error handler
         self.errors = ErrorHandler(logger=self.log, db=self.db)
 
+        # Session recorder (replay)
+        if recorder is None and CONFIG.get("RECORD_DIR"):
+            recorder = SessionRecorder(CONFIG["RECORD_DIR"])
+        self.recorder = recorder
+
         # Market
-        self.reader = PolymarketReader()
+        self.reader = reader or PolymarketReader(recorder=self.recorder)
         self.scanner = AdaptiveScanner(config=CONFIG)
 
         # AI
-        self.ai_clients = [
-            SecureAIClient(CONFIG),
-            SecureAIClient(CONFIG),
-            SecureAIClient(CONFIG),
+        self.ai_clients = ai_clients or [
+            SecureAIClient(CONFIG, recorder=self.recorder),
+            SecureAIClient(CONFIG, recorder=self.recorder),
+            SecureAIClient(CONFIG, recorder=self.recorder),
         ]
         self.ai_models = ["deepseek-v3.2", "qwen3-next:80b", "glm-5"]
+        self.router = ModelRouter(self.ai_models, CONFIG, logger=self.log)
+        self.ensemble = ConcurrentEnsemble(
+            [(model, partial(client.evaluate, model=model))
+             for client, model in zip(self.ai_clients, self.ai_models)],
+            config=CONFIG, errors=self.errors, router=self.router,
+        )
         self.confidence = ConfidenceManager(CONFIG)
         self.optimizer = ProfitOptimizer()
+        self.scorer = HeuristicScorer(CONFIG)
+        self.prescore = CONFIG.get("HEURISTIC_PRESCORE", True)
 
         # Cost & Risk (before execution — needed by position manager)
         self.cost_calc = CostCalculator(CONFIG)
@@ -102,7 +130,26 @@ class AlphaOrchestrator:
             database=self.db,
         )
 
+        # Tracing par décision (échantillonné)
+        self.tracer = get_tracer()
+
+        # Pipeline décision (exécuté inline à chaque cycle)
+        self.pipeline = build_decision_pipeline(
+            self, "alpha", CONFIG, execute=self.live_exec.execute, audit=True
+        )
+
+        # Cycle : "sequential" (top 3, un trade) ou "concurrent" (top N en parallèle, opt-in)
+        self.cycle_mode = CONFIG.get("CYCLE_MODE", "sequential")
+        self.cycle_top_n = CONFIG.get("CYCLE_TOP_N", 10)
+        self.cycle_max_trades = CONFIG.get("CYCLE_MAX_TRADES", 3)
+        self.cycle_risk_budget = CONFIG.get("CYCLE_RISK_BUDGET", 0.05)
+        self.batch_prefetch = CONFIG.get("AI_BATCH_PREFETCH", True)
+        self.cycle_stats = {"cycles": 0, "evaluated": 0, "candidates": 0, "executed": 0,
+                            "timings": {}, "last": {}}
+
         # State
+        self.lock = threading.Lock()
+        self.running = True
         self.capital = CONFIG["STARTING_CAPITAL"]
         self.starting_capital = CONFIG["STARTING_CAPITAL"]
         self.total_pnl = 0
@@ -123,21 +170,21 @@ class AlphaOrchestrator:
         else:
             self.log.info(f"Fresh start | Capital: {self.capital}")
 
+        # Warm start : cooldowns, confidence, risque, backoff, positions
+        self.snapshot = WarmStartSnapshot(CONFIG, db_path=self.db.db_path, logger=self.log)
+        self.snapshot.restore(self)
+
         self.log.info("System initialized.")
 
     def cycle(self):
         """Un cycle complet : scan -> AI -> validate -> execute -> record."""
 
-        # 0. Error handler check
-        if not self.errors.is_system_healthy():
-            self.log.critical("System unhealthy — too many critical errors")
-            return "UNHEALTHY"
+        cycle_start = time.monotonic()
 
-        # 1. Kill switch
-        if not self.kill_switch.validate(self.capital, self.starting_capital):
-            self.log.critical(f"KILL SWITCH — capital: {self.capital}")
-            self.db.log_audit("KILL_SWITCH", f"capital={self.capital}")
-            return "KILLED"
+        # 0-1. Error handler + kill switch
+        status = self._precheck()
+        if status is not None:
+            return status
 
         # 2. Scan markets
         markets = self.errors.safe_execute(
@@ -150,128 +197,185 @@ class AlphaOrchestrator:
 
         self.scanner.record_scan(len(markets))
         self.log.info(f"{len(markets)} markets fetched")
+        timings = {"scan": time.monotonic() - cycle_start}
 
-        # Sort by volume
-        markets.sort(key=lambda x: x.get("volume", 0), reverse=True)
+        t = time.monotonic()
+        markets = self._rank(markets)
+        timings["rank"] = time.monotonic() - t
 
         # 3. Evaluate top markets
+        top_n = self.cycle_top_n if self.cycle_mode == "concurrent" else 3
+        self._trace_candidates(markets[:top_n], cycle_start, timings)
+
+        if self.cycle_mode == "concurrent":
+            result, counts = self._cycle_concurrent(markets, timings)
+        else:
+            result, counts = self._cycle_sequential(markets, timings)
+
+        timings["total"] = time.monotonic() - cycle_start
+        self._record_cycle(timings, counts)
+
+        return result
+
+    def _precheck(self):
+        """Santé système + kill switch. Retourne le statut bloquant ou None."""
+
+        if not self.errors.is_system_healthy():
+            self.log.critical("System unhealthy — too many critical errors")
+            return "UNHEALTHY"
+
+        if not self.kill_switch.validate(self.capital, self.starting_capital):
+            self.log.critical(f"KILL SWITCH — capital: {self.capital}")
+            self.db.log_audit("KILL_SWITCH", f"capital={self.capital}")
+            return "KILLED"
+
+        return None
+
+    def _rank(self, markets):
+        """Pré-score NumPy — seuls les marchés pouvant passer confidence + coûts,
+        meilleur expected_net heuristique d'abord (sinon tri par volume)."""
+
+        if self.prescore:
+            return self.scorer.rank(markets, self.capital, self.confidence.get_threshold())
+
+        markets.sort(key=lambda x: x.get("volume", 0), reverse=True)
+        return markets
+
+    def _trace_candidates(self, candidates, cycle_start, timings):
+        """Ouvre les traces des marchés évalués : scan (fetch) + filter (pré-score)."""
+
+        scan_end = cycle_start + timings["scan"]
+        rank_end = scan_end + timings.get("rank", 0)
+
+        for market in candidates:
+            if self.tracer.begin(market, cycle_start):
+                self.tracer.add(market, "scan", cycle_start, scan_end)
+                self.tracer.add(market, "filter", scan_end, rank_end)
+
+    def _cycle_sequential(self, markets, timings):
+        """Top 3 l'un après l'autre, arrêt au premier trade (pipeline inline)."""
+
+        t = time.monotonic()
+        evaluated = 0
+        result = "NO_TRADE"
+
         for market in markets[:3]:
 
-            decision = self._evaluate_market(market)
+            evaluated += 1
+            order = self.pipeline.run(market)
 
-            if decision is None:
-                continue
+            # Un seul trade par cycle
+            if order is not None:
+                result = "EXECUTED"
+                break
 
-            # 4. Confidence check
-            conf_ok, conf_reason = self.confidence.validate(decision)
-            if not conf_ok:
-                self.log.debug(f"Confidence rejected: {conf_reason}")
-                continue
+        for market in markets[evaluated:3]:
+            self.tracer.finish(market, "cycle_limit")
 
-            # 5. Calculate size
-            size = self.optimizer.calculate_size(
-                self.capital, decision["confidence"]
-            )
-            decision["size"] = size
+        timings["evaluate"] = time.monotonic() - t
+        executed = 1 if result == "EXECUTED" else 0
+        return result, {"evaluated": evaluated, "candidates": executed, "executed": executed}
 
-            # 6. Cost check
-            cost_ok, cost_info = self.cost_calc.validate(decision)
-            if not cost_ok:
-                self.log.debug(f"Cost rejected: {cost_info}")
-                continue
+    def _cycle_concurrent(self, markets, timings):
+        """Top N en parallèle jusqu'à l'étape confidence, puis risque + exécution
+        en série dans l'ordre du classement, jusqu'au budget trades / risque du cycle."""
 
-            # 7. Risk check
-            risk_ok, risk_reason = self.risk.validate_trade(
-                self.capital, size, decision["confidence"]
-            )
-            if not risk_ok:
-                self.log.risk(f"Blocked: {risk_reason}")
-                self.db.log_audit("RISK_BLOCKED", risk_reason)
-                continue
+        candidates = markets[:self.cycle_top_n]
+
+        t = time.monotonic()
+        if self._prefetch_batch(candidates):
+            timings["prefetch"] = time.monotonic() - t
+
+        t = time.monotonic()
+        decisions = self.pipeline.run_batch(candidates, stop="confidence")
+        passing = [d for d in decisions if d is not None]   # ordre du classement conservé
+        timings["evaluate"] = time.monotonic() - t
+
+        t = time.monotonic()
+        executed, committed, budget = self._execute_decisions(passing)
+        timings["trade"] = time.monotonic() - t
+
+        self.log.info(f"Cycle: {len(candidates)} evaluated, {len(passing)} candidates, {executed} executed | committed: {round(committed, 2)}/{round(budget, 2)}")
 
-            # 8. Execute (via full pipeline: guard -> wallet -> execute -> fill)
-            order = self.errors.safe_execute(
-                self.live_exec.execute, decision,
-                default=None, context="execution"
-            )
+        result = "EXECUTED" if executed else "NO_TRADE"
+        return result, {"evaluated": len(candidates), "candidates": len(passing), "executed": executed}
 
-            if order is None:
+    def _prefetch_batch(self, candidates):
+        """Un prompt batch par modèle pour tous les candidats (evaluate_batch),
+        modèles en parallèle. Les réponses vont dans le cache IA : l'ensemble
+        les relit ensuite en hits cache au lieu de N appels unitaires par
+        modèle. Sans cache, rien à réutiliser — pas de prefetch.
+        Retourne True si un prefetch a eu lieu."""
+
+        if not self.batch_prefetch or len(candidates) < 2:
+            return False
+
+        clients = [(client, model) for client, model in zip(self.ai_clients, self.ai_models)
+                   if hasattr(client, "evaluate_batch") and getattr(client, "cache", None) is not None]
+        if not clients:
+            return False
+
+        def prefetch(client, model):
+            self.errors.safe_execute(client.evaluate_batch, candidates, model,
+                                     default=None, context=f"ai_batch_{model}")
+
+        with ThreadPoolExecutor(max_workers=len(clients), thread_name_prefix="alpha-batch") as pool:
+            for client, model in clients:
+                pool.submit(prefetch, client, model)
+        return True
+
+    def _execute_decisions(self, decisions):
+        """Étape trade en série sur des décisions classées, jusqu'au budget
+        trades / risque du cycle. Retourne (executed, committed, budget)."""
+
+        executed = 0
+        committed = 0
+        budget = self.capital * self.cycle_risk_budget
+
+        for decision in decisions:
+
+            if executed >= self.cycle_max_trades:
+                self.tracer.finish(decision, "cycle_limit")
                 continue
 
-            pnl = order.get("pnl", 0)
-
-            # 9. Update state
-            self.capital += pnl
-            self.total_pnl += pnl
-            self.total_trades += 1
-
-            if pnl > 0:
-                self.wins += 1
-            else:
-                self.losses += 1
-
-            self.risk.record_trade(pnl)
-            self.risk.update_capital(self.capital)
-
-            # Confidence outcome for auto-adjust
-            self.confidence.record_outcome(decision["confidence"], pnl > 0)
-
-            # 10. Record in database
-            self.db.record_trade(
-                market=decision["market"],
-                side=decision["side"],
-                price=decision["price"],
-                size=size,
-                pnl=pnl,
-                confidence=decision["confidence"],
-                model=decision.get("model", ""),
-                source=decision.get("source", "ai"),
-                status=order.get("status", "SIMULATED"),
-            )
-
-            self._save_state()
-
-            # 11. Log
-            self.log.trade(
-                decision["market"], decision["side"],
-                size, pnl, decision["confidence"]
-            )
-            self.db.log_audit(
-                "EXECUTED",
-                f"pnl={round(pnl,2)} capital={round(self.capital,2)}"
-            )
-
-            self.log.info(f"PnL: {round(pnl, 2)} | Capital: {round(self.capital, 2)}")
+            # Budget risque : taille estimée avant l'étape trade (qui la recalcule)
+            size = self.optimizer.calculate_size(self.capital, decision["confidence"])
+            if committed + size > budget:
+                self.log.debug(f"Cycle risk budget: {round(committed + size, 2)} > {round(budget, 2)}")
+                self.tracer.finish(decision, "cycle_budget")
+                continue
 
-            # Un seul trade par cycle
-            return "EXECUTED"
+            order = self.pipeline.run(decision, start="trade")
+            if order is not None:
+                executed += 1
+                committed += decision["size"]
 
-        return "NO_TRADE"
+        return executed, committed, budget
+
+    def _record_cycle(self, timings, counts):
+
+        stats = self.cycle_stats
+        stats["cycles"] += 1
+        for key, value in counts.items():
+            stats[key] += value
+        for phase, seconds in timings.items():
+            stats["timings"][phase] = stats["timings"].get(phase, 0) + seconds
+        stats["last"] = {phase: round(seconds, 3) for phase, seconds in timings.items()}
 
     def _evaluate_market(self, market):
-        """Évalue un marché via l'ensemble IA."""
+        """Évalue un marché via l'ensemble IA (modèles en parallèle)."""
 
-        results = []
-        for client, model in zip(self.ai_clients, self.ai_models):
-            result = self.errors.safe_execute(
-                client.evaluate, market, model,
-                default={"trade": False, "side": "NO", "confidence": 0},
-                context=f"ai_{model}"
-            )
-            results.append(result)
+        evaluation = self.ensemble.evaluate_detailed(market)
+
+        for result in evaluation["results"]:
             trade = result.get("trade", False)
             conf = result.get("confidence", 0)
-            self.log.debug(f"  [{model}] trade:{trade} conf:{conf}")
-
-        # Filtrer trades
-        trades = [r for r in results if r.get("trade", False)]
+            self.log.debug(f"  [{result.get('model', '?')}] trade:{trade} conf:{conf}")
 
-        if not trades:
+        best = evaluation["best"]
+        if best is None:
             return None
 
-        # Meilleure confiance
-        best = max(trades, key=lambda x: x.get("confidence", 0))
-
         decision = {
             "market": market["market"],
             "token_id": market.get("token_id"),
@@ -311,11 +415,48 @@ class AlphaOrchestrator:
         self.log.info(f"  Winrate: {winrate}%")
         self.log.info(f"  Drawdown: {drawdown}%")
 
+        # Calibration confidence
+        cal_status = self.confidence.get_status()
+        calibration = " ".join(f"{m}:n={c['samples']},ece={c['ece']}" for m, c in cal_status["models"].items())
+        self.log.info(f"  Calibration: threshold {cal_status['threshold']} | {calibration}")
+
+        # Pré-score heuristique
+        ps_status = self.scorer.get_status()
+        self.log.info(f"  Prescore: {ps_status['scored']} scored, {ps_status['rejected']} rejected ({ps_status['reject_rate']}%) | confidence:{ps_status['rejected_confidence']} cost:{ps_status['rejected_cost']}")
+
+        # Cycles
+        cs = self.cycle_stats
+        n = max(1, cs["cycles"])
+        phases = " ".join(f"{p}:{round(v / n, 3)}s" for p, v in cs["timings"].items())
+        self.log.info(f"  Cycle [{self.cycle_mode}]: {cs['cycles']} cycles | avg {phases} | coverage:{round(cs['evaluated'] / n, 1)} markets/cycle candidates:{cs['candidates']} executed:{cs['executed']}")
+
+        for line in format_pipeline_status(self.pipeline) + format_trace_status(self.tracer):
+            self.log.info(line)
+
         # AI benchmark
         for client, model in zip(self.ai_clients, self.ai_models):
             bench = client.get_benchmark()
             self.log.info(f"  AI [{model}]: {bench['success_rate']}% success, {bench['avg_latency']}s avg")
 
+        ai_cache = getattr(self.ai_clients[0], "cache", None)
+        if ai_cache is not None:
+            cache_status = ai_cache.get_status()
+            rates = " ".join(f"{m}:{r}%" for m, r in cache_status["hit_rate"].items())
+            self.log.info(f"  AI cache: {cache_status['size']} entries, {cache_status['hits']} hits | {rates}")
+
+        http_status = get_session_pool().get_stats()
+        self.log.info(f"  HTTP pool: {http_status['hosts']} hosts, {http_status['connections']} conns, {http_status['requests']} reqs, reuse:{http_status['reuse_rate']}%")
+
+        ens_status = self.ensemble.get_status()
+        self.log.info(f"  Ensemble [{ens_status['policy']}]: {ens_status['evaluations']} evals, early:{ens_status['early_exits']} cancelled:{ens_status['cancelled']} timeouts:{sum(ens_status['timeouts'].values())} avg:{ens_status['avg_latency']}s")
+
+        router_status = self.router.get_status()
+        for model, stats in router_status["models"].items():
+            self.log.info(f"  Router [{model}]: ewma:{stats['ewma_latency']}s p95:{stats['p95']}s success:{stats['success_rate']}% agree:{stats['agreement_rate']}% selected:{stats['selected']} skipped:{stats['skipped']} hedge_wins:{stats['hedges_won']}")
+
+        for name, cb in get_breakers_status("ai:").items():
+            self.log.info(f"  Breaker [{name[3:]}]: {cb['state']} fail:{cb['failure_rate']}% opened:{cb['times_opened']} rejected:{cb['rejected']} retry_in:{cb['retry_in']}s")
+
         # Risk status
         risk_status = self.risk.get_status()
         self.log.info(f"  Risk: streak:{risk_status['loss_streak']} daily:{risk_status['daily_trades']} hourly:{risk_status['hourly_trades']}")
@@ -336,16 +477,29 @@ class AlphaOrchestrator:
 
         # Position Monitor status
         mon_status = self.monitor.get_status()
-        self.log.info(f"  Monitor: connected:{mon_status['connected']} updates:{mon_status['price_updates']} exits:{mon_status['exits_triggered']}")
+        self.log.info(f"  Monitor: connected:{mon_status['connected']} updates:{mon_status['price_updates']} exits:{mon_status['exits_triggered']} exit_latency:{mon_status['exit_latency_ms']}ms")
 
         # Scanner status
         scan_status = self.scanner.get_status()
         self.log.info(f"  Scanner: interval:{scan_status['interval']}s rate_limited:{scan_status['rate_limited']}")
 
+        # Rate limiter (partagé)
+        rl_status = self.scanner.limiter.get_status()
+        self.log.info(f"  RateLimiter: granted:{rl_status['total_granted']} denied:{rl_status['total_denied']} throttled:{rl_status['total_throttled']}")
+
         # Error status
         err_status = self.errors.get_status()
         self.log.info(f"  Errors: {err_status['total_errors']} total, {err_status['critical_errors']} critical")
 
+        # Persistence (write-behind)
+        db_status = self.db.get_status()
+        if db_status["write_behind"]:
+            self.log.info(f"  Persistence: pending:{db_status['pending']} batches:{db_status['batches']} written:{db_status['written']} avg_batch:{db_status['avg_batch']} coalesced:{db_status['coalesced']} failed:{db_status['failed']} max_lag:{db_status['max_lag_ms']}ms")
+
+        # Warm start snapshot
+        snap = self.snapshot.get_status()
+        self.log.info(f"  Snapshot: saves:{snap['saves']} failures:{snap['failures']} size:{snap['last_bytes']}B write:{snap['last_duration_ms']}ms | restored:{snap['restored']} age:{snap['restored_age']}s")
+
         self.log.info("=" * 50)
 
         # DB stats
@@ -357,7 +511,12 @@ class AlphaOrchestrator:
         """Arrêt propre."""
 
         self.log.info("Shutting down...")
+        self.ensemble.shutdown()
         self._save_state()
+        self.snapshot.save(self)
         self.db.backup()
         self.db.close()
+
+        if self.recorder:
+            self.recorder.close()
         self.log.info("Shutdown complete.")
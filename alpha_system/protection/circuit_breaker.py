@@ -0,0 +1,171 @@
+"""
+Circuit Breaker — coupe les appels vers un endpoint en panne.
+
+États :
+- CLOSED    : appels normaux, taux d'échec suivi sur une fenêtre glissante
+- OPEN      : taux d'échec > CB_FAILURE_RATE -> appels refusés (fallback
+              immédiat, zéro temps réseau) pendant CB_COOLDOWN secondes
+- HALF_OPEN : après le cool-down, CB_HALF_OPEN_PROBES appels de test ;
+              succès -> CLOSED, échec -> OPEN
+
+Un breaker par modèle IA, partagé par tous les clients du process
+(get_circuit_breaker()).
+"""
+
+import threading
+import time
+from collections import deque
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Breaker thread-safe — fenêtre glissante + sonde de cool-down."""
+
+    def __init__(self, name, config=None):
+
+        config = config or {}
+
+        self.name = name
+        self.window = config.get("CB_WINDOW", 20)
+        self.min_calls = config.get("CB_MIN_CALLS", 5)
+        self.failure_rate = config.get("CB_FAILURE_RATE", 0.5)
+        self.cooldown = config.get("CB_COOLDOWN", 30)
+        self.half_open_probes = config.get("CB_HALF_OPEN_PROBES", 1)
+
+        self.lock = threading.Lock()
+        self.state = CLOSED
+        self.outcomes = deque(maxlen=self.window)   # True = échec
+        self.opened_at = 0.0
+        self.probes_in_flight = 0
+
+        # Stats
+        self.times_opened = 0
+        self.rejected = 0
+
+    # ============================================
+    # GATE
+    # ============================================
+
+    def allow(self):
+        """True si l'appel peut partir. En HALF_OPEN, réserve une sonde."""
+
+        with self.lock:
+
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.cooldown:
+                    self.rejected += 1
+                    return False
+                self.state = HALF_OPEN
+                self.probes_in_flight = 0
+
+            if self.state == HALF_OPEN:
+                if self.probes_in_flight >= self.half_open_probes:
+                    self.rejected += 1
+                    return False
+                self.probes_in_flight += 1
+
+            return True
+
+    def is_open(self):
+
+        with self.lock:
+            return self.state == OPEN
+
+    # ============================================
+    # OUTCOMES
+    # ============================================
+
+    def record_success(self):
+
+        with self.lock:
+            if self.state == HALF_OPEN:
+                self.state = CLOSED
+                self.outcomes.clear()
+                self.probes_in_flight = 0
+                return
+
+            self.outcomes.append(False)
+
+    def record_failure(self):
+
+        with self.lock:
+            if self.state == HALF_OPEN:
+                self._open()
+                return
+
+            if self.state == OPEN:
+                return
+
+            self.outcomes.append(True)
+
+            if len(self.outcomes) >= self.min_calls:
+                if sum(self.outcomes) / len(self.outcomes) > self.failure_rate:
+                    self._open()
+
+    def _open(self):
+
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.probes_in_flight = 0
+        self.times_opened += 1
+
+    def reset(self):
+
+        with self.lock:
+            self.state = CLOSED
+            self.outcomes.clear()
+            self.probes_in_flight = 0
+
+    # ============================================
+    # STATUS
+    # ============================================
+
+    def get_status(self):
+
+        with self.lock:
+            failures = sum(self.outcomes)
+            retry_in = 0
+            if self.state == OPEN:
+                retry_in = max(0, self.cooldown - (time.monotonic() - self.opened_at))
+
+            return {
+                "state": self.state,
+                "failure_rate": round(failures / max(1, len(self.outcomes)) * 100, 1),
+                "window": len(self.outcomes),
+                "times_opened": self.times_opened,
+                "rejected": self.rejected,
+                "retry_in": round(retry_in, 1),
+            }
+
+
+# ============================================
+# REGISTRY
+# ============================================
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name):
+    """Breaker partagé par nom (ex: "ai:deepseek-v3.2")."""
+
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            from alpha_system.config import CONFIG
+            breaker = CircuitBreaker(name, CONFIG)
+            _breakers[name] = breaker
+        return breaker
+
+
+def get_breakers_status(prefix=""):
+    """Statut de tous les breakers dont le nom commence par prefix."""
+
+    with _breakers_lock:
+        breakers = [(n, b) for n, b in _breakers.items() if n.startswith(prefix)]
+
+    return {name: breaker.get_status() for name, breaker in breakers}
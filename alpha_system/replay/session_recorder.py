@@ -0,0 +1,134 @@
+"""
+Session Recorder — enregistre les entrées brutes d'une session de trading.
+
+Capture les réponses gamma-api, les frames WebSocket et les réponses IA
+avec un timestamp monotone (secondes depuis le début de la session),
+dans des segments JSONL compressés (gzip) :
+
+    <directory>/segment_00000.jsonl.gz
+    <directory>/segment_00001.jsonl.gz
+    ...
+
+Une ligne = {"t": 1.234, "kind": "gamma" | "ws" | "ai", "data": ...}
+Relu par SessionReplayer pour rejouer la session sans réseau.
+"""
+
+import gzip
+import json
+import os
+import threading
+import time
+
+
+KIND_GAMMA = "gamma"
+KIND_WS = "ws"
+KIND_AI = "ai"
+
+SEGMENT_PATTERN = "segment_{:05d}.jsonl.gz"
+
+
+class SessionRecorder:
+    """Enregistreur thread-safe — rotation par nombre d'événements."""
+
+    def __init__(self, directory, segment_size=5000):
+
+        self.directory = directory
+        self.segment_size = segment_size
+
+        os.makedirs(directory, exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.start = time.monotonic()
+        self.segment_index = self._next_segment_index()
+        self.segment_count = 0
+        self.file = None
+
+        # Stats
+        self.events = {KIND_GAMMA: 0, KIND_WS: 0, KIND_AI: 0}
+        self.segments_written = 0
+
+    # ============================================
+    # RECORD
+    # ============================================
+
+    def record(self, kind, data, **meta):
+        """Ajoute un événement à la session."""
+
+        event = {"t": round(time.monotonic() - self.start, 6), "kind": kind, "data": data}
+        event.update(meta)
+        line = json.dumps(event, separators=(",", ":"), default=str)
+
+        with self.lock:
+            if self.file is None:
+                self._open_segment()
+
+            self.file.write(line + "\n")
+            self.segment_count += 1
+            self.events[kind] = self.events.get(kind, 0) + 1
+
+            if self.segment_count >= self.segment_size:
+                self._close_segment()
+
+    def record_gamma(self, data):
+        self.record(KIND_GAMMA, data)
+
+    def record_ws(self, message):
+        self.record(KIND_WS, message)
+
+    def record_ai(self, market, model, result):
+        self.record(KIND_AI, result, model=model, market=market.get("market", ""))
+
+    # ============================================
+    # SEGMENTS
+    # ============================================
+
+    def _next_segment_index(self):
+        """Reprend après le dernier segment existant (pas d'écrasement)."""
+
+        existing = [f for f in os.listdir(self.directory)
+                    if f.startswith("segment_") and f.endswith(".jsonl.gz")]
+        return len(existing)
+
+    def _open_segment(self):
+
+        path = os.path.join(self.directory, SEGMENT_PATTERN.format(self.segment_index))
+        self.file = gzip.open(path, "wt", encoding="utf-8")
+        self.segment_count = 0
+
+    def _close_segment(self):
+
+        if self.file is None:
+            return
+
+        self.file.close()
+        self.file = None
+        self.segment_index += 1
+        self.segments_written += 1
+
+    def close(self):
+        """Ferme le segment courant (flush gzip)."""
+
+        with self.lock:
+            self._close_segment()
+
+    def get_status(self):
+
+        return {
+            "directory": self.directory,
+            "events": dict(self.events),
+            "segments": self.segments_written + (1 if self.file else 0),
+        }
+
+
+def iter_segments(directory):
+    """Itère les événements de tous les segments, dans l'ordre d'écriture."""
+
+    files = sorted(f for f in os.listdir(directory)
+                   if f.startswith("segment_") and f.endswith(".jsonl.gz"))
+
+    for name in files:
+        with gzip.open(os.path.join(directory, name), "rt", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
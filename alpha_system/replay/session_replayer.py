@@ -0,0 +1,307 @@
+"""
+Session Replayer — rejoue une session enregistrée par SessionRecorder.
+
+Fournit des implémentations injectables des sources de données :
+- ReplayReader        -> remplace PolymarketReader (get_markets)
+- ReplayAIClient      -> remplace SecureAIClient (evaluate, get_benchmark)
+- ReplayWebSocketSource -> remplace la connexion WebSocket (run / close)
+
+Vitesse :
+- speed = 1.0   temps réel
+- speed = 10.0  accéléré x10
+- speed = 0     aussi vite que possible (benchmark débit)
+
+Usage :
+    python -m alpha_system.replay.session_replayer <dir> --mode ultra --speed 0
+"""
+
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+
+from alpha_system.market.polymarket_reader import PolymarketReader
+from alpha_system.replay.session_recorder import iter_segments, KIND_GAMMA, KIND_WS, KIND_AI
+
+
+# ============================================
+# CLOCK
+# ============================================
+
+class ReplayClock:
+    """Horloge partagée — cale les événements sur leur timestamp enregistré."""
+
+    def __init__(self, speed=1.0):
+
+        self.speed = speed
+        self.lock = threading.Lock()
+        self.wall_start = None
+        self.t_start = None
+
+    def wait_until(self, t):
+        """Bloque jusqu'à l'instant de replay correspondant à t."""
+
+        if not self.speed:
+            return
+
+        with self.lock:
+            if self.wall_start is None or self.t_start is None or t < self.t_start:
+                self.wall_start = time.monotonic()
+                self.t_start = t
+                return
+            target = self.wall_start + (t - self.t_start) / self.speed
+
+        delay = target - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+# ============================================
+# REPLAY READER
+# ============================================
+
+class ReplayReader:
+    """Remplace PolymarketReader — une réponse gamma enregistrée par appel."""
+
+    def __init__(self, events, clock):
+
+        self.events = deque(events)
+        self.clock = clock
+        self.parser = PolymarketReader()
+        self.exhausted = not self.events
+        self.calls = 0
+
+    def get_markets(self):
+
+        if not self.events:
+            self.exhausted = True
+            return []
+
+        event = self.events.popleft()
+        self.clock.wait_until(event["t"])
+        self.calls += 1
+
+        if not self.events:
+            self.exhausted = True
+
+        return self.parser.parse_markets(event["data"])
+
+
+# ============================================
+# REPLAY AI CLIENT
+# ============================================
+
+class ReplayAIClient:
+    """Remplace SecureAIClient — réponses enregistrées par (modèle, marché)."""
+
+    def __init__(self, events, speed=1.0, simulate_latency=True):
+
+        self.speed = speed
+        self.simulate_latency = simulate_latency
+        self.lock = threading.Lock()
+
+        self.responses = defaultdict(deque)
+        for event in events:
+            self.responses[(event.get("model"), event.get("market"))].append(event["data"])
+
+        # Benchmark (même format que SecureAIClient)
+        self.total_calls = 0
+        self.successful_calls = 0
+        self.fallback_calls = 0
+        self.total_latency = 0
+        self.misses = 0
+
+    def evaluate(self, market, model="deepseek-v3.2"):
+
+        key = (model, market.get("market", ""))
+
+        with self.lock:
+            self.total_calls += 1
+            queue = self.responses.get(key)
+
+            # Réutilise la dernière réponse si le marché est réévalué plus souvent
+            if queue:
+                result = dict(queue.popleft() if len(queue) > 1 else queue[0])
+            else:
+                result = None
+
+            if result is None:
+                self.misses += 1
+                self.fallback_calls += 1
+                return {"trade": False, "side": "NO", "confidence": 0,
+                        "model": model, "source": "replay_miss"}
+
+            latency = result.get("latency", 0) or 0
+            self.total_latency += latency
+            if result.get("source") == "fallback":
+                self.fallback_calls += 1
+            else:
+                self.successful_calls += 1
+
+        if self.simulate_latency and self.speed and latency:
+            time.sleep(latency / self.speed)
+
+        return result
+
+    def get_benchmark(self):
+
+        avg_latency = round(self.total_latency / max(1, self.total_calls), 2)
+        success_rate = round(self.successful_calls / max(1, self.total_calls) * 100, 1)
+
+        return {
+            "total_calls": self.total_calls,
+            "successful": self.successful_calls,
+            "fallbacks": self.fallback_calls,
+            "success_rate": success_rate,
+            "avg_latency": avg_latency,
+            "misses": self.misses,
+        }
+
+
+# ============================================
+# REPLAY WEBSOCKET SOURCE
+# ============================================
+
+class ReplayWebSocketSource:
+    """Remplace la connexion WebSocket — pousse les frames enregistrées."""
+
+    def __init__(self, events, clock):
+
+        self.events = list(events)
+        self.clock = clock
+        self.running = False
+        self.frames_sent = 0
+
+    def run(self, on_message):
+        """Envoie toutes les frames à on_message(ws, message), puis retourne."""
+
+        self.running = True
+
+        for event in self.events:
+            if not self.running:
+                break
+            self.clock.wait_until(event["t"])
+            on_message(None, event["data"])
+            self.frames_sent += 1
+
+        self.running = False
+
+    def close(self):
+        self.running = False
+
+
+# ============================================
+# SESSION REPLAYER
+# ============================================
+
+class SessionReplayer:
+    """Charge une session et fabrique les sources injectables."""
+
+    def __init__(self, directory, speed=1.0, simulate_latency=True):
+
+        self.directory = directory
+        self.speed = speed
+        self.simulate_latency = simulate_latency
+        self.clock = ReplayClock(speed)
+
+        self.events = {KIND_GAMMA: [], KIND_WS: [], KIND_AI: []}
+        for event in iter_segments(directory):
+            self.events.setdefault(event["kind"], []).append(event)
+
+    def reader(self):
+        return ReplayReader(self.events[KIND_GAMMA], self.clock)
+
+    def ai_client(self):
+        return ReplayAIClient(self.events[KIND_AI], self.speed, self.simulate_latency)
+
+    def ws_source(self):
+        return ReplayWebSocketSource(self.events[KIND_WS], self.clock)
+
+    def get_status(self):
+        return {kind: len(events) for kind, events in self.events.items()}
+
+
+# ============================================
+# RUN REPLAY
+# ============================================
+
+def run_replay(directory, mode="alpha", speed=0, db_path="alpha_system/data/replay.db"):
+    """Rejoue une session dans un orchestrator. Retourne un résumé de benchmark."""
+
+    replayer = SessionReplayer(directory, speed=speed)
+    ai = replayer.ai_client()
+    ai_clients = [ai, ai, ai]
+    start = time.monotonic()
+
+    if mode == "alpha":
+        from alpha_system.orchestrator import AlphaOrchestrator
+
+        reader = replayer.reader()
+        system = AlphaOrchestrator(reader=reader, ai_clients=ai_clients, db_path=db_path)
+        cycles = 0
+        while not reader.exhausted:
+            system.cycle()
+            cycles += 1
+        processed = cycles
+
+    elif mode == "ultra":
+        from alpha_system.ultra_fast_orchestrator import UltraFastOrchestrator
+
+        reader = replayer.reader()
+        system = UltraFastOrchestrator(reader=reader, ai_clients=ai_clients, db_path=db_path)
+        scanner = threading.Thread(target=system.scanner_loop, name="scanner", daemon=True)
+        scanner.start()
+        system.decisions.start()
+
+        while not reader.exhausted:
+            time.sleep(0.01)
+
+        system.running = False
+        scanner.join()
+        system.decisions.wait_idle()
+        system.decisions.stop()
+        processed = system.decisions_made
+
+    elif mode == "ws":
+        from alpha_system.websocket_orchestrator import WebSocketOrchestrator
+
+        source = replayer.ws_source()
+        system = WebSocketOrchestrator(ws_source=source, ai_clients=ai_clients, db_path=db_path)
+        system.start_workers()
+        source.run(system.on_message)
+        system.decisions.wait_idle()
+        system.stop_workers()
+        processed = system.messages_received
+
+    else:
+        raise ValueError(f"unknown replay mode: {mode}")
+
+    elapsed = time.monotonic() - start
+    system.report()
+    system.db.close()
+
+    return {
+        "mode": mode,
+        "speed": speed,
+        "events": replayer.get_status(),
+        "processed": processed,
+        "elapsed": round(elapsed, 3),
+        "throughput": round(processed / max(elapsed, 1e-9), 1),
+        "trades": system.total_trades,
+        "ai": ai.get_benchmark(),
+    }
+
+
+if __name__ == "__main__":
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Replay d'une session enregistrée")
+    parser.add_argument("directory")
+    parser.add_argument("--mode", choices=["alpha", "ultra", "ws"], default="alpha")
+    parser.add_argument("--speed", type=float, default=0)
+    args = parser.parse_args()
+
+    summary = run_replay(args.directory, mode=args.mode, speed=args.speed)
+    print(summary)
+    sys.exit(0)
@@ -178,6 +178,42 @@ class RiskEngineV2:
         if capital > self.peak_capital:
             self.peak_capital = capital
 
+    # === WARM START (snapshot) ===
+
+    def export_state(self):
+        """Compteurs jour / heure, série de pertes, peak capital.
+        Les positions sont re-synchronisées par le PositionManager."""
+
+        self._check_daily_reset()
+        self._check_hourly_reset()
+
+        now = datetime.now(UTC)
+        return {
+            "date": now.date().isoformat(),
+            "hour": f"{now.date().isoformat()}T{now.hour:02d}",
+            "daily_trades": self.daily_trades,
+            "daily_pnl": self.daily_pnl,
+            "loss_streak": self.loss_streak,
+            "hourly_trades": self.hourly_trades,
+            "peak_capital": self.peak_capital,
+        }
+
+    def restore_state(self, state):
+        """Compteurs repris seulement dans le même jour / la même heure UTC
+        (même règle que les resets automatiques). Peak capital toujours repris."""
+
+        now = datetime.now(UTC)
+
+        if state.get("date") == now.date().isoformat():
+            self.daily_trades = state.get("daily_trades", 0)
+            self.daily_pnl = state.get("daily_pnl", 0)
+            self.loss_streak = state.get("loss_streak", 0)
+
+        if state.get("hour") == f"{now.date().isoformat()}T{now.hour:02d}":
+            self.hourly_trades = state.get("hourly_trades", 0)
+
+        self.peak_capital = max(self.peak_capital, state.get("peak_capital", 0))
+
     # === INTERNAL ===
 
     def _check_trailing_stop(self, capital):
@@ -31,6 +31,19 @@ def test_database():
     print("  [OK] database")
 
 
+def test_database_backup_dir():
+    import tempfile
+    from alpha_system.memory.database import DatabaseManager
+
+    tmp = tempfile.mkdtemp()
+    db = DatabaseManager(os.path.join(tmp, "bk.db"), write_behind=False)
+    path = db.backup()
+    db.close()
+    assert os.path.dirname(path) == os.path.join(tmp, "backups")   # backups à côté de la DB
+    assert os.path.exists(path)
+    print("  [OK] database_backup_dir")
+
+
 def test_risk_engine():
     from alpha_system.config import CONFIG
     from alpha_system.risk.risk_engine_v2 import RiskEngineV2
@@ -229,6 +242,1909 @@ def test_order_monitor():
     print("  [OK] order_monitor")
 
 
+def test_market_delta():
+    from alpha_system.config import CONFIG
+    from alpha_system.market.market_delta import MarketDelta
+    delta = MarketDelta(CONFIG)
+    market = {"market": "m1", "token_id": "tok1", "price": 0.70, "volume": 5000, "spread": 0.01}
+    assert delta.evaluate(market) is True       # état mémorisé dès l'évaluation
+    # Inchangé -> skip
+    assert delta.evaluate(dict(market, price=0.701)) is False
+    assert delta.skipped["unchanged"] == 1
+    # Prix bouge -> forward
+    assert delta.evaluate(dict(market, price=0.72)) is True
+    assert delta.forwarded["price"] == 1
+    # Volume +10% -> forward (comparé au dernier état transmis)
+    market = dict(market, price=0.72, volume=5500)
+    assert delta.evaluate(market) is True
+    assert delta.forwarded["volume"] == 1
+    # Evaluation trop vieille -> forward
+    delta.last_state["tok1"]["evaluated_at"] -= delta.max_age + 1
+    assert delta.evaluate(market) is True
+    assert delta.forwarded["stale"] == 1
+    assert delta.get_status()["tracked"] == 1
+    print("  [OK] market_delta")
+
+
+def test_market_delta_filtered():
+    from alpha_system.config import CONFIG
+    from alpha_system.market.market_delta import MarketDelta
+    delta = MarketDelta(CONFIG)
+    # Transmis puis rejeté en aval (volume faible, cooldown) : pas retransmis au scan suivant
+    market = {"market": "m1", "token_id": "tok1", "price": 0.70, "volume": 10}
+    assert delta.evaluate(market) is True
+    assert delta.evaluate(dict(market)) is False
+    assert delta.forwarded["new"] == 1 and delta.skipped["unchanged"] == 1
+    # Délesté sans évaluation : oublié, retransmis
+    delta.forget(market)
+    assert delta.evaluate(market) is True
+    print("  [OK] market_delta_filtered")
+
+
+def test_rate_limiter():
+    from alpha_system.core.rate_limiter import (
+        RateLimiter, PRIORITY_CRITICAL, PRIORITY_LOW, parse_retry_after,
+    )
+    url = "https://api.test/markets"
+    rl = RateLimiter({"RATE_LIMITS": {"api.test/markets": (1, 5)}})
+    # Scans: ne consomment pas la réserve critique (20% du burst)
+    granted = sum(rl.try_acquire(url, PRIORITY_LOW) for _ in range(5))
+    assert granted == 4
+    assert rl.try_acquire(url, PRIORITY_CRITICAL) is True
+    # 429 + Retry-After -> endpoint bloqué pour tous
+    wait = rl.report_response(url, 429, {"Retry-After": "30"})
+    assert wait == 30
+    assert rl.blocked_for(url) > 29
+    assert rl.try_acquire(url, PRIORITY_CRITICAL) is False
+    assert rl.try_acquire("https://api.test/order/abc", PRIORITY_CRITICAL) is True
+    assert parse_retry_after("bogus", default=7) == 7
+    status = rl.get_status()
+    assert status["buckets"]["api.test/markets"]["throttled"] == 1
+    print("  [OK] rate_limiter")
+
+
+def test_scanner_rate_limit_status():
+    from alpha_system.core.rate_limiter import RateLimiter
+    from alpha_system.market.adaptive_scanner import AdaptiveScanner
+    url = "https://api.test/markets"
+    rl = RateLimiter({"RATE_LIMITS": {"api.test/markets": (1, 5)}})
+    rl.report_response(url, 429, {"Retry-After": "30"})
+    # AdaptiveScanner voit le blocage du rate limiter partagé
+    sc = AdaptiveScanner(base_interval=1, rate_limiter=rl, url=url)
+
+    # get_status ne modifie rien (pas de backoff appliqué par un report)
+    status = sc.get_status()
+    assert status["rate_limited"] and status["rate_limit_wait"] > 29
+    assert not sc.rate_limited and sc.current_interval == 1 and sc.rate_limit_count == 0
+
+    assert sc.can_scan() is False
+    assert sc.rate_limited is True and sc.current_interval == 2
+    for _ in range(3):
+        sc.get_status()
+    assert sc.current_interval == 2 and sc.rate_limit_count == 1
+    sc.clear_rate_limit()
+    assert rl.blocked_for(url) == 0
+    print("  [OK] scanner_rate_limit_status")
+
+
+def test_scanner_rate_limit_expiry():
+    import time
+    from alpha_system.core.rate_limiter import RateLimiter
+    from alpha_system.market.adaptive_scanner import AdaptiveScanner
+    url = "https://api.test/markets"
+    sc = AdaptiveScanner(base_interval=1, rate_limiter=RateLimiter({}), url=url)
+    # Rate limit échu ici et dans le limiter -> rate_limited remis à False
+    sc.report_rate_limit(0.01)
+    time.sleep(0.02)
+    assert sc.get_rate_limit_wait() == 0 and not sc.rate_limited
+    assert not sc.get_status()["rate_limited"]
+    print("  [OK] scanner_rate_limit_expiry")
+
+
+def _record_session(directory):
+    """Session enregistrée dans directory : 1 snapshot Gamma, 1 frame WS, 1 réponse IA."""
+    import json
+    from alpha_system.replay.session_recorder import SessionRecorder
+
+    gamma = [{"question": "Will X happen?", "outcomePrices": "[\"0.82\", \"0.18\"]",
+              "clobTokenIds": "[\"tok1\", \"tok2\"]", "volume": "50000", "active": True}]
+    rec = SessionRecorder(directory, segment_size=2)
+    rec.record_gamma(gamma)
+    rec.record_ws(json.dumps({"asset_id": "tok1", "price": "0.81", "volume": 5000}))
+    rec.record_ai({"market": "Will X happen?"}, "glm-5",
+                  {"trade": True, "side": "YES", "confidence": 0.9, "model": "glm-5", "source": "ai"})
+    rec.close()
+    return rec
+
+
+def test_session_recorder():
+    import tempfile
+    rec = _record_session(tempfile.mkdtemp())
+    assert rec.get_status()["segments"] == 2
+    print("  [OK] session_recorder")
+
+
+def test_session_replayer():
+    import tempfile
+    from alpha_system.replay.session_replayer import SessionReplayer
+    directory = tempfile.mkdtemp()
+    _record_session(directory)
+    replayer = SessionReplayer(directory, speed=0)
+    assert replayer.get_status() == {"gamma": 1, "ws": 1, "ai": 1}
+    reader = replayer.reader()
+    markets = reader.get_markets()
+    assert markets[0]["price"] == 0.82 and markets[0]["token_id"] == "tok1"
+    assert reader.exhausted is True
+    ai = replayer.ai_client()
+    assert ai.evaluate(markets[0], "glm-5")["confidence"] == 0.9
+    assert ai.evaluate(markets[0], "deepseek-v3.2")["source"] == "replay_miss"
+    frames = []
+    replayer.ws_source().run(lambda ws, msg: frames.append(msg))
+    assert len(frames) == 1
+    print("  [OK] session_replayer")
+
+
+def test_run_replay():
+    import tempfile
+    from alpha_system.replay.session_replayer import run_replay
+    directory = tempfile.mkdtemp()
+    _record_session(directory)
+    # Replay complet dans AlphaOrchestrator
+    summary = run_replay(directory, mode="alpha", speed=0, db_path=os.path.join(directory, "replay.db"))
+    assert summary["processed"] == 1
+    assert summary["ai"]["total_calls"] == 3
+    print("  [OK] run_replay")
+
+
+# Marché Gamma brut (outcomePrices / clobTokenIds en chaînes JSON)
+_GAMMA_MARKET = {"id": "42", "updatedAt": "2026-01-01T00:00:00Z", "question": "Will Y?",
+                 "outcomePrices": "[\"0.30\", \"0.70\"]", "clobTokenIds": "[\"a\", \"b\"]",
+                 "volume": "20000", "closed": False}
+
+
+def test_market_normalizer():
+    from alpha_system.market.market_normalizer import normalize_market, get_cache_stats, clear_cache
+    clear_cache()
+    raw = dict(_GAMMA_MARKET)
+    m1 = normalize_market(raw)
+    assert m1.yes_price == 0.30 and m1.no_price == 0.70
+    assert m1.token_id == "a"
+    assert m1.volume == 20000.0
+    # Même id + updatedAt -> même objet, pas de re-parse
+    assert normalize_market(dict(raw)) is m1
+    # updatedAt change -> nouveau parse
+    m2 = normalize_market(dict(raw, updatedAt="2026-01-01T00:01:00Z", outcomePrices="[\"0.4\", \"0.6\"]"))
+    assert m2.yes_price == 0.4
+    stats = get_cache_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 2
+    # JSON invalide -> pas de prix, pas d'exception
+    assert normalize_market({"outcomePrices": "not json"}).yes_price is None
+    print("  [OK] market_normalizer")
+
+
+def test_market_filter_normalized():
+    from alpha_system.market.market_normalizer import clear_cache
+    from alpha_system.market.market_filter import MarketFilter
+    clear_cache()
+    # MarketFilter passe par la normalisation
+    mf = MarketFilter(min_volume=10000)
+    tradable = mf.filter([dict(_GAMMA_MARKET)])
+    assert tradable[0]["token_id"] == "a"
+    assert mf.parse_prices(_GAMMA_MARKET) == ["0.30", "0.70"]
+    print("  [OK] market_filter_normalized")
+
+
+def test_timing_wheel():
+    from alpha_system.market.cooldown_service import TimingWheel
+    wheel = TimingWheel(tick=1.0, slots=8, levels=3, now=0)
+    wheel.schedule("a", 5)
+    wheel.schedule("b", 100)   # niveau supérieur -> cascade
+    assert wheel.advance(4) == []
+    assert wheel.advance(5) == ["a"]
+    assert wheel.advance(99) == []
+    assert wheel.advance(100) == ["b"]
+    print("  [OK] timing_wheel")
+
+
+def test_cooldown_service():
+    from alpha_system.market.cooldown_service import CooldownService
+    cds = CooldownService(base_cooldown=100, config={"COOLDOWN_MAX_ENTRIES": 2})
+    assert cds.acquire("m1", 0.50, now=0) is True
+    assert cds.acquire("m1", 0.50, now=10) is False
+    # Marché plat -> cooldown allongé
+    assert cds.acquire("m1", 0.50, now=150) is False
+    # Marché volatil -> cooldown raccourci
+    cds.acquire("m2", 0.50, now=0)
+    cds.acquire("m2", 0.60, now=1)
+    assert cds.acquire("m2", 0.70, now=30) is True
+    assert cds.shortened >= 1
+    # Mémoire bornée
+    cds.acquire("m3", 0.50, now=31)
+    assert len(cds) == 2
+    assert cds.evicted == 1
+    # Expiration O(1) via la wheel
+    cds.expire(now=10000)
+    assert len(cds) == 0
+    assert cds.get_status()["expired"] == 2
+    print("  [OK] cooldown_service")
+
+
+def test_market_queue():
+    import queue
+    from alpha_system.core.market_queue import PriorityMarketQueue
+    mq = PriorityMarketQueue(maxsize=2, config={"QUEUE_MAX_AGE": 30})
+    assert mq.put_nowait({"market": "low", "price": 0.5, "volume": 10})
+    assert mq.put_nowait({"market": "high", "price": 0.1, "volume": 500000})
+    # Remplacement : une seule entrée par marché
+    assert mq.put_nowait({"market": "low", "price": 0.5, "volume": 20})
+    assert mq.qsize() == 2 and mq.replaced == 1
+    # File pleine : la moins prioritaire est éjectée
+    assert mq.put_nowait({"market": "mid", "price": 0.2, "volume": 100000})
+    assert mq.dropped == 1
+    assert mq.get(timeout=0)["market"] == "high"
+    assert mq.get(timeout=0)["market"] == "mid"
+    # Entrées périmées évincées avant traitement
+    mq.max_age = -1
+    mq.put_nowait({"market": "old", "price": 0.1, "volume": 1000})
+    try:
+        mq.get(timeout=0.01)
+        assert False, "stale entry returned"
+    except queue.Empty:
+        pass
+    assert mq.get_status()["stale_evicted"] == 1
+    print("  [OK] market_queue")
+
+
+def test_coalescing_buffer():
+    from alpha_system.market.coalescing_buffer import CoalescingBuffer
+    buf = CoalescingBuffer()
+    buf.update("tok1", {"price": 0.50})
+    buf.update("tok2", {"price": 0.30})
+    buf.update("tok1", {"price": 0.55})  # coalescé : seule la dernière compte
+    assert buf.depth() == 2
+    key, market = buf.take(timeout=0)
+    assert key == "tok1" and market["price"] == 0.55
+    # Update pendant le traitement -> reprogrammée après done()
+    buf.update("tok1", {"price": 0.60})
+    assert buf.depth() == 1
+    buf.done("tok1")
+    assert buf.take(timeout=0)[0] == "tok2"
+    assert buf.take(timeout=0) == ("tok1", {"price": 0.60})
+    buf.done("tok1")
+    buf.done("tok2")
+    assert buf.take(timeout=0) is None
+    assert buf.wait_idle(timeout=1)
+    status = buf.get_status()
+    assert status["ingested"] == 4 and status["coalesced"] == 1
+    print("  [OK] coalescing_buffer")
+
+
+def _ensemble_model(name, delay, trade, side="YES", conf=0.9):
+    """Modèle d'ensemble stub : décision après delay secondes, interruptible."""
+    from alpha_system.ai.concurrent_ensemble import call_sleep
+
+    def fn(market):
+        if call_sleep(delay):  # interruptible — comme le backoff des clients
+            return {"trade": False, "side": "NO", "confidence": 0, "model": name}
+        return {"trade": trade, "side": side, "confidence": conf, "model": name}
+    return (name, fn)
+
+
+def test_concurrent_ensemble():
+    import time
+    from alpha_system.ai.concurrent_ensemble import ConcurrentEnsemble
+    # best : premier trade >= seuil -> sortie sans attendre le modèle lent
+    ens = ConcurrentEnsemble([_ensemble_model("fast", 0, True), _ensemble_model("slow", 2, True, conf=0.99)],
+                             config={"ENSEMBLE_EARLY_EXIT_CONFIDENCE": 0.8})
+    start = time.monotonic()
+    best = ens.evaluate({"market": "m", "price": 0.8})
+    assert best["model"] == "fast" and time.monotonic() - start < 1
+    assert ens.get_status()["early_exits"] == 1
+    ens.shutdown()
+    print("  [OK] concurrent_ensemble")
+
+
+def test_ensemble_quorum():
+    from alpha_system.ai.concurrent_ensemble import ConcurrentEnsemble
+    # quorum : 2 modèles d'accord
+    ens = ConcurrentEnsemble([_ensemble_model("a", 0, True, conf=0.7), _ensemble_model("b", 0.05, True, conf=0.8),
+                              _ensemble_model("c", 2, False)],
+                             config={"ENSEMBLE_POLICY": "quorum", "ENSEMBLE_QUORUM": 2})
+    assert ens.evaluate({"market": "m", "price": 0.8})["model"] == "b"
+    ens.shutdown()
+    print("  [OK] ensemble_quorum")
+
+
+def test_ensemble_model_deadline():
+    from alpha_system.ai.concurrent_ensemble import ConcurrentEnsemble
+    # deadline par modèle : retardataire ignoré
+    ens = ConcurrentEnsemble([_ensemble_model("ok", 0, True, conf=0.5), _ensemble_model("late", 2, True)],
+                             config={"ENSEMBLE_MODEL_DEADLINES": {"late": 0.1}})
+    assert ens.evaluate({"market": "m", "price": 0.8})["model"] == "ok"
+    assert ens.get_status()["timeouts"]["late"] == 1
+    ens.shutdown()
+    print("  [OK] ensemble_model_deadline")
+
+
+def test_http_pool():
+    import threading
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+    from alpha_system.core.http_pool import SessionPool
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            body = b'{"ok": true}'
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/api/chat"
+    try:
+        pool = SessionPool({"HTTP_CONNECT_TIMEOUT": 2, "HTTP_READ_TIMEOUT": 5})
+        assert pool.timeout(1) == (1, 1) and pool.timeout() == (2, 5)
+        for _ in range(5):
+            assert pool.post(url, json={}).json() == {"ok": True}
+        stats = pool.get_stats(url)
+        assert stats["requests"] == 5 and stats["connections"] == 1
+        assert stats["reuse_rate"] == 80.0
+        pool.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+    print("  [OK] http_pool")
+
+
+def test_ai_cache():
+    from alpha_system.config import CONFIG
+    from alpha_system.memory.ai_cache import AIDecisionCache
+    from alpha_system.ai.secure_ai_client import SecureAIClient, PROMPT_VERSION
+    cache = AIDecisionCache(_tmp_path("ai_cache.db"), {"AI_CACHE_MAX_ENTRIES": 2})
+    market = {"market": "m1", "price": 0.801, "volume": 5000}
+    result = {"trade": True, "side": "YES", "confidence": 0.9, "model": "x", "source": "ai"}
+    cache.put("x", PROMPT_VERSION, market, result)
+    # Même bucket prix -> hit, marqué cache
+    hit = cache.get("x", PROMPT_VERSION, dict(market, price=0.804))
+    assert hit["source"] == "cache" and hit["confidence"] == 0.9
+    assert cache.get("x", PROMPT_VERSION, dict(market, price=0.85)) is None
+    assert cache.get("other", PROMPT_VERSION, market) is None
+    assert cache.get_status()["hit_rate"]["x"] == 50.0
+    # Client : cache consulté avant tout appel réseau
+    client = SecureAIClient(CONFIG, cache=cache)
+    assert client.evaluate(market, "x")["source"] == "cache"
+    assert client.total_calls == 0 and client.cache_hits == 1
+    cache.close()
+    print("  [OK] ai_cache")
+
+
+def test_ai_cache_warm_restart():
+    from alpha_system.memory.ai_cache import AIDecisionCache
+    from alpha_system.ai.secure_ai_client import PROMPT_VERSION
+    path = _tmp_path("ai_cache.db")
+    cache = AIDecisionCache(path, {"AI_CACHE_MAX_ENTRIES": 2})
+    market = {"market": "m1", "price": 0.801, "volume": 5000}
+    result = {"trade": True, "side": "YES", "confidence": 0.9, "model": "x", "source": "ai"}
+    # Borne LRU
+    for name in ("m1", "m2", "m3"):
+        cache.put("x", PROMPT_VERSION, dict(market, market=name), result)
+    assert len(cache) == 2 and cache.evicted == 1
+    cache.close()
+    # Redémarrage à chaud
+    warm = AIDecisionCache(path, {"AI_CACHE_MAX_ENTRIES": 2})
+    assert len(warm) == 2
+    assert warm.get("x", PROMPT_VERSION, dict(market, market="m3")) is not None
+    warm.ttl = -1
+    assert warm.get("x", PROMPT_VERSION, dict(market, market="m3")) is None
+    warm.close()
+    print("  [OK] ai_cache_warm_restart")
+
+
+def test_ai_cache_cold_start():
+    from alpha_system.config import CONFIG
+    from alpha_system.memory.ai_cache import AIDecisionCache
+    from alpha_system.ai.secure_ai_client import SecureAIClient
+    market = {"market": "m1", "price": 0.801, "volume": 5000}
+    # Démarrage à froid : cache vide rempli par le premier appel, hit au second
+    calls = []
+    server, url = _stub_ai_server(lambda prompt: calls.append(prompt) or '{"trade": true, "side": "YES", "confidence": 0.9}')
+    try:
+        cold = AIDecisionCache(_tmp_path("cold.db"), {})
+        client = SecureAIClient(dict(CONFIG, AI_STREAM=False), cache=cold)
+        client.url = url
+        assert client.evaluate(market, "x")["source"] == "ai" and len(cold) == 1
+        assert client.evaluate(market, "x")["source"] == "cache"
+        assert len(calls) == 1 and client.cache_hits == 1
+        cold.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+    print("  [OK] ai_cache_cold_start")
+
+
+# ============================================
+# STUBS PARTAGÉS (orchestrators sans réseau)
+# ============================================
+
+# Réponse IA "trade" type (le modèle appelé est ajouté par _StubAI)
+_TRADE = {"trade": True, "side": "YES", "confidence": 0.9, "source": "ai"}
+
+
+class _StubAI:
+    """Client IA stub : result (dict, ou None = pas de décision) après delay
+    secondes (call_sleep : interrompu par l'annulation de l'ensemble).
+    Compte les appels et leur concurrence maximale."""
+
+    def __init__(self, delay=0, result=None):
+        import threading
+
+        self.delay = delay
+        self.result = result
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def evaluate(self, market, model="x"):
+        from alpha_system.ai.concurrent_ensemble import call_sleep
+
+        with self.lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.delay:
+                call_sleep(self.delay)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+        return None if self.result is None else dict(self.result, model=model)
+
+    def get_benchmark(self):
+        return {"success_rate": 100, "avg_latency": self.delay}
+
+
+def _stub_ais(delay=0, result=None):
+    """Les 3 clients IA d'un orchestrator."""
+
+    return [_StubAI(delay, result) for _ in range(3)]
+
+
+class _StubReader:
+    """Reader stub : les mêmes marchés à chaque scan (dicts neufs, comme un vrai fetch)."""
+
+    def __init__(self, markets):
+        self.markets = markets
+
+    def get_markets(self):
+        return [dict(m) for m in self.markets]
+
+
+def _stub_markets(n, name="m", token="t"):
+    """n marchés liquides, prix décroissants à partir de 0.90."""
+
+    return [{"market": f"{name}{i}", "price": 0.9 - i * 0.01, "volume": 50000, "token_id": f"{token}{i}"}
+            for i in range(n)]
+
+
+def _stub_ai_server(respond):
+    """Serveur IA local (format /api/chat Ollama) — respond(prompt) -> content,
+    liste de (texte, délai) envoyée en NDJSON chunké (stream), ou code HTTP.
+    Un texte en bytes est envoyé tel quel (ligne NDJSON brute)."""
+    import json
+    import threading
+    import time
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            self.server.connections += 1     # connexions TCP ouvertes (keep-alive)
+
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            content = respond(payload["messages"][0]["content"])
+            if isinstance(content, list):
+                return self._stream(content)
+            if isinstance(content, int):
+                self.send_response(content)  # code d'erreur HTTP
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            body = json.dumps({"message": {"content": content}}).encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _stream(self, chunks):
+            self.send_response(200)
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            try:
+                for i, (text, delay) in enumerate(chunks):
+                    time.sleep(delay)
+                    if isinstance(text, bytes):
+                        line = text + b"\n"
+                    else:
+                        line = json.dumps({"message": {"content": text},
+                                           "done": i == len(chunks) - 1}).encode() + b"\n"
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+                    self.wfile.flush()
+                self.wfile.write(b"0\r\n\r\n")
+            except OSError:
+                pass  # client a fermé le stream
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.connections = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/api/chat"
+
+
+def _tmp_path(name):
+    """Chemin name dans un répertoire temporaire neuf : la DB d'un orchestrator,
+    ses backups/ et son snapshot restent hors de alpha_system/data."""
+    import tempfile
+
+    return os.path.join(tempfile.mkdtemp(), name)
+
+
+def _close(system):
+    """Arrêt d'un orchestrator de test (sans snapshot ni backup)."""
+
+    system.ensemble.shutdown()
+    system.db.close()
+
+
+def test_evaluate_batch():
+    import json
+    import re
+    from alpha_system.config import CONFIG
+    from alpha_system.ai.secure_ai_client import SecureAIClient
+
+    prompts = []
+
+    def respond(prompt):
+        prompts.append(prompt)
+        ids = [int(i) for i in re.findall(r"- id (\d+):", prompt)]
+        if not ids:
+            return '{"trade": true, "side": "NO", "confidence": 0.6}'
+        # id 1 absent, id 2 invalide -> appels unitaires
+        items = [{"id": i, "trade": True, "side": "YES", "confidence": 0.9} for i in ids if i != 1]
+        for item in items:
+            if item["id"] == 2:
+                item["confidence"] = 7
+        return "Here:\n" + json.dumps(items)
+
+    server, url = _stub_ai_server(respond)
+    try:
+        client = SecureAIClient(CONFIG, cache=False)
+        client.url = url
+        markets = [{"market": f"m{i}", "price": 0.8, "volume": 1000} for i in range(5)]
+        results = client.evaluate_batch(markets, "x")
+        assert len(results) == 5
+        assert [r["confidence"] for r in results] == [0.9, 0.6, 0.6, 0.9, 0.9]
+        assert all(r["source"] == "ai" for r in results)
+        assert len(prompts) == 3 and client.batch_misses == 2
+    finally:
+        server.shutdown()
+        server.server_close()
+    print("  [OK] evaluate_batch")
+
+
+def _batch_server(batches, singles):
+    """Serveur IA : tableau JSON pour un prompt batch (ids notés dans batches),
+    objet unique sinon (prompt noté dans singles)."""
+    import json
+    import re
+
+    def respond(prompt):
+        ids = [int(i) for i in re.findall(r"- id (\d+):", prompt)]
+        if not ids:
+            singles.append(prompt)
+            return '{"trade": true, "side": "YES", "confidence": 0.9}'
+        batches.append(ids)
+        return json.dumps([{"id": i, "trade": True, "side": "YES", "confidence": 0.9} for i in ids])
+
+    return _stub_ai_server(respond)
+
+
+def test_evaluate_batch_adaptive_size():
+    from alpha_system.config import CONFIG
+    from alpha_system.ai.secure_ai_client import SecureAIClient
+
+    server, url = _batch_server([], [])
+    try:
+        client = SecureAIClient(CONFIG, cache=False)
+        client.url = url
+        # Batch plein sous la latence cible -> taille augmentée
+        client.batch_size = 2
+        client.evaluate_batch([{"market": f"m{i}", "price": 0.8, "volume": 1000} for i in range(2)], "x")
+        assert client.batch_size == 3
+    finally:
+        server.shutdown()
+        server.server_close()
+    print("  [OK] evaluate_batch_adaptive_size")
+
+
+def test_alpha_batch_prefetch():
+    from alpha_system.config import CONFIG
+    from alpha_system.ai.secure_ai_client import SecureAIClient
+    from alpha_system.memory.ai_cache import AIDecisionCache
+    from alpha_system.orchestrator import AlphaOrchestrator
+
+    # Cycle Alpha concurrent : un batch par modèle, l'ensemble relit le cache
+    batches, singles = [], []
+    server, url = _batch_server(batches, singles)
+    try:
+        cache = AIDecisionCache(_tmp_path("batch_cache.db"), {})
+        clients = [SecureAIClient(dict(CONFIG, AI_STREAM=False), cache=cache) for _ in range(3)]
+        for client in clients:
+            client.url = url
+        system = AlphaOrchestrator(reader=_StubReader(_stub_markets(4, "b", "b")), ai_clients=clients,
+                                   db_path=_tmp_path("batch.db"))
+        system.cycle_mode, system.cycle_top_n = "concurrent", 4
+        assert system.cycle() == "EXECUTED"
+        assert len(batches) == 3 and all(len(ids) == 4 for ids in batches) and not singles
+        assert sum(client.cache_hits for client in clients) >= 4     # early exit possible
+        assert "prefetch" in system.cycle_stats["last"]
+        _close(system)
+    finally:
+        server.shutdown()
+        server.server_close()
+    print("  [OK] alpha_batch_prefetch")
+
+
+def test_stream_parser():
+    from alpha_system.ai.stream_parser import JSONObjectDetector
+
+    detector = JSONObjectDetector()
+    assert detector.feed('Sure: {"a": "x}"') == []
+    assert detector.feed(', "b": {"c": 1}} then {"d": 2}') == ['{"a": "x}", "b": {"c": 1}}', '{"d": 2}']
+    print("  [OK] stream_parser")
+
+
+def test_streaming_decision():
+    import time
+    from alpha_system.config import CONFIG
+    from alpha_system.ai.secure_ai_client import SecureAIClient
+
+    def respond(prompt):
+        return [('{"trade": true, ', 0), ('"side": "YES", "confidence": 0.8}', 0.05),
+                (" Explanation: the market is strongly priced...", 3)]
+
+    server, url = _stub_ai_server(respond)
+    try:
+        client = SecureAIClient(CONFIG, cache=False)
+        client.url = url
+        start = time.monotonic()
+        result = client.evaluate({"market": "m", "price": 0.8, "volume": 1000}, "x")
+        assert time.monotonic() - start < 2  # pas d'attente de la fin de génération
+        assert result["source"] == "ai" and result["confidence"] == 0.8
+        assert 0 < result["ttfd"] < 2
+        assert client.stream_early_closes == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+    print("  [OK] streaming_decision")
+
+
+def test_stream_drain_keep_alive():
+    import time
+    from alpha_system.config import CONFIG
+    from alpha_system.ai.secure_ai_client import SecureAIClient
+
+    # Fin de stream drainée en tâche de fond : la connexion keep-alive est réutilisée
+    def short(prompt):
+        return [('{"trade": true, "side": "YES", "confidence": 0.8}', 0), (" Because...", 0.1)]
+
+    server, url = _stub_ai_server(short)
+    try:
+        client = SecureAIClient(CONFIG, cache=False)
+        client.url = url
+        for i in range(2):
+            assert client.evaluate({"market": f"k{i}", "price": 0.8, "volume": 1000}, "x")["source"] == "ai"
+            deadline = time.monotonic() + 5
+            while client.stream_drained <= i and time.monotonic() < deadline:
+                time.sleep(0.01)
+        assert client.stream_drained == 2 and client.stream_discarded == 0
+        assert server.connections == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+    print("  [OK] stream_drain_keep_alive")
+
+
+def test_stream_bad_chunk():
+    from alpha_system.config import CONFIG
+    from alpha_system.ai.secure_ai_client import SecureAIClient
+    from alpha_system.protection.circuit_breaker import get_circuit_breaker
+
+    # Ligne NDJSON tronquée au milieu du stream : ignorée, la décision arrive quand même
+    def respond(prompt):
+        return [('{"trade": true, ', 0), (b'{"message": {"content": "trunc', 0),
+                ('"side": "YES", "confidence": 0.8}', 0)]
+
+    server, url = _stub_ai_server(respond)
+    try:
+        client = SecureAIClient(CONFIG, cache=False)
+        client.url = url
+        result = client.evaluate({"market": "m", "price": 0.8, "volume": 1000}, "bad-chunk")
+        assert result["source"] == "ai" and client.stream_bad_chunks == 1
+        # Un seul verdict breaker pour la tentative : un succès
+        status = get_circuit_breaker("ai:bad-chunk").get_status()
+        assert status["window"] == 1 and status["failure_rate"] == 0
+    finally:
+        server.shutdown()
+        server.server_close()
+    print("  [OK] stream_bad_chunk")
+
+
+# Routage adaptatif (opt-in) : un seul modèle après 3 appels de warmup
+_ROUTER_ADAPTIVE = {"ROUTER_POLICY": "adaptive", "ROUTER_MAX_MODELS": 1, "ROUTER_WARMUP": 3, "ROUTER_EXPLORE": 0}
+
+
+def test_model_router():
+    from alpha_system.ai.model_router import ModelRouter
+
+    router = ModelRouter(["fast", "slow", "broken"], _ROUTER_ADAPTIVE)
+    # Warmup : tous interrogés
+    assert router.select() == ["fast", "slow", "broken"]
+    for _ in range(3):
+        router.record("fast", 0.1, True)
+        router.record("slow", 2.0, True)
+        router.record("broken", 0.1, False)
+    # Le plus rapide et fiable seul, le modèle en échec écarté
+    assert router.select() == ["fast"]
+    assert router.get_status()["models"]["broken"]["skipped"] == 1
+    print("  [OK] model_router")
+
+
+def test_model_router_default_all():
+    from alpha_system.ai.model_router import ModelRouter
+
+    # Défaut "all" : aucun modèle écarté après warmup
+    router = ModelRouter(["fast", "broken"], {"ROUTER_WARMUP": 3})
+    for _ in range(3):
+        router.record("fast", 0.1, True)
+        router.record("broken", 0.1, False)
+    assert router.select() == ["fast", "broken"]
+    print("  [OK] model_router_default_all")
+
+
+def test_model_router_hedge():
+    import time
+    from alpha_system.ai.model_router import ModelRouter
+    from alpha_system.ai.concurrent_ensemble import ConcurrentEnsemble, call_sleep
+
+    # Hedge : primaire au-delà de son p95 -> secours, premier revenu gagne
+    def model(name, delay):
+        def fn(market):
+            call_sleep(delay)
+            return {"trade": True, "side": "YES", "confidence": 0.9, "model": name}
+        return (name, fn)
+
+    router = ModelRouter(["primary", "backup"], _ROUTER_ADAPTIVE)
+    for _ in range(3):
+        router.record("primary", 0.05, True)
+        router.record("backup", 0.5, True)
+    ens = ConcurrentEnsemble([model("primary", 2), model("backup", 0)], router=router)
+    start = time.monotonic()
+    best = ens.evaluate({"market": "m", "price": 0.8})
+    assert best["model"] == "backup" and time.monotonic() - start < 1
+    status = router.get_status()
+    assert status["hedges"] == 1 and status["models"]["backup"]["hedges_won"] == 1
+    # Latence du secours mesurée depuis sa soumission, pas depuis le début de l'ensemble
+    assert router.stats["backup"].latencies[-1] < router.stats["primary"].percentile(95)
+    ens.shutdown()
+    print("  [OK] model_router_hedge")
+
+
+def test_model_router_cache_hit():
+    from alpha_system.ai.model_router import ModelRouter
+    from alpha_system.ai.concurrent_ensemble import ConcurrentEnsemble
+
+    # Hit cache : aucune latence enregistrée pour le modèle
+    router = ModelRouter(["cached"], _ROUTER_ADAPTIVE)
+    ens = ConcurrentEnsemble([("cached", lambda m: {"trade": False, "model": "cached", "source": "cache"})],
+                             router=router)
+    ens.evaluate({"market": "m", "price": 0.8})
+    assert router.stats["cached"].samples == 0
+    ens.shutdown()
+    print("  [OK] model_router_cache_hit")
+
+
+def test_circuit_breaker():
+    import time
+    from alpha_system.protection.circuit_breaker import CircuitBreaker
+
+    cb = CircuitBreaker("t", {"CB_MIN_CALLS": 2, "CB_FAILURE_RATE": 0.5, "CB_COOLDOWN": 0.05})
+    assert cb.allow()
+    cb.record_success()
+    cb.record_failure()
+    assert cb.state == "closed"        # 50% = seuil, pas au-delà
+    cb.record_failure()
+    assert cb.state == "open" and not cb.allow()
+    time.sleep(0.06)
+    assert cb.allow() and cb.state == "half_open"
+    assert not cb.allow()              # une seule sonde
+    cb.record_success()
+    assert cb.state == "closed"
+    print("  [OK] circuit_breaker")
+
+
+def test_circuit_breaker_client():
+    import time
+    from alpha_system.config import CONFIG
+    from alpha_system.protection.circuit_breaker import get_circuit_breaker
+    from alpha_system.ai.secure_ai_client import SecureAIClient
+
+    hits = []
+    server, url = _stub_ai_server(lambda prompt: hits.append(1) or 500)
+    try:
+        breaker = get_circuit_breaker("ai:cb-model")
+        breaker.min_calls, breaker.cooldown = 2, 60
+        client = SecureAIClient(CONFIG, cache=False)
+        client.url = url
+        market = {"market": "m", "price": 0.8, "volume": 1000}
+        # Retries coupés dès l'ouverture du breaker
+        assert client.evaluate(market, "cb-model")["source"] == "fallback"
+        assert breaker.state == "open" and len(hits) == 2
+        # Breaker ouvert : fallback immédiat, aucun appel réseau
+        start = time.monotonic()
+        assert client.evaluate(market, "cb-model")["source"] == "fallback"
+        assert time.monotonic() - start < 0.1 and len(hits) == 2
+        assert client.breaker_rejected == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+    print("  [OK] circuit_breaker_client")
+
+
+def _local_ai_client(models):
+    """LocalAIServer (seed 7) démarré + SecureAIClient pointé dessus, sans cache."""
+    from alpha_system.config import CONFIG
+    from alpha_system.ai.local_ai_server import LocalAIServer
+    from alpha_system.ai.secure_ai_client import SecureAIClient
+
+    server = LocalAIServer(models, seed=7).start()
+    return server, SecureAIClient(dict(CONFIG, AI_API_URL=server.url), cache=False)
+
+
+def test_local_ai_server():
+    from alpha_system.ai.local_ai_server import LocalAIServer
+
+    server, client = _local_ai_client({"*": {"latency": 0.01}})
+    try:
+        market = {"market": "Will it rain?", "price": 0.85, "volume": 1000}
+        # Réponse déterministe par (seed, modèle, marché, prix)
+        first = client.evaluate(market, "steady")
+        assert first["source"] == "ai" and first["side"] == "YES" and first["trade"]
+        assert client.evaluate(market, "steady")["confidence"] == first["confidence"]
+        assert LocalAIServer(seed=7).decide("steady", "Will it rain?", 0.85)["confidence"] == first["confidence"]
+    finally:
+        server.stop()
+    print("  [OK] local_ai_server")
+
+
+def test_local_ai_server_batch():
+    import json
+    from alpha_system.ai.local_ai_server import LocalAIServer
+
+    # Prompt batch -> tableau JSON avec les ids
+    batch = json.loads(LocalAIServer(seed=7).answer("m", "- id 0: Market: a | Price: 0.2 | Volume: 1\n"
+                                                         "- id 1: Market: b | Price: 0.5 | Volume: 1"))
+    assert [(b["id"], b["side"], b["trade"]) for b in batch] == [(0, "NO", True), (1, "NO", False)]
+    print("  [OK] local_ai_server_batch")
+
+
+def test_local_ai_server_verbose_stream():
+    server, client = _local_ai_client({"chatty": {"verbose": " Explanation: " + "x" * 400, "latency": 2}})
+    try:
+        # Modèle verbeux en streaming : décision lue avant la fin de génération
+        market = {"market": "Will it rain?", "price": 0.85, "volume": 1000}
+        assert client.evaluate(market, "chatty")["source"] == "ai"
+        assert client.stream_early_closes == 1
+    finally:
+        server.stop()
+    print("  [OK] local_ai_server_verbose_stream")
+
+
+def test_local_ai_server_malformed():
+    server, client = _local_ai_client({"garbled": {"malformed_rate": 1}})
+    try:
+        # JSON tronqué à chaque appel -> retries puis fallback
+        market = {"market": "Will it rain?", "price": 0.85, "volume": 1000}
+        assert client.evaluate(market, "garbled")["source"] == "fallback"
+        assert server.get_status()["models"]["garbled"] == {"requests": 3, "errors": 0,
+                                                            "malformed": 3, "timeouts": 0}
+    finally:
+        server.stop()
+    print("  [OK] local_ai_server_malformed")
+
+
+# Prix couvrant les cas du scorer : 0.5 (aucun edge), bornes hautes / basses, 0.62 (sous le seuil)
+_SCORER_MARKETS = [{"market": f"m{i}", "price": p} for i, p in enumerate([0.5, 0.7, 0.9, 0.1, 0.98, 0.62])]
+
+
+def test_heuristic_scorer():
+    from alpha_system.config import CONFIG
+    from alpha_system.ai.heuristic_scorer import HeuristicScorer
+    from alpha_system.ai.profit_optimizer import ProfitOptimizer
+    from alpha_system.execution.cost_calculator import CostCalculator
+
+    scorer = HeuristicScorer(dict(CONFIG, HEURISTIC_CONFIDENCE_MARGIN=0.4))
+    scores = scorer.score(_SCORER_MARKETS, 1000, threshold=0.75)
+
+    assert list(scores["confidence"].round(2)) == [0.0, 0.4, 0.8, 0.8, 0.95, 0.24]
+    assert list(scores["side_yes"]) == [False, True, True, False, True, True]
+    # Borne < seuil : 0.5 et 0.62 jamais envoyés à l'IA
+    assert list(scores["rejected"]) == [True, False, False, False, False, True]
+
+    # expected_net identique au calcul unitaire ProfitOptimizer + CostCalculator
+    size = ProfitOptimizer().calculate_size(1000, 0.8)
+    net = CostCalculator(CONFIG).is_trade_worth_it(size, 0.9, 0.8)["expected_net"]
+    assert round(float(scores["expected_net"][2]), 4) == net
+    print("  [OK] heuristic_scorer")
+
+
+def test_heuristic_scorer_costs():
+    from alpha_system.config import CONFIG
+    from alpha_system.ai.heuristic_scorer import HeuristicScorer
+
+    # Coûts > gain même à la borne -> rejet cost
+    costly = HeuristicScorer(dict(CONFIG, TAKER_FEE=0.5))
+    assert costly.score(_SCORER_MARKETS, 1000, threshold=0.75)["reason"][2] == 2
+    print("  [OK] heuristic_scorer_costs")
+
+
+def test_heuristic_scorer_rank_admit():
+    from alpha_system.config import CONFIG
+    from alpha_system.ai.heuristic_scorer import HeuristicScorer
+
+    scorer = HeuristicScorer(dict(CONFIG, HEURISTIC_CONFIDENCE_MARGIN=0.4))
+    ranked = [m["market"] for m in scorer.rank(_SCORER_MARKETS, 1000, threshold=0.75)]
+    assert ranked == ["m4", "m2", "m3", "m1"]
+    assert scorer.admit({"price": 0.85}, 1000) and not scorer.admit({"price": 0.55}, 1000)
+    assert scorer.get_status()["rejected_confidence"] == 3        # 0.5 et 0.62 au rank, 0.55
+    print("  [OK] heuristic_scorer_rank_admit")
+
+
+def test_heuristic_scorer_default_margin():
+    from alpha_system.config import CONFIG
+    from alpha_system.ai.heuristic_scorer import HeuristicScorer
+
+    # Défaut (marge 1.0) : masque coûts seul, les prix proches de 0.5 rentables atteignent l'IA
+    default = HeuristicScorer(CONFIG)
+    scores = default.score(_SCORER_MARKETS, 1000, threshold=0.75)
+    assert list(scores["rejected"]) == [True, False, False, False, False, False]
+    assert scores["reason"][0] == 2 and default.get_status()["rejected_confidence"] == 0
+    print("  [OK] heuristic_scorer_default_margin")
+
+
+def test_confidence_calibration():
+    from alpha_system.config import CONFIG
+    from alpha_system.ai.confidence_manager import ConfidenceManager
+
+    cm = ConfidenceManager(dict(CONFIG, CALIBRATION_WINDOW=40, CALIBRATION_MIN_SAMPLES=20,
+                                CALIBRATION_PRIOR=0, CONFIDENCE_THRESHOLD=0.75))
+    decision = {"confidence": 0.85, "model": "overconfident"}
+    assert cm.validate(decision)[0]    # pas encore d'historique -> brute
+
+    # Modèle sur-confiant : 0.85 annoncé, 40% de gains réalisés
+    for i in range(100):
+        cm.record_outcome(0.85, i % 5 < 2, "overconfident")
+        cm.record_outcome(0.85, True, "sharp")
+    assert len(cm.outcomes) == 50      # fenêtres bornées
+    status = cm.get_status()["models"]["overconfident"]
+    assert status["samples"] == 40 and status["diagram"] == [(0.85, 40, 0.4)]
+    assert cm.calibrate(0.85, "overconfident") == 0.4
+    assert not cm.validate(decision)[0]
+    assert cm.validate({"confidence": 0.85, "model": "sharp"})[0]
+
+    # Isotonique : un bin bas "chanceux" ne dépasse pas le bin au-dessus
+    for i in range(40):
+        cm.record_outcome(0.65, True, "sharp")
+    assert cm.calibrate(0.65, "sharp") <= cm.calibrate(0.85, "sharp")
+    print("  [OK] confidence_calibration")
+
+
+def test_ws_message_guard():
+    import json
+    from alpha_system.websocket_orchestrator import WebSocketOrchestrator
+
+    system = WebSocketOrchestrator(ai_clients=_stub_ais(), db_path=_tmp_path("ws.db"))
+
+    # Volume invalide : update ignorée comme un prix invalide
+    assert system._parse_single({"market": "m", "price": "0.8", "volume": "n/a"}) is None
+    assert system._parse_single({"market": "m", "price": "0.8", "volume": "12"})["volume"] == 12.0
+
+    # Rien ne remonte au thread WebSocket : JSON invalide, clé non hashable
+    system.on_message(None, "{not json")
+    system.on_message(None, json.dumps({"market": "m", "price": 0.8, "token_id": ["a", "b"]}))
+    system.on_message(None, json.dumps([{"market": "ok", "price": 0.8, "volume": "bad"},
+                                        {"market": "ok", "price": 0.8, "volume": 5000, "token_id": "t"}]))
+    assert system.parse_errors == 2 and system.messages_received == 3
+    assert system.buffer.depth() == 1
+
+    _close(system)
+    print("  [OK] ws_message_guard")
+
+
+def test_ws_admit_reads_capital_under_lock():
+    import threading
+    from alpha_system.websocket_orchestrator import WebSocketOrchestrator
+
+    system = WebSocketOrchestrator(ai_clients=_stub_ais(), db_path=_tmp_path("ws_admit.db"))
+    market = {"market": "m", "price": 0.8, "volume": 50000, "token_id": "t"}
+
+    # Capital en cours de mise à jour (self.lock tenu) : l'admission attend
+    with system.lock:
+        worker = threading.Thread(target=system._admit, args=(("t", market),))
+        worker.start()
+        worker.join(0.2)
+        assert worker.is_alive()
+    worker.join(5)
+    assert not worker.is_alive()
+
+    _close(system)
+    print("  [OK] ws_admit_reads_capital_under_lock")
+
+
+class _SourceQueue:
+    """Source de Pipeline de test : FIFO + task_done(item) / unfinished()."""
+
+    def __init__(self, items=()):
+        import queue
+
+        self.queue = queue.Queue()
+        self.done = []
+        for item in items:
+            self.queue.put(item)
+
+    def get(self, timeout=None):
+        return self.queue.get(timeout=timeout)
+
+    def task_done(self, item):
+        self.done.append(item)
+        self.queue.task_done()
+
+    def qsize(self):
+        return self.queue.qsize()
+
+    def unfinished(self):
+        with self.queue.mutex:
+            return self.queue.unfinished_tasks
+
+
+def test_stage_queue_backpressure():
+    from alpha_system.core.pipeline import StageQueue
+
+    q = StageQueue(2, "drop_new")
+    assert q.put(1) and q.put(2) and not q.put(3) and q.dropped == 1
+    q = StageQueue(2, "drop_oldest")
+    for i in range(3):
+        q.put(i)
+    assert q.get(0) == 1 and q.dropped == 1
+    print("  [OK] stage_queue_backpressure")
+
+
+def test_pipeline():
+    from alpha_system.core.pipeline import Pipeline, Stage
+
+    # Inline : filtre (None) et erreur capturée
+    inline = Pipeline("t", [Stage("double", lambda x: x * 2), Stage("odd", lambda x: x if x % 4 else None)])
+    assert inline.run(1) == 2 and inline.run(2) is None
+    assert inline.get_status()["odd"]["filtered"] == 1
+    print("  [OK] pipeline")
+
+
+def test_pipeline_threaded_workers():
+    import threading
+    import time
+    from alpha_system.core.pipeline import Pipeline
+
+    # Threaded : 4 workers sur l'étape lente, source externe avec task_done
+    source, out = _SourceQueue(range(8)), []
+    lock = threading.Lock()
+    active = {"now": 0, "max": 0}
+
+    def slow(x):
+        with lock:
+            active["now"] += 1
+            active["max"] = max(active["max"], active["now"])
+        time.sleep(0.1)
+        with lock:
+            active["now"] -= 1
+        return x
+
+    pipe = Pipeline.from_settings("t", [("gate", lambda x: x), ("slow", slow), ("sink", out.append)],
+                                  {"slow": {"workers": 4, "queue": 2, "timeout": 5}}, source=source)
+    pipe.start()
+    assert pipe.wait_idle(timeout=5)
+    pipe.stop()
+    assert sorted(out) == list(range(8)) and sorted(source.done) == list(range(8))
+    assert 1 < active["max"] <= 4       # étape lente en parallèle, bornée par ses workers
+    status = pipe.get_status()["slow"]
+    assert status["processed"] == 8 and status["latency"]["count"] == 8
+    print("  [OK] pipeline_threaded_workers")
+
+
+def test_pipeline_one_worker_per_token():
+    import threading
+    import time
+    from alpha_system.core.pipeline import Pipeline
+    from alpha_system.market.coalescing_buffer import CoalescingBuffer
+
+    # task_done à la sortie du pipeline (pas de la 1re étape) : un seul worker par token
+    buffer = CoalescingBuffer()
+    lock = threading.Lock()
+    seen, busy, overlaps = [], set(), []
+
+    def decide(item):
+        key, market = item
+        with lock:
+            if key in busy:
+                overlaps.append(key)
+            busy.add(key)
+        time.sleep(0.02)
+        return item
+
+    def sink(item):
+        key, market = item
+        seen.append(market)
+        with lock:
+            busy.discard(key)
+
+    pipe = Pipeline.from_settings("t", [("gate", lambda x: x), ("decide", decide), ("sink", sink)],
+                                  {"gate": {"workers": 2}, "decide": {"workers": 4}}, source=buffer)
+    pipe.start()
+    for i in range(20):
+        buffer.update("tok", i)
+        time.sleep(0.005)
+    assert buffer.wait_idle(timeout=5) and pipe.wait_idle(timeout=5)
+    pipe.stop()
+    assert not overlaps and seen[-1] == 19
+    print("  [OK] pipeline_one_worker_per_token")
+
+
+def test_pipeline_releases_dropped():
+    import threading
+    import time
+    from alpha_system.core.pipeline import Pipeline
+
+    # Item rejeté par la file suivante (drop_new) : rendu à la source
+    source = _SourceQueue(range(6))
+    done = source.done
+    release = threading.Event()
+    pipe = Pipeline.from_settings("t", [("gate", lambda x: x), ("stuck", lambda x: release.wait(5) and None)],
+                                  {"stuck": {"queue": 1, "policy": "drop_new"}}, source=source)
+    pipe.start()
+    deadline = time.monotonic() + 5
+    while len(done) < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(done) >= 4             # rejetés libérés pendant que "stuck" bloque
+    release.set()
+    assert pipe.wait_idle(timeout=5)
+    pipe.stop()
+    status = pipe.get_status()["stuck"]
+    assert sorted(done) == list(range(6)) and status["dropped"] + status["processed"] == 6
+    print("  [OK] pipeline_releases_dropped")
+
+
+def test_pipeline_stage_timeout():
+    import time
+    from alpha_system.core.pipeline import Pipeline, Stage
+
+    # Timeout : résultat trop tardif abandonné
+    late = Pipeline("t", [Stage("late", lambda x: time.sleep(0.1) or x, timeout=0.01)])
+    assert late.run(1) is None and late.get_status()["late"]["timeouts"] == 1
+    print("  [OK] pipeline_stage_timeout")
+
+
+def test_pipeline_stage_deadline():
+    import time
+    from alpha_system.core.pipeline import Pipeline, Stage
+    from alpha_system.ai.concurrent_ensemble import call_cancelled, call_sleep
+
+    # Timeout d'étape = deadline de l'appel : un appel IA bloqué rend la main
+    slept = []
+
+    def hung(x):
+        cancelled = call_sleep(30)
+        slept.append(call_cancelled())
+        return None if cancelled else x
+
+    pipe = Pipeline("t", [Stage("ai", hung, timeout=0.1)])
+    start = time.monotonic()
+    assert pipe.run(1) is None
+    assert slept == [True] and time.monotonic() - start < 5
+    print("  [OK] pipeline_stage_deadline")
+
+
+def test_stage_deadline_bounds_ensemble():
+    import time
+    from alpha_system.core.pipeline import Stage
+    from alpha_system.ai.concurrent_ensemble import ConcurrentEnsemble, call_sleep
+
+    # Ensemble lancé sous la deadline d'étape : deadline globale bornée
+    ens = ConcurrentEnsemble([("m", lambda market: call_sleep(30) and None)], {"ENSEMBLE_DEADLINE": 30})
+    stage = Stage("ai", ens.evaluate, timeout=0.1)
+    start = time.monotonic()
+    assert stage.process({"market": "m", "price": 0.8}) is None
+    assert time.monotonic() - start < 5 and ens.timeouts["m"] == 1
+    ens.shutdown()
+    print("  [OK] stage_deadline_bounds_ensemble")
+
+
+def test_pipeline_wait_idle():
+    from alpha_system.core.pipeline import Pipeline, Stage
+    from alpha_system.ai.concurrent_ensemble import call_sleep
+
+    # wait_idle sur compteurs : un item soumis compte jusqu'à sa sortie
+    gate = Pipeline("t", [Stage("hold", lambda x: call_sleep(0.2) or x)])
+    gate.start()
+    assert gate.submit(1) and not gate.is_idle()
+    assert gate.wait_idle(timeout=5) and gate.active == 0
+    gate.stop()
+    print("  [OK] pipeline_wait_idle")
+
+
+def _decision_stages():
+    """AlphaOrchestrator stub + DecisionStages : exécution simulée notée dans executed,
+    admission de l'orchestrator limitée aux prix > 0.5."""
+    from alpha_system.core.decision_pipeline import DecisionStages
+    from alpha_system.orchestrator import AlphaOrchestrator
+
+    system = AlphaOrchestrator(reader=None, ai_clients=_stub_ais(), db_path=_tmp_path("stages.db"))
+    executed = []
+
+    def execute(decision):
+        executed.append(dict(decision))
+        return {"pnl": 1.0, "status": "SIMULATED"}
+
+    stages = DecisionStages(system, execute, admit=lambda m: m if m["price"] > 0.5 else None)
+    return system, stages, executed
+
+
+# Décision IA type, à passer aux étapes trade
+_DECISION = {"market": "m", "side": "YES", "price": 0.8, "confidence": 0.9, "model": "x", "source": "ai"}
+
+
+def test_decision_stages_gate():
+    system, stages, executed = _decision_stages()
+
+    # gate : admission de l'orchestrator puis santé / kill switch
+    assert stages.gate({"market": "low", "price": 0.2}) is None
+    market = {"market": "m", "price": 0.8, "volume": 50000, "token_id": "t"}
+    assert stages.gate(market) is market
+
+    _close(system)
+    print("  [OK] decision_stages_gate")
+
+
+def test_decision_stages_trade():
+    system, stages, executed = _decision_stages()
+
+    # trade + record : exécution, capital, compteurs
+    start = system.capital
+    assert stages.trade(dict(_DECISION)) == {"pnl": 1.0, "status": "SIMULATED"}
+    assert system.total_trades == 1 and system.capital == start + 1.0
+
+    _close(system)
+    print("  [OK] decision_stages_trade")
+
+
+def test_decision_stages_reread_capital():
+    import threading
+    system, stages, executed = _decision_stages()
+
+    # Capital relu sous trade_lock : un trade concurrent a pu le modifier pendant l'IA
+    stages.trade_lock.acquire()
+    blocked = threading.Thread(target=stages.trade, args=(dict(_DECISION),))
+    blocked.start()
+    with system.lock:
+        system.capital = 2000.0
+    stages.trade_lock.release()
+    blocked.join(5)
+    assert executed[-1]["size"] == system.optimizer.calculate_size(2000.0, 0.9)
+    assert system.total_trades == 1
+
+    _close(system)
+    print("  [OK] decision_stages_reread_capital")
+
+
+def test_decision_stages_kill_switch():
+    system, stages, executed = _decision_stages()
+
+    # Kill switch : drawdown au-delà du seuil -> gate refuse et arrête le système
+    with system.lock:
+        system.capital = 0.0
+    assert stages.gate({"market": "m", "price": 0.8, "volume": 50000, "token_id": "t"}) is None
+    assert not system.running and not system.kill_switch.active
+
+    _close(system)
+    print("  [OK] decision_stages_kill_switch")
+
+
+def test_alpha_concurrent_cycle():
+    from alpha_system.orchestrator import AlphaOrchestrator
+
+    ais = _stub_ais(delay=0.2, result=_TRADE)
+    system = AlphaOrchestrator(reader=_StubReader(_stub_markets(6)), ai_clients=ais, db_path=_tmp_path("cycle.db"))
+    assert system.cycle_mode == "sequential"           # concurrent : opt-in
+    system.cycle_mode, system.cycle_top_n, system.cycle_max_trades = "concurrent", 6, 2
+
+    assert system.cycle() == "EXECUTED"
+    assert max(ai.max_in_flight for ai in ais) > 1     # plusieurs marchés évalués en parallèle
+    stats = system.cycle_stats
+    assert stats["evaluated"] == 6 and stats["candidates"] == 6
+    assert stats["executed"] == 2 and system.total_trades == 2   # budget trades du cycle
+    assert set(stats["last"]) == {"scan", "rank", "evaluate", "trade", "total"}
+    _close(system)
+    print("  [OK] alpha_concurrent_cycle")
+
+
+def test_async_orchestrator():
+    import asyncio
+    import json
+    import websockets
+    from alpha_system.async_orchestrator import AsyncAlphaOrchestrator
+
+    async def feed(ws):
+        # Un tick au-dessus du take profit pour chaque souscription
+        async for message in ws:
+            await ws.send(json.dumps({"token_id": json.loads(message)["token_id"], "price": 0.70}))
+
+    async def scenario():
+        async with websockets.serve(feed, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+
+            db_path = _tmp_path("async.db")
+            system = AsyncAlphaOrchestrator(reader=_StubReader(_stub_markets(6)),
+                                            ai_clients=_stub_ais(delay=0.1, result=_TRADE), db_path=db_path)
+            system.ai_concurrency = 2
+            system.bot.cycle_top_n = 6
+            system.bot.monitor.websocket_url = f"ws://127.0.0.1:{port}"
+            system.bot.positions.open_position("held", "tok-held", "YES", 0.60, 5)
+
+            task = asyncio.create_task(system.run())
+            for _ in range(200):
+                await asyncio.sleep(0.05)
+                if system.cycles and system.bot.monitor.exits_triggered:
+                    break
+            system.stop()
+            await task
+            return system
+
+    system = asyncio.run(scenario())
+
+    assert system.cycles >= 1 and system.results.get("EXECUTED")
+    assert system.max_in_flight == 2                       # semaphore IA
+    assert system.bot.cycle_stats["evaluated"] >= 6
+    status = system.bot.monitor.get_status()
+    assert status["exits_triggered"] == 1                  # TP déclenché par le tick
+    assert system.bot.positions.closed_positions[0].exit_reason == "TAKE_PROFIT"
+    assert status["price_updates"] >= 1                    # sortie déclenchée par un tick WebSocket
+    print("  [OK] async_orchestrator")
+
+def _write_behind_db(name):
+    """DatabaseManager write-behind (fenêtre 5 s : rien commité avant flush)
+    avec 50 trades, 50 audits et 50 snapshots d'état en attente."""
+    from alpha_system.memory.database import DatabaseManager
+
+    db = DatabaseManager(_tmp_path(name), write_behind=True)
+    db.writer.flush_interval = 5
+    for i in range(50):
+        db.record_trade(f"m{i}", "YES", 0.6, 1, 0.1, 0.8)
+        db.log_audit("EXECUTED", f"trade {i}")
+        db.save_state(1000 + i, 1000, i, i + 1, i + 1, 0)
+    return db
+
+
+def test_write_behind_opt_in():
+    from alpha_system.config import CONFIG
+    from alpha_system.memory.database import DatabaseManager
+
+    assert CONFIG["PERSIST_WRITE_BEHIND"] is False          # write-behind : opt-in
+    db = DatabaseManager(_tmp_path("sync.db"))
+    assert db.writer is None
+    db.close()
+    print("  [OK] write_behind_opt_in")
+
+
+def test_persistence_writer():
+    import sqlite3
+    db = _write_behind_db("persist.db")
+
+    # Rien sur disque pendant la fenêtre de durabilité
+    other = sqlite3.connect(db.db_path)
+    assert other.execute("SELECT COUNT(*) FROM trades").fetchone()[0] == 0
+    other.close()
+
+    # Lecture cohérente : flush implicite, un seul lot
+    assert db.get_trade_count() == 50
+    assert db.load_state()["capital"] == 1049          # dernier snapshot
+    status = db.get_status()
+    assert status["batches"] == 1 and status["written"] == 101   # 50 trades + 50 audits + 1 état
+    assert status["coalesced"] == 49
+    db.close()
+    print("  [OK] persistence_writer")
+
+
+def test_database_reads_under_lock():
+    import threading
+    from alpha_system.memory.database import DatabaseManager
+
+    db = DatabaseManager(_tmp_path("lock.db"), write_behind=True)
+    # Lectures sous db.lock : attendent un commit en cours (connexion partagée)
+    read = threading.Event()
+    with db.lock:
+        reader = threading.Thread(target=lambda: db.get_stats() and read.set())
+        reader.start()
+        assert not read.wait(0.1)
+    reader.join(5)
+    assert read.is_set()
+    db.close()
+    print("  [OK] database_reads_under_lock")
+
+
+def test_persistence_writer_flush_on_close():
+    import sqlite3
+    db = _write_behind_db("close.db")
+
+    # Flush à la fermeture
+    db.record_trade("last", "NO", 0.4, 1, -0.1, 0.8)
+    db.close()
+    other = sqlite3.connect(db.db_path)
+    assert other.execute("SELECT COUNT(*) FROM trades").fetchone()[0] == 51
+    assert other.execute("SELECT COUNT(*) FROM audit_log").fetchone()[0] == 50
+    other.close()
+    print("  [OK] persistence_writer_flush_on_close")
+
+
+def test_persistence_writer_flood():
+    import sqlite3
+    import threading
+    from alpha_system.memory.persistence_writer import PersistenceWriter
+
+    conn = sqlite3.connect(":memory:", check_same_thread=False)
+    conn.execute("CREATE TABLE t (v INTEGER)")
+    writer = PersistenceWriter(conn, threading.RLock(), flush_interval=0, batch_max=5)
+
+    # Producteur plus rapide qu'un lot : chaque lot fait avancer le flush
+    stop = threading.Event()
+
+    def produce():
+        i = 0
+        while not stop.is_set():
+            writer.write("INSERT INTO t VALUES (?)", (i,))
+            writer.set_state("INSERT INTO t VALUES (?)", (-1,))
+            i += 1
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    try:
+        for _ in range(3):
+            assert writer.flush(5)
+    finally:
+        stop.set()
+        producer.join(5)
+    writer.stop()
+    assert writer.get_status()["pending"] == 0
+    print("  [OK] persistence_writer_flood")
+
+
+def _shard_test_worker(shard):
+    """Factory de shard (process enfant) : IA et exécution stub."""
+    import time
+    from alpha_system.config import CONFIG
+    from alpha_system.core.shard_pool import ShardWorker
+
+    def evaluate(market):
+        time.sleep(0.05)
+        return {"market": market["market"], "token_id": market["token_id"], "side": "YES",
+                "confidence": 0.9, "price": market["price"], "model": f"shard{shard}", "source": "ai"}
+
+    def execute(decision):
+        return {"pnl": 0.1, "status": "SIMULATED"}
+
+    return ShardWorker(shard, evaluate, execute, CONFIG)
+
+
+def _shard_crash_worker(shard):
+    """Factory de shard (process enfant) : le marché "crash" tue le process."""
+    from alpha_system.config import CONFIG
+    from alpha_system.core.shard_pool import ShardWorker
+
+    def evaluate(market):
+        if market["market"] == "crash":
+            os._exit(1)
+        return None
+
+    return ShardWorker(shard, evaluate, lambda decision: None, CONFIG)
+
+def test_risk_coordinator_sizing():
+    from alpha_system.core.shard_pool import RiskCoordinator
+    from alpha_system.ultra_fast_orchestrator import UltraFastOrchestrator
+
+    system = UltraFastOrchestrator(reader=None, ai_clients=_stub_ais(), db_path=_tmp_path("coord.db"))
+    coordinator = RiskCoordinator(system, stages=None)
+
+    def decision(name):
+        return {"market": name, "token_id": name, "side": "YES", "confidence": 0.9, "price": 0.6}
+
+    first = coordinator.reserve(decision("a"))
+    second = coordinator.reserve(decision("b"))
+    assert first["granted"] and second["granted"]
+    # Seconde réservation dimensionnée sur le capital restant, pas sur le capital total
+    available = system.capital - first["decision"]["size"]
+    assert second["decision"]["size"] == system.optimizer.calculate_size(available, 0.9)
+    assert second["decision"]["size"] <= first["decision"]["size"]
+
+    for reply in (first, second):
+        coordinator.release(reply["reservation"], None)
+    assert coordinator.reserved == 0 and not system.risk.positions
+    _close(system)
+    print("  [OK] risk_coordinator_sizing")
+
+
+# 8 marchés liquides répartis sur les shards par token_id
+_SHARD_MARKETS = [{"market": f"m{i}", "price": 0.8, "volume": 50000, "token_id": f"tok{i}"} for i in range(8)]
+
+
+def _run_shards(system, workers, markets):
+    """Pool de workers shards (_shard_test_worker) : markets soumis, attente idle,
+    arrêt. Retourne le get_status() du pool avant arrêt."""
+    from alpha_system.config import CONFIG
+    from alpha_system.core.shard_pool import ShardedDecisionPool
+
+    pool = ShardedDecisionPool(system, "ultra", dict(CONFIG, SHARD_WORKERS=workers), factory=_shard_test_worker)
+    pool.start()
+    try:
+        for market in markets:
+            assert pool.submit(market)
+        assert pool.wait_idle(timeout=60)
+        return pool.get_status()
+    finally:
+        pool.stop()
+
+
+def test_shard_pool():
+    from alpha_system.config import CONFIG
+    from alpha_system.core.shard_pool import shard_of
+    from alpha_system.ultra_fast_orchestrator import UltraFastOrchestrator
+
+    system = UltraFastOrchestrator(reader=None, ai_clients=_stub_ais(), db_path=_tmp_path("shards.db"))
+    assert shard_of("tok3", 2) == shard_of("tok3", 2)          # routage stable
+    status = _run_shards(system, 2, _SHARD_MARKETS)
+
+    shards = status["shards"]
+    assert sum(s["processed"] for s in shards.values()) == 8
+    for shard, st in shards.items():
+        assert st["dispatched"] == sum(1 for m in _SHARD_MARKETS if shard_of(m["token_id"], 2) == shard)
+
+    # Limite horaire RiskEngineV2 tenue globalement malgré 2 shards concurrents
+    assert system.total_trades == CONFIG["MAX_TRADES_PER_HOUR"]
+    coordinator = status["coordinator"]
+    assert coordinator["granted"] == system.total_trades and coordinator["denied"] == 8 - system.total_trades
+    assert coordinator["outstanding"] == 0 and not system.risk.positions
+    assert shards[0]["reserve"]["count"] + shards[1]["reserve"]["count"] == 8
+    _close(system)
+    print("  [OK] shard_pool")
+
+
+def test_shard_pool_coordinator_error():
+    from alpha_system.ultra_fast_orchestrator import UltraFastOrchestrator
+
+    system = UltraFastOrchestrator(reader=None, ai_clients=_stub_ais(), db_path=_tmp_path("shards.db"))
+
+    # Coordinateur qui lève : refus renvoyé au shard, aucun item bloqué
+    def broken(*args, **kwargs):
+        raise RuntimeError("risk engine down")
+
+    system.risk.validate_trade = broken
+    status = _run_shards(system, 2, _SHARD_MARKETS)
+
+    assert status["pending"] == 0
+    assert status["coordinator"]["denied"] == 8 and status["coordinator"]["outstanding"] == 0
+    assert sum(s["processed"] for s in status["shards"].values()) == 8
+    _close(system)
+    print("  [OK] shard_pool_coordinator_error")
+
+
+def test_shard_pool_restart():
+    from alpha_system.config import CONFIG
+    from alpha_system.core.shard_pool import ShardedDecisionPool
+    from alpha_system.ultra_fast_orchestrator import UltraFastOrchestrator
+
+    system = UltraFastOrchestrator(reader=None, ai_clients=_stub_ais(), db_path=_tmp_path("shards.db"))
+
+    # Shard mort : items en cours rendus, process relancé, marchés suivants traités
+    pool = ShardedDecisionPool(system, "ultra", dict(CONFIG, SHARD_WORKERS=1), factory=_shard_crash_worker)
+    pool.start()
+    assert pool.submit({"market": "crash", "price": 0.8, "volume": 50000, "token_id": "crash"})
+    assert pool.wait_idle(timeout=60)
+    assert pool.submit(_SHARD_MARKETS[0])
+    assert pool.wait_idle(timeout=60)
+    status = pool.get_status()
+    pool.stop()
+
+    assert status["restarts"] == 1 and status["pending"] == 0
+    assert status["shards"][0]["processed"] == 1 and status["shards"][0]["errors"] == 1
+    _close(system)
+    print("  [OK] shard_pool_restart")
+
+
+def test_tracer_sampling():
+    from alpha_system.core.tracer import Tracer
+
+    # Échantillonnage : 0 -> aucune trace
+    assert Tracer({"TRACE_SAMPLE_RATE": 0}).begin({"market": "m"}) is None
+
+    # Ring borné : seules les dernières traces terminées sont gardées
+    tracer = Tracer({"TRACE_SAMPLE_RATE": 1.0, "TRACE_RING_SIZE": 2})
+    for i in range(3):
+        market = {"market": f"m{i}"}
+        tracer.begin(market)
+        tracer.finish(market, "filtered")
+    assert len(tracer.recent(10)) == 2 and tracer.get_status()["finished"] == 3
+    tracer.close()
+    print("  [OK] tracer_sampling")
+
+
+def test_tracer():
+    from alpha_system.core.tracer import Tracer
+
+    tracer = Tracer({"TRACE_SAMPLE_RATE": 1.0})
+    # Rescan du même marché : nouvelle trace, celle en cours de décision intacte
+    inflight, rescan = {"market": "x"}, {"market": "x"}
+    tracer.begin(inflight)
+    tracer.begin(rescan)
+    tracer.finish(rescan, "filtered")
+    decision = tracer.link(inflight, {"market": "x", "side": "YES"})
+    with tracer.span(decision, "confidence"):
+        pass
+    tracer.finish(decision, "executed")
+    assert tracer.get_status()["outcomes"] == {"filtered": 1, "executed": 1}
+    assert [span["name"] for span in tracer.recent(1)[0]["spans"]] == ["confidence"]
+    tracer.close()
+    print("  [OK] tracer")
+
+
+def test_tracer_stage_abort():
+    from alpha_system.core.pipeline import Stage
+    from alpha_system.core.tracer import Tracer
+
+    tracer = Tracer({"TRACE_SAMPLE_RATE": 1.0})
+
+    # Erreur d'étape : trace fermée par on_abort
+    def boom(item):
+        raise RuntimeError("boom")
+
+    failed = {"market": "y"}
+    tracer.begin(failed)
+    assert Stage("ai", boom, on_abort=tracer.finish).process(failed) is None
+    assert tracer.get_status()["outcomes"]["ai_error"] == 1 and not tracer.get_status()["active"]
+    tracer.close()
+    print("  [OK] tracer_stage_abort")
+
+
+def test_tracer_alpha_cycle():
+    import json
+    import alpha_system.core.tracer as tracer_module
+    from alpha_system.core.tracer import Tracer, format_trace_status
+    from alpha_system.orchestrator import AlphaOrchestrator
+
+    path = _tmp_path("traces.jsonl")
+    tracer = Tracer({"TRACE_SAMPLE_RATE": 1.0, "TRACE_RING_SIZE": 5, "TRACE_FILE": path})
+
+    previous = tracer_module._tracer_instance
+    tracer_module._tracer_instance = tracer
+    try:
+        system = AlphaOrchestrator(reader=_StubReader(_stub_markets(4)), ai_clients=_stub_ais(result=_TRADE),
+                                   db_path=_tmp_path("trace.db"))
+        system.cycle_mode, system.cycle_top_n, system.cycle_max_trades = "concurrent", 4, 1
+        assert system.cycle() == "EXECUTED"
+        _close(system)
+    finally:
+        tracer_module._tracer_instance = previous
+    tracer.close()
+
+    status = tracer.get_status()
+    assert status["outcomes"]["executed"] == 1 and status["outcomes"]["cycle_limit"] == 3
+    assert status["active"] == 0
+
+    executed = next(t for t in tracer.recent(10) if t["outcome"] == "executed")
+    names = [span["name"] for span in executed["spans"]]
+    assert any(name.startswith("model:") for name in names)
+    for name in ("scan", "filter", "confidence", "cost", "risk", "execute", "submit", "persist"):
+        assert name in names, name
+    assert all(span["start_ms"] >= 0 and span["duration_ms"] >= 0 for span in executed["spans"])
+
+    lines = [json.loads(line) for line in open(path)]
+    assert len(lines) == status["finished"] == 4
+    assert "p99" in format_trace_status(tracer)[1]
+    print("  [OK] tracer_alpha_cycle")
+
+
+def test_cooldown_restore():
+    from alpha_system.config import CONFIG
+    from alpha_system.market.cooldown_service import CooldownService
+
+    # Cooldowns : restant décompté de l'arrêt, échus étalés sur le spread
+    cd = CooldownService(base_cooldown=300, config=CONFIG)
+    cd.acquire("a", 0.5, now=1000.0)
+    cd.acquire("b", 0.5, now=1200.0)
+    restored = CooldownService(base_cooldown=300, config=CONFIG)
+    restored.restore_state(cd.export_state(now=1250.0), elapsed=100, spread=10, now=50.0)
+    assert restored.is_cooling("b", now=50.0 + 149) and not restored.is_cooling("b", now=50.0 + 151)
+    assert not restored.is_cooling("a", now=50.0 + 10.01)       # échu pendant l'arrêt
+    assert not restored.acquire("b", 0.5, now=50.0 + 100)       # recalibration cohérente
+    print("  [OK] cooldown_restore")
+
+
+def test_warm_start():
+    from alpha_system.config import CONFIG
+    from alpha_system.orchestrator import AlphaOrchestrator
+
+    db_path = _tmp_path("warm.db")
+    system = AlphaOrchestrator(ai_clients=_stub_ais(), db_path=db_path)
+    system.positions.open_position("m1", "t1", "YES", 0.5, 10, confidence=0.8, model="glm-5")
+    system.positions.update_price("m1", 0.53)
+    system.risk.record_trade(-1)
+    system.risk.record_trade(-1)
+    system.scanner.record_error()
+    for i in range(40):
+        system.confidence.record_outcome(0.85, i % 2 == 0, model="glm-5")
+    calibrated = system.confidence.calibrate(0.85, "glm-5")
+    system.shutdown()                                          # snapshot à l'arrêt
+
+    path = system.snapshot.path
+    assert os.path.exists(path) and not os.path.exists(path + ".tmp")
+
+    # Redémarrage : état runtime repris
+    warm = AlphaOrchestrator(ai_clients=_stub_ais(), db_path=db_path)
+    position = warm.positions.get_position("m1")
+    assert position is not None and position.highest_price == 0.53 and position.model == "glm-5"
+    assert "m1" in warm.risk.positions
+    assert warm.risk.loss_streak == 2 and warm.risk.daily_trades == 2 and warm.risk.hourly_trades == 2
+    assert warm.scanner.get_interval() == CONFIG["SCAN_INTERVAL"] * 2
+    assert warm.confidence.calibrate(0.85, "glm-5") == calibrated
+    assert warm.snapshot.get_status()["restored"]["positions"] == 1
+    _close(warm)
+    print("  [OK] warm_start")
+
+
+def test_warm_start_stale_snapshot():
+    import json
+    from alpha_system.config import CONFIG
+    from alpha_system.market.adaptive_scanner import AdaptiveScanner
+    from alpha_system.memory.warm_start import WarmStartSnapshot
+
+    class Stub:
+        pass
+
+    stub = Stub()
+    stub.scanner = AdaptiveScanner(config=CONFIG)
+    stub.scanner.record_error()
+    path = _tmp_path("warm.snapshot.json")
+    WarmStartSnapshot(CONFIG, path=path).save(stub)
+
+    # Snapshot trop vieux : cooldowns / scanner ignorés ; autre mode : ignoré
+    with open(path) as f:
+        snapshot = json.load(f)
+    snapshot["saved_at"] -= CONFIG["SNAPSHOT_MAX_AGE"] + 1
+    with open(path, "w") as f:
+        json.dump(snapshot, f)
+
+    stub.scanner = AdaptiveScanner(config=CONFIG)
+    assert "scanner" not in WarmStartSnapshot(CONFIG, path=path).restore(stub)
+    assert WarmStartSnapshot(dict(CONFIG, MODE="LIVE"), path=path).load() is None
+    print("  [OK] warm_start_stale_snapshot")
+
+
+# Marchés de priorité croissante pour PriorityMarketQueue (volume, prix)
+_LOW = {"market": "low", "price": 0.5, "volume": 10}
+_MID = {"market": "mid", "price": 0.2, "volume": 100000}
+_HIGH = {"market": "high", "price": 0.1, "volume": 500000}
+
+
+def _full_queue(policy):
+    """File de 2 pleine (high puis low) ; les évictions sont notées dans shed."""
+    from alpha_system.core.market_queue import PriorityMarketQueue
+
+    shed = []
+    mq = PriorityMarketQueue(2, {"QUEUE_SHED_POLICY": policy}, on_evict=lambda m, r: shed.append((m["market"], r)))
+    mq.put(_HIGH)
+    mq.put(_LOW)
+    return mq, shed
+
+
+def test_queue_shed_evict():
+    # drop_oldest : "high" (le plus ancien) éjecté
+    mq, shed = _full_queue("drop_oldest")
+    assert mq.put(_MID) and shed == [("high", "shed")]
+
+    # drop_lowest : "low" éjecté pour "mid"
+    mq, shed = _full_queue("drop_lowest")
+    assert mq.put(_MID) and shed == [("low", "shed")]
+
+    assert mq.check_overload()                  # délestage depuis le dernier check
+    print("  [OK] queue_shed_evict")
+
+
+def test_queue_shed_reject():
+    # drop_newest : toute arrivée rejetée, même une mise à jour
+    mq, shed = _full_queue("drop_newest")
+    assert not mq.put(_MID) and not mq.put(dict(_LOW, price=0.4))
+    assert mq.get_status()["rejected"] == 2 and mq.replaced == 0
+
+    # coalesce : mises à jour acceptées, nouveaux marchés rejetés
+    mq, shed = _full_queue("coalesce")
+    assert mq.put(dict(_LOW, price=0.4)) and not mq.put(_MID)
+    assert mq.replaced == 1 and mq.dropped == 1 and shed == [("low", "superseded")]
+    print("  [OK] queue_shed_reject")
+
+
+def test_queue_overload_hysteresis():
+    from alpha_system.core.market_queue import PriorityMarketQueue
+
+    # Surcharge avec hystérésis : entrée à 3/4 (high), sortie à 1/4 (low)
+    mq = PriorityMarketQueue(4, {"QUEUE_OVERLOAD_HIGH": 0.75, "QUEUE_OVERLOAD_LOW": 0.25})
+    for market in (_LOW, _HIGH):
+        mq.put(market)
+    assert not mq.check_overload()
+    mq.put(_MID)
+    assert mq.check_overload()
+    mq.get(timeout=0)
+    assert mq.check_overload()                  # 2/4 : toujours en surcharge
+    mq.get(timeout=0)
+    assert not mq.check_overload() and mq.get_status()["overload_events"] == 1
+    print("  [OK] queue_overload_hysteresis")
+
+
+def test_scanner_overload_stretch():
+    from alpha_system.config import CONFIG
+    from alpha_system.market.adaptive_scanner import AdaptiveScanner
+
+    # Scanner : intervalle étiré en surcharge, retour progressif
+    sc = AdaptiveScanner(config=CONFIG)
+    sc.report_overload(True)
+    sc.report_overload(True)
+    assert sc.stretch(0.05) == 0.2 and sc.get_interval() == CONFIG["SCAN_INTERVAL"] * 4
+    sc.report_overload(False)
+    assert sc.overload_factor == 2 and sc.get_status()["overload_count"] == 1
+    print("  [OK] scanner_overload_stretch")
+
+
+def test_ultra_shed_release():
+    from alpha_system.ultra_fast_orchestrator import UltraFastOrchestrator
+
+    # Ultra : un marché délesté n'est ni en cooldown ni marqué évalué par le delta
+    system = UltraFastOrchestrator(reader=None, ai_clients=_stub_ais(), db_path=_tmp_path("admission.db"))
+    market = {"market": "m1", "token_id": "t1", "price": 0.6, "volume": 50000}
+    assert system.delta.evaluate(market) and system.filter.evaluate(market)
+    system._on_shed(market, "stale")
+    system._release_shed()
+    assert system.delta.evaluate(market) and system.filter.evaluate(market)
+    _close(system)
+    print("  [OK] ultra_shed_release")
+
+
 def run_all():
 
     print("=" * 50)
@@ -238,6 +2154,7 @@ def run_all():
     tests = [
         test_config,
         test_database,
+        test_database_backup_dir,
         test_risk_engine,
         test_confidence_manager,
         test_cost_calculator,
@@ -250,6 +2167,87 @@ def run_all():
         test_wallet_monitor,
         test_execution_guard,
         test_order_monitor,
+        test_market_delta,
+        test_market_delta_filtered,
+        test_rate_limiter,
+        test_scanner_rate_limit_status,
+        test_scanner_rate_limit_expiry,
+        test_session_recorder,
+        test_session_replayer,
+        test_run_replay,
+        test_market_normalizer,
+        test_market_filter_normalized,
+        test_timing_wheel,
+        test_cooldown_service,
+        test_market_queue,
+        test_coalescing_buffer,
+        test_concurrent_ensemble,
+        test_ensemble_quorum,
+        test_ensemble_model_deadline,
+        test_http_pool,
+        test_ai_cache,
+        test_ai_cache_warm_restart,
+        test_ai_cache_cold_start,
+        test_evaluate_batch,
+        test_evaluate_batch_adaptive_size,
+        test_alpha_batch_prefetch,
+        test_stream_parser,
+        test_streaming_decision,
+        test_stream_drain_keep_alive,
+        test_stream_bad_chunk,
+        test_model_router,
+        test_model_router_default_all,
+        test_model_router_hedge,
+        test_model_router_cache_hit,
+        test_circuit_breaker,
+        test_circuit_breaker_client,
+        test_local_ai_server,
+        test_local_ai_server_batch,
+        test_local_ai_server_verbose_stream,
+        test_local_ai_server_malformed,
+        test_heuristic_scorer,
+        test_heuristic_scorer_costs,
+        test_heuristic_scorer_rank_admit,
+        test_heuristic_scorer_default_margin,
+        test_confidence_calibration,
+        test_ws_message_guard,
+        test_ws_admit_reads_capital_under_lock,
+        test_stage_queue_backpressure,
+        test_pipeline,
+        test_pipeline_threaded_workers,
+        test_pipeline_one_worker_per_token,
+        test_pipeline_releases_dropped,
+        test_pipeline_stage_timeout,
+        test_pipeline_stage_deadline,
+        test_stage_deadline_bounds_ensemble,
+        test_pipeline_wait_idle,
+        test_decision_stages_gate,
+        test_decision_stages_trade,
+        test_decision_stages_reread_capital,
+        test_decision_stages_kill_switch,
+        test_alpha_concurrent_cycle,
+        test_async_orchestrator,
+        test_write_behind_opt_in,
+        test_persistence_writer,
+        test_database_reads_under_lock,
+        test_persistence_writer_flush_on_close,
+        test_persistence_writer_flood,
+        test_risk_coordinator_sizing,
+        test_shard_pool,
+        test_shard_pool_coordinator_error,
+        test_shard_pool_restart,
+        test_tracer_sampling,
+        test_tracer,
+        test_tracer_stage_abort,
+        test_tracer_alpha_cycle,
+        test_cooldown_restore,
+        test_warm_start,
+        test_warm_start_stale_snapshot,
+        test_queue_shed_evict,
+        test_queue_shed_reject,
+        test_queue_overload_hysteresis,
+        test_scanner_overload_stretch,
+        test_ultra_shed_release,
     ]
 
     passed = 0
@@ -1,31 +1,45 @@
 """
 Ultra Fast Orchestrator — Pipeline parallèle basse latence.
 
-Thread 1: Scanner continu Polymarket
-Thread 2: Decision engine (AI + Risk + Execution)
+Thread 1: Scanner continu Polymarket -> PriorityMarketQueue
+Pipeline: gate -> ai -> confidence -> trade (workers par étape, core/pipeline.py)
 Main:     Monitoring + Reports + Shutdown
 
 Latence cible: 50-150ms (hors appels IA)
 """
 
 import threading
-import queue
 import time
+from collections import deque
 from datetime import datetime, timezone
+from functools import partial
 
 from alpha_system.config import CONFIG
 from alpha_system.utils.logger import setup_logger
 from alpha_system.memory.database import DatabaseManager
+from alpha_system.memory.warm_start import WarmStartSnapshot
 from alpha_system.protection.error_handler import ErrorHandler
 from alpha_system.protection.kill_switch import KillSwitch
+from alpha_system.protection.circuit_breaker import get_breakers_status
 from alpha_system.market.polymarket_reader import PolymarketReader
 from alpha_system.market.adaptive_scanner import AdaptiveScanner
+from alpha_system.market.cooldown_service import CooldownService
+from alpha_system.market.market_delta import MarketDelta
+from alpha_system.core.market_queue import PriorityMarketQueue
 from alpha_system.ai.secure_ai_client import SecureAIClient
+from alpha_system.ai.concurrent_ensemble import ConcurrentEnsemble
+from alpha_system.ai.model_router import ModelRouter
+from alpha_system.core.http_pool import get_session_pool
+from alpha_system.core.decision_pipeline import build_decision_pipeline, format_pipeline_status
+from alpha_system.core.shard_pool import ShardedDecisionPool, format_shard_status
+from alpha_system.core.tracer import get_tracer, format_trace_status
 from alpha_system.ai.confidence_manager import ConfidenceManager
+from alpha_system.ai.heuristic_scorer import HeuristicScorer
 from alpha_system.ai.profit_optimizer import ProfitOptimizer
 from alpha_system.execution.execution_engine import ExecutionEngine
 from alpha_system.execution.cost_calculator import CostCalculator
 from alpha_system.risk.risk_engine_v2 import RiskEngineV2
+from alpha_system.replay.session_recorder import SessionRecorder
 
 
 # ============================================
@@ -50,8 +64,8 @@ class FastFilter:
         self.min_volume = 1000
         self.min_price = 0.05
         self.max_price = 0.95
-        self.recently_seen = {}
-        self.cooldown = 300  # 5 min avant de réévaluer un marché
+        self.cooldown = 300  # 5 min avant de réévaluer un marché (base adaptative)
+        self.cooldowns = CooldownService(base_cooldown=self.cooldown, config=CONFIG)
 
     def evaluate(self, market):
 
@@ -65,23 +79,12 @@ class FastFilter:
             return False
 
         # Dedup — skip si évalué récemment
-        market_name = market.get("market", "")
-        now = time.time()
-
-        if market_name in self.recently_seen:
-            if now - self.recently_seen[market_name] < self.cooldown:
-                return False
-
-        self.recently_seen[market_name] = now
-        return True
+        return self.cooldowns.acquire(market.get("market", ""), price)
 
     def cleanup(self):
-        """Purge les entrées expirées."""
+        """Purge les entrées expirées (timing wheel, O(expirées))."""
 
-        now = time.time()
-        expired = [k for k, v in self.recently_seen.items() if now - v > self.cooldown * 2]
-        for k in expired:
-            del self.recently_seen[k]
+        self.cooldowns.expire()
 
 
 # ============================================
@@ -91,7 +94,8 @@ class FastFilter:
 class UltraFastOrchestrator:
     """Orchestrator multi-thread basse latence."""
 
-    def __init__(self):
+    def __init__(self, reader=None, ai_clients=None, recorder=None, db_path=None):
+        """reader / ai_clients injectables (replay, tests). recorder enregistre la session."""
 
         print("\n" + "=" * 60)
         print("  ULTRA FAST TRADING BOT ALPHA")
@@ -105,20 +109,37 @@ class UltraFastOrchestrator:
         self.log.info("Initializing Ultra Fast System...")
 
         # Database
-        self.db = DatabaseManager(CONFIG["DB_PATH"])
+        self.db = DatabaseManager(db_path or CONFIG["DB_PATH"])
 
         # Error handler
         self.errors = ErrorHandler(logger=self.log, db=self.db)
 
+        # Session recorder (replay)
+        if recorder is None and CONFIG.get("RECORD_DIR"):
+            recorder = SessionRecorder(CONFIG["RECORD_DIR"])
+        self.recorder = recorder
+
         # Market
-        self.reader = PolymarketReader()
+        self.reader = reader or PolymarketReader(recorder=self.recorder)
         self.scanner = AdaptiveScanner(config=CONFIG)
         self.filter = FastFilter()
+        self.filter_lock = threading.Lock()     # scanner + snapshot
+        self.delta = MarketDelta(CONFIG)
 
         # AI ensemble
-        self.ai_clients = [SecureAIClient(CONFIG) for _ in range(len(AI_MODELS))]
+        self.ai_clients = ai_clients or [
+            SecureAIClient(CONFIG, recorder=self.recorder) for _ in range(len(AI_MODELS))
+        ]
+        self.router = ModelRouter(AI_MODELS, CONFIG, logger=self.log)
+        self.ensemble = ConcurrentEnsemble(
+            [(model, partial(client.evaluate, model=model))
+             for client, model in zip(self.ai_clients, AI_MODELS)],
+            config=CONFIG, errors=self.errors, router=self.router,
+        )
         self.confidence = ConfidenceManager(CONFIG)
         self.optimizer = ProfitOptimizer()
+        self.scorer = HeuristicScorer(CONFIG)
+        self.prescore = CONFIG.get("HEURISTIC_PRESCORE", True)
 
         # Execution
         self.execution = ExecutionEngine()
@@ -128,8 +149,27 @@ class UltraFastOrchestrator:
         self.risk = RiskEngineV2(CONFIG)
         self.kill_switch = KillSwitch()
 
-        # Queue
-        self.market_queue = queue.Queue(MAX_QUEUE_SIZE)
+        # Tracing par décision (échantillonné)
+        self.tracer = get_tracer()
+
+        # Queue (priorité score + fraîcheur, remplacement par marché)
+        self.market_queue = PriorityMarketQueue(MAX_QUEUE_SIZE, CONFIG, on_evict=self._on_shed)
+        self.shed_markets = deque()      # délestés, rendus au scanner (cooldown / delta)
+
+        # Pipeline décision — workers par étape, alimenté par la file à priorité
+        self.pipeline = build_decision_pipeline(
+            self, "ultra", CONFIG, execute=self.execution.execute,
+            admit=self._admit, source=self.market_queue,
+        )
+
+        # SHARD_WORKERS > 0 : ai + pré-risque en process, risque centralisé ici
+        # (clients IA construits dans chaque shard — ignoré si ai_clients injectés)
+        self.shard_pool = None
+        if CONFIG.get("SHARD_WORKERS", 0) > 0 and ai_clients is None:
+            self.shard_pool = ShardedDecisionPool(
+                self, "ultra", CONFIG, admit=self._admit, source=self.market_queue,
+            )
+        self.decisions = self.shard_pool or self.pipeline
 
         # State (thread-safe)
         self.lock = threading.Lock()
@@ -162,6 +202,10 @@ class UltraFastOrchestrator:
         else:
             self.log.info(f"Fresh start | Capital: {self.capital}")
 
+        # Warm start : cooldowns, confidence, risque, backoff, positions
+        self.snapshot = WarmStartSnapshot(CONFIG, db_path=self.db.db_path, logger=self.log)
+        self.snapshot.restore(self)
+
         self.log.info("Ultra Fast System initialized.")
 
     # ============================================
@@ -176,10 +220,18 @@ class UltraFastOrchestrator:
         while self.running:
 
             try:
+                # Rate limit serveur (429 / Retry-After) — attendre au lieu de marteler
+                rl_wait = self.scanner.get_rate_limit_wait()
+                if rl_wait > 0:
+                    time.sleep(min(rl_wait, 1))
+                    continue
+
                 start = time.time()
+                scan_start = time.monotonic()
 
                 markets = self.reader.get_markets()
                 self.scan_count += 1
+                scan_end = time.monotonic()
 
                 if not markets:
                     self.scanner.record_scan(0)
@@ -188,32 +240,56 @@ class UltraFastOrchestrator:
 
                 self.scanner.record_scan(len(markets))
 
-                # Sort by volume (best first)
-                markets.sort(key=lambda x: x.get("volume", 0), reverse=True)
+                # Delta — skip si rien n'a bougé depuis la dernière évaluation (état mémorisé ici)
+                candidates = [m for m in markets if self.delta.evaluate(m)]
+
+                # Pré-score NumPy — borne heuristique sous le seuil / les coûts : jamais envoyé à l'IA
+                if self.prescore:
+                    with self.lock:
+                        current_capital = self.capital
+                    candidates = self.scorer.rank(candidates, current_capital, self.confidence.get_threshold())
+
+                self._release_shed()
 
                 pushed = 0
-                for market in markets:
+                for market in candidates:
 
                     if not self.running:
                         break
 
-                    if self.filter.evaluate(market):
+                    if self.tracer.begin(market, scan_start):
+                        self.tracer.add(market, "scan", scan_start, scan_end)
+
+                    with self.filter_lock, self.tracer.span(market, "filter"):
+                        passed = self.filter.evaluate(market)
+
+                    if passed:
                         self.filter_passed += 1
 
-                        if not self.market_queue.full():
-                            self.market_queue.put_nowait(market)
+                        # Admission control : file pleine -> QUEUE_SHED_POLICY
+                        self.tracer.start_span(market, "queue")
+                        if self.market_queue.put_nowait(market):
                             pushed += 1
+                        else:
+                            self.shed_markets.append(market)
+                            self.tracer.finish(market, "shed")
                     else:
                         self.filter_rejected += 1
+                        self.tracer.finish(market, "filtered")
 
                 elapsed = round((time.time() - start) * 1000, 1)
                 self.log.debug(f"Scan #{self.scan_count}: {len(markets)} markets, {pushed} queued ({elapsed}ms)")
 
+                self._check_overload()
+
                 # Cleanup filter cache periodically
                 if self.scan_count % 100 == 0:
-                    self.filter.cleanup()
+                    with self.filter_lock:
+                        self.filter.cleanup()
+                    self.delta.cleanup()
 
-                time.sleep(SCAN_DELAY)
+                # Surcharge : scans espacés (AdaptiveScanner)
+                time.sleep(self.scanner.stretch(SCAN_DELAY))
 
             except Exception as e:
                 self.errors.handle(e, "scanner_loop")
@@ -221,138 +297,59 @@ class UltraFastOrchestrator:
                 time.sleep(1)
 
     # ============================================
-    # THREAD 2 — DECISION ENGINE
+    # ADMISSION CONTROL
     # ============================================
 
-    def decision_loop(self):
-        """Consume queue -> AI -> Risk -> Execute."""
-
-        self.log.info("Decision engine started")
-
-        while self.running:
-
-            try:
-                # Wait for market (timeout pour permettre shutdown)
-                try:
-                    market = self.market_queue.get(timeout=1)
-                except queue.Empty:
-                    continue
-
-                self.decisions_made += 1
-
-                # Error handler check
-                if not self.errors.is_system_healthy():
-                    self.log.critical("System unhealthy — skipping")
-                    continue
-
-                # Kill switch
-                with self.lock:
-                    current_capital = self.capital
-
-                if not self.kill_switch.validate(current_capital, self.starting_capital):
-                    self.log.critical(f"KILL SWITCH — capital: {current_capital}")
-                    self.db.log_audit("KILL_SWITCH", f"capital={current_capital}")
-                    self.running = False
-                    break
-
-                # AI evaluation (ensemble — fastest model wins)
-                decision = self._evaluate_market(market)
-
-                if decision is None:
-                    continue
+    def _on_shed(self, market, reason):
+        """Marché sorti de la file sans évaluation (éjecté / périmé / remplacé) — tout thread."""
 
-                # Confidence check
-                conf_ok, conf_reason = self.confidence.validate(decision)
-                if not conf_ok:
-                    continue
+        # Remplacé par sa mise à jour, toujours en file : seule sa trace se termine
+        if reason != "superseded":
+            self.shed_markets.append(market)
+        self.tracer.finish(market, reason)
 
-                # Calculate size
-                size = self.optimizer.calculate_size(current_capital, decision["confidence"])
-                decision["size"] = size
+    def _release_shed(self):
+        """Thread scanner : un marché délesté n'a pas été évalué — pas de cooldown,
+        et le delta le retransmet au prochain scan."""
 
-                # Cost check
-                cost_ok, cost_info = self.cost_calc.validate(decision)
-                if not cost_ok:
-                    continue
+        while self.shed_markets:
+            market = self.shed_markets.popleft()
+            with self.filter_lock:
+                self.filter.cooldowns.release(market.get("market", ""))
+            self.delta.forget(market)
 
-                # Risk check
-                risk_ok, risk_reason = self.risk.validate_trade(
-                    current_capital, size, decision["confidence"]
-                )
-                if not risk_ok:
-                    self.log.risk(f"Blocked: {risk_reason}")
-                    self.db.log_audit("RISK_BLOCKED", risk_reason)
-                    continue
+    def _check_overload(self):
+        """État de surcharge de la file -> intervalle de scan (AdaptiveScanner)."""
 
-                # EXECUTE
-                order = self.errors.safe_execute(
-                    self.execution.execute, decision,
-                    default=None, context="execution"
-                )
+        was_overloaded = self.scanner.overloaded
+        overloaded = self.market_queue.check_overload()
+        self.scanner.report_overload(overloaded)
 
-                if order is None:
-                    continue
+        if overloaded != was_overloaded:
+            q = self.market_queue.get_status()
+            if overloaded:
+                self.log.warning(f"Overload: queue {q['size']}/{q['maxsize']} shed:{q['dropped']} — scan delay x{self.scanner.overload_factor}")
+            else:
+                self.log.info(f"Overload cleared: queue {q['size']}/{q['maxsize']}")
 
-                pnl = order.get("pnl", 0)
+    # ============================================
+    # DECISION PIPELINE (gate -> ai -> confidence -> trade)
+    # ============================================
 
-                # Update state (thread-safe)
-                with self.lock:
-                    self.capital += pnl
-                    self.total_pnl += pnl
-                    self.total_trades += 1
+    def _admit(self, market):
+        """Entrée du pipeline — compte les marchés sortis de la file."""
 
-                    if pnl > 0:
-                        self.wins += 1
-                    else:
-                        self.losses += 1
-
-                self.risk.record_trade(pnl)
-                self.risk.update_capital(self.capital)
-                self.confidence.record_outcome(decision["confidence"], pnl > 0)
-
-                # DB record
-                self.db.record_trade(
-                    market=decision["market"],
-                    side=decision["side"],
-                    price=decision["price"],
-                    size=size,
-                    pnl=pnl,
-                    confidence=decision["confidence"],
-                    model=decision.get("model", ""),
-                    source=decision.get("source", "ai"),
-                    status=order.get("status", "SIMULATED"),
-                )
-
-                self._save_state()
-
-                self.log.trade(
-                    decision["market"], decision["side"],
-                    size, pnl, decision["confidence"]
-                )
-                self.log.info(f"PnL: {round(pnl, 2)} | Capital: {round(self.capital, 2)}")
-
-            except Exception as e:
-                self.errors.handle(e, "decision_loop")
+        self.decisions_made += 1
+        return market
 
     def _evaluate_market(self, market):
-        """Évalue un marché via l'ensemble IA."""
-
-        results = []
-        for client, model in zip(self.ai_clients, AI_MODELS):
-            result = self.errors.safe_execute(
-                client.evaluate, market, model,
-                default={"trade": False, "side": "NO", "confidence": 0},
-                context=f"ai_{model}"
-            )
-            results.append(result)
+        """Évalue un marché via l'ensemble IA (modèles en parallèle, early-exit)."""
 
-        trades = [r for r in results if r.get("trade", False)]
+        best = self.ensemble.evaluate(market)
 
-        if not trades:
+        if best is None:
             return None
 
-        best = max(trades, key=lambda x: x.get("confidence", 0))
-
         return {
             "market": market["market"],
             "token_id": market.get("token_id"),
@@ -402,13 +399,57 @@ class UltraFastOrchestrator:
         self.log.info(f"  Winrate: {winrate}%")
         self.log.info(f"  Drawdown: {drawdown}%")
         self.log.info(f"  Scans: {self.scan_count} | Filter: {self.filter_passed} passed, {self.filter_rejected} rejected")
-        self.log.info(f"  Queue: {self.market_queue.qsize()} pending")
+        q_status = self.market_queue.get_status()
+        self.log.info(f"  Queue: {q_status['size']}/{q_status['maxsize']} pending | policy:{q_status['policy']} admitted:{q_status['enqueued']} coalesced:{q_status['replaced']} shed:{q_status['dropped']} (rejected:{q_status['rejected']}) stale:{q_status['stale_evicted']}")
+        scan_status = self.scanner.get_status()
+        self.log.info(f"  Overload: {q_status['overloaded']} | events:{q_status['overload_events']} scan_factor:x{scan_status['overload_factor']}")
+
+        # Cooldown
+        cd_status = self.filter.cooldowns.get_status()
+        self.log.info(f"  Cooldown: {cd_status['size']} tracked | cooling:{cd_status['cooling']} shortened:{cd_status['shortened']} expired:{cd_status['expired']} evicted:{cd_status['evicted']} avg:{cd_status['avg_cooldown']}s")
+
+        # Delta
+        delta_status = self.delta.get_status()
+        skip_reasons = " ".join(f"{k}:{v}" for k, v in delta_status["skip_reasons"].items())
+        self.log.info(f"  Delta: {delta_status['forwarded']} forwarded, {delta_status['skipped']} skipped ({skip_reasons}) | tracked:{delta_status['tracked']}")
+
+        # Calibration confidence
+        cal_status = self.confidence.get_status()
+        calibration = " ".join(f"{m}:n={c['samples']},ece={c['ece']}" for m, c in cal_status["models"].items())
+        self.log.info(f"  Calibration: threshold {cal_status['threshold']} | {calibration}")
+
+        # Pré-score heuristique
+        ps_status = self.scorer.get_status()
+        self.log.info(f"  Prescore: {ps_status['scored']} scored, {ps_status['rejected']} rejected ({ps_status['reject_rate']}%) | confidence:{ps_status['rejected_confidence']} cost:{ps_status['rejected_cost']}")
+
+        lines = format_shard_status(self.shard_pool) if self.shard_pool else format_pipeline_status(self.pipeline)
+        for line in lines + format_trace_status(self.tracer):
+            self.log.info(line)
 
         # AI benchmark
         for client, model in zip(self.ai_clients, AI_MODELS):
             bench = client.get_benchmark()
             self.log.info(f"  AI [{model}]: {bench['success_rate']}% success, {bench['avg_latency']}s avg")
 
+        ai_cache = getattr(self.ai_clients[0], "cache", None)
+        if ai_cache is not None:
+            cache_status = ai_cache.get_status()
+            rates = " ".join(f"{m}:{r}%" for m, r in cache_status["hit_rate"].items())
+            self.log.info(f"  AI cache: {cache_status['size']} entries, {cache_status['hits']} hits | {rates}")
+
+        http_status = get_session_pool().get_stats()
+        self.log.info(f"  HTTP pool: {http_status['hosts']} hosts, {http_status['connections']} conns, {http_status['requests']} reqs, reuse:{http_status['reuse_rate']}%")
+
+        ens_status = self.ensemble.get_status()
+        self.log.info(f"  Ensemble [{ens_status['policy']}]: {ens_status['evaluations']} evals, early:{ens_status['early_exits']} cancelled:{ens_status['cancelled']} timeouts:{sum(ens_status['timeouts'].values())} avg:{ens_status['avg_latency']}s")
+
+        router_status = self.router.get_status()
+        for model, stats in router_status["models"].items():
+            self.log.info(f"  Router [{model}]: ewma:{stats['ewma_latency']}s p95:{stats['p95']}s success:{stats['success_rate']}% agree:{stats['agreement_rate']}% selected:{stats['selected']} skipped:{stats['skipped']} hedge_wins:{stats['hedges_won']}")
+
+        for name, cb in get_breakers_status("ai:").items():
+            self.log.info(f"  Breaker [{name[3:]}]: {cb['state']} fail:{cb['failure_rate']}% opened:{cb['times_opened']} rejected:{cb['rejected']} retry_in:{cb['retry_in']}s")
+
         # Risk
         risk_status = self.risk.get_status()
         self.log.info(f"  Risk: streak:{risk_status['loss_streak']} daily:{risk_status['daily_trades']} hourly:{risk_status['hourly_trades']}")
@@ -417,10 +458,23 @@ class UltraFastOrchestrator:
         scan_status = self.scanner.get_status()
         self.log.info(f"  Scanner: interval:{scan_status['interval']}s rate_limited:{scan_status['rate_limited']}")
 
+        # Rate limiter (partagé)
+        rl_status = self.scanner.limiter.get_status()
+        self.log.info(f"  RateLimiter: granted:{rl_status['total_granted']} denied:{rl_status['total_denied']} throttled:{rl_status['total_throttled']}")
+
         # Errors
         err_status = self.errors.get_status()
         self.log.info(f"  Errors: {err_status['total_errors']} total, {err_status['critical_errors']} critical")
 
+        # Persistence (write-behind)
+        db_status = self.db.get_status()
+        if db_status["write_behind"]:
+            self.log.info(f"  Persistence: pending:{db_status['pending']} batches:{db_status['batches']} written:{db_status['written']} avg_batch:{db_status['avg_batch']} coalesced:{db_status['coalesced']} failed:{db_status['failed']} max_lag:{db_status['max_lag_ms']}ms")
+
+        # Warm start snapshot
+        snap = self.snapshot.get_status()
+        self.log.info(f"  Snapshot: saves:{snap['saves']} failures:{snap['failures']} size:{snap['last_bytes']}B write:{snap['last_duration_ms']}ms | restored:{snap['restored']} age:{snap['restored_age']}s")
+
         self.log.info("=" * 50)
 
     # ============================================
@@ -438,14 +492,8 @@ class UltraFastOrchestrator:
             daemon=True
         )
 
-        decision_thread = threading.Thread(
-            target=self.decision_loop,
-            name="decision",
-            daemon=True
-        )
-
         scanner_thread.start()
-        decision_thread.start()
+        self.decisions.start()
 
         self.log.info("All threads running.")
         self.db.log_audit("SYSTEM_START", "Ultra Fast mode")
@@ -469,6 +517,9 @@ class UltraFastOrchestrator:
                     self.db.backup()
                     last_backup = now
 
+                # Snapshot warm start (SNAPSHOT_INTERVAL)
+                self.snapshot.maybe_save(self)
+
                 # Health check
                 if not self.errors.is_system_healthy():
                     self.log.critical("System unhealthy — shutting down")
@@ -485,12 +536,18 @@ class UltraFastOrchestrator:
         self.log.info("Shutting down Ultra Fast System...")
         self.running = False
         time.sleep(1)
+        self.decisions.stop()
+        self.ensemble.shutdown()
 
         self.report()
         self._save_state()
+        self.snapshot.save(self)
         self.db.backup()
         self.db.log_audit("SYSTEM_STOP", "Ultra Fast shutdown")
         self.db.close()
+
+        if self.recorder:
+            self.recorder.close()
         self.log.info("Shutdown complete.")
 
 
@@ -2,7 +2,10 @@
 WebSocket Orchestrator — Réception instantanée des prix Polymarket.
 
 Au lieu de scan HTTP (100-500ms), les updates arrivent en push (1-20ms).
-Pipeline: WebSocket -> FastFilter -> AI -> Risk -> Execute
+Pipeline: WebSocket -> CoalescingBuffer -> gate (FastFilter) -> ai -> confidence -> trade
+
+Le thread WebSocket ne fait que parser et déposer la dernière update
+par token : les appels IA bloquants tournent dans les workers de l'étape ai.
 
 Latence cible: 15-60ms
 """
@@ -12,18 +15,31 @@ import json
 import time
 import websocket
 from datetime import datetime, timezone
+from functools import partial
 
 from alpha_system.config import CONFIG
 from alpha_system.utils.logger import setup_logger
 from alpha_system.memory.database import DatabaseManager
+from alpha_system.memory.warm_start import WarmStartSnapshot
 from alpha_system.protection.error_handler import ErrorHandler
 from alpha_system.protection.kill_switch import KillSwitch
+from alpha_system.protection.circuit_breaker import get_breakers_status
+from alpha_system.market.cooldown_service import CooldownService
+from alpha_system.market.coalescing_buffer import CoalescingBuffer
 from alpha_system.ai.secure_ai_client import SecureAIClient
+from alpha_system.ai.concurrent_ensemble import ConcurrentEnsemble
+from alpha_system.ai.model_router import ModelRouter
+from alpha_system.core.http_pool import get_session_pool
+from alpha_system.core.decision_pipeline import build_decision_pipeline, format_pipeline_status
+from alpha_system.core.shard_pool import ShardedDecisionPool, build_worker, format_shard_status
+from alpha_system.core.tracer import get_tracer, format_trace_status
 from alpha_system.ai.confidence_manager import ConfidenceManager
+from alpha_system.ai.heuristic_scorer import HeuristicScorer
 from alpha_system.ai.profit_optimizer import ProfitOptimizer
 from alpha_system.execution.execution_engine import ExecutionEngine
 from alpha_system.execution.cost_calculator import CostCalculator
 from alpha_system.risk.risk_engine_v2 import RiskEngineV2
+from alpha_system.replay.session_recorder import SessionRecorder
 
 
 # ============================================
@@ -48,8 +64,8 @@ class FastFilter:
         self.min_volume = 1000
         self.min_price = 0.05
         self.max_price = 0.95
-        self.recently_seen = {}
-        self.cooldown = 60  # 60s entre réévaluations du même marché
+        self.cooldown = 60  # 60s entre réévaluations du même marché (base adaptative)
+        self.cooldowns = CooldownService(base_cooldown=self.cooldown, config=CONFIG)
 
     def evaluate(self, market):
 
@@ -62,21 +78,13 @@ class FastFilter:
         if price < self.min_price or price > self.max_price:
             return False
 
-        market_name = market.get("market", "")
-        now = time.time()
-
-        if market_name in self.recently_seen:
-            if now - self.recently_seen[market_name] < self.cooldown:
-                return False
-
-        self.recently_seen[market_name] = now
-        return True
+        # Dedup — cooldown adaptatif à la volatilité du marché
+        return self.cooldowns.acquire(market.get("market", ""), price)
 
     def cleanup(self):
-        now = time.time()
-        expired = [k for k, v in self.recently_seen.items() if now - v > self.cooldown * 2]
-        for k in expired:
-            del self.recently_seen[k]
+        """Purge les entrées expirées (timing wheel, O(expirées))."""
+
+        self.cooldowns.expire()
 
 
 # ============================================
@@ -86,7 +94,9 @@ class FastFilter:
 class WebSocketOrchestrator:
     """Orchestrator WebSocket — push-based, ultra basse latence."""
 
-    def __init__(self):
+    def __init__(self, ws_source=None, ai_clients=None, recorder=None, db_path=None):
+        """ws_source / ai_clients injectables (replay, tests).
+        ws_source : objet avec run(on_message) et close(), remplace la connexion live."""
 
         print("\n" + "=" * 60)
         print("  WEBSOCKET TRADING BOT ALPHA")
@@ -99,17 +109,36 @@ class WebSocketOrchestrator:
         self.log.info("Initializing WebSocket System...")
 
         # Database
-        self.db = DatabaseManager(CONFIG["DB_PATH"])
+        self.db = DatabaseManager(db_path or CONFIG["DB_PATH"])
 
         # Error handler
         self.errors = ErrorHandler(logger=self.log, db=self.db)
 
-        # Filter
+        # Session recorder (replay)
+        if recorder is None and CONFIG.get("RECORD_DIR"):
+            recorder = SessionRecorder(CONFIG["RECORD_DIR"])
+        self.recorder = recorder
+
+        # Filter (CooldownService non thread-safe — partagé par les workers)
         self.filter = FastFilter()
+        self.filter_lock = threading.Lock()
+
+        # Ingestion -> pipeline décision
+        self.buffer = CoalescingBuffer()
 
         # AI ensemble
-        self.ai_clients = [SecureAIClient(CONFIG) for _ in range(len(AI_MODELS))]
+        self.ai_clients = ai_clients or [
+            SecureAIClient(CONFIG, recorder=self.recorder) for _ in range(len(AI_MODELS))
+        ]
+        self.router = ModelRouter(AI_MODELS, CONFIG, logger=self.log)
+        self.ensemble = ConcurrentEnsemble(
+            [(model, partial(client.evaluate, model=model))
+             for client, model in zip(self.ai_clients, AI_MODELS)],
+            config=CONFIG, errors=self.errors, router=self.router,
+        )
         self.confidence = ConfidenceManager(CONFIG)
+        self.scorer = HeuristicScorer(CONFIG)
+        self.prescore = CONFIG.get("HEURISTIC_PRESCORE", True)
         self.optimizer = ProfitOptimizer()
 
         # Execution
@@ -120,6 +149,25 @@ class WebSocketOrchestrator:
         self.risk = RiskEngineV2(CONFIG)
         self.kill_switch = KillSwitch()
 
+        # Tracing par décision (échantillonné)
+        self.tracer = get_tracer()
+
+        # Pipeline décision — gate (filtre) -> ai -> confidence -> trade (sérialisé)
+        self.pipeline = build_decision_pipeline(
+            self, "ws", CONFIG, execute=self.execution.execute,
+            admit=self._admit, source=self.buffer,
+        )
+
+        # SHARD_WORKERS > 0 : ai + pré-risque en process, risque centralisé ici
+        # (clients IA construits dans chaque shard — ignoré si ai_clients injectés)
+        self.shard_pool = None
+        if CONFIG.get("SHARD_WORKERS", 0) > 0 and ai_clients is None:
+            self.shard_pool = ShardedDecisionPool(
+                self, "ws", CONFIG, factory=partial(build_worker, source="websocket"),
+                admit=self._admit, source=self.buffer,
+            )
+        self.decisions = self.shard_pool or self.pipeline
+
         # State (thread-safe)
         self.lock = threading.Lock()
         self.capital = CONFIG["STARTING_CAPITAL"]
@@ -131,12 +179,14 @@ class WebSocketOrchestrator:
 
         # Counters
         self.messages_received = 0
+        self.parse_errors = 0
         self.filter_passed = 0
         self.filter_rejected = 0
 
         # Control
         self.running = True
         self.ws = None
+        self.ws_source = ws_source
 
         # Restore state
         saved = self.db.load_state()
@@ -149,6 +199,10 @@ class WebSocketOrchestrator:
             self.losses = saved["losses"]
             self.log.info(f"State restored | Capital: {self.capital} | Trades: {self.total_trades}")
 
+        # Warm start : cooldowns, confidence, risque
+        self.snapshot = WarmStartSnapshot(CONFIG, db_path=self.db.db_path, logger=self.log)
+        self.snapshot.restore(self)
+
         self.log.info("WebSocket System initialized.")
 
     # ============================================
@@ -170,112 +224,79 @@ class WebSocketOrchestrator:
         self.log.info("Subscribed to market channel")
 
     def on_message(self, ws, message):
-        """Message reçu — pipeline instantané."""
+        """Message reçu — parse et coalescence uniquement (thread WebSocket).
+
+        Aucune exception ne remonte au thread WebSocket : un message
+        inexploitable est compté dans parse_errors et ignoré."""
 
+        received = time.monotonic()
         self.messages_received += 1
 
         try:
-            data = json.loads(message)
+            self._ingest(message, received)
+        except Exception as e:
+            self.parse_errors += 1
+            self.log.debug(f"WS message dropped: {e!r}")
 
-            # Extraire les données marché
-            market = self._parse_ws_message(data)
+    def _ingest(self, message, received):
 
-            if market is None:
-                return
+        if self.recorder:
+            self.recorder.record_ws(message)
 
-            # FAST FILTER (~1ms)
-            if not self.filter.evaluate(market):
-                self.filter_rejected += 1
-                return
+        markets = self._parse_ws_message(json.loads(message))
+        parsed = time.monotonic()
 
-            self.filter_passed += 1
+        for market in markets:
+            key = market.get("token_id") or market["market"]
 
-            # Vérifier santé système
-            if not self.errors.is_system_healthy():
-                return
+            if self.tracer.begin(market, received):
+                self.tracer.add(market, "scan", received, parsed)
+                self.tracer.start_span(market, "queue")
 
-            with self.lock:
-                current_capital = self.capital
+            # Update en attente coalescée (jamais évaluée) : sa trace est "superseded"
+            replaced = self.buffer.update(key, market)
+            if replaced is not None:
+                self.tracer.finish(replaced, "superseded")
 
-            if not self.kill_switch.validate(current_capital, self.starting_capital):
-                self.log.critical(f"KILL SWITCH — capital: {current_capital}")
-                self.running = False
-                return
+    # ============================================
+    # DECISION WORKERS
+    # ============================================
 
-            # AI EVALUATION (ensemble)
-            decision = self._evaluate_market(market)
+    def start_workers(self):
+        """Lance le pipeline décision (workers par étape) ou les shards."""
 
-            if decision is None:
-                return
+        self.decisions.start()
 
-            # CONFIDENCE CHECK
-            conf_ok, _ = self.confidence.validate(decision)
-            if not conf_ok:
-                return
+    def stop_workers(self, timeout=5):
 
-            # SIZE
-            size = self.optimizer.calculate_size(current_capital, decision["confidence"])
-            decision["size"] = size
+        self.running = False
+        self.decisions.stop(timeout)
 
-            # COST CHECK
-            cost_ok, _ = self.cost_calc.validate(decision)
-            if not cost_ok:
-                return
+    def _admit(self, item):
+        """Entrée du pipeline : pré-score + fast filter (~1ms)."""
 
-            # RISK CHECK
-            risk_ok, risk_reason = self.risk.validate_trade(
-                current_capital, size, decision["confidence"]
-            )
-            if not risk_ok:
-                self.log.risk(f"Blocked: {risk_reason}")
-                return
-
-            # EXECUTE INSTANTLY
-            order = self.errors.safe_execute(
-                self.execution.execute, decision,
-                default=None, context="ws_execution"
-            )
+        key, market = item
+        self.tracer.end_span(market, "queue")
 
-            if order is None:
-                return
-
-            pnl = order.get("pnl", 0)
-
-            # UPDATE STATE
-            with self.lock:
-                self.capital += pnl
-                self.total_pnl += pnl
-                self.total_trades += 1
-                if pnl > 0:
-                    self.wins += 1
-                else:
-                    self.losses += 1
-
-            self.risk.record_trade(pnl)
-            self.risk.update_capital(self.capital)
-            self.confidence.record_outcome(decision["confidence"], pnl > 0)
-
-            # DB
-            self.db.record_trade(
-                market=decision["market"],
-                side=decision["side"],
-                price=decision["price"],
-                size=size,
-                pnl=pnl,
-                confidence=decision["confidence"],
-                model=decision.get("model", ""),
-                source="websocket",
-                status=order.get("status", "SIMULATED"),
-            )
-            self._save_state()
+        # Capital lu sous self.lock, comme les autres étapes
+        with self.lock:
+            capital = self.capital
 
-            self.log.trade(
-                decision["market"], decision["side"],
-                size, pnl, decision["confidence"]
-            )
+        with self.filter_lock, self.tracer.span(market, "filter"):
+            if self.prescore and not self.scorer.admit(market, capital, self.confidence.get_threshold()):
+                passed = None
+            elif not self.filter.evaluate(market):
+                self.filter_rejected += 1
+                passed = False
+            else:
+                self.filter_passed += 1
+                passed = True
 
-        except Exception as e:
-            self.errors.handle(e, "on_message")
+        if not passed:
+            self.tracer.finish(market, "prescore_rejected" if passed is None else "filtered")
+            return None
+
+        return market
 
     def on_error(self, ws, error):
         self.log.error(f"WebSocket error: {error}")
@@ -289,17 +310,19 @@ class WebSocketOrchestrator:
     # ============================================
 
     def _parse_ws_message(self, data):
-        """Parse un message WebSocket Polymarket en format marché standard."""
+        """Parse un message WebSocket Polymarket -> liste de marchés standard.
+
+        Un message peut contenir plusieurs updates : toutes sont retournées."""
 
         # Format attendu des WS Polymarket (peut varier)
-        if isinstance(data, list):
-            for item in data:
-                parsed = self._parse_single(item)
-                if parsed:
-                    return parsed
-            return None
+        items = data if isinstance(data, list) else [data]
 
-        return self._parse_single(data)
+        markets = []
+        for item in items:
+            parsed = self._parse_single(item)
+            if parsed:
+                markets.append(parsed)
+        return markets
 
     def _parse_single(self, data):
         """Parse un seul update marché."""
@@ -317,8 +340,12 @@ class WebSocketOrchestrator:
         except (ValueError, TypeError):
             return None
 
+        try:
+            volume = float(data.get("volume", 0) or 0)
+        except (ValueError, TypeError):
+            return None
+
         market_name = data.get("market") or data.get("question") or data.get("asset_id", "unknown")
-        volume = float(data.get("volume", 0) or 0)
         token_id = data.get("token_id") or data.get("asset_id")
 
         return {
@@ -333,23 +360,13 @@ class WebSocketOrchestrator:
     # ============================================
 
     def _evaluate_market(self, market):
-        """Évalue via ensemble IA."""
+        """Évalue un marché via l'ensemble IA (modèles en parallèle, early-exit)."""
 
-        results = []
-        for client, model in zip(self.ai_clients, AI_MODELS):
-            result = self.errors.safe_execute(
-                client.evaluate, market, model,
-                default={"trade": False, "side": "NO", "confidence": 0},
-                context=f"ai_{model}"
-            )
-            results.append(result)
+        best = self.ensemble.evaluate(market)
 
-        trades = [r for r in results if r.get("trade", False)]
-        if not trades:
+        if best is None:
             return None
 
-        best = max(trades, key=lambda x: x.get("confidence", 0))
-
         return {
             "market": market["market"],
             "token_id": market.get("token_id"),
@@ -393,15 +410,61 @@ class WebSocketOrchestrator:
         self.log.info(f"  WS messages: {self.messages_received}")
         self.log.info(f"  Filter: {self.filter_passed} passed, {self.filter_rejected} rejected")
 
+        buf_status = self.buffer.get_status()
+        self.log.info(f"  Ingest: {buf_status['ingest_rate']} msg/s | coalesced:{buf_status['coalescing_ratio']}% | depth:{buf_status['depth']} in_flight:{buf_status['in_flight']} | parse_errors:{self.parse_errors}")
+
+        lines = format_shard_status(self.shard_pool) if self.shard_pool else format_pipeline_status(self.pipeline)
+        for line in lines + format_trace_status(self.tracer):
+            self.log.info(line)
+
+        cd_status = self.filter.cooldowns.get_status()
+        self.log.info(f"  Cooldown: {cd_status['size']} tracked | cooling:{cd_status['cooling']} shortened:{cd_status['shortened']} expired:{cd_status['expired']} evicted:{cd_status['evicted']} avg:{cd_status['avg_cooldown']}s")
+
+        cal_status = self.confidence.get_status()
+        calibration = " ".join(f"{m}:n={c['samples']},ece={c['ece']}" for m, c in cal_status["models"].items())
+        self.log.info(f"  Calibration: threshold {cal_status['threshold']} | {calibration}")
+
+        ps_status = self.scorer.get_status()
+        self.log.info(f"  Prescore: {ps_status['scored']} scored, {ps_status['rejected']} rejected ({ps_status['reject_rate']}%) | confidence:{ps_status['rejected_confidence']} cost:{ps_status['rejected_cost']}")
+
         for client, model in zip(self.ai_clients, AI_MODELS):
             bench = client.get_benchmark()
             self.log.info(f"  AI [{model}]: {bench['success_rate']}% success")
 
+        ai_cache = getattr(self.ai_clients[0], "cache", None)
+        if ai_cache is not None:
+            cache_status = ai_cache.get_status()
+            rates = " ".join(f"{m}:{r}%" for m, r in cache_status["hit_rate"].items())
+            self.log.info(f"  AI cache: {cache_status['size']} entries, {cache_status['hits']} hits | {rates}")
+
+        http_status = get_session_pool().get_stats()
+        self.log.info(f"  HTTP pool: {http_status['hosts']} hosts, {http_status['connections']} conns, {http_status['requests']} reqs, reuse:{http_status['reuse_rate']}%")
+
+        ens_status = self.ensemble.get_status()
+        self.log.info(f"  Ensemble [{ens_status['policy']}]: {ens_status['evaluations']} evals, early:{ens_status['early_exits']} cancelled:{ens_status['cancelled']} timeouts:{sum(ens_status['timeouts'].values())} avg:{ens_status['avg_latency']}s")
+
+        router_status = self.router.get_status()
+        for model, stats in router_status["models"].items():
+            self.log.info(f"  Router [{model}]: ewma:{stats['ewma_latency']}s p95:{stats['p95']}s success:{stats['success_rate']}% agree:{stats['agreement_rate']}% selected:{stats['selected']} skipped:{stats['skipped']} hedge_wins:{stats['hedges_won']}")
+
+        for name, cb in get_breakers_status("ai:").items():
+            self.log.info(f"  Breaker [{name[3:]}]: {cb['state']} fail:{cb['failure_rate']}% opened:{cb['times_opened']} rejected:{cb['rejected']} retry_in:{cb['retry_in']}s")
+
         risk_status = self.risk.get_status()
         self.log.info(f"  Risk: streak:{risk_status['loss_streak']} daily:{risk_status['daily_trades']}")
 
         err_status = self.errors.get_status()
         self.log.info(f"  Errors: {err_status['total_errors']} total")
+
+        # Persistence (write-behind)
+        db_status = self.db.get_status()
+        if db_status["write_behind"]:
+            self.log.info(f"  Persistence: pending:{db_status['pending']} batches:{db_status['batches']} written:{db_status['written']} avg_batch:{db_status['avg_batch']} coalesced:{db_status['coalesced']} failed:{db_status['failed']} max_lag:{db_status['max_lag_ms']}ms")
+
+        # Warm start snapshot
+        snap = self.snapshot.get_status()
+        self.log.info(f"  Snapshot: saves:{snap['saves']} failures:{snap['failures']} size:{snap['last_bytes']}B write:{snap['last_duration_ms']}ms | restored:{snap['restored']} age:{snap['restored_age']}s")
+
         self.log.info("=" * 50)
 
     # ============================================
@@ -433,6 +496,14 @@ class WebSocketOrchestrator:
                 self.errors.handle(e, "ws_connect")
                 time.sleep(RECONNECT_DELAY)
 
+    def _run_source(self):
+        """Source injectée (replay) à la place de la connexion live."""
+
+        try:
+            self.ws_source.run(self.on_message)
+        except Exception as e:
+            self.errors.handle(e, "ws_source")
+
     # ============================================
     # START / STOP
     # ============================================
@@ -444,11 +515,12 @@ class WebSocketOrchestrator:
         self.db.log_audit("SYSTEM_START", "WebSocket mode")
 
         ws_thread = threading.Thread(
-            target=self._connect,
+            target=self._run_source if self.ws_source else self._connect,
             name="websocket",
             daemon=True
         )
         ws_thread.start()
+        self.start_workers()
 
         last_report = time.time()
         last_backup = time.time()
@@ -461,13 +533,16 @@ class WebSocketOrchestrator:
 
                 if now - last_report >= REPORT_INTERVAL:
                     self.report()
-                    self.filter.cleanup()
+                    with self.filter_lock:
+                        self.filter.cleanup()
                     last_report = now
 
                 if now - last_backup >= BACKUP_INTERVAL:
                     self.db.backup()
                     last_backup = now
 
+                self.snapshot.maybe_save(self)
+
                 if not self.errors.is_system_healthy():
                     self.log.critical("System unhealthy — shutting down")
                     break
@@ -486,12 +561,20 @@ class WebSocketOrchestrator:
         if self.ws:
             self.ws.close()
 
-        time.sleep(1)
+        if self.ws_source:
+            self.ws_source.close()
+
+        self.stop_workers()
+        self.ensemble.shutdown()
         self.report()
         self._save_state()
+        self.snapshot.save(self)
         self.db.backup()
         self.db.log_audit("SYSTEM_STOP", "WebSocket shutdown")
         self.db.close()
+
+        if self.recorder:
+            self.recorder.close()
         self.log.info("Shutdown complete.")
 
 
@@ -1,6 +1,7 @@
-import json
 import requests
 
+from alpha_system.market.market_normalizer import normalize_market
+
 
 class PolymarketReader:
 
@@ -33,10 +34,7 @@ class PolymarketReader:
 
     def parse_prices(self, market):
 
-        prices_raw = market.get("outcomePrices", "[null, null]")
-        if isinstance(prices_raw, str):
-            return json.loads(prices_raw)
-        return prices_raw
+        return list(normalize_market(market).prices)
 
 
     def get_best_market(self):
@@ -52,32 +50,22 @@ class PolymarketReader:
 
             try:
 
-                if market.get("closed"):
-                    continue
+                normalized = normalize_market(market)
 
-                prices = self.parse_prices(market)
+                if normalized.closed:
+                    continue
 
-                if len(prices) < 2 or prices[0] is None:
+                if len(normalized.prices) < 2 or normalized.yes_price is None:
                     continue
 
                 question = market["question"]
-                price = float(prices[0])
-
-                # extraire token_id pour le trading LIVE
-                token_id = None
-                tokens_raw = market.get("clobTokenIds", "[]")
-                if isinstance(tokens_raw, str):
-                    tokens = json.loads(tokens_raw)
-                else:
-                    tokens = tokens_raw
-                if tokens:
-                    token_id = tokens[0]
 
                 return {
 
                     "market": question,
-                    "price": price,
-                    "token_id": token_id
+                    "price": normalized.yes_price,
+                    # token_id pour le trading LIVE
+                    "token_id": normalized.token_id
 
                 }
 
@@ -1,5 +1,6 @@
 import requests
-import json
+
+from alpha_system.market.market_normalizer import normalize_market
 
 API_URL = "https://gamma-api.polymarket.com/markets"
 
@@ -13,25 +14,16 @@ def analyze_market(market):
 
     title = market.get("question", "N/A")
 
-    prices_raw = market.get("outcomePrices", "[null, null]")
-    if isinstance(prices_raw, str):
-        prices = json.loads(prices_raw)
-    else:
-        prices = prices_raw
-
-    yes_price = prices[0] if len(prices) > 0 else None
-    no_price = prices[1] if len(prices) > 1 else None
+    normalized = normalize_market(market)
 
-    volume = market.get("volume", 0)
+    yes_price = normalized.yes_price
+    no_price = normalized.no_price
+    volume = normalized.volume
 
     # validation données
     if yes_price is None or no_price is None:
         return None
 
-    yes_price = float(yes_price)
-    no_price = float(no_price)
-    volume = float(volume)
-
     # logique Alpha
     tradable = True
     reasons = []